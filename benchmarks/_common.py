@@ -0,0 +1,87 @@
+#   Copyright 2026 Michael Rice <michael@michaelrice.org>
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Shared helpers for the scripts in ``benchmarks/``.
+
+The benchmarks are plain scripts, not part of the test suite. Each one
+builds its own throwaway SQLite file under a temp directory so runs
+don't interfere with each other or with a developer's ``steel_pigs.db``.
+"""
+
+import statistics
+import time
+
+from sqlalchemy import insert
+
+from steel_pigs.mac import mac_to_int
+from steel_pigs.plugins.providers.sql import ServerDataModel, ServerInterface, SwitchInfo
+from steel_pigs.synthetic import make_server, server_mac
+
+SERVER_NUMBER_BASE = 100000
+
+
+def switch_row(i):
+    return {
+        "server_number": SERVER_NUMBER_BASE + i,
+        "switch_name": f"sw-{i // 48:05d}",
+        "switch_port": str(i % 48),
+    }
+
+
+def interface_row(i, nic):
+    """ServerInterface row for server ``i``'s extra NIC ``nic`` (1-based)."""
+    return {
+        "server_number": SERVER_NUMBER_BASE + i,
+        "mac": mac_to_int(server_mac(SERVER_NUMBER_BASE + i, nic)),
+        "role": "data",
+    }
+
+
+def populate(engine, count, batch=10000, nics=0):
+    """Bulk-insert ``count`` servers (one switch port and ``nics`` extra
+    interfaces each) via executemany."""
+    with engine.begin() as conn:
+        for start in range(0, count, batch):
+            stop = min(start + batch, count)
+            conn.execute(
+                insert(ServerDataModel),
+                [make_server(SERVER_NUMBER_BASE + i) for i in range(start, stop)],
+            )
+            conn.execute(insert(SwitchInfo), [switch_row(i) for i in range(start, stop)])
+            if nics:
+                conn.execute(
+                    insert(ServerInterface),
+                    [interface_row(i, n) for i in range(start, stop) for n in range(1, nics + 1)],
+                )
+
+
+def time_calls(fn, args_list):
+    """Call ``fn(*args)`` for each entry; return per-call latencies in ms."""
+    samples = []
+    for args in args_list:
+        t0 = time.perf_counter()
+        fn(*args)
+        samples.append((time.perf_counter() - t0) * 1000)
+    return samples
+
+
+def summarize(samples):
+    """mean / p50 / p99 of a list of millisecond samples."""
+    ordered = sorted(samples)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    return {
+        "mean": statistics.fmean(ordered),
+        "p50": statistics.median(ordered),
+        "p99": p99,
+    }
@@ -0,0 +1,225 @@
+#   Copyright 2026 Michael Rice <michael@michaelrice.org>
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Concurrent PXE boots one worker process keeps in flight, sync vs async.
+
+Each stack serves ``GET /pxe?mac=...`` from one process with
+``--threads`` request threads while ``--clients`` simulated servers
+boot in a loop:
+
+* ``sync`` -- ``steel_pigs.asgi`` under uvicorn with the blocking
+  ``SQL`` provider.
+* ``async`` -- the same, with the ``AsyncSQL`` provider
+  (``STEEL_PIGS_ASYNC_DB=1``).
+* ``gthread`` -- the WSGI app with the ``SQL`` provider in one gunicorn
+  gthread worker, as deployed; skipped without gunicorn.
+
+All three get the same thread count, so the difference is the provider
+and not the pool. Each request thread still blocks until its view
+returns; what ``AsyncSQL`` changes is that a lookup waits on the event
+loop instead of holding one of the ``SQL`` provider's pooled
+connections (``pool_size`` + ``max_overflow``, 15 by default).
+
+Every SELECT sleeps ``--latency-ms`` inside the SQLite driver to stand
+in for a database across the network. "In flight" is throughput times
+that latency: how many boots were waiting on the database at once, on
+average. Needs the ``async`` extra. Run from the repo root::
+
+    python benchmarks/bench_async_boots.py
+    python benchmarks/bench_async_boots.py --clients 200 --latency-ms 50
+"""
+
+import argparse
+import http.client
+import importlib.util
+import os
+import random
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from _common import SERVER_NUMBER_BASE, populate, summarize
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.util import await_only
+
+from steel_pigs.plugins.providers.sql import SQL
+from steel_pigs.synthetic import server_mac
+
+STACKS = ("sync", "async", "gthread")
+
+
+def _inject_latency(seconds):
+    def delay(statement):
+        if statement.lstrip().upper().startswith("SELECT"):
+            time.sleep(seconds)
+
+    @event.listens_for(Engine, "connect")
+    def _slow(dbapi_connection, connection_record):
+        driver = connection_record.driver_connection
+        if isinstance(driver, sqlite3.Connection):
+            driver.set_trace_callback(delay)
+        else:  # aiosqlite: the callback runs on its connection thread
+            await_only(driver.set_trace_callback(delay))
+
+
+def serve(args):
+    os.environ["STEEL_PIGS_DATABASE_URL"] = f"sqlite:///{args.db}"
+    os.environ["STEEL_PIGS_ASYNC_DB"] = "1" if args.serve == "async" else "0"
+    os.environ["STEEL_PIGS_ASGI_THREADS"] = str(args.threads)
+    _inject_latency(args.latency_ms / 1000)
+    if args.serve == "gthread":
+        from gunicorn.app.base import BaseApplication
+
+        class Worker(BaseApplication):
+            def load_config(self):
+                self.cfg.set("bind", f"127.0.0.1:{args.port}")
+                self.cfg.set("workers", 1)
+                self.cfg.set("worker_class", "gthread")
+                self.cfg.set("threads", args.threads)
+                self.cfg.set("loglevel", "warning")
+
+            def load(self):
+                from steel_pigs.webapp import app
+
+                return app
+
+        Worker().run()
+    else:
+        import uvicorn
+
+        from steel_pigs.asgi import app
+
+        uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _get(port, path, timeout=60):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=timeout)
+    try:
+        conn.request("GET", path)
+        response = conn.getresponse()
+        response.read()
+        return response.status
+    finally:
+        conn.close()
+
+
+def _wait_ready(port, proc):
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("server exited during startup")
+        try:
+            if _get(port, "/healthz", timeout=1) == 200:
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("server did not come up")
+
+
+def boot_storm(port, rows, clients, seconds):
+    """Run ``clients`` booting loops for ``seconds``.
+
+    :return: (latencies in ms, errors, wall seconds until the last
+        outstanding boot finished)
+    """
+    latencies, errors = [], []
+    start = time.monotonic()
+    deadline = start + seconds
+
+    def client(seed):
+        rng = random.Random(seed)
+        while time.monotonic() < deadline:
+            t0 = time.perf_counter()
+            try:
+                status = _get(
+                    port, f"/pxe?mac={server_mac(SERVER_NUMBER_BASE + rng.randrange(rows))}"
+                )
+            except OSError as exc:
+                errors.append(repr(exc))
+                continue
+            if status != 200:
+                errors.append(status)
+                continue
+            latencies.append((time.perf_counter() - t0) * 1000)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors, time.monotonic() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--threads", type=int, default=64)
+    parser.add_argument("--serve", choices=STACKS, help=argparse.SUPPRESS)
+    parser.add_argument("--db", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve:
+        return serve(args)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        db = Path(workdir) / "boots.db"
+        sql = SQL({"engine": f"sqlite:///{db}"})
+        populate(sql.engine, args.rows)
+        sql.engine.dispose()
+
+        print(
+            f"{args.clients} clients, {args.threads} threads, "
+            f"{args.latency_ms:g} ms per SELECT, {args.seconds:g} s each"
+        )
+        print(f"{'stack':<7} {'boots/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'in flight':>10} errors")
+        for stack in STACKS:
+            if stack == "gthread" and importlib.util.find_spec("gunicorn") is None:
+                print(f"{stack:<7} skipped, gunicorn is not installed")
+                continue
+            port = _free_port()
+            proc = subprocess.Popen(
+                [sys.executable, __file__, "--serve", stack, "--db", str(db), "--port", str(port)]
+                + ["--latency-ms", str(args.latency_ms), "--threads", str(args.threads)],
+            )
+            try:
+                _wait_ready(port, proc)
+                latencies, errors, elapsed = boot_storm(port, args.rows, args.clients, args.seconds)
+            finally:
+                proc.terminate()
+                proc.wait()
+            rate = len(latencies) / elapsed
+            s = summarize(latencies)
+            print(
+                f"{stack:<7} {rate:>8.1f} {s['p50']:>8.1f} {s['p99']:>8.1f} "
+                f"{rate * args.latency_ms / 1000:>10.2f} {len(errors)}"
+            )
+
+
+if __name__ == "__main__":
+    main()
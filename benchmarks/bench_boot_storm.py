@@ -0,0 +1,129 @@
+#   Copyright 2026 Michael Rice <michael@michaelrice.org>
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Boot-status callbacks during a boot storm, with and without write-behind.
+
+``--racks`` racks of ``--nodes`` servers kick at once. Every node
+reports ``kicking``, ``provision`` and ``done`` through
+``update_server_field`` (what ``POST /v1/update/status`` calls), a few
+milliseconds apart, from its own thread. Each run reports the database
+commits per second, the callbacks per second and the callback latency:
+
+* ``direct`` -- every callback is its own transaction.
+* ``write-behind`` -- ``WriteBehindProvider``: acknowledged once queued,
+  committed in batches every ``--window-ms``.
+* ``sync-ack`` -- the same buffer, but each callback waits for its
+  batch to commit.
+
+Every COMMIT sleeps ``--commit-latency-ms`` to stand in for a database
+that flushes to disk across the network. Run from the repo root::
+
+    python benchmarks/bench_boot_storm.py
+    python benchmarks/bench_boot_storm.py --racks 10 --commit-latency-ms 10
+"""
+
+import argparse
+import random
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from _common import SERVER_NUMBER_BASE, populate, summarize
+from sqlalchemy import event
+
+from steel_pigs.plugins.providers.sql import SQL
+from steel_pigs.plugins.providers.writebehind import WriteBehindProvider
+
+STATUSES = ("kicking", "provision", "done")
+
+
+def _count_commits(engine, latency):
+    commits = []
+
+    @event.listens_for(engine, "commit")
+    def _commit(conn):
+        time.sleep(latency)
+        commits.append(1)
+
+    return commits
+
+
+def storm(provider, servers, gap):
+    """Run every server's callbacks; return (latencies in ms, wall seconds)."""
+    latencies = []
+    start = threading.Barrier(len(servers))
+
+    def node(number, seed):
+        rng = random.Random(seed)
+        start.wait()
+        for status in STATUSES:
+            t0 = time.perf_counter()
+            provider.update_server_field(number, "boot_status", status)
+            latencies.append((time.perf_counter() - t0) * 1000)
+            time.sleep(rng.uniform(0, gap))
+
+    threads = [threading.Thread(target=node, args=(n, n)) for n in servers]
+    t0 = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--racks", type=int, default=5)
+    parser.add_argument("--nodes", type=int, default=40)
+    parser.add_argument("--commit-latency-ms", type=float, default=5)
+    parser.add_argument("--window-ms", type=float, default=50)
+    parser.add_argument("--gap-ms", type=float, default=20, help="max pause between callbacks")
+    args = parser.parse_args()
+    count = args.racks * args.nodes
+    servers = [SERVER_NUMBER_BASE + i for i in range(count)]
+
+    print(
+        f"{count} servers x {len(STATUSES)} callbacks, "
+        f"{args.commit_latency_ms:g} ms per COMMIT, {args.window_ms:g} ms window"
+    )
+    print(
+        f"{'mode':<13} {'callbacks/s':>11} {'commits':>8} {'commits/s':>10} "
+        f"{'p50 ms':>8} {'p99 ms':>8}"
+    )
+    for mode in ("direct", "write-behind", "sync-ack"):
+        with tempfile.TemporaryDirectory() as workdir:
+            sql = SQL({"engine": f"sqlite:///{Path(workdir) / 'storm.db'}"})
+            populate(sql.engine, count)
+            commits = _count_commits(sql.engine, args.commit_latency_ms / 1000)
+            provider = sql
+            if mode != "direct":
+                provider = WriteBehindProvider(
+                    sql, window_seconds=args.window_ms / 1000, sync_ack=mode == "sync-ack"
+                )
+            latencies, elapsed = storm(provider, servers, args.gap_ms / 1000)
+            if provider is not sql:
+                provider.close()
+            elapsed = max(elapsed, 1e-9)
+            assert all(sql.get_server_by_number(n)["boot_status"] == STATUSES[-1] for n in servers)
+            s = summarize(latencies)
+            print(
+                f"{mode:<13} {len(latencies) / elapsed:>11.0f} {len(commits):>8} "
+                f"{len(commits) / elapsed:>10.1f} {s['p50']:>8.2f} {s['p99']:>8.2f}"
+            )
+            sql.engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
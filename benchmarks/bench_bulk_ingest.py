@@ -0,0 +1,106 @@
+#   Copyright 2026 Michael Rice <michael@michaelrice.org>
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Registration throughput: one POST /v1/servers per server vs /v1/servers:bulk.
+
+Each mode gets a fresh SQLite file and a fresh app, driven through the
+Flask test client (no network), so the numbers are validation +
+transaction + audit cost per server. Run from the repo root::
+
+    python benchmarks/bench_bulk_ingest.py --count 5000
+"""
+
+import argparse
+import json
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from _common import SERVER_NUMBER_BASE
+
+from steel_pigs.synthetic import make_server
+
+TOKEN = "bench-token"
+HEADERS = {"Authorization": f"Bearer {TOKEN}"}
+
+
+def _app(workdir, name):
+    os.environ["STEEL_PIGS_DATABASE_URL"] = f"sqlite:///{Path(workdir) / name}"
+    os.environ["STEEL_PIGS_API_TOKEN"] = TOKEN
+    from steel_pigs import pigs_config
+    from steel_pigs.plugins.providers.sql import SQL
+    from steel_pigs.webapp import Plugins, _load_plugin, create_app
+
+    plugins = {
+        attr: _load_plugin(getattr(pigs_config, key))
+        for attr, key in {
+            "version": "VERSION_PROVIDER_PLUGIN",
+            "formatter": "FORMATTER_PROVIDER_PLUGIN",
+            "pxe": "PXE_PROVIDER_PLUGIN",
+            "provision": "PROVISION_PROVIDER_PLUGIN",
+            "auth": "AUTH_PROVIDER_PLUGIN",
+        }.items()
+    }
+    sql = SQL({"engine": os.environ["STEEL_PIGS_DATABASE_URL"]})
+    return create_app(plugins=Plugins(server_data=sql, **plugins)).test_client()
+
+
+def single(client, count):
+    for i in range(count):
+        rv = client.post("/v1/servers", json=make_server(SERVER_NUMBER_BASE + i), headers=HEADERS)
+        assert rv.status_code == 201, rv.data
+
+
+def bulk_json(client, count):
+    rv = client.post(
+        "/v1/servers:bulk",
+        json=[make_server(SERVER_NUMBER_BASE + i) for i in range(count)],
+        headers=HEADERS,
+    )
+    assert rv.get_json()["created"] == count, rv.data
+
+
+def bulk_ndjson(client, count):
+    body = "\n".join(json.dumps(make_server(SERVER_NUMBER_BASE + i)) for i in range(count))
+    rv = client.post(
+        "/v1/servers:bulk", data=body, content_type="application/x-ndjson", headers=HEADERS
+    )
+    assert rv.get_json()["created"] == count, rv.data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=5000)
+    args = parser.parse_args()
+    # Audit lines would dominate the terminal (and the timing).
+    logging.getLogger("steel_pigs.audit").setLevel(logging.WARNING)
+
+    print(f"{'mode':<14} {'servers':>8} {'seconds':>8} {'servers/s':>10}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, fn in (
+            ("single", single),
+            ("bulk json", bulk_json),
+            ("bulk ndjson", bulk_ndjson),
+        ):
+            client = _app(workdir, name.replace(" ", "_") + ".db")
+            t0 = time.perf_counter()
+            fn(client, args.count)
+            elapsed = time.perf_counter() - t0
+            print(f"{name:<14} {args.count:>8} {elapsed:>8.2f} {args.count / elapsed:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#   Copyright 2026 Michael Rice <michael@michaelrice.org>
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Fan-out of the change feed to many concurrent long-polling consumers.
+
+``--waiters`` threads each loop the way a ``GET /v1/changes?wait=``
+consumer does: ``wait_for_changes(cursor)``, then ``list_changes``,
+then advance the cursor. The main thread makes ``--rounds`` writes and,
+for each, waits until every consumer has received it. Reported per
+waiter count:
+
+* latency from the start of the write to each consumer holding the
+  batch (p50 / p99 / max);
+* database statements per write, all consumers included. Polling the
+  log once per consumer would cost one per waiter per poll interval.
+
+``--writer other`` makes the writes through a second provider on the
+same file, as another worker process would: consumers then learn of
+them by polling, every ``--poll`` seconds.
+
+Run from the repo root::
+
+    python benchmarks/bench_change_feed.py
+    python benchmarks/bench_change_feed.py --waiters 10 100 1000 --writer other
+"""
+
+import argparse
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from _common import SERVER_NUMBER_BASE, populate, summarize
+from sqlalchemy import event
+
+from steel_pigs.plugins.providers.sql import SQL
+
+
+def _consumer(sql, cursor, rounds, received, stop):
+    for _ in range(rounds):
+        while not stop.is_set():
+            if sql.wait_for_changes(cursor, 5):
+                changes = sql.list_changes(cursor, 100)
+                if changes:
+                    cursor = changes[-1]["seq"]
+                    received.append(time.perf_counter())
+                    break
+
+
+def run(url, waiters, rounds, writer_kind, poll):
+    sql = SQL({"engine": url, "change_poll_seconds": poll})
+    writer = sql if writer_kind == "same" else SQL({"engine": url})
+    statements = [0]
+
+    def count(*args):
+        statements[0] += 1
+
+    cursor = sql.change_feed.head()
+    inbox = [[] for _ in range(waiters)]
+    stop = threading.Event()
+    threads = [
+        threading.Thread(target=_consumer, args=(sql, cursor, rounds, inbox[i], stop))
+        for i in range(waiters)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.2 + poll)
+
+    latencies = []
+    event.listen(sql.engine, "before_cursor_execute", count)
+    try:
+        for r in range(rounds):
+            start = time.perf_counter()
+            writer.set_boot_status(SERVER_NUMBER_BASE + r, "online")
+            deadline = time.monotonic() + 10 + poll
+            while any(len(box) <= r for box in inbox) and time.monotonic() < deadline:
+                time.sleep(0.0005)
+            latencies.extend((box[r] - start) * 1000 for box in inbox if len(box) > r)
+            # Let the consumers settle back into wait_for_changes.
+            time.sleep(0.05)
+    finally:
+        event.remove(sql.engine, "before_cursor_execute", count)
+        stop.set()
+        for thread in threads:
+            thread.join()
+    if writer is not sql:
+        writer.engine.dispose()
+    sql.engine.dispose()
+    return latencies, statements[0] / rounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--waiters", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--writer", choices=("same", "other"), default="same")
+    parser.add_argument("--poll", type=float, default=1.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        url = f"sqlite:///{Path(workdir) / 'changes.db'}"
+        populate(SQL({"engine": url}).engine, args.rounds)
+        print(f"writer: {args.writer} process, poll every {args.poll}s")
+        print(
+            f"{'waiters':>8} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9} "
+            f"{'stmts/write':>12} {'delivered':>10}"
+        )
+        for waiters in args.waiters:
+            latencies, per_write = run(url, waiters, args.rounds, args.writer, args.poll)
+            s = summarize(latencies)
+            print(
+                f"{waiters:>8} {s['p50']:>9.2f} {s['p99']:>9.2f} {max(latencies):>9.2f} "
+                f"{per_write:>12.1f} {len(latencies):>10}/{waiters * args.rounds}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#   Copyright 2026 Michael Rice <michael@michaelrice.org>
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""``get_server_by_mac`` latency with several NICs per server.
+
+For each NIC count the script builds a SQLite file with ``--servers``
+servers, each with that many extra ``ServerInterface`` rows, and times
+lookups by primary MAC, by a random other NIC and by an unknown MAC
+(which probes both indexes). Also reports the size of the unique MAC
+index from SQLite's ``dbstat`` table. Run from the repo root::
+
+    python benchmarks/bench_interfaces.py
+    python benchmarks/bench_interfaces.py --servers 10000 --nics 1 3
+"""
+
+import argparse
+import random
+import tempfile
+from pathlib import Path
+
+from _common import SERVER_NUMBER_BASE, populate, summarize, time_calls
+
+from steel_pigs.plugins.providers.sql import SQL
+from steel_pigs.synthetic import server_mac
+
+
+def run(servers, nics, lookups, workdir):
+    url = f"sqlite:///{Path(workdir) / f'nics_{nics}.db'}"
+    sql = SQL({"engine": url})
+    populate(sql.engine, servers, nics=nics)
+    rng = random.Random(nics)
+    picks = rng.sample(range(servers), min(lookups, servers))
+    keys = {
+        "primary": [(server_mac(SERVER_NUMBER_BASE + i),) for i in picks],
+        "other nic": [
+            (server_mac(SERVER_NUMBER_BASE + i, rng.randint(1, nics)).upper().replace(":", "-"),)
+            for i in picks
+        ],
+        "unknown": [(server_mac(SERVER_NUMBER_BASE + servers + i),) for i in picks],
+    }
+    results = {
+        kind: summarize(time_calls(sql.get_server_by_mac, args)) for kind, args in keys.items()
+    }
+    for (mac,) in keys["other nic"][:10]:
+        assert sql.get_server_by_mac(mac) is not None, mac
+    with sql.engine.connect() as conn:
+        index_bytes = conn.exec_driver_sql(
+            "SELECT SUM(pgsize) FROM dbstat WHERE name = 'ix_ServerInterface_mac'"
+        ).scalar()
+    sql.engine.dispose()
+    return results, index_bytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--servers", type=int, default=100_000)
+    parser.add_argument("--nics", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--lookups", type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f"{args.servers} servers")
+    print(f"{'nics':>4} {'mac index MiB':>14} {'lookup':<10} {'p50 ms':>8} {'p99 ms':>8}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for nics in args.nics:
+            results, index_bytes = run(args.servers, nics, args.lookups, workdir)
+            for kind, s in results.items():
+                print(
+                    f"{nics:>4} {index_bytes / 2**20:>14.1f} {kind:<10} "
+                    f"{s['p50']:>8.3f} {s['p99']:>8.3f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#   Copyright 2026 Michael Rice <michael@michaelrice.org>
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Page latency of ``SQL.list_servers`` deep into the table.
+
+Builds a SQLite file with ``--rows`` servers, one in every hundred
+``online``, and times fetching a page starting at several depths:
+
+* ``keyset`` -- ``list_servers(after=...)``, what ``GET /v1/servers``
+  runs;
+* ``offset`` -- the same page through ``LIMIT ... OFFSET``, for
+  comparison;
+* ``online`` -- ``list_servers`` filtered to the 1% ``online`` servers,
+  at the same depth in the server_number range.
+
+Run from the repo root::
+
+    python benchmarks/bench_list_pages.py
+    python benchmarks/bench_list_pages.py --rows 100000 --page 1000
+"""
+
+import argparse
+import tempfile
+from pathlib import Path
+
+from _common import SERVER_NUMBER_BASE, populate, summarize, time_calls
+from sqlalchemy import select, update
+
+from steel_pigs.plugins.providers.sql import SQL, ServerDataModel
+
+_SERVER = ServerDataModel.__table__
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--page", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        sql = SQL({"engine": f"sqlite:///{Path(workdir) / 'pages.db'}"})
+        populate(sql.engine, args.rows)
+        with sql.engine.begin() as conn:
+            conn.execute(
+                update(_SERVER)
+                .where(_SERVER.c.server_number % 100 == 0)
+                .values(operational_status="online")
+            )
+
+        def by_offset(offset):
+            stmt = select(_SERVER).order_by(_SERVER.c.server_number)
+            with sql.engine.connect() as conn:
+                return conn.execute(stmt.limit(args.page).offset(offset)).all()
+
+        print(f"{args.rows} rows, {args.page} per page")
+        print(f"{'depth':>9} {'keyset p50':>11} {'offset p50':>11} {'online p50':>11}  (ms)")
+        depths = sorted({0, 10_000, 100_000, args.rows // 2, args.rows - args.page})
+        for depth in (d for d in depths if d < args.rows):
+            after = SERVER_NUMBER_BASE + depth - 1
+            keyset = time_calls(sql.list_servers, [(after, args.page)] * args.repeat)
+            offset = time_calls(by_offset, [(depth,)] * args.repeat)
+            online = time_calls(
+                lambda a: sql.list_servers(a, args.page, operational_status="online"),
+                [(after,)] * args.repeat,
+            )
+            print(
+                f"{depth:>9} {summarize(keyset)['p50']:>11.3f} "
+                f"{summarize(offset)['p50']:>11.3f} {summarize(online)['p50']:>11.3f}"
+            )
+        sql.engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#   Copyright 2026 Michael Rice <michael@michaelrice.org>
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Lookup latency of the SQL provider with and without the lookup indexes.
+
+For each table size the script builds a SQLite file at head, times
+``get_server_by_mac`` / ``get_server_by_name`` / ``get_server_by_switch``,
+then drops every secondary index (the initial revision had none) and
+times the same calls again. Run from the repo root::
+
+    python benchmarks/bench_lookup_indexes.py
+    python benchmarks/bench_lookup_indexes.py --sizes 10000 100000 --lookups 50
+"""
+
+import argparse
+import random
+import tempfile
+from pathlib import Path
+
+from _common import SERVER_NUMBER_BASE, populate, summarize, switch_row, time_calls
+from sqlalchemy import inspect
+
+from steel_pigs.plugins.providers.sql import SQL
+from steel_pigs.synthetic import server_mac
+
+
+def _measure(sql, picks):
+    macs = [(server_mac(SERVER_NUMBER_BASE + i),) for i in picks]
+    names = [(f"node-{SERVER_NUMBER_BASE + i}",) for i in picks]
+    switches = [(switch_row(i)["switch_name"], switch_row(i)["switch_port"]) for i in picks]
+    return {
+        "mac": summarize(time_calls(sql.get_server_by_mac, macs)),
+        "hostname": summarize(time_calls(sql.get_server_by_name, names)),
+        "switch/port": summarize(time_calls(sql.get_server_by_switch, switches)),
+    }
+
+
+def run(size, lookups, workdir):
+    url = f"sqlite:///{Path(workdir) / f'lookup_{size}.db'}"
+    sql = SQL({"engine": url})
+    populate(sql.engine, size)
+    picks = random.Random(size).sample(range(size), min(lookups, size))
+    indexed = _measure(sql, picks)
+    # Downgrading would drop columns the provider selects, so drop the
+    # indexes by hand instead.
+    with sql.engine.begin() as conn:
+        for table in ("ServerData", "SwitchInfo"):
+            for index in inspect(conn).get_indexes(table):
+                conn.exec_driver_sql(f'DROP INDEX "{index["name"]}"')
+    scanned = _measure(sql, picks)
+    sql.engine.dispose()
+    return scanned, indexed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--lookups", type=int, default=100, help="lookups per key type")
+    args = parser.parse_args()
+
+    print(
+        f"{'rows':>9} {'key':<12} {'before p50':>11} {'before p99':>11} "
+        f"{'after p50':>10} {'after p99':>10}  (ms)"
+    )
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in args.sizes:
+            before, after = run(size, args.lookups, workdir)
+            for key in before:
+                b, a = before[key], after[key]
+                print(
+                    f"{size:>9} {key:<12} {b['p50']:>11.3f} {b['p99']:>11.3f} "
+                    f"{a['p50']:>10.3f} {a['p99']:>10.3f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#   Copyright 2026 Michael Rice <michael@michaelrice.org>
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""MAC index size and lookup speed: string column vs integer column.
+
+For each table size the script builds a SQLite file at head, adds the
+old ``primary_mac`` string index next to the ``primary_mac_int`` one
+and reports:
+
+* the on-disk size of each index (from SQLite's ``dbstat`` table);
+* the latency of a bare indexed ``SELECT id`` on each column, so the
+  difference is the index alone;
+* the latency of ``get_server_by_mac``, which parses the MAC first.
+
+Run from the repo root::
+
+    python benchmarks/bench_mac_index.py
+    python benchmarks/bench_mac_index.py --sizes 100000 --lookups 2000
+"""
+
+import argparse
+import random
+import tempfile
+from pathlib import Path
+
+from _common import SERVER_NUMBER_BASE, populate, summarize, time_calls
+from sqlalchemy import Index, bindparam, select
+
+from steel_pigs.mac import mac_to_int
+from steel_pigs.plugins.providers.sql import SQL, ServerDataModel
+from steel_pigs.synthetic import server_mac
+
+_SERVER = ServerDataModel.__table__
+_STRING_INDEX = Index("bench_ServerData_primary_mac", _SERVER.c.primary_mac)
+
+
+def _index_bytes(conn, name):
+    return conn.exec_driver_sql("SELECT SUM(pgsize) FROM dbstat WHERE name = ?", (name,)).scalar()
+
+
+def run(size, lookups, workdir):
+    url = f"sqlite:///{Path(workdir) / f'mac_{size}.db'}"
+    sql = SQL({"engine": url})
+    populate(sql.engine, size)
+    _STRING_INDEX.create(sql.engine)
+    picks = random.Random(size).sample(range(size), min(lookups, size))
+    macs = [server_mac(SERVER_NUMBER_BASE + i) for i in picks]
+    by_string = select(_SERVER.c.id).where(_SERVER.c.primary_mac == bindparam("v"))
+    by_int = select(_SERVER.c.id).where(_SERVER.c.primary_mac_int == bindparam("v"))
+    with sql.engine.connect() as conn:
+        sizes = {
+            "string": _index_bytes(conn, _STRING_INDEX.name),
+            "int": _index_bytes(conn, "ix_ServerData_primary_mac_int"),
+        }
+        latency = {
+            "string": summarize(
+                time_calls(
+                    lambda m: conn.execute(by_string, {"v": m}).scalar(), [(m,) for m in macs]
+                )
+            ),
+            "int": summarize(
+                time_calls(
+                    lambda m: conn.execute(by_int, {"v": mac_to_int(m)}).scalar(),
+                    [(m,) for m in macs],
+                )
+            ),
+        }
+    lookup = summarize(time_calls(sql.get_server_by_mac, [(m,) for m in macs]))
+    sql.engine.dispose()
+    return sizes, latency, lookup
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--lookups", type=int, default=1000)
+    args = parser.parse_args()
+
+    print(
+        f"{'rows':>9} {'column':<7} {'index KiB':>10} {'B/row':>6} "
+        f"{'select p50':>11} {'select p99':>11}  (ms)"
+    )
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in args.sizes:
+            sizes, latency, lookup = run(size, args.lookups, workdir)
+            for column in ("string", "int"):
+                s = latency[column]
+                print(
+                    f"{size:>9} {column:<7} {sizes[column] / 1024:>10.0f} "
+                    f"{sizes[column] / size:>6.1f} {s['p50']:>11.4f} {s['p99']:>11.4f}"
+                )
+            print(
+                f"{size:>9} get_server_by_mac p50 {lookup['p50']:.4f} ms, "
+                f"p99 {lookup['p99']:.4f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
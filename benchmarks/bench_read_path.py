@@ -0,0 +1,121 @@
+#   Copyright 2026 Michael Rice <michael@michaelrice.org>
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Per-lookup CPU time and allocations: ORM read path vs the Core one.
+
+``orm`` is the previous implementation: an ORM ``select()`` with the
+zone and switches joined-eager-loaded, turned into a dict attribute by
+attribute. ``core`` is ``SQL.get_server_by_*`` as shipped: a cached
+Core statement whose rows are folded straight into the dict. Both hit
+the same SQLite file and return equal dicts. Run from the repo root::
+
+    python benchmarks/bench_read_path.py
+    python benchmarks/bench_read_path.py --rows 100000 --lookups 5000
+"""
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from _common import SERVER_NUMBER_BASE, populate
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload, sessionmaker
+
+from steel_pigs.plugins.providers.sql import SQL, ServerDataModel, _row_to_dict
+from steel_pigs.synthetic import server_mac
+
+
+def orm_lookup(session_factory, mac):
+    stmt = (
+        select(ServerDataModel)
+        .options(
+            joinedload(ServerDataModel.provision_zone),
+            joinedload(ServerDataModel.switches),
+        )
+        .where(ServerDataModel.primary_mac == mac)
+        .limit(1)
+    )
+    with session_factory() as s:
+        server = s.execute(stmt).unique().scalar_one_or_none()
+        if server is None:
+            return None
+        ret = _row_to_dict(server)
+        ret["provision_zone"] = _row_to_dict(server.provision_zone)
+        ret["switches"] = [_row_to_dict(switch) for switch in server.switches]
+        return ret
+
+
+def _cpu_us(fn, keys):
+    samples = []
+    for key in keys:
+        t0 = time.process_time_ns()
+        fn(key)
+        samples.append((time.process_time_ns() - t0) / 1000)
+    return statistics.fmean(samples)
+
+
+def _alloc(fn, keys):
+    """Mean peak bytes traced above the baseline during one call."""
+    peaks = []
+    tracemalloc.start()
+    try:
+        for key in keys:
+            base = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            fn(key)
+            peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    finally:
+        tracemalloc.stop()
+    return statistics.fmean(peaks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--lookups", type=int, default=2_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        sql = SQL({"engine": f"sqlite:///{Path(workdir) / 'read_path.db'}"})
+        populate(sql.engine, args.rows)
+        session_factory = sessionmaker(bind=sql.engine)
+        rng = random.Random(args.rows)
+        keys = [
+            server_mac(SERVER_NUMBER_BASE + rng.randrange(args.rows)) for _ in range(args.lookups)
+        ]
+
+        paths = {
+            "orm": lambda mac: orm_lookup(session_factory, mac),
+            "core": sql.get_server_by_mac,
+        }
+        assert paths["orm"](keys[0]) == paths["core"](keys[0])
+        for fn in paths.values():
+            for key in keys[:100]:  # warm statement caches
+                fn(key)
+
+        print(f"{args.rows} rows, {args.lookups} get_server_by_mac calls per path")
+        print(f"{'path':<6} {'cpu us/call':>12} {'peak KiB/call':>14}")
+        for name, fn in paths.items():
+            cpu = _cpu_us(fn, keys)
+            peak = _alloc(fn, keys) / 1024
+            print(f"{name:<6} {cpu:>12.1f} {peak:>14.1f}")
+        sql.engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
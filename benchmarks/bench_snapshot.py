@@ -0,0 +1,85 @@
+#   Copyright 2026 Michael Rice <michael@michaelrice.org>
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Memory footprint and lookup latency of the snapshot provider.
+
+Memory is what ``tracemalloc`` still holds after the snapshot has
+loaded, scaled to 100k servers. Latency compares the snapshot with the
+``SQL`` provider on the same file, per key type. Run from the repo
+root::
+
+    python benchmarks/bench_snapshot.py
+    python benchmarks/bench_snapshot.py --rows 100000 --lookups 5000
+"""
+
+import argparse
+import gc
+import random
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+from _common import SERVER_NUMBER_BASE, populate, summarize, switch_row, time_calls
+
+from steel_pigs.plugins.providers.snapshot import SnapshotProvider
+from steel_pigs.plugins.providers.sql import SQL
+from steel_pigs.synthetic import server_mac
+
+
+def _lookups(picks):
+    return {
+        "mac": ("get_server_by_mac", [(server_mac(SERVER_NUMBER_BASE + i),) for i in picks]),
+        "hostname": ("get_server_by_name", [(f"node-{SERVER_NUMBER_BASE + i}",) for i in picks]),
+        "switch/port": (
+            "get_server_by_switch",
+            [(switch_row(i)["switch_name"], switch_row(i)["switch_port"]) for i in picks],
+        ),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--lookups", type=int, default=2_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        config = {"engine": f"sqlite:///{Path(workdir) / 'snapshot.db'}"}
+        sql = SQL(config)
+        populate(sql.engine, args.rows)
+
+        gc.collect()
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        snapshot = SnapshotProvider(config)
+        gc.collect()
+        held = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+        print(
+            f"{args.rows} servers: {held / 2**20:.1f} MiB held, "
+            f"{held / args.rows * 100_000 / 2**20:.1f} MiB per 100k servers"
+        )
+
+        picks = random.Random(args.rows).choices(range(args.rows), k=args.lookups)
+        print(f"{'key':<12} {'sql p50':>9} {'sql p99':>9} {'snap p50':>9} {'snap p99':>9}  (ms)")
+        for key, (method, calls) in _lookups(picks).items():
+            s = summarize(time_calls(getattr(sql, method), calls))
+            n = summarize(time_calls(getattr(snapshot, method), calls))
+            print(f"{key:<12} {s['p50']:>9.4f} {s['p99']:>9.4f} {n['p50']:>9.4f} {n['p99']:>9.4f}")
+        sql.engine.dispose()
+        snapshot.source.engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#   Copyright 2026 Michael Rice <michael@michaelrice.org>
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Worker startup time: revision check vs Alembic upgrade on every boot.
+
+Each sample is a fresh interpreter against an already-migrated SQLite
+file:
+
+* ``import`` -- ``import steel_pigs.webapp`` alone. Plugins are lazy,
+  so this is what a preloading gunicorn master pays once.
+* ``boot`` -- the import plus building every plugin, which is what each
+  worker does in ``post_worker_init``: one ``alembic_version`` query,
+  Alembic never imported.
+* ``alembic`` -- the boot followed by ``alembic upgrade head``, which
+  every worker used to run.
+* ``forked`` -- ``GUNICORN_PRELOAD=1``: the master has imported the app
+  and the plugin modules; timed from ``fork()`` until the child has
+  built its plugins.
+
+Run from the repo root::
+
+    python benchmarks/bench_worker_startup.py
+    python benchmarks/bench_worker_startup.py --runs 20
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from steel_pigs.plugins.providers.sql import SQL
+
+_BOOT = "import sys, steel_pigs.webapp as w; plugins = w.app.extensions['steel_pigs'].load_all(); "
+
+_CHILD = {
+    "import": "import steel_pigs.webapp",
+    "boot": _BOOT + "assert not any(m.startswith('alembic') for m in sys.modules)",
+    "alembic": (
+        _BOOT + "from alembic import command; "
+        "from steel_pigs.db import make_alembic_config; "
+        "command.upgrade(make_alembic_config(engine=plugins.server_data.engine), 'head')"
+    ),
+    # Prints its own timing: the fork and the child's boot only.
+    "forked": (
+        "import os, time, steel_pigs.webapp as w; "
+        "lazy = w.app.extensions['steel_pigs']; lazy.import_modules(); "
+        "t0 = time.perf_counter(); pid = os.fork(); "
+        "lazy.load_all() if pid == 0 else None; os._exit(0) if pid == 0 else None; "
+        "os.waitpid(pid, 0); print((time.perf_counter() - t0) * 1000)"
+    ),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        url = f"sqlite:///{Path(workdir) / 'startup.db'}"
+        SQL({"engine": url}).engine.dispose()
+        env = {
+            **os.environ,
+            "STEEL_PIGS_DATABASE_URL": url,
+            "STEEL_PIGS_SECRET_KEY": "bench",
+            "STEEL_PIGS_DB_MIGRATE": "check",
+        }
+        print(f"{'mode':<8} {'median ms':>10} {'min ms':>8} {'max ms':>8}")
+        for mode, code in _CHILD.items():
+            samples = []
+            for _ in range(args.runs):
+                t0 = time.perf_counter()
+                proc = subprocess.run(
+                    [sys.executable, "-c", code], env=env, check=True, capture_output=True
+                )
+                elapsed = (time.perf_counter() - t0) * 1000
+                samples.append(float(proc.stdout) if mode == "forked" else elapsed)
+            print(
+                f"{mode:<8} {statistics.median(samples):>10.0f} "
+                f"{min(samples):>8.0f} {max(samples):>8.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
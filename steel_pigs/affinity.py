@@ -0,0 +1,40 @@
+#   Copyright 2026 Michael Rice <michael@michaelrice.org>
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Who is asking, for read-your-writes routing.
+
+A provider that sends reads to replicas has to send a caller back to
+the primary once that caller has written, or it could read its own
+write from a replica that hasn't caught up. :func:`current_keys` names
+the caller of the current Flask request twice over: by request id (so
+later reads in the same request are sticky) and by authenticated actor
+(so that actor's next requests are too). Outside a request it returns
+nothing and reads are never sticky.
+"""
+
+from flask import g, has_app_context
+
+
+def current_keys():
+    """Affinity keys for the current request, most specific first."""
+    if not has_app_context():
+        return ()
+    keys = []
+    request_id = g.get("request_id")
+    if request_id:
+        keys.append(f"request:{request_id}")
+    actor = g.get("actor")
+    if actor:
+        keys.append(f"actor:{actor}")
+    return tuple(keys)
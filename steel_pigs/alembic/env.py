@@ -19,10 +19,12 @@ Two callers reach this file:
 * The CLI (``python -m steel_pigs.db upgrade``) and direct ``alembic``
   invocations -- both supply a database URL through alembic.ini or the
   ``STEEL_PIGS_DATABASE_URL`` env var. We build an engine from that.
-* The SQL plugin's startup auto-upgrade -- it passes the already-created
-  engine in via ``config.attributes['engine']`` so migrations run on the
-  same connection the plugin uses. This matters for in-memory SQLite,
-  where each connection sees a different DB.
+* ``steel_pigs.db.upgrade_schema`` (the SQL plugin's startup upgrade
+  and the CLI's ``upgrade``) -- it passes the connection holding the
+  migration lock in via ``config.attributes['connection']`` so
+  migrations run on it. Callers may pass an engine through
+  ``config.attributes['engine']`` instead. Either matters for in-memory
+  SQLite, where each connection sees a different DB.
 """
 
 import os
@@ -62,7 +64,18 @@ def run_migrations_offline():
         context.run_migrations()
 
 
+def _run_on(connection):
+    context.configure(connection=connection, target_metadata=target_metadata)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
 def run_migrations_online():
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        # upgrade_schema's lock-holding connection; it commits.
+        _run_on(connection)
+        return
     connectable = config.attributes.get("engine")
     if connectable is None:
         connectable = engine_from_config(
@@ -71,9 +84,7 @@ def run_migrations_online():
             poolclass=pool.NullPool,
         )
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
-        with context.begin_transaction():
-            context.run_migrations()
+        _run_on(connection)
 
 
 if context.is_offline_mode():
@@ -0,0 +1,102 @@
+"""Add canonical integer MAC column
+
+Revision ID: 2540a6815260
+Revises: 0edc7e9bd910
+Create Date: 2026-10-18 12:20:22.150568
+
+"""
+
+import logging
+import re
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2540a6815260'
+down_revision: Union[str, Sequence[str], None] = '0edc7e9bd910'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+log = logging.getLogger('steel_pigs.db')
+
+BACKFILL_BATCH = 1000
+
+server_data = sa.table(
+    'ServerData',
+    sa.column('id', sa.Integer()),
+    sa.column('primary_mac', sa.String()),
+    sa.column('primary_mac_int', sa.BigInteger()),
+)
+
+# A frozen copy of steel_pigs.mac.mac_to_int as of this revision, so
+# replaying the migration always computes the same keys whatever the
+# runtime parser becomes.
+_SEPARATED = re.compile(r'[0-9a-f]{1,2}([:-])(?:[0-9a-f]{1,2}\1){4}[0-9a-f]{1,2}')
+_CISCO = re.compile(r'[0-9a-f]{4}\.[0-9a-f]{4}\.[0-9a-f]{4}')
+_BARE = re.compile(r'[0-9a-f]{12}')
+
+
+def _mac_to_int(mac):
+    if not isinstance(mac, str):
+        raise ValueError(f'Not a MAC address: {mac!r}')
+    value = mac.strip().lower()
+    if _SEPARATED.fullmatch(value):
+        return int(''.join(octet.zfill(2) for octet in re.split('[:-]', value)), 16)
+    if _CISCO.fullmatch(value):
+        return int(value.replace('.', ''), 16)
+    if _BARE.fullmatch(value):
+        return int(value, 16)
+    raise ValueError(f'Not a MAC address: {mac!r}')
+
+
+def _backfill() -> None:
+    """Fill primary_mac_int from primary_mac, BACKFILL_BATCH rows at a time.
+
+    Rows whose primary_mac doesn't parse keep NULL and are logged.
+    """
+    conn = op.get_bind()
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(server_data.c.id, server_data.c.primary_mac)
+            .where(server_data.c.id > last_id)
+            .order_by(server_data.c.id)
+            .limit(BACKFILL_BATCH)
+        ).all()
+        if not rows:
+            return
+        updates = []
+        for row_id, mac in rows:
+            try:
+                updates.append({'row_id': row_id, 'mac_int': _mac_to_int(mac)})
+            except ValueError:
+                log.warning('ServerData id %s: %r is not a MAC address; left NULL', row_id, mac)
+        if updates:
+            conn.execute(
+                server_data.update()
+                .where(server_data.c.id == sa.bindparam('row_id'))
+                .values(primary_mac_int=sa.bindparam('mac_int')),
+                updates,
+            )
+        last_id = rows[-1][0]
+
+
+def upgrade() -> None:
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.add_column('ServerData', sa.Column('primary_mac_int', sa.BigInteger(), nullable=True))
+    op.drop_index(op.f('ix_ServerData_primary_mac'), table_name='ServerData')
+    # ### end Alembic commands ###
+    _backfill()
+    # Built after the backfill so it's written once, in order.
+    op.create_index(op.f('ix_ServerData_primary_mac_int'), 'ServerData', ['primary_mac_int'], unique=False)
+
+
+def downgrade() -> None:
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_index(op.f('ix_ServerData_primary_mac_int'), table_name='ServerData')
+    op.create_index(op.f('ix_ServerData_primary_mac'), 'ServerData', ['primary_mac'], unique=False)
+    op.drop_column('ServerData', 'primary_mac_int')
+    # ### end Alembic commands ###
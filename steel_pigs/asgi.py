@@ -0,0 +1,33 @@
+#   Copyright 2026 Michael Rice <michael@michaelrice.org>
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+"""ASGI entry point, for running under uvicorn (or any ASGI server)::
+
+    pip install 'steel_pigs[async]'
+    STEEL_PIGS_ASYNC_DB=1 uvicorn steel_pigs.asgi:app
+
+Flask itself is a WSGI framework: the app runs on a pool of
+``STEEL_PIGS_ASGI_THREADS`` threads (default 64) in front of one event
+loop, so a single worker process keeps that many requests in flight.
+With ``STEEL_PIGS_ASYNC_DB=1`` the PXE lookups those requests make are
+awaited on the ``AsyncSQL`` provider's event loop rather than each
+holding a pooled blocking connection.
+"""
+
+import os
+
+from a2wsgi import WSGIMiddleware
+
+from steel_pigs.webapp import app as wsgi_app
+
+app = WSGIMiddleware(wsgi_app, workers=int(os.environ.get("STEEL_PIGS_ASGI_THREADS", "64")))
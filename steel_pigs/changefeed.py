@@ -0,0 +1,232 @@
+#   Copyright 2026 Michael Rice <michael@michaelrice.org>
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Long-poll fan-out for the ``GET /v1/changes`` feed.
+
+Every consumer of the feed asks the same question -- "is there anything
+after my cursor?" -- and most of them hold the same cursor. A
+:class:`ChangeFeed` answers it from memory: it keeps the newest sequence
+number (the *head*) and a condition variable the waiting requests sleep
+on. Nothing touches the database per waiter:
+
+* a write committed by this process calls :meth:`ChangeFeed.notify`,
+  which reads the head once and wakes every waiter;
+* writes committed by other workers are found by polling the head, at
+  most once per ``poll_seconds`` however many requests are waiting;
+* woken waiters at the same cursor share one read of the batch, which
+  is memoized until the head moves. A read re-polls the head first if
+  it is older than ``poll_seconds``, so a memoized batch is never more
+  than that behind another worker's write.
+
+Sequence numbers are handed out when a write logs its entry, not when
+it commits. With one writer at a time (SQLite) that is the same order,
+but on Postgres or MySQL a transaction holding seq 5 can commit after
+one holding seq 6 -- and a consumer that already moved its cursor past
+6 would never see 5. Give such backends a ``commit_lag``: an entry is
+only handed out once the head has been seen past it for that many
+seconds. Consumers then miss nothing as long as every write commits
+within ``commit_lag`` of logging its entry, at the price of seeing
+changes that much later.
+
+Waiters block a server thread each, like any other request; size the
+worker's thread pool for the number of consumers that long-poll.
+"""
+
+import collections
+import threading
+import time
+
+# Memoized batches kept per head. Consumers cluster on a few cursors.
+_MAX_BATCHES = 64
+
+
+class ChangeFeed:
+    """Newest-sequence tracker and waiter wake-up for one change log.
+
+    :param latest: callable returning the newest sequence number in the
+        log (0 if it is empty)
+    :param read: callable ``(since, limit)`` returning the entries after
+        ``since``, oldest first, each a dict with a ``seq`` key
+    :param poll_seconds: how stale the head may get before a waiter or
+        a read polls ``latest`` for writes made by other processes
+    :param commit_lag: seconds an entry is held back after the head is
+        first seen past it, for backends whose writers may commit out
+        of sequence order (0: hand out everything up to the head)
+    """
+
+    def __init__(self, latest, read, poll_seconds=1.0, clock=time.monotonic, commit_lag=0.0):
+        self._latest = latest
+        self._read = read
+        self.poll_seconds = poll_seconds
+        self.commit_lag = commit_lag
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._head = None  # None until read, and again once a write makes it stale
+        self._head_at = 0.0  # when the head was last read from the log
+        self._sightings = collections.deque()  # (when, head) not yet commit_lag old
+        self._settled = 0  # newest head seen at least commit_lag ago
+        self._stale_count = 0  # bumped by notify(); guards against a racing _refresh
+        self._next_poll = 0.0
+        self._polling = False
+        self._waiters = 0
+        self._batches = {}
+        self._reading = set()  # cursors being read for the memo
+        self.polls = 0
+
+    def _refresh(self):
+        """Read the head from the log and wake the waiters if it moved."""
+        with self._cond:
+            stale_count = self._stale_count
+        head = self._latest()
+        with self._cond:
+            self.polls += 1
+            now = self._clock()
+            # Every id up to ``head`` was allocated by now, whatever the
+            # stale count says.
+            newest = self._sightings[-1][1] if self._sightings else self._settled
+            if self.commit_lag and head > newest:
+                self._sightings.append((now, head))
+            if self._stale_count != stale_count:
+                # A write was committed while reading; ``head`` may
+                # predate it. Leave the head unknown so it is read again.
+                return head
+            self._head_at = now
+            if self._head is None or head > self._head:
+                self._head = head
+                self._batches.clear()
+                self._cond.notify_all()
+            return self._head
+
+    def _visible(self, now):
+        """The newest sequence number that may be handed out. Call
+        holding the lock."""
+        if not self.commit_lag:
+            return self._head
+        while self._sightings and self._sightings[0][0] <= now - self.commit_lag:
+            self._settled = self._sightings.popleft()[1]
+        return self._settled
+
+    def notify(self):
+        """A change was committed by this process.
+
+        With requests waiting, reads the new head and wakes them. With
+        none, only marks the head stale, so writes cost nothing extra
+        while nobody is listening.
+        """
+        with self._cond:
+            self._stale_count += 1
+            self._head = None
+            self._batches.clear()
+            if not self._waiters:
+                return
+        self._refresh()
+
+    def head(self):
+        """The newest sequence number."""
+        with self._cond:
+            head = self._head
+        return head if head is not None else self._refresh()
+
+    def wait(self, since, timeout):
+        """Block until entries after ``since`` can be read or ``timeout`` seconds pass.
+
+        :return: True if there are entries after ``since``
+        """
+        deadline = self._clock() + timeout
+        with self._cond:
+            self._waiters += 1
+        try:
+            while True:
+                with self._cond:
+                    now = self._clock()
+                    visible = self._visible(now)
+                    if visible is not None and visible > since:
+                        return True
+                    seen = next((when for when, head in self._sightings if head > since), None)
+                    if seen is not None:
+                        # Already written, not yet commit_lag old.
+                        if now >= deadline:
+                            return False
+                        self._cond.wait(min(deadline, seen + self.commit_lag) - now)
+                        continue
+                    if self._polling or (self._head is not None and now < self._next_poll):
+                        # Someone else is reading the head, or it is
+                        # fresh enough: sleep until woken or it's due.
+                        if now >= deadline:
+                            return False
+                        wake = deadline if self._polling else min(deadline, self._next_poll)
+                        self._cond.wait(wake - now)
+                        continue
+                    self._polling = True
+                    self._next_poll = now + self.poll_seconds
+                try:
+                    head = self._refresh()
+                finally:
+                    with self._cond:
+                        self._polling = False
+                        self._cond.notify_all()
+                if head > since and not self.commit_lag:
+                    return True
+                if self._clock() >= deadline:
+                    return False
+        finally:
+            with self._cond:
+                self._waiters -= 1
+
+    def read(self, since, limit):
+        """Entries after ``since`` (at most ``limit``), shared by equal cursors.
+
+        Concurrent calls for the same cursor wait for the first one's
+        read instead of each querying the log. Entries newer than
+        ``commit_lag`` allows are left for a later call.
+        """
+        with self._cond:
+            fresh = self._head is not None and self._clock() - self._head_at < self.poll_seconds
+        if not fresh:
+            self._refresh()
+        batch = self._shared_read(since, limit)
+        if not self.commit_lag:
+            return batch
+        with self._cond:
+            visible = self._visible(self._clock())
+        return [entry for entry in batch if entry["seq"] <= visible]
+
+    def _shared_read(self, since, limit):
+        key = (since, limit)
+        owner = False
+        with self._cond:
+            head = self._head
+            if head is not None:
+                while key in self._reading and self._head == head:
+                    self._cond.wait()
+                if self._head == head:
+                    batch = self._batches.get(key)
+                    if batch is not None:
+                        return batch
+                    self._reading.add(key)
+                    owner = True
+        try:
+            batch = self._read(since, limit)
+        finally:
+            if owner:
+                with self._cond:
+                    self._reading.discard(key)
+                    # Only memoize if no write landed while reading; the
+                    # batch then holds everything up to this head.
+                    if self._head == head:
+                        if len(self._batches) >= _MAX_BATCHES:
+                            self._batches.clear()
+                        self._batches[key] = batch
+                    self._cond.notify_all()
+        return batch
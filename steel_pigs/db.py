@@ -14,43 +14,121 @@
 
 """Database management entrypoint.
 
-Two consumers:
+Three consumers:
 
-* :func:`make_alembic_config` -- used by ``SQL.__init__`` to auto-upgrade
-  the schema at startup, and by the CLI below.
+* :func:`current_revision` / :data:`HEAD_REVISION` -- the cheap schema
+  check ``SQL.__init__`` runs on every worker start.
+* :func:`upgrade_schema` -- Alembic upgrade under a cross-process
+  migration lock, used by the SQL plugin when the check fails in
+  ``upgrade`` mode and by the CLI.
 * The ``python -m steel_pigs.db`` CLI -- a thin wrapper over the Alembic
   subcommands operators reach for most often (``upgrade``, ``downgrade``,
-  ``revision``, ``current``, ``history``, ``stamp``).
+  ``revision``, ``current``, ``history``, ``stamp``), plus ``reshard``
+  for ``ShardedSQL`` deployments, ``load`` / ``dump`` for bulk
+  inventory files (see :mod:`steel_pigs.loader`) and ``explain``, which
+  fails if a hot statement's query plan reads a whole table (see
+  :mod:`steel_pigs.explain`).
+
+Alembic itself is imported only when a migration command actually runs,
+so a worker whose schema is current never loads it.
 """
 
 import argparse
 import os
 import sys
+import time
+from contextlib import contextmanager
 from pathlib import Path
 
-from alembic import command
-from alembic.config import Config
+from sqlalchemy import create_engine, inspect, pool, text
+from sqlalchemy.exc import IntegrityError
 
 PACKAGE_DIR = Path(__file__).resolve().parent
 ALEMBIC_INI = PACKAGE_DIR / "alembic.ini"
 SCRIPT_LOCATION = PACKAGE_DIR / "alembic"
 
+# Newest revision under alembic/versions. Workers compare the database's
+# alembic_version row with this instead of loading the script directory;
+# bump it with every new migration (test_database_plugin checks it).
+HEAD_REVISION = "11da4b263cdd"
+
+# Held while migrating so concurrent workers / deploy jobs don't race.
+# SQLite needs none: its writers already serialize on the file lock.
+MIGRATION_LOCK_ID = 0x5D33_1915  # Postgres advisory lock key
+MIGRATION_LOCK_NAME = "steel_pigs.migrate"  # MySQL/MariaDB GET_LOCK name
+MIGRATION_LOCK_TIMEOUT = 600  # seconds, MySQL/MariaDB
+
+
+def current_revision(connection):
+    """The revision stamped in ``alembic_version``; None if unversioned."""
+    if not inspect(connection).has_table("alembic_version"):
+        return None
+    return connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+
+
+@contextmanager
+def migration_lock(connection):
+    """Hold the cross-process migration lock on ``connection``."""
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_ID})
+        release = text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_ID}
+    elif dialect in ("mysql", "mariadb"):
+        acquired = connection.execute(
+            text("SELECT GET_LOCK(:name, :timeout)"),
+            {"name": MIGRATION_LOCK_NAME, "timeout": MIGRATION_LOCK_TIMEOUT},
+        ).scalar()
+        if acquired != 1:
+            raise TimeoutError(f"Timed out waiting for the {MIGRATION_LOCK_NAME} lock")
+        release = text("SELECT RELEASE_LOCK(:name)"), {"name": MIGRATION_LOCK_NAME}
+    else:
+        yield
+        return
+    try:
+        yield
+    finally:
+        connection.execute(*release)
+        connection.commit()
+
+
+def upgrade_schema(engine, revision="head"):
+    """``alembic upgrade`` on ``engine`` under :func:`migration_lock`.
+
+    A worker that waited on the lock while another one migrated finds
+    the schema at head and skips Alembic.
+    """
+    from alembic import command
+
+    with engine.connect() as conn, migration_lock(conn):
+        if revision == "head" and current_revision(conn) == HEAD_REVISION:
+            return
+        conn.commit()
+        # Migrate on the connection holding the lock: one connection
+        # total, so it works with a pool of one.
+        command.upgrade(make_alembic_config(connection=conn), revision)
+        conn.commit()
+
 
-def make_alembic_config(*, db_url=None, engine=None) -> Config:
+def make_alembic_config(*, db_url=None, engine=None, connection=None):
     """Build an Alembic Config pointing at the in-package migrations.
 
-    ``db_url`` overrides the URL from alembic.ini. ``engine`` (preferred
-    when calling from inside the SQL plugin) is threaded through
-    ``config.attributes`` so the migration runs on the same connection
-    the plugin uses -- required for in-memory SQLite, where each
-    connection sees a separate database.
+    ``db_url`` overrides the URL from alembic.ini. ``engine`` or an open
+    ``connection`` (preferred when calling from inside the SQL plugin)
+    is threaded through ``config.attributes`` so the migration runs on
+    the same database the plugin uses -- required for in-memory SQLite,
+    where each connection sees a separate database. A connection is
+    left open, with its transaction for the caller to commit.
     """
+    from alembic.config import Config
+
     config = Config(str(ALEMBIC_INI))
     config.set_main_option("script_location", str(SCRIPT_LOCATION))
     if db_url is not None:
         config.set_main_option("sqlalchemy.url", db_url)
     if engine is not None:
         config.attributes["engine"] = engine
+    if connection is not None:
+        config.attributes["connection"] = connection
     return config
 
 
@@ -65,14 +143,23 @@ def _cli_config(args):
 
 
 def _cmd_upgrade(args):
-    command.upgrade(_cli_config(args), args.revision)
+    url = _cli_config(args).get_main_option("sqlalchemy.url")
+    engine = create_engine(url, poolclass=pool.NullPool)
+    try:
+        upgrade_schema(engine, args.revision)
+    finally:
+        engine.dispose()
 
 
 def _cmd_downgrade(args):
+    from alembic import command
+
     command.downgrade(_cli_config(args), args.revision)
 
 
 def _cmd_revision(args):
+    from alembic import command
+
     command.revision(
         _cli_config(args),
         message=args.message,
@@ -81,17 +168,134 @@ def _cmd_revision(args):
 
 
 def _cmd_current(args):
+    from alembic import command
+
     command.current(_cli_config(args), verbose=args.verbose)
 
 
 def _cmd_history(args):
+    from alembic import command
+
     command.history(_cli_config(args), verbose=args.verbose)
 
 
 def _cmd_stamp(args):
+    from alembic import command
+
     command.stamp(_cli_config(args), args.revision)
 
 
+def _cmd_reshard(args):
+    from steel_pigs.plugins.providers.sharded import ShardedSQL, reshard
+
+    urls = args.shards or [
+        url.strip() for url in os.environ.get("STEEL_PIGS_SHARD_URLS", "").split(",") if url.strip()
+    ]
+    if not urls:
+        raise SystemExit("reshard needs --shards or $STEEL_PIGS_SHARD_URLS")
+    provider = ShardedSQL({"shards": urls})
+    start = time.perf_counter()
+
+    def progress(shard, moved):
+        elapsed = time.perf_counter() - start
+        print(f"shard {shard}: moved {moved} servers ({elapsed:.1f}s)", flush=True)
+
+    target = args.to if args.to is not None else len(urls)
+    moved = reshard(provider, target, batch=args.batch, grace=args.grace, progress=progress)
+    elapsed = time.perf_counter() - start
+    print(f"Resharded to {target} shards: moved {moved} servers in {elapsed:.1f}s")
+
+
+def _cli_engine(args):
+    """An engine on the CLI's database, which must be at HEAD_REVISION."""
+    url = _cli_config(args).get_main_option("sqlalchemy.url")
+    engine = create_engine(url, poolclass=pool.NullPool)
+    with engine.connect() as conn:
+        revision = current_revision(conn)
+    if revision != HEAD_REVISION:
+        engine.dispose()
+        raise SystemExit(
+            f"Database is at revision {revision}, not {HEAD_REVISION}; "
+            "run `python -m steel_pigs.db upgrade` first."
+        )
+    return engine
+
+
+def _inventory_files(args, command):
+    files = {"zones": args.zones, "servers": args.servers, "switches": args.switches}
+    if not any(files.values()):
+        raise SystemExit(f"{command} needs at least one of --zones, --servers, --switches")
+    return files
+
+
+def _cmd_load(args):
+    from steel_pigs import loader
+
+    files = _inventory_files(args, "load")
+    engine = _cli_engine(args)
+    try:
+        results = loader.load(
+            engine,
+            **files,
+            batch_size=args.batch,
+            rebuild_indexes=args.rebuild_indexes,
+            report=print,
+        )
+    except IntegrityError as exc:
+        # A concurrent writer took a key after the load checked it.
+        raise SystemExit(f"load failed, nothing was written: {exc.orig}") from exc
+    finally:
+        engine.dispose()
+    if any(result["rejected"] for result in results.values()):
+        raise SystemExit(1)
+
+
+def _cmd_dump(args):
+    from steel_pigs import loader
+
+    files = _inventory_files(args, "dump")
+    engine = _cli_engine(args)
+    try:
+        loader.dump(engine, **files, batch_size=args.batch, report=print)
+    finally:
+        engine.dispose()
+
+
+def _cmd_explain(args):
+    import tempfile
+
+    from steel_pigs import explain
+
+    with tempfile.TemporaryDirectory() as workdir:
+        if args.seeded is not None:
+            url = explain.sample_database(Path(workdir) / "explain.db", servers=args.seeded)
+            engine = create_engine(url, poolclass=pool.NullPool)
+        else:
+            engine = _cli_engine(args)
+        try:
+            plans = explain.explain(engine)
+        except ValueError as exc:
+            raise SystemExit(str(exc)) from None
+        finally:
+            engine.dispose()
+    for plan in plans:
+        print(f"{'SCAN' if plan.scans else 'ok':<4}  {plan.name}")
+        for step in plan.steps if args.verbose else plan.scans:
+            print(f"      {step}")
+    scanning = sum(1 for plan in plans if plan.scans)
+    print(f"{len(plans)} statements, {scanning} with full scans")
+    if scanning:
+        raise SystemExit(1)
+
+
+def _add_inventory_files(parser, verb):
+    for kind in ("zones", "servers", "switches"):
+        parser.add_argument(
+            f"--{kind}", metavar="PATH", help=f"{verb} {kind} (.csv, .ndjson or .jsonl)."
+        )
+    parser.add_argument("--batch", type=int, default=5000, help="Rows per batch.")
+
+
 def main(argv=None):
     parser = argparse.ArgumentParser(
         prog="python -m steel_pigs.db",
@@ -135,6 +339,61 @@ def main(argv=None):
     p_stamp.add_argument("revision")
     p_stamp.set_defaults(func=_cmd_stamp)
 
+    p_reshard = subs.add_parser(
+        "reshard",
+        help="Move ShardedSQL servers to a new shard count while workers keep serving.",
+    )
+    p_reshard.add_argument(
+        "--shards",
+        nargs="+",
+        metavar="URL",
+        help="Every shard's URL, first shard first. Falls back to $STEEL_PIGS_SHARD_URLS.",
+    )
+    p_reshard.add_argument(
+        "--to", type=int, help="Shard count to move to (default: every URL given)."
+    )
+    p_reshard.add_argument("--batch", type=int, default=500, help="Servers moved per transaction.")
+    p_reshard.add_argument(
+        "--grace",
+        type=float,
+        help="Seconds to wait for workers to see the new layout (default: 6, their default "
+        "layout refresh plus one).",
+    )
+    p_reshard.set_defaults(func=_cmd_reshard)
+
+    p_load = subs.add_parser(
+        "load",
+        help="Bulk-load zones, servers and switches from CSV or NDJSON files.",
+    )
+    _add_inventory_files(p_load, "Load")
+    p_load.add_argument(
+        "--rebuild-indexes",
+        action="store_true",
+        help="Drop secondary indexes for the load and rebuild them after. Locks the tables "
+        "until the load commits: only for a database nothing else is using.",
+    )
+    p_load.set_defaults(func=_cmd_load)
+
+    p_dump = subs.add_parser("dump", help="Write the inventory out as files `load` reads back.")
+    _add_inventory_files(p_dump, "Write")
+    p_dump.set_defaults(func=_cmd_dump)
+
+    p_explain = subs.add_parser(
+        "explain",
+        help="Check the query plan of every hot SQL-provider statement; fail on full scans.",
+    )
+    p_explain.add_argument(
+        "--seeded",
+        type=int,
+        nargs="?",
+        const=1000,
+        metavar="SERVERS",
+        help="Plan against a fresh SQLite file seeded with SERVERS servers (default: 1000) "
+        "instead of the configured database.",
+    )
+    p_explain.add_argument("-v", "--verbose", action="store_true", help="Print every plan.")
+    p_explain.set_defaults(func=_cmd_explain)
+
     args = parser.parse_args(argv)
     args.func(args)
 
@@ -18,7 +18,7 @@ class ProvisionException(Exception):
 
 
 class ServerAlreadyExists(Exception):
-    """Raised by ``create_server`` when the server_number is taken."""
+    """Raised by ``create_server`` when the server_number or an interface MAC is taken."""
 
 
 class ServerNotFound(Exception):
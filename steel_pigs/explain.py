@@ -0,0 +1,262 @@
+#   Copyright 2026 Michael Rice <michael@michaelrice.org>
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Query plans for the SQL provider's hot statements.
+
+Behind ``python -m steel_pigs.db explain``. :func:`hot_statements` builds
+the statements the SQL provider runs on every lookup, status update,
+listing page, export and change-feed poll -- the same cached constructs,
+not copies -- and :func:`explain` asks the database how it would run
+each one and flags any that read a whole table:
+
+* SQLite -- ``EXPLAIN QUERY PLAN``; a ``SCAN`` step is a full pass.
+* Postgres -- ``EXPLAIN (FORMAT JSON)`` with ``enable_seqscan`` off, so
+  a ``Seq Scan`` (or an ``Index Scan`` with no index condition) means no
+  index can serve the statement rather than that the table is small.
+* MySQL / MariaDB -- ``EXPLAIN``; access type ``ALL`` (or ``index``, a
+  full index pass).
+
+Listings and exports read servers in ``server_number`` order by design;
+walking that index is allowed for them (``full_index``), a table scan
+plus sort is not.
+
+:func:`sample_database` builds the seeded SQLite file ``explain
+--seeded`` checks when there's no database to point it at, e.g. in CI.
+It is deliberately left without ``ANALYZE`` statistics: SQLite then
+plans by the shape of the schema alone, so a pass means an index can
+serve every statement, whatever the data turns out to look like.
+"""
+
+import re
+from typing import NamedTuple
+
+from sqlalchemy import bindparam, insert, text
+
+from steel_pigs.mac import mac_to_int
+from steel_pigs.plugins.providers import sql
+from steel_pigs.plugins.providers.pluginbase import LIST_FILTERS
+from steel_pigs.synthetic import make_server, server_mac
+
+_SAMPLE_FILTERS = {
+    "operational_status": "active",
+    "boot_status": "done",
+    "boot_os": "Ubuntu",
+    "provision_zone_id": 1,
+}
+
+
+class HotStatement(NamedTuple):
+    name: str
+    statement: object
+    params: dict
+    full_index: bool = False  # may walk a whole index (reads every row by design)
+
+
+class Plan(NamedTuple):
+    name: str
+    steps: list  # the database's plan, one string per step
+    scans: list  # the steps that read a whole table (or index)
+
+
+def hot_statements():
+    """Every hot statement the SQL provider issues, with sample parameters."""
+    lookups = sql._LOOKUPS
+    yield HotStatement("get_server_by_name", lookups["name"], {"value": "node-1"})
+    yield HotStatement("get_server_by_number", lookups["number"], {"value": 1})
+    yield HotStatement("get_server_by_mac", lookups["mac"], {"value": 1})
+    yield HotStatement(
+        "get_server_by_switch", lookups["switch"], {"switch_name": "sw-1", "switch_port": "1"}
+    )
+
+    by_number = [sql._SERVER.c.server_number == bindparam("server_number")]
+    by_switch = [sql._on_switch(bindparam("switch_name"))]
+    by_zone = [sql._SERVER.c.provision_zone_id == bindparam("zone_id")]
+    for selector, where, params in (
+        ("server", by_number, {"server_number": 1}),
+        ("switch", by_switch, {"switch_name": "sw-1"}),
+        ("zone", by_zone, {"zone_id": 1}),
+    ):
+        yield HotStatement(
+            f"update lock by {selector}", sql._locking_read("boot_status", where), params
+        )
+        yield HotStatement(
+            f"update by {selector}",
+            sql._field_update("boot_status", bindparam("status"), where),
+            {**params, "status": "done"},
+        )
+
+    keys = {"keys": [1, 2]}
+    yield HotStatement("lookup_servers primary macs", sql._BATCH_PRIMARY_MACS, keys)
+    yield HotStatement("lookup_servers interface macs", sql._BATCH_NIC_MACS, keys)
+    yield HotStatement(
+        "lookup_servers switches",
+        sql._BATCH_SWITCHES,
+        {"names": ["sw-1"], "keys": [("sw-1", "1"), ("sw-1", "2")]},
+    )
+    yield HotStatement("lookup_servers servers", sql._BATCH_SERVERS, keys)
+
+    for filters in ((), *((name,) for name in LIST_FILTERS)):
+        label = ", ".join(filters) or "unfiltered"
+        params = {name: _SAMPLE_FILTERS[name] for name in filters}
+        for first_page in (True, False):
+            page = "first page" if first_page else "next page"
+            yield HotStatement(
+                f"list_servers {label} {page}",
+                sql._listing(filters, first_page),
+                {**params, "limit": 100, "after": 1},
+                full_index=first_page and not filters,
+            )
+        yield HotStatement(
+            f"export_servers {label}", sql._export(filters), params, full_index=not filters
+        )
+
+    yield HotStatement("list_changes", sql._CHANGES, {"since": 1, "limit": 100})
+    yield HotStatement("latest change", sql._LATEST_CHANGE, {})
+
+
+def _run(conn, prefix, statement, params):
+    """Run ``statement`` behind ``prefix`` (``EXPLAIN ...``) with ``params`` bound."""
+    state = statement.compile(dialect=conn.dialect).construct_expanded_state(params)
+    bound = state.positional_parameters if conn.dialect.positional else state.parameters
+    return conn.exec_driver_sql(f"{prefix} {state.statement}", bound)
+
+
+# What a plan step reads: TABLE or INDEX means all of it.
+TABLE = "table"
+INDEX = "index"
+
+
+def _sqlite_plan(conn, statement, params):
+    steps = []
+    for row in _run(conn, "EXPLAIN QUERY PLAN", statement, params):
+        step = row[-1]
+        full = None
+        if _SQLITE_SCAN.match(step):
+            full = INDEX if _SQLITE_INDEX_SCAN.match(step) else TABLE
+        steps.append((step, full))
+    return steps
+
+
+# "SCAN CONSTANT ROW" / "SCAN 2 CONSTANT ROWS" read a VALUES list, not a table.
+_SQLITE_SCAN = re.compile(r"SCAN (?!(\d+ )?CONSTANT ROW)")
+_SQLITE_INDEX_SCAN = re.compile(r"SCAN \S+ USING (COVERING )?INDEX ")
+
+
+def _postgres_plan(conn, statement, params):
+    with conn.begin():
+        conn.execute(text("SET LOCAL enable_seqscan = off"))
+        (plan,) = _run(conn, "EXPLAIN (FORMAT JSON)", statement, params).scalar()
+    steps = []
+    nodes = [plan["Plan"]]
+    while nodes:
+        node = nodes.pop()
+        kind = node["Node Type"]
+        step = kind
+        if "Relation Name" in node:
+            step += f" on {node['Relation Name']}"
+        if "Index Name" in node:
+            step += f" using {node['Index Name']}"
+        full = None
+        if kind == "Seq Scan":
+            full = TABLE
+        elif kind in ("Index Scan", "Index Only Scan") and "Index Cond" not in node:
+            # With seq scans off, walking some unrelated index stands in for one.
+            full = INDEX
+        steps.append((step, full))
+        nodes.extend(reversed(node.get("Plans", ())))
+    return steps
+
+
+def _mysql_plan(conn, statement, params):
+    steps = []
+    for row in _run(conn, "EXPLAIN", statement, params).mappings():
+        full = {"ALL": TABLE, "index": INDEX}.get(row["type"])
+        steps.append((f"{row['table']} type={row['type']} key={row['key']}", full))
+    return steps
+
+
+_PLANNERS = {
+    "sqlite": _sqlite_plan,
+    "postgresql": _postgres_plan,
+    "mysql": _mysql_plan,
+    "mariadb": _mysql_plan,  # what SQLAlchemy calls mariadb+pymysql:// URLs
+}
+
+
+def explain(engine, statements=None):
+    """A :class:`Plan` for each of ``statements`` (default: :func:`hot_statements`)."""
+    planner = _PLANNERS.get(engine.dialect.name)
+    if planner is None:
+        raise ValueError(f"Cannot read query plans from {engine.dialect.name}")
+    plans = []
+    with engine.connect() as conn:
+        for hot in hot_statements() if statements is None else statements:
+            steps = planner(conn, hot.statement, hot.params)
+            allowed = (None, INDEX) if hot.full_index else (None,)
+            plans.append(
+                Plan(
+                    hot.name,
+                    [step for step, _ in steps],
+                    [step for step, full in steps if full not in allowed],
+                )
+            )
+    return plans
+
+
+def sample_database(path, servers=1000):
+    """Migrate a SQLite file at ``path`` and fill it with ``servers``
+    synthetic servers (with zones, switch ports and a second NIC each).
+    Returns its URL."""
+    url = f"sqlite:///{path}"
+    plugin = sql.SQL({"engine": url})
+    zones = [
+        {
+            "id": i,
+            "zone_name": f"zone-{i}",
+            "provision_img_host": f"img-{i}",
+            "provision_mirror_host": f"mirror-{i}",
+        }
+        for i in range(1, 9)
+    ]
+    rows = []
+    switches = []
+    nics = []
+    for i in range(servers):
+        number = i + 1
+        rows.append(
+            make_server(
+                number,
+                bootstrapped=i % 2 == 0,
+                boot_os=("Ubuntu", "CentOS", "Debian")[i % 3],
+                boot_status=("kicking", "provision", "done")[i % 3],
+                operational_status=("provisioning", "active")[i % 2],
+                provision_zone_id=zones[i % len(zones)]["id"],
+            )
+        )
+        switches.append(
+            {"server_number": number, "switch_name": f"sw-{i // 48}", "switch_port": str(i % 48)}
+        )
+        nics.append(
+            {"server_number": number, "mac": mac_to_int(server_mac(number, 1)), "role": "data"}
+        )
+    try:
+        with plugin.engine.begin() as conn:
+            conn.execute(insert(sql._ZONE), zones)
+            if rows:
+                conn.execute(insert(sql._SERVER), rows)
+                conn.execute(insert(sql._SWITCH), switches)
+                conn.execute(insert(sql._NIC), nics)
+    finally:
+        plugin.engine.dispose()
+    return url
@@ -0,0 +1,111 @@
+#   Copyright 2026 Michael Rice <michael@michaelrice.org>
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Cache generation counter shared by every worker on a host.
+
+gunicorn runs several worker processes; a per-process cache in one of
+them can't see a mutation that landed on another. Instead of a message
+bus, every worker compares a single 64-bit generation number on its
+read path and drops its caches when the number moved. The ``/v1``
+mutation routes bump it before the response goes out, so once a client
+has its acknowledgement no worker will answer from pre-mutation state.
+
+Two implementations:
+
+* :class:`LocalGeneration` -- a plain in-process counter. Enough for a
+  single worker, and the default.
+* :class:`FileGeneration` -- the counter lives in a small file that each
+  worker memory-maps. Reading it is a memory load, no syscall; bumping
+  takes an ``flock`` for the read-modify-write. Point every worker on
+  the host at the same path (``STEEL_PIGS_CACHE_GENERATION_FILE``).
+
+The file is per host. Replicas on different hosts still rely on the
+cache TTL to converge.
+"""
+
+import mmap
+import os
+import struct
+import threading
+from contextlib import contextmanager
+
+_COUNTER = struct.Struct("<Q")
+
+
+@contextmanager
+def _flock(fd):
+    # fcntl is POSIX-only; imported here so LocalGeneration still works
+    # on platforms without it.
+    import fcntl
+
+    fcntl.flock(fd, fcntl.LOCK_EX)
+    try:
+        yield
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+class LocalGeneration:
+    """In-process generation counter."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._value = 0
+
+    def current(self):
+        return self._value
+
+    def bump(self):
+        with self._lock:
+            self._value += 1
+            return self._value
+
+
+class FileGeneration:
+    """Generation counter in a memory-mapped file shared across processes."""
+
+    def __init__(self, path):
+        self.path = os.fspath(path)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            with _flock(fd):
+                if os.fstat(fd).st_size < _COUNTER.size:
+                    os.ftruncate(fd, _COUNTER.size)
+            self._map = mmap.mmap(fd, _COUNTER.size)
+        finally:
+            # The mapping keeps the file referenced; the fd isn't needed.
+            os.close(fd)
+
+    def current(self):
+        return _COUNTER.unpack_from(self._map, 0)[0]
+
+    def bump(self):
+        # Fresh descriptor per bump: flock is tied to the open file
+        # description, which a forked child would otherwise share with
+        # its parent (gunicorn --preload), defeating the lock.
+        fd = os.open(self.path, os.O_RDWR)
+        try:
+            with _flock(fd):
+                value = self.current() + 1
+                _COUNTER.pack_into(self._map, 0, value)
+        finally:
+            os.close(fd)
+        return value
+
+
+def make_generation(path=None):
+    """Build the shared counter for ``path``, or a local one if unset."""
+    if path:
+        return FileGeneration(path)
+    return LocalGeneration()
@@ -0,0 +1,66 @@
+#   Copyright 2026 Michael Rice <michael@michaelrice.org>
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+"""gunicorn settings used by the Docker image::
+
+    gunicorn -c python:steel_pigs.gunicorn_conf steel_pigs.webapp:app
+
+* ``GUNICORN_BIND`` (default ``0.0.0.0:8000``) and ``GUNICORN_WORKERS``
+  (default ``2``).
+* ``GUNICORN_THREADS`` (default ``16``) -- requests each worker serves
+  at once. Workers are ``gthread``: a ``GET /v1/changes?wait=`` long-poll
+  holds its thread, not the whole worker, so PXE lookups keep flowing
+  while consumers wait.
+* ``GUNICORN_TIMEOUT`` (default ``90``) -- seconds before a silent
+  worker is killed. Keep it above ``CHANGES_WAIT_MAX``
+  (``steel_pigs.schemas``), the longest a long-poll may wait.
+* ``GUNICORN_PRELOAD`` -- set to ``1`` to import the app, and every
+  configured plugin module, once in the master. Workers then share
+  those pages copy-on-write and fork without re-importing anything.
+  Plugins are still *built* per worker (see ``LazyPlugins``), so no
+  database connection crosses the fork.
+
+Either way each worker builds its plugins as it boots, so its first
+request doesn't pay for the engine and schema check.
+"""
+
+import logging
+import os
+
+log = logging.getLogger(__name__)
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("GUNICORN_WORKERS", "2"))
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", "16"))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "90"))
+accesslog = "-"
+preload_app = os.environ.get("GUNICORN_PRELOAD", "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def when_ready(server):
+    # Master, after the preloaded app is imported and before any fork.
+    if server.cfg.preload_app:
+        from steel_pigs.webapp import app
+
+        app.extensions["steel_pigs"].import_modules()
+
+
+def post_worker_init(worker):
+    from steel_pigs.webapp import app
+
+    try:
+        app.extensions["steel_pigs"].load_all()
+    except Exception:
+        # Serve anyway: /readyz reports 503 and the next request retries.
+        log.exception("Loading plugins at worker start failed.")
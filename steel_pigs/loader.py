@@ -0,0 +1,495 @@
+#   Copyright 2026 Michael Rice <michael@michaelrice.org>
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Bulk load and dump of the inventory, behind ``python -m steel_pigs.db``.
+
+:func:`load` streams CSV or NDJSON files of zones, servers and switches,
+validates every row with the API's input schemas (``ProvisionZoneIn``,
+``CreateServerIn``, ``SwitchRowIn``) and inserts the valid ones as
+executemany batches, all in one transaction: a load that fails part way
+leaves the database as it was. Invalid rows are reported by line and
+skipped, as ``POST /v1/servers:bulk`` does; so are rows that would
+clash with a unique key -- a zone id or name, a ``server_number``, or a
+MAC another server has -- whether stored already or earlier in the file,
+and rows that name a zone or server that doesn't exist (or that this
+load rejected), so no backend's foreign keys fail the whole load.
+
+:func:`dump` writes the same three files back out. Loading a dump into
+an empty database reproduces the inventory.
+
+Formats go by file extension: ``.csv``, or ``.ndjson`` / ``.jsonl``.
+CSV columns are the schema's fields; an empty cell means the field is
+absent, and a server's ``interfaces`` cell lists ``mac=role`` pairs
+separated by ``;``.
+"""
+
+import csv
+import json
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from marshmallow import ValidationError
+from sqlalchemy import insert, select, text
+
+from steel_pigs.mac import int_to_mac
+from steel_pigs.plugins.providers.sql import (
+    _IN_CHUNK,
+    CHANGE_ADD_SWITCH,
+    CHANGE_CREATE,
+    ProvisionZone,
+    ServerChange,
+    ServerDataModel,
+    ServerInterface,
+    SwitchInfo,
+    _all_macs,
+    _chunks,
+    _claim_macs,
+    _mac_conflict,
+    _mac_owners,
+    _server_macs,
+    _split_interfaces,
+)
+from steel_pigs.schemas import CreateServerIn, ProvisionZoneIn, SwitchRowIn
+
+# Rows per executemany.
+BATCH_SIZE = 5000
+
+# Rejected rows printed per file; the rest are only counted.
+REPORT_REJECTED = 20
+
+_ZONE = ProvisionZone.__table__
+_SERVER = ServerDataModel.__table__
+_SWITCH = SwitchInfo.__table__
+_NIC = ServerInterface.__table__
+_CHANGE = ServerChange.__table__
+
+ZONE_FIELDS = tuple(ProvisionZoneIn().fields)
+SERVER_FIELDS = tuple(CreateServerIn().fields)
+SWITCH_FIELDS = ("server_number", "switch_name", "switch_port")
+
+_SERVER_COLUMNS = [_SERVER.c[name] for name in SERVER_FIELDS if name != "interfaces"]
+_ZONE_ROWS = select(*(_ZONE.c[name] for name in ZONE_FIELDS)).order_by(_ZONE.c.id)
+# Switch entries without a server can't be loaded back.
+_SWITCH_ROWS = (
+    select(*(_SWITCH.c[name] for name in SWITCH_FIELDS))
+    .where(_SWITCH.c.server_number.is_not(None))
+    .order_by(_SWITCH.c.id)
+)
+
+
+def file_format(path):
+    """``"csv"`` or ``"ndjson"``, from ``path``'s extension."""
+    suffix = Path(path).suffix.lower()
+    if suffix == ".csv":
+        return "csv"
+    if suffix in (".ndjson", ".jsonl"):
+        return "ndjson"
+    raise ValueError(f"{path}: expected a .csv, .ndjson or .jsonl file")
+
+
+# --- reading ---------------------------------------------------------------
+
+
+def _csv_interfaces(cell):
+    """``[{"mac", "role"}]`` from a CSV ``interfaces`` cell."""
+    nics = []
+    for pair in cell.split(";"):
+        mac, _, role = pair.strip().partition("=")
+        nics.append({"mac": mac, "role": role} if role else {"mac": mac})
+    return nics
+
+
+def _read(path):
+    """Yield ``(line, item, parse_error)`` for each row of ``path``."""
+    with open(path, newline="", encoding="utf-8") as stream:
+        if file_format(path) == "csv":
+            reader = csv.DictReader(stream)
+            for row in reader:
+                item = {key: value for key, value in row.items() if value != ""}
+                if "interfaces" in item:
+                    item["interfaces"] = _csv_interfaces(item["interfaces"])
+                yield reader.line_num, item, None
+            return
+        for line, raw in enumerate(stream, 1):
+            raw = raw.strip()
+            if not raw:
+                continue
+            try:
+                yield line, json.loads(raw), None
+            except ValueError as exc:
+                yield line, None, f"Invalid JSON: {exc}"
+
+
+def _batched(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# --- key checks -----------------------------------------------------------
+
+
+def _taken(conn, column, values):
+    """The ``values`` already stored in ``column``."""
+    taken = set()
+    for chunk in _chunks(list({value for value in values if value is not None}), _IN_CHUNK):
+        taken.update(conn.execute(select(column).where(column.in_(chunk))).scalars())
+    return taken
+
+
+def _zone_conflicts(conn, zones):
+    """``{position: message}`` for the ``zones`` whose id or name is taken,
+    in the database or earlier in the file."""
+    ids = _taken(conn, _ZONE.c.id, [zone["id"] for zone in zones])
+    names = _taken(conn, _ZONE.c.zone_name, [zone["zone_name"] for zone in zones])
+    conflicts = {}
+    for pos, zone in enumerate(zones):
+        if zone["id"] in ids:
+            conflicts[pos] = f"zone id {zone['id']!r} already exists"
+        elif zone["zone_name"] in names:
+            conflicts[pos] = f"zone_name {zone['zone_name']!r} already exists"
+        else:
+            if zone["id"] is not None:
+                ids.add(zone["id"])
+            names.add(zone["zone_name"])
+    return conflicts
+
+
+def _server_conflicts(conn, servers):
+    """``{position: message}`` for the ``servers`` whose server_number or
+    MACs are taken, as ``SQL.create_servers`` checks them, or whose
+    provision_zone_id names no stored zone."""
+    numbers = [server["server_number"] for server in servers]
+    macs = [_server_macs(*_split_interfaces(server)) for server in servers]
+    taken = _taken(conn, _SERVER.c.server_number, numbers)
+    owners = _mac_owners(conn, _all_macs(macs))
+    zones = _taken(conn, _ZONE.c.id, [server["provision_zone_id"] for server in servers])
+    conflicts = {}
+    for pos, number in enumerate(numbers):
+        zone = servers[pos]["provision_zone_id"]
+        if number in taken:
+            conflicts[pos] = f"server_number {number!r} already exists"
+            continue
+        if zone is not None and zone not in zones:
+            conflicts[pos] = f"provision_zone_id {zone!r} does not exist"
+            continue
+        message = _mac_conflict(number, *macs[pos], *owners)
+        if message is not None:
+            conflicts[pos] = message
+            continue
+        taken.add(number)
+        _claim_macs(number, *macs[pos], *owners)
+    return conflicts
+
+
+def _switch_conflicts(conn, switches):
+    """``{position: message}`` for the ``switches`` whose server isn't
+    stored. Servers loaded earlier in this load are, by now; ones it
+    rejected aren't."""
+    numbers = [switch["server_number"] for switch in switches]
+    stored = _taken(conn, _SERVER.c.server_number, numbers)
+    return {
+        pos: f"server_number {number!r} does not exist"
+        for pos, number in enumerate(numbers)
+        if number not in stored
+    }
+
+
+# --- writing rows ----------------------------------------------------------
+
+
+def _insert_zones(conn, zones):
+    # Explicit ids and generated ones can't share an executemany.
+    given = [zone for zone in zones if zone["id"] is not None]
+    generated = [
+        {k: v for k, v in zone.items() if k != "id"} for zone in zones if zone["id"] is None
+    ]
+    for rows in (given, generated):
+        if rows:
+            conn.execute(insert(_ZONE), rows)
+
+
+def _insert_servers(conn, servers):
+    split = [_split_interfaces(server) for server in servers]
+    conn.execute(insert(_SERVER), [columns for columns, _ in split])
+    nics = [nic for _, server_nics in split for nic in server_nics]
+    if nics:
+        conn.execute(insert(_NIC), nics)
+    _log_changes(conn, [server["server_number"] for server in servers], CHANGE_CREATE)
+
+
+def _insert_switches(conn, switches):
+    conn.execute(insert(_SWITCH), switches)
+    _log_changes(conn, [switch["server_number"] for switch in switches], CHANGE_ADD_SWITCH)
+
+
+def _log_changes(conn, server_numbers, action):
+    # The same entries the API's writes log, so change-feed consumers
+    # see loaded rows too.
+    conn.execute(
+        insert(_CHANGE),
+        [{"server_number": number, "action": action, "field": None} for number in server_numbers],
+    )
+
+
+# name -> (schema, key check, insert function, tables whose secondary
+# indexes it fills)
+_KINDS = {
+    "zones": (ProvisionZoneIn, _zone_conflicts, _insert_zones, (_ZONE,)),
+    "servers": (CreateServerIn, _server_conflicts, _insert_servers, (_SERVER, _NIC)),
+    "switches": (SwitchRowIn, _switch_conflicts, _insert_switches, (_SWITCH,)),
+}
+
+
+def _load_file(conn, kind, path, batch_size, report):
+    schema, conflicts, insert_rows, _ = _KINDS[kind]
+    loader = schema(many=True)
+    loaded, rejected = 0, []
+    start = time.perf_counter()
+    for batch in _batched(_read(path), batch_size):
+        items, lines = [], []
+        for line, item, parse_error in batch:
+            if parse_error is not None:
+                rejected.append((line, {"_json": [parse_error]}))
+            else:
+                items.append(item)
+                lines.append(line)
+        try:
+            data, errors = loader.load(items), {}
+        except ValidationError as exc:
+            data, errors = exc.valid_data, exc.messages
+        rejected.extend((lines[pos], messages) for pos, messages in errors.items())
+        valid = [(lines[pos], row) for pos, row in enumerate(data) if pos not in errors]
+        if valid:
+            # Rows loaded by earlier batches are in the database by now.
+            clashes = conflicts(conn, [row for _, row in valid])
+            rejected.extend(
+                (valid[pos][0], {"_conflict": [message]}) for pos, message in clashes.items()
+            )
+            valid = [entry for pos, entry in enumerate(valid) if pos not in clashes]
+        valid = [row for _, row in valid]
+        if valid:
+            insert_rows(conn, valid)
+            loaded += len(valid)
+    seconds = time.perf_counter() - start
+    rejected.sort(key=lambda entry: entry[0])
+    if report is not None:
+        rate = loaded / seconds if seconds else 0.0
+        report(
+            f"{kind}: {loaded} rows in {seconds:.2f}s ({rate:.0f} rows/s), {len(rejected)} rejected"
+        )
+        for line, messages in rejected[:REPORT_REJECTED]:
+            report(f"  {path}:{line}: {messages}")
+        if len(rejected) > REPORT_REJECTED:
+            report(f"  ... and {len(rejected) - REPORT_REJECTED} more")
+    return {"loaded": loaded, "rejected": rejected, "seconds": seconds}
+
+
+def _secondary_indexes(tables):
+    # Unique indexes stay: they are what rejects duplicates.
+    return [index for table in tables for index in table.indexes if not index.unique]
+
+
+def _reset_zone_sequence(conn):
+    """Move Postgres' id sequence past zone ids that were given explicitly."""
+    if conn.dialect.name == "postgresql":
+        conn.execute(
+            text(
+                "SELECT setval(pg_get_serial_sequence('\"ProvisionZone\"', 'id'), "
+                'coalesce(max(id), 1)) FROM "ProvisionZone"'
+            )
+        )
+
+
+def load(
+    engine,
+    zones=None,
+    servers=None,
+    switches=None,
+    batch_size=BATCH_SIZE,
+    rebuild_indexes=False,
+    report=None,
+):
+    """Bulk-load inventory files into the database behind ``engine``.
+
+    Zones load first, then servers, then switches, so each can refer to
+    the last. Everything runs in one transaction.
+
+    :param zones: path of a zones file, or None
+    :param servers: path of a servers file, or None
+    :param switches: path of a switches file, or None
+    :param batch_size: rows per executemany
+    :param rebuild_indexes: drop the secondary indexes of the tables
+        being filled and rebuild them after the load -- one sorted build
+        per index instead of updating it row by row. The drop locks the
+        tables (Postgres: ACCESS EXCLUSIVE) until the load commits, so
+        only use it on a database nothing else is using.
+    :param report: called with one line of progress text at a time
+    :return: ``{kind: {"loaded", "rejected", "seconds"}}`` per file
+        given; ``rejected`` lists ``(line, errors)``
+    """
+    files = {
+        kind: path
+        for kind, path in (("zones", zones), ("servers", servers), ("switches", switches))
+        if path is not None
+    }
+    for path in files.values():
+        file_format(path)
+    indexes = []
+    if rebuild_indexes:
+        indexes = _secondary_indexes(table for kind in files for table in _KINDS[kind][3])
+        if report is not None:
+            report(
+                f"dropping {len(indexes)} indexes for the load: their tables stay locked "
+                "until it commits"
+            )
+    results = {}
+    try:
+        with engine.begin() as conn:
+            for index in indexes:
+                index.drop(conn)
+            for kind, path in files.items():
+                results[kind] = _load_file(conn, kind, path, batch_size, report)
+            if "zones" in files:
+                _reset_zone_sequence(conn)
+            if indexes:
+                start = time.perf_counter()
+                for index in indexes:
+                    index.create(conn)
+                if report is not None:
+                    seconds = time.perf_counter() - start
+                    report(f"rebuilt {len(indexes)} indexes in {seconds:.2f}s")
+    finally:
+        if indexes:
+            # Not every backend rolls DDL back with the transaction.
+            with engine.begin() as conn:
+                for index in indexes:
+                    index.create(conn, checkfirst=True)
+    return results
+
+
+# --- dump ------------------------------------------------------------------
+
+
+def _csv_cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return ";".join(f"{nic['mac']}={nic['role']}" for nic in value)
+    return value
+
+
+@contextmanager
+def _writer(path, fields):
+    """A ``write(row)`` for ``path`` in the format its extension names."""
+    csv_file = file_format(path) == "csv"
+    with open(path, "w", newline="", encoding="utf-8") as stream:
+        if csv_file:
+            writer = csv.writer(stream)
+            writer.writerow(fields)
+
+            def write(row):
+                writer.writerow([_csv_cell(row[name]) for name in fields])
+
+        else:
+
+            def write(row):
+                stream.write(json.dumps(row, separators=(",", ":")) + "\n")
+
+        yield write
+
+
+def _dump_servers(conn, write, batch_size):
+    count, after = 0, None
+    while True:
+        stmt = select(*_SERVER_COLUMNS).order_by(_SERVER.c.server_number).limit(batch_size)
+        if after is not None:
+            stmt = stmt.where(_SERVER.c.server_number > after)
+        rows = conn.execute(stmt).mappings().all()
+        if not rows:
+            return count
+        numbers = [row["server_number"] for row in rows]
+        nics = {}
+        for chunk in _chunks(numbers, _IN_CHUNK):
+            stmt = (
+                select(_NIC.c.server_number, _NIC.c.mac, _NIC.c.role)
+                .where(_NIC.c.server_number.in_(chunk))
+                .order_by(_NIC.c.server_number, _NIC.c.id)
+            )
+            for number, mac, role in conn.execute(stmt):
+                nics.setdefault(number, []).append({"mac": int_to_mac(mac), "role": role})
+        for row in rows:
+            write({**row, "interfaces": nics.get(row["server_number"], [])})
+        count += len(rows)
+        after = numbers[-1]
+
+
+def _dump_rows(conn, write, batch_size, stmt):
+    count = 0
+    for row in conn.execution_options(yield_per=batch_size).execute(stmt).mappings():
+        write(dict(row))
+        count += 1
+    return count
+
+
+def _dump_zones(conn, write, batch_size):
+    return _dump_rows(conn, write, batch_size, _ZONE_ROWS)
+
+
+def _dump_switches(conn, write, batch_size):
+    return _dump_rows(conn, write, batch_size, _SWITCH_ROWS)
+
+
+_DUMPS = {
+    "zones": (ZONE_FIELDS, _dump_zones),
+    "servers": (SERVER_FIELDS, _dump_servers),
+    "switches": (SWITCH_FIELDS, _dump_switches),
+}
+
+
+def dump(engine, zones=None, servers=None, switches=None, batch_size=BATCH_SIZE, report=None):
+    """Write the inventory to files :func:`load` reads back.
+
+    Servers come out in ``server_number`` order, a page of
+    ``batch_size`` at a time with their interfaces; zones and switches
+    stream straight off a cursor. Switch entries without a server are
+    left out.
+
+    :return: ``{kind: rows written}`` per file given
+    """
+    files = {
+        kind: path
+        for kind, path in (("zones", zones), ("servers", servers), ("switches", switches))
+        if path is not None
+    }
+    for path in files.values():
+        file_format(path)
+    counts = {}
+    with engine.connect() as conn:
+        for kind, path in files.items():
+            fields, run = _DUMPS[kind]
+            start = time.perf_counter()
+            with _writer(path, fields) as write:
+                counts[kind] = run(conn, write, batch_size)
+            if report is not None:
+                seconds = time.perf_counter() - start
+                rate = counts[kind] / seconds if seconds else 0.0
+                report(f"{kind}: {counts[kind]} rows in {seconds:.2f}s ({rate:.0f} rows/s)")
+    return counts
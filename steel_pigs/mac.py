@@ -0,0 +1,53 @@
+#   Copyright 2026 Michael Rice <michael@michaelrice.org>
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""MAC addresses as 48-bit integers.
+
+Servers report the same MAC in several notations -- ``aa:bb:cc:dd:ee:ff``
+(Linux, iPXE), ``AA-BB-CC-DD-EE-FF`` (Windows, some BMCs),
+``aabb.ccdd.eeff`` (Cisco) and bare ``aabbccddeeff``. The inventory
+stores and looks MACs up by their integer value so every notation of
+one address is the same key.
+"""
+
+import re
+
+_SEPARATED = re.compile(r"[0-9a-f]{1,2}([:-])(?:[0-9a-f]{1,2}\1){4}[0-9a-f]{1,2}")
+_CISCO = re.compile(r"[0-9a-f]{4}\.[0-9a-f]{4}\.[0-9a-f]{4}")
+_BARE = re.compile(r"[0-9a-f]{12}")
+
+
+def mac_to_int(mac):
+    """The 48-bit integer value of ``mac`` in any of the notations above.
+
+    Colon and dash separated octets may drop a leading zero
+    (``0:1b:...``), as ``ip link`` on some systems prints them.
+
+    :raises ValueError: if ``mac`` isn't a MAC address
+    """
+    if not isinstance(mac, str):
+        raise ValueError(f"Not a MAC address: {mac!r}")
+    value = mac.strip().lower()
+    if _SEPARATED.fullmatch(value):
+        return int("".join(octet.zfill(2) for octet in re.split("[:-]", value)), 16)
+    if _CISCO.fullmatch(value):
+        return int(value.replace(".", ""), 16)
+    if _BARE.fullmatch(value):
+        return int(value, 16)
+    raise ValueError(f"Not a MAC address: {mac!r}")
+
+
+def int_to_mac(value):
+    """``value`` as a lower-case, colon-separated MAC."""
+    return ":".join(f"{(value >> shift) & 0xFF:02x}" for shift in range(40, -8, -8))
@@ -15,8 +15,6 @@
 from flask import Blueprint, flash, redirect, render_template, url_for
 from markupsafe import escape
 
-from .forms import SearchByNameForm
-
 frontend = Blueprint("frontend", __name__)
 
 
@@ -24,6 +22,9 @@ frontend = Blueprint("frontend", __name__)
 # "templates/index.html" documentation for more details.
 @frontend.route("/")
 def index():
+    # Imported here so Flask-WTF isn't loaded until the demo UI is used.
+    from .forms import SearchByNameForm
+
     form = SearchByNameForm()
 
     return render_template("home_form.html", form=form)
@@ -32,6 +33,8 @@ def index():
 # Shows a long signup form, demonstrating form rendering.
 @frontend.route("/find_by_name/", methods=("GET", "POST"))
 def find_by_name():
+    from .forms import SearchByNameForm
+
     form = SearchByNameForm()
 
     if form.validate_on_submit():
@@ -20,6 +20,48 @@ Secrets and per-deployment values come from environment variables:
   warning is logged; sessions will not survive a restart.
 * ``STEEL_PIGS_DATABASE_URL`` -- SQLAlchemy URL for the bundled ``SQL``
   inventory plugin. Defaults to an in-memory sqlite database.
+* ``STEEL_PIGS_DB_POOL_SIZE``, ``STEEL_PIGS_DB_MAX_OVERFLOW``,
+  ``STEEL_PIGS_DB_POOL_TIMEOUT``, ``STEEL_PIGS_DB_POOL_RECYCLE``,
+  ``STEEL_PIGS_DB_POOL_PRE_PING``, ``STEEL_PIGS_DB_STATEMENT_TIMEOUT_MS``
+  -- connection pool and statement timeout settings for the ``SQL``
+  plugin. Unset keeps SQLAlchemy's defaults.
+* ``STEEL_PIGS_DB_MIGRATE`` -- ``upgrade`` (default) migrates a stale
+  schema when a worker starts; ``check`` only compares the revision and
+  keeps ``/readyz`` at 503 until ``python -m steel_pigs.db upgrade``
+  has run.
+* ``STEEL_PIGS_DATABASE_REPLICA_URLS`` -- comma-separated read-replica
+  URLs. Lookups round-robin over them; writes stay on
+  ``STEEL_PIGS_DATABASE_URL``. A request or actor that wrote reads from
+  the primary for ``STEEL_PIGS_REPLICA_STICKY_SECONDS`` (default 5).
+* ``STEEL_PIGS_CHANGE_POLL_SECONDS`` -- how often long-polls of
+  ``GET /v1/changes`` look for writes made by other workers (default 1).
+* ``STEEL_PIGS_CHANGE_COMMIT_LAG_SECONDS`` -- how long ``GET
+  /v1/changes`` holds back a change after first seeing it, so a
+  transaction that committed out of sequence order isn't skipped
+  (default 0 on SQLite, 2 on Postgres/MySQL).
+* ``STEEL_PIGS_ASYNC_DB`` -- set to ``1`` to load ``AsyncSQL`` instead
+  of ``SQL``: same settings, but the PXE views await their lookups on
+  SQLAlchemy's asyncio engine (needs the ``async`` extra; see
+  ``steel_pigs.asgi``).
+* ``STEEL_PIGS_SHARD_URLS`` -- comma-separated database URLs, first
+  shard first. Set, it loads ``ShardedSQL`` over them instead of
+  ``SQL`` (``STEEL_PIGS_DATABASE_URL`` is then unused, and read
+  replicas aren't supported); workers re-read the shard count every
+  ``STEEL_PIGS_SHARD_LAYOUT_REFRESH_SECONDS`` (default 5). See
+  ``python -m steel_pigs.db reshard``.
+* ``STEEL_PIGS_PROVIDER_CACHE`` -- set to ``1`` to put a read-through
+  LRU/TTL cache in front of the inventory plugin. Size and TTL come
+  from ``STEEL_PIGS_PROVIDER_CACHE_SIZE`` / ``STEEL_PIGS_PROVIDER_CACHE_TTL``.
+* ``STEEL_PIGS_WRITE_BEHIND`` -- set to ``1`` to queue boot-status
+  writes and commit them in batches every
+  ``STEEL_PIGS_WRITE_BEHIND_WINDOW_MS`` (default 50), last write per
+  server winning. ``STEEL_PIGS_WRITE_BEHIND_MAX_PENDING`` bounds the
+  queue; ``STEEL_PIGS_WRITE_BEHIND_SYNC_ACK=1`` holds each request
+  until its batch has committed.
+* ``STEEL_PIGS_CACHE_GENERATION_FILE`` -- path of the generation file
+  every worker on the host shares for cache invalidation (see
+  ``steel_pigs.generation``). Unset means each worker only sees its
+  own mutations until the TTL expires.
 
 Plugin selection (which namespace/class to load for each role) stays in
 this file -- swap the dicts below to point at your own plugins.
@@ -46,6 +88,18 @@ def _resolve_secret_key():
 SECRET_KEY = _resolve_secret_key()
 
 
+def _env_flag(name, default=False):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_number(name, kind=int):
+    value = os.environ.get(name)
+    return kind(value) if value else None
+
+
 def _resolve_database_url():
     url = os.environ.get("STEEL_PIGS_DATABASE_URL", "sqlite:///steel_pigs.db")
     if ":memory:" in url:
@@ -61,12 +115,74 @@ def _resolve_database_url():
     return url
 
 
+_ASYNC_DB = _env_flag("STEEL_PIGS_ASYNC_DB")
+_SHARD_URLS = [
+    url.strip() for url in os.environ.get("STEEL_PIGS_SHARD_URLS", "").split(",") if url.strip()
+]
+
+if _SHARD_URLS:
+    _PROVIDER_MODULE, _PROVIDER_CLASS = "sharded", "ShardedSQL"
+elif _ASYNC_DB:
+    _PROVIDER_MODULE, _PROVIDER_CLASS = "async_sql", "AsyncSQL"
+else:
+    _PROVIDER_MODULE, _PROVIDER_CLASS = "sql", "SQL"
+
 PROVIDER_PLUGIN = {
-    "namespace": "steel_pigs.plugins.providers.sql",
-    "class": "SQL",
+    "namespace": f"steel_pigs.plugins.providers.{_PROVIDER_MODULE}",
+    "class": _PROVIDER_CLASS,
     "engine": _resolve_database_url(),
+    # Overrides for the per-connection SQLite pragmas (WAL, busy_timeout,
+    # synchronous, mmap_size, cache_size); see SQLITE_PRAGMAS in
+    # steel_pigs.plugins.providers.sql.
+    "sqlite_pragmas": {},
+    # Connection pool sizing for server-backed databases. Unset keeps
+    # SQLAlchemy's defaults; /stats reports checkout waits and
+    # utilization to size these against.
+    "pool_size": _env_number("STEEL_PIGS_DB_POOL_SIZE"),
+    "max_overflow": _env_number("STEEL_PIGS_DB_MAX_OVERFLOW"),
+    "pool_timeout": _env_number("STEEL_PIGS_DB_POOL_TIMEOUT", float),
+    "pool_recycle": _env_number("STEEL_PIGS_DB_POOL_RECYCLE"),
+    "pool_pre_ping": _env_flag("STEEL_PIGS_DB_POOL_PRE_PING", default=None),
+    "statement_timeout_ms": _env_number("STEEL_PIGS_DB_STATEMENT_TIMEOUT_MS"),
+    # "upgrade" or "check"; see MIGRATE_MODES in steel_pigs.plugins.providers.sql.
+    "migrate": os.environ.get("STEEL_PIGS_DB_MIGRATE", "upgrade"),
+    # Read replicas for get_server_by_*; writes always go to "engine".
+    "replicas": [
+        url.strip()
+        for url in os.environ.get("STEEL_PIGS_DATABASE_REPLICA_URLS", "").split(",")
+        if url.strip()
+    ],
+    "replica_sticky_seconds": float(os.environ.get("STEEL_PIGS_REPLICA_STICKY_SECONDS", "5")),
+    "change_poll_seconds": float(os.environ.get("STEEL_PIGS_CHANGE_POLL_SECONDS", "1")),
+    # Unset: 0 on SQLite, 2 seconds on servers with concurrent writers.
+    "change_commit_lag_seconds": _env_number("STEEL_PIGS_CHANGE_COMMIT_LAG_SECONDS", float),
+    # ShardedSQL only (STEEL_PIGS_SHARD_URLS): every shard's URL, and how
+    # often to re-read the shard count.
+    "shards": _SHARD_URLS,
+    "layout_refresh_seconds": float(os.environ.get("STEEL_PIGS_SHARD_LAYOUT_REFRESH_SECONDS", "5")),
 }
 
+# Optional read-through cache layered over PROVIDER_PLUGIN by create_app.
+# Works with any provider; see steel_pigs.plugins.providers.caching.
+PROVIDER_CACHE = {
+    "enabled": _env_flag("STEEL_PIGS_PROVIDER_CACHE"),
+    "max_entries": int(os.environ.get("STEEL_PIGS_PROVIDER_CACHE_SIZE", "4096")),
+    "ttl_seconds": float(os.environ.get("STEEL_PIGS_PROVIDER_CACHE_TTL", "5")),
+    "generation_file": os.environ.get("STEEL_PIGS_CACHE_GENERATION_FILE"),
+}
+
+# Optional write-behind buffer for boot-status writes, layered under the
+# cache. See steel_pigs.plugins.providers.writebehind.
+PROVIDER_WRITE_BEHIND = {
+    "enabled": _env_flag("STEEL_PIGS_WRITE_BEHIND"),
+    "window_seconds": float(os.environ.get("STEEL_PIGS_WRITE_BEHIND_WINDOW_MS", "50")) / 1000,
+    "max_pending": int(os.environ.get("STEEL_PIGS_WRITE_BEHIND_MAX_PENDING", "10000")),
+    "sync_ack": _env_flag("STEEL_PIGS_WRITE_BEHIND_SYNC_ACK"),
+}
+
+# Items per transaction (and per audit event) for POST /v1/servers:bulk.
+BULK_BATCH_SIZE = int(os.environ.get("STEEL_PIGS_BULK_BATCH_SIZE", "500"))
+
 VERSION_PROVIDER_PLUGIN = {
     "namespace": "steel_pigs.plugins.providers.static_version",
     "class": "StaticVersionProvider",
@@ -0,0 +1,149 @@
+#   Copyright 2026 Michael Rice <michael@michaelrice.org>
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import asyncio
+import os
+import threading
+import time
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from .sql import _LOOKUPS, SQL, _fold_server, _mac_key, _make_engine, _PoolMetrics
+
+# Async driver used for each backend's lookups. The driver package has
+# to be installed (``pip install steel_pigs[async]`` covers SQLite).
+ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "postgresql": "asyncpg",
+    "mysql": "aiomysql",
+    "mariadb": "aiomysql",
+}
+
+
+def _async_url(url):
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver known for {backend!r} databases")
+    if backend == "sqlite" and url.database in (None, "", ":memory:"):
+        # A second engine would open a second, empty in-memory database.
+        raise ValueError("AsyncSQL needs a file-backed SQLite database")
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+
+
+class AsyncSQL(SQL):
+    """``SQL`` provider whose lookups can be awaited.
+
+    ``aget_server_by_*`` run the same statements as ``get_server_by_*``
+    through SQLAlchemy's asyncio engine (aiosqlite for SQLite, see
+    ``ASYNC_DRIVERS``), so the async PXE views wait on the database
+    without holding a thread. Everything else -- the blocking lookups,
+    writes, migrations, replica routing -- is inherited from ``SQL``,
+    and the config dict is the same.
+
+    Async connections belong to the event loop that opened them, while
+    Flask runs each async view on a loop of its own. The async engines
+    therefore live on one private loop thread per process, started on
+    first use (and again in a forked worker); callers on any loop await
+    results from it.
+    """
+
+    def __init__(self, config):
+        super().__init__(config)
+        self._config = config
+        # Fail at startup, not on the first PXE boot.
+        self._async_urls = {engine: _async_url(engine.url) for engine in self._pool_metrics}
+        self._loop = None
+        self._loop_pid = None
+        self._loop_lock = threading.Lock()
+        self._async_engines = {}
+        self._async_metrics = {}
+
+    def _async_loop(self):
+        """The private loop, started (or restarted after fork) on demand."""
+        if self._loop is not None and self._loop_pid == os.getpid():
+            return self._loop
+        with self._loop_lock:
+            if self._loop is None or self._loop_pid != os.getpid():
+                loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=loop.run_forever, name="steel-pigs-async-sql", daemon=True
+                ).start()
+                # Engines inherited from a parent process hold connections
+                # tied to the parent's loop; start over with fresh ones.
+                self._async_engines = {
+                    engine: _make_engine({**self._config, "engine": url}, create_async_engine)
+                    for engine, url in self._async_urls.items()
+                }
+                self._async_metrics = {
+                    engine: _PoolMetrics(async_engine.pool)
+                    for engine, async_engine in self._async_engines.items()
+                }
+                self._loop, self._loop_pid = loop, os.getpid()
+        return self._loop
+
+    async def _fetch(self, engine, kind, params):
+        """Run a lookup on the private loop."""
+        metrics = self._async_metrics[engine]
+        start = time.perf_counter()
+        try:
+            async with self._async_engines[engine].connect() as conn:
+                metrics.record((time.perf_counter() - start) * 1000)
+                result = await conn.execute(_LOOKUPS[kind], params)
+                return _fold_server(result.all())
+        except PoolTimeoutError:
+            metrics.record_timeout()
+            raise
+
+    async def _aget_server(self, kind, params):
+        # Pick the engine here, in the caller's context, so replica
+        # stickiness sees the current request.
+        engine = self._read_engine()
+        loop = self._async_loop()
+        future = asyncio.run_coroutine_threadsafe(self._fetch(engine, kind, params), loop)
+        return await asyncio.wrap_future(future)
+
+    async def aget_server_by_name(self, name):
+        return await self._aget_server("name", {"value": name})
+
+    async def aget_server_by_number(self, number):
+        return await self._aget_server("number", {"value": number})
+
+    async def aget_server_by_mac(self, mac):
+        key = _mac_key(mac)
+        if key is None:
+            return None
+        return await self._aget_server("mac", {"value": key})
+
+    async def aget_server_by_switch(self, switch_name, switch_port):
+        return await self._aget_server(
+            "switch", {"switch_name": switch_name, "switch_port": switch_port}
+        )
+
+    def stats(self):
+        stats = super().stats()
+        if self._async_metrics:
+            stats["async_pool"] = self._async_metrics[self.engine].snapshot()
+        return stats
+
+    def close(self):
+        """Dispose the async engines and stop the private loop."""
+        with self._loop_lock:
+            loop, self._loop = self._loop, None
+            if loop is None or self._loop_pid != os.getpid():
+                return
+            for async_engine in self._async_engines.values():
+                asyncio.run_coroutine_threadsafe(async_engine.dispose(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+            self._async_engines, self._async_metrics = {}, {}
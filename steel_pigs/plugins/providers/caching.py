@@ -0,0 +1,314 @@
+#   Copyright 2026 Michael Rice <michael@michaelrice.org>
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import threading
+import time
+from collections import OrderedDict
+
+from steel_pigs.generation import LocalGeneration
+
+from .pluginbase import ProviderPluginBase
+
+
+def _server_key(server_number):
+    """Normalize a server number so ``"555121"`` and ``555121`` share entries."""
+    try:
+        return int(server_number)
+    except (TypeError, ValueError):
+        return server_number
+
+
+class CachingProvider(ProviderPluginBase):
+    """Read-through LRU + TTL cache in front of any inventory provider.
+
+    Wraps the ``get_server_by_*`` lookups of another
+    ``ProviderPluginBase``. An iPXE client that chainloads or retries
+    asks for the same server several times within seconds; those repeats
+    are served from memory instead of a fresh DB session each.
+
+    Entries are bounded by ``max_entries`` (least recently used goes
+    first) and ``ttl_seconds``. Every mutation that goes through this
+    wrapper evicts all entries for the affected ``server_number``,
+    whichever key (number, MAC, hostname, switch/port) they were cached
+    under. Misses (``None`` results) are not cached, so a newly
+    registered server is visible on its first boot.
+
+    ``generation`` (see :mod:`steel_pigs.generation`) extends this across
+    worker processes: it is read on every lookup, and when another
+    worker has bumped it since the last lookup the whole cache is
+    dropped before answering.
+
+    Cached dicts are shared between callers -- treat them as read-only.
+    Attributes that aren't part of the provider contract (``engine``,
+    ``create_entry``, ...) pass straight through to the wrapped provider
+    and bypass invalidation.
+    """
+
+    def __init__(
+        self,
+        provider,
+        max_entries=4096,
+        ttl_seconds=5.0,
+        clock=time.monotonic,
+        generation=None,
+    ):
+        self.provider = provider
+        self.generation = generation if generation is not None else LocalGeneration()
+        self._seen_generation = self.generation.current()
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._keys_by_server = {}  # server_number -> {key, ...}
+        # Bumped on every invalidation. A load that straddles a write
+        # sees a different epoch when it finishes and skips the store,
+        # so a pre-write read can't repopulate the cache.
+        self._epoch = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.flushes = 0
+
+    def __getattr__(self, name):
+        # Only reached for attributes not found normally. Guard against
+        # recursion before ``provider`` is set (copy/pickle, __init__).
+        if name == "provider":
+            raise AttributeError(name)
+        return getattr(self.provider, name)
+
+    # --- cache mechanics ---------------------------------------------------
+
+    def _probe(self, key, now):
+        """``(True, value)`` on a hit, else ``(False, epoch)`` to store under."""
+        generation = self.generation.current()
+        with self._lock:
+            if generation != self._seen_generation:
+                self._seen_generation = generation
+                self._flush()
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[1]
+            self.misses += 1
+            return False, self._epoch
+
+    def _cached(self, key, load):
+        now = self._clock()
+        hit, found = self._probe(key, now)
+        if hit:
+            return found
+        value = load()
+        if value is not None:
+            self._store(key, value, now + self.ttl_seconds, found)
+        return value
+
+    async def _acached(self, key, aload):
+        now = self._clock()
+        hit, found = self._probe(key, now)
+        if hit:
+            return found
+        value = await aload()
+        if value is not None:
+            self._store(key, value, now + self.ttl_seconds, found)
+        return value
+
+    def _store(self, key, value, expires_at, epoch):
+        server = _server_key(value.get("server_number"))
+        with self._lock:
+            if epoch != self._epoch:
+                return
+            self._drop(key)
+            self._entries[key] = (expires_at, value)
+            self._keys_by_server.setdefault(server, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.evictions += 1
+
+    def _drop(self, key):
+        """Remove ``key`` and its reverse-index entry. Caller holds the lock."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        server = _server_key(entry[1].get("server_number"))
+        keys = self._keys_by_server.get(server)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_server[server]
+
+    def invalidate(self, server_number):
+        """Evict every entry that resolves to ``server_number``."""
+        server = _server_key(server_number)
+        with self._lock:
+            self._epoch += 1
+            self.invalidations += 1
+            for key in list(self._keys_by_server.get(server, ())):
+                self._drop(key)
+
+    def clear(self):
+        """Evict everything."""
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        """Drop all entries. Caller holds the lock."""
+        self._epoch += 1
+        self.flushes += 1
+        self._entries.clear()
+        self._keys_by_server.clear()
+
+    def stats(self):
+        stats = dict(self.provider.stats())
+        with self._lock:
+            stats["cache"] = {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "flushes": self.flushes,
+                "generation": self._seen_generation,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+            }
+        return stats
+
+    def ready(self):
+        return self.provider.ready()
+
+    # --- reads -------------------------------------------------------------
+
+    def get_server_by_name(self, name):
+        return self._cached(("name", name), lambda: self.provider.get_server_by_name(name))
+
+    def get_server_by_number(self, number):
+        return self._cached(
+            ("number", _server_key(number)),
+            lambda: self.provider.get_server_by_number(number),
+        )
+
+    def get_server_by_mac(self, mac):
+        return self._cached(("mac", mac), lambda: self.provider.get_server_by_mac(mac))
+
+    def get_server_by_switch(self, switch_name, switch_port):
+        return self._cached(
+            ("switch", switch_name, switch_port),
+            lambda: self.provider.get_server_by_switch(switch_name, switch_port),
+        )
+
+    async def aget_server_by_name(self, name):
+        return await self._acached(("name", name), lambda: self.provider.aget_server_by_name(name))
+
+    async def aget_server_by_number(self, number):
+        return await self._acached(
+            ("number", _server_key(number)),
+            lambda: self.provider.aget_server_by_number(number),
+        )
+
+    async def aget_server_by_mac(self, mac):
+        return await self._acached(("mac", mac), lambda: self.provider.aget_server_by_mac(mac))
+
+    async def aget_server_by_switch(self, switch_name, switch_port):
+        return await self._acached(
+            ("switch", switch_name, switch_port),
+            lambda: self.provider.aget_server_by_switch(switch_name, switch_port),
+        )
+
+    def lookup_servers(self, server_numbers=(), macs=(), switches=()):
+        # One batched read beats thousands of cache probes that mostly
+        # miss; sweeps rarely repeat an identifier within the TTL.
+        return self.provider.lookup_servers(server_numbers, macs, switches)
+
+    def list_servers(self, after=None, limit=100, **filters):
+        # Pages aren't cached; a listing walks past each server once.
+        return self.provider.list_servers(after, limit, **filters)
+
+    def export_servers(self, **filters):
+        return self.provider.export_servers(**filters)
+
+    def list_changes(self, since=0, limit=100):
+        return self.provider.list_changes(since, limit)
+
+    def wait_for_changes(self, since, timeout):
+        return self.provider.wait_for_changes(since, timeout)
+
+    # --- writes: delegate, then evict ---------------------------------------
+
+    def set_boot_status(self, server_number, boot_status):
+        try:
+            return self.provider.set_boot_status(server_number, boot_status)
+        finally:
+            self.invalidate(server_number)
+
+    def set_boot_os(self, server_number, boot_os):
+        try:
+            return self.provider.set_boot_os(server_number, boot_os)
+        finally:
+            self.invalidate(server_number)
+
+    def set_operational_status(self, server_number, operational_status):
+        try:
+            return self.provider.set_operational_status(server_number, operational_status)
+        finally:
+            self.invalidate(server_number)
+
+    def update_server_field(self, server_number, field, value):
+        try:
+            return self.provider.update_server_field(server_number, field, value)
+        finally:
+            self.invalidate(server_number)
+
+    def create_server(self, server_data):
+        try:
+            return self.provider.create_server(server_data)
+        finally:
+            self.invalidate(server_data.get("server_number"))
+
+    def create_servers(self, servers):
+        try:
+            return self.provider.create_servers(servers)
+        finally:
+            for server_data in servers:
+                self.invalidate(server_data.get("server_number"))
+
+    def bulk_update_field(self, field, value, **targets):
+        try:
+            previous = self.provider.bulk_update_field(field, value, **targets)
+        except Exception:
+            # Unknown how much of it landed.
+            self.clear()
+            raise
+        for number in previous:
+            self.invalidate(number)
+        return previous
+
+    def update_server_fields(self, field, values):
+        try:
+            previous = self.provider.update_server_fields(field, values)
+        except Exception:
+            self.clear()
+            raise
+        for number in previous:
+            self.invalidate(number)
+        return previous
+
+    def add_switch(self, server_number, switch_name, switch_port):
+        try:
+            return self.provider.add_switch(server_number, switch_name, switch_port)
+        finally:
+            self.invalidate(server_number)
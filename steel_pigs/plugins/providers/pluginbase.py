@@ -14,6 +14,19 @@
 
 import abc
 
+from steel_pigs.exceptions.pigs_exceptions import ServerAlreadyExists, ServerNotFound
+
+# Server fields the mutation API may change, and the single-server
+# setter each one maps to.
+MUTABLE_FIELDS = {
+    "boot_status": "set_boot_status",
+    "boot_os": "set_boot_os",
+    "operational_status": "set_operational_status",
+}
+
+# Server fields list_servers can filter on (equality).
+LIST_FILTERS = ("operational_status", "boot_status", "boot_os", "provision_zone_id")
+
 
 class ProviderPluginBase(abc.ABC):
     @abc.abstractmethod
@@ -41,7 +54,8 @@ class ProviderPluginBase(abc.ABC):
         Retrieve data about a server and return a dict that
         represents it.
 
-        :param mac: Any MAC address from a given server
+        :param mac: Any MAC address from a given server, in any notation
+            ``steel_pigs.mac.mac_to_int`` accepts
         :return: returns a dict that represents a server
         """
         return
@@ -58,6 +72,26 @@ class ProviderPluginBase(abc.ABC):
         """
         return
 
+    # Awaitable lookups for the async views. These call the blocking
+    # get_server_by_* inline; providers with an async driver override
+    # them so a view awaits the database instead of holding its thread.
+
+    async def aget_server_by_name(self, name):
+        """Awaitable :meth:`get_server_by_name`."""
+        return self.get_server_by_name(name)
+
+    async def aget_server_by_number(self, number):
+        """Awaitable :meth:`get_server_by_number`."""
+        return self.get_server_by_number(number)
+
+    async def aget_server_by_mac(self, mac):
+        """Awaitable :meth:`get_server_by_mac`."""
+        return self.get_server_by_mac(mac)
+
+    async def aget_server_by_switch(self, switch_name, switch_port):
+        """Awaitable :meth:`get_server_by_switch`."""
+        return self.get_server_by_switch(switch_name, switch_port)
+
     @abc.abstractmethod
     def set_boot_status(self, server_number, boot_status):
         """
@@ -98,11 +132,13 @@ class ProviderPluginBase(abc.ABC):
         """Insert a new server record.
 
         :param server_data: dict matching the server schema. Required
-            keys are validated at the route boundary, not here.
+            keys are validated at the route boundary, not here. An
+            optional ``interfaces`` list of ``{"mac", "role"}`` dicts
+            names the server's other NICs.
         :return: the inserted server as a dict (including any
             server-side defaults / generated id).
-        :raises ServerAlreadyExists: if ``server_data['server_number']``
-            is taken.
+        :raises ServerAlreadyExists: if ``server_data['server_number']``,
+            or one of its interface MACs, is taken.
         """
         return
 
@@ -117,3 +153,206 @@ class ProviderPluginBase(abc.ABC):
         :raises ServerNotFound: if ``server_number`` doesn't exist.
         """
         return
+
+    def create_servers(self, servers):
+        """Insert many server records, reporting conflicts per item.
+
+        The default calls :meth:`create_server` once per item. Providers
+        that can batch (one transaction, executemany) should override it.
+
+        :param servers: list of dicts, each as for :meth:`create_server`
+        :return: list aligned with ``servers``; each entry is either
+            ``{"status": "created", "server": <dict>}`` or
+            ``{"status": "conflict", "message": <str>}``.
+        """
+        results = []
+        for server_data in servers:
+            try:
+                created = self.create_server(server_data)
+            except ServerAlreadyExists as exc:
+                results.append({"status": "conflict", "message": str(exc)})
+            else:
+                results.append({"status": "created", "server": created})
+        return results
+
+    def update_server_field(self, server_number, field, value):
+        """Set one field on a server and return the value it replaces.
+
+        The mutation routes build their audit ``before``/``after`` from
+        this instead of reading the server first. The default reads the
+        server and calls its single-server setter, which is two calls
+        and not atomic; providers backed by a database should override
+        it with one transaction (``SELECT ... FOR UPDATE`` plus
+        ``UPDATE``, or a single statement with RETURNING).
+
+        :param server_number: the server to change
+        :param field: one of ``MUTABLE_FIELDS``
+        :param value: the new value
+        :return: the previous value of ``field``
+        :raises ServerNotFound: if ``server_number`` doesn't exist.
+        """
+        if field not in MUTABLE_FIELDS:
+            raise ValueError(f"{field!r} is not a mutable server field")
+        existing = self.get_server_by_number(server_number)
+        if existing is None:
+            raise ServerNotFound(f"server_number {server_number!r} not found")
+        getattr(self, MUTABLE_FIELDS[field])(server_number, value)
+        return existing[field]
+
+    def bulk_update_field(
+        self, field, value, server_numbers=None, switch_name=None, provision_zone_id=None
+    ):
+        """Set one field to the same value on many servers.
+
+        Targets are the servers in ``server_numbers``, attached to
+        ``switch_name``, or in ``provision_zone_id``; supplying several
+        narrows to servers matching all of them.
+
+        The default handles ``server_numbers`` by calling
+        :meth:`update_server_field` per server. Providers that can run
+        one set-based UPDATE (and support the selectors) should override
+        it.
+
+        :param field: one of ``MUTABLE_FIELDS``
+        :param value: the new value
+        :return: dict mapping server_number to the previous value, for
+            every server that was updated
+        :raises NotImplementedError: for selectors the provider can't
+            evaluate
+        """
+        if field not in MUTABLE_FIELDS:
+            raise ValueError(f"{field!r} is not a mutable server field")
+        if switch_name is not None or provision_zone_id is not None or server_numbers is None:
+            raise NotImplementedError("selector-based updates are not supported by this provider")
+        previous = {}
+        for number in dict.fromkeys(server_numbers):
+            try:
+                previous[number] = self.update_server_field(number, field, value)
+            except ServerNotFound:
+                continue
+        return previous
+
+    def update_server_fields(self, field, values):
+        """Set one field to a per-server value on many servers.
+
+        The write-behind buffer (see
+        :mod:`steel_pigs.plugins.providers.writebehind`) flushes through
+        this. The default groups the servers by value and calls
+        :meth:`bulk_update_field` once per group; providers backed by a
+        database should override it with one transaction.
+
+        :param field: one of ``MUTABLE_FIELDS``
+        :param values: dict mapping server_number to its new value
+        :return: dict mapping server_number to the previous value, for
+            every server that was updated
+        """
+        if field not in MUTABLE_FIELDS:
+            raise ValueError(f"{field!r} is not a mutable server field")
+        groups = {}
+        for number, value in values.items():
+            groups.setdefault(value, []).append(number)
+        previous = {}
+        for value, numbers in groups.items():
+            previous.update(self.bulk_update_field(field, value, server_numbers=numbers))
+        return previous
+
+    def lookup_servers(self, server_numbers=(), macs=(), switches=()):
+        """Resolve many identifiers to servers at once.
+
+        The default calls the matching ``get_server_by_*`` once per
+        identifier. Providers backed by a database should override it
+        with a few ``IN (...)`` queries.
+
+        :param server_numbers: server numbers to look up
+        :param macs: MAC addresses, in any notation ``get_server_by_mac``
+            accepts
+        :param switches: ``(switch_name, switch_port)`` pairs
+        :return: ``{"server_numbers": {number: server}, "macs": {mac:
+            server}, "switches": {(switch_name, switch_port): server}}``,
+            keyed by the identifiers as passed; ``server`` is the dict
+            ``get_server_by_*`` returns, or None if nothing matched
+        """
+        return {
+            "server_numbers": {n: self.get_server_by_number(n) for n in server_numbers},
+            "macs": {mac: self.get_server_by_mac(mac) for mac in macs},
+            "switches": {pair: self.get_server_by_switch(*pair) for pair in switches},
+        }
+
+    def list_servers(self, after=None, limit=100, **filters):
+        """One page of servers in ``server_number`` order.
+
+        Pages are keyed on ``server_number`` rather than an offset:
+        pass the last server_number of one page as ``after`` to get the
+        next, so every page costs the same however deep it is.
+
+        Optional: the default raises NotImplementedError.
+
+        :param after: only servers with a greater server_number
+        :param limit: at most this many servers
+        :param filters: equality filters on ``LIST_FILTERS`` fields
+        :return: list of server dicts (with ``provision_zone``; no
+            ``switches``)
+        """
+        raise NotImplementedError("server listing is not supported by this provider")
+
+    def export_servers(self, **filters):
+        """Every server, for a full-inventory export.
+
+        Providers should stream: return an iterator that reads the
+        backing store in batches rather than building the whole list.
+        Filter validation happens on the call, before iteration starts.
+
+        Optional: the default raises NotImplementedError.
+
+        :param filters: equality filters on ``LIST_FILTERS`` fields
+        :return: iterator of server dicts (with ``provision_zone`` and
+            ``switches``) in ``server_number`` order
+        """
+        raise NotImplementedError("server export is not supported by this provider")
+
+    def list_changes(self, since=0, limit=100):
+        """Entries of the change log after the cursor ``since``.
+
+        Every write appends one entry per server it touched, numbered
+        by a sequence that only grows, so a consumer that keeps the last
+        ``seq`` it saw does work in proportion to what changed rather
+        than to the fleet.
+
+        Optional: the default raises NotImplementedError.
+
+        :param since: sequence number of the last entry already seen
+            (0 for the start of the log)
+        :param limit: at most this many entries
+        :return: list of ``{"seq", "server_number", "action", "field",
+            "changed_at"}`` dicts, oldest first
+        """
+        raise NotImplementedError("the change feed is not supported by this provider")
+
+    def wait_for_changes(self, since, timeout):
+        """Block until the change log has entries after ``since``.
+
+        Optional: the default doesn't wait and returns False, so
+        consumers fall back to polling.
+
+        :param since: as for :meth:`list_changes`
+        :param timeout: seconds to wait at most
+        :return: True if there are entries after ``since``
+        """
+        return False
+
+    def stats(self):
+        """Operational counters for the ``/stats`` endpoint.
+
+        Optional: providers that track nothing can keep this default.
+
+        :return: a JSON-serializable dict
+        """
+        return {}
+
+    def ready(self):
+        """Whether the provider can serve requests, for ``/readyz``.
+
+        Optional: the default is always ready. Database-backed providers
+        report False while their schema doesn't match the code.
+        """
+        return True
@@ -0,0 +1,696 @@
+#   Copyright 2026 Michael Rice <michael@michaelrice.org>
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Inventory spread over several databases by a hash of server_number.
+
+:class:`ShardedSQL` places each server on one of N ``SQL`` providers
+with :func:`shard_for`; :func:`reshard` (``python -m steel_pigs.db
+reshard``) moves servers to a new shard count while workers keep
+serving.
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+from sqlalchemy import bindparam, case, delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+from steel_pigs.exceptions.pigs_exceptions import ServerAlreadyExists, ServerNotFound
+
+from .pluginbase import MUTABLE_FIELDS, ProviderPluginBase
+from .sql import (
+    _IN_CHUNK,
+    SQL,
+    ServerDataModel,
+    ServerInterface,
+    ShardDirectory,
+    ShardLayout,
+    SwitchInfo,
+    _all_macs,
+    _check_server_fields,
+    _chunks,
+    _claim_macs,
+    _filter_names,
+    _mac_conflict,
+    _mac_key,
+    _server_macs,
+    _split_interfaces,
+)
+
+log = logging.getLogger(__name__)
+
+# ShardDirectory kinds: the keys get_server_by_mac / _name / _switch
+# resolve without asking every shard.
+DIRECTORY_MAC = "mac"  # primary MAC, 12 hex digits
+DIRECTORY_NIC = "nic"  # ServerInterface MAC, 12 hex digits
+DIRECTORY_NAME = "name"  # hostname
+DIRECTORY_SWITCH = "switch"  # switch name and port, see _switch_key
+
+_SERVER = ServerDataModel.__table__
+_SWITCH = SwitchInfo.__table__
+_NIC = ServerInterface.__table__
+_DIRECTORY = ShardDirectory.__table__
+_LAYOUT = ShardLayout.__table__
+
+# Primary MACs rank before interface MACs, so get_server_by_mac prefers
+# them as SQL's own lookup does; otherwise the oldest entry wins.
+# (create_server keeps one address from being both, but rows from before
+# that check may be.)
+_KIND_RANK = case((_DIRECTORY.c.kind == DIRECTORY_MAC, 0), else_=1)
+_FIND = (
+    select(_DIRECTORY.c.server_number, _DIRECTORY.c.shard)
+    .where(
+        _DIRECTORY.c.kind.in_(bindparam("kinds", expanding=True)),
+        _DIRECTORY.c.key == bindparam("key"),
+    )
+    .order_by(_KIND_RANK, _DIRECTORY.c.id)
+    .limit(1)
+)
+_RESOLVE = (
+    select(_DIRECTORY.c.key, _DIRECTORY.c.server_number)
+    .where(
+        _DIRECTORY.c.kind.in_(bindparam("kinds", expanding=True)),
+        _DIRECTORY.c.key.in_(bindparam("keys", expanding=True)),
+    )
+    .order_by(_KIND_RANK, _DIRECTORY.c.id)
+)
+_READ_LAYOUT = select(_LAYOUT.c.shards, _LAYOUT.c.previous).where(_LAYOUT.c.id == 1)
+
+_MASK64 = (1 << 64) - 1
+
+
+def _mix(value):
+    # splitmix64 finalizer: consecutive server_numbers land on
+    # unrelated jump-hash seeds.
+    value = (value + 0x9E3779B97F4A7C15) & _MASK64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return value ^ (value >> 31)
+
+
+def shard_for(server_number, shards):
+    """Index of the shard holding ``server_number`` in a ``shards``-way layout.
+
+    Jump consistent hash (Lamping & Veach) of the number: the same in
+    every process and release, and growing a layout from N to N+1
+    shards moves only the ~1/(N+1) of servers that land on the new one.
+    """
+    key = _mix(int(server_number) & _MASK64)
+    bucket, jump = -1, 0
+    while jump < shards:
+        bucket = jump
+        key = (key * 2862933555777941757 + 1) & _MASK64
+        jump = int((bucket + 1) * ((1 << 31) / ((key >> 33) + 1)))
+    return bucket
+
+
+def _mac_text(mac_int):
+    return f"{mac_int:012x}"
+
+
+def _switch_key(switch_name, switch_port):
+    return f"{switch_name}\x1f{switch_port}"
+
+
+def _entries_for(server_data, shard):
+    """Directory rows for a server being created on ``shard``."""
+    number = server_data.get("server_number")
+    entries = []
+    primary = _mac_key(server_data.get("primary_mac"))
+    if primary is not None:
+        entries.append((DIRECTORY_MAC, _mac_text(primary)))
+    entries.extend(
+        (DIRECTORY_NIC, _mac_text(nic["mac"])) for nic in _split_interfaces(server_data)[1]
+    )
+    if server_data.get("hostname") is not None:
+        entries.append((DIRECTORY_NAME, server_data["hostname"]))
+    return [
+        {"kind": kind, "key": key, "server_number": number, "shard": shard} for kind, key in entries
+    ]
+
+
+def _unique(servers):
+    """Drop repeats of a server_number from a server_number-ordered stream.
+
+    A server caught mid-move by a reshard can briefly be on two shards.
+    """
+    last = object()
+    for server in servers:
+        if server["server_number"] != last:
+            last = server["server_number"]
+            yield server
+
+
+def _by_number(server):
+    return server["server_number"]
+
+
+class ShardedSQL(ProviderPluginBase):
+    """Inventory provider spreading servers over several ``SQL`` databases.
+
+    Config dict must include ``shards``, a list of SQLAlchemy URLs.
+    Example::
+
+        {'shards': ['postgresql://db0/pigs', 'postgresql://db1/pigs']}
+
+    Every other key (pool sizing, ``sqlite_pragmas``, ``migrate``, ...)
+    configures each shard's ``SQL`` provider; ``replicas`` isn't
+    supported. ``layout_refresh_seconds`` (default 5) is how often the
+    shard count is re-read, so workers notice a reshard.
+
+    A server lives on shard ``shard_for(server_number, n)``, where ``n``
+    is the count in the ``ShardLayout`` row on the first shard -- the
+    number of URLs when the layout is first created. URLs past ``n``
+    are idle until a reshard grows into them. Lookups by number go
+    straight to the server's shard.
+
+    The first shard also keeps the ``ShardDirectory``: each server's
+    MACs, hostname and switch ports, with its number and shard. MAC,
+    hostname and switch lookups read one directory row and then the
+    one shard it names, however many shards there are. Listing, export
+    and selector-based bulk updates ask every shard and merge by
+    server_number.
+
+    Nothing here is a distributed transaction:
+
+    * ``create_server`` adds its directory rows first and removes them
+      if the shard rejects the server. A crash in between leaves rows
+      pointing at a server that doesn't exist, which lookups treat as
+      a miss.
+    * ``add_switch`` adds its directory row after the switch commits.
+    * Interface MACs are checked for uniqueness against the directory
+      before the insert, without a lock, so two workers racing to
+      claim one MAC on different shards can both succeed.
+    * ``bulk_update_field`` commits shard by shard.
+
+    The change feed isn't supported: each shard numbers its own log.
+
+    While :func:`reshard` runs, the layout also records the previous
+    shard count. A server is then looked for, and written, on its old
+    shard first and its new one second; new servers go to the new one.
+    """
+
+    def __init__(self, config, clock=time.monotonic):
+        urls = list(config.get("shards") or ())
+        if not urls:
+            raise ValueError("ShardedSQL needs at least one shard URL in 'shards'")
+        if config.get("replicas"):
+            raise ValueError("ShardedSQL doesn't support read replicas")
+        skip = ("shards", "replicas", "engine", "layout_refresh_seconds")
+        shard_config = {k: v for k, v in config.items() if k not in skip}
+        self.shards = [SQL({**shard_config, "engine": url}) for url in urls]
+        self.directory = self.shards[0]
+        self._clock = clock
+        self._layout_refresh = float(config.get("layout_refresh_seconds", 5.0))
+        self._layout_lock = threading.Lock()
+        self._layout = self.load_layout()
+        self._layout_due = self._clock() + self._layout_refresh
+
+    # --- layout --------------------------------------------------------
+
+    def load_layout(self):
+        """``(shards, previous)`` from the first shard, created if missing."""
+        with self.directory._connect() as conn:
+            row = conn.execute(_READ_LAYOUT).first()
+            if row is None:
+                try:
+                    conn.execute(insert(_LAYOUT).values(id=1, shards=len(self.shards)))
+                    conn.commit()
+                except IntegrityError:
+                    conn.rollback()  # another worker created it first
+                row = conn.execute(_READ_LAYOUT).first()
+        layout = (row.shards, row.previous)
+        if max(row.shards, row.previous or 0) > len(self.shards):
+            raise ValueError(
+                f"Shard layout {layout} needs more shards than the {len(self.shards)} configured"
+            )
+        return layout
+
+    def save_layout(self, shards, previous):
+        with self.directory._session_scope() as s:
+            s.execute(
+                update(_LAYOUT).where(_LAYOUT.c.id == 1).values(shards=shards, previous=previous)
+            )
+        with self._layout_lock:
+            self._layout = (shards, previous)
+
+    def layout(self):
+        """``(shards, previous)``, re-read every ``layout_refresh_seconds``."""
+        now = self._clock()
+        if now >= self._layout_due:
+            with self._layout_lock:
+                if now >= self._layout_due:
+                    self._layout = self.load_layout()
+                    self._layout_due = now + self._layout_refresh
+        return self._layout
+
+    def _placements(self, server_number, layout=None):
+        """Shards that may hold ``server_number``: the old one first mid-reshard."""
+        try:
+            number = int(server_number)
+        except (TypeError, ValueError):
+            return ()
+        shards, previous = layout or self.layout()
+        new = shard_for(number, shards)
+        if previous is None:
+            return (new,)
+        old = shard_for(number, previous)
+        return (new,) if old == new else (old, new)
+
+    def _active(self):
+        shards, previous = self.layout()
+        return self.shards[: max(shards, previous or 0)]
+
+    # --- directory -----------------------------------------------------
+
+    def _find(self, kinds, key):
+        with self.directory._connect() as conn:
+            return conn.execute(_FIND, {"kinds": list(kinds), "key": key}).first()
+
+    def _add_entries(self, entries):
+        """Insert directory rows; returns their ids, in order."""
+        if not entries:
+            return []
+        with self.directory._session_scope() as s:
+            if self.directory.engine.dialect.insert_executemany_returning:
+                stmt = insert(_DIRECTORY).returning(_DIRECTORY.c.id, sort_by_parameter_order=True)
+                return list(s.execute(stmt, entries).scalars())
+            return [
+                s.execute(insert(_DIRECTORY), entry).inserted_primary_key[0] for entry in entries
+            ]
+
+    def _remove_entries(self, ids):
+        with self.directory._session_scope() as s:
+            for chunk in _chunks(ids, _IN_CHUNK):
+                s.execute(delete(_DIRECTORY).where(_DIRECTORY.c.id.in_(chunk)))
+
+    def _mac_owners(self, macs):
+        """``(interfaces, primaries)`` from the directory, as ``sql._mac_owners``."""
+        keys = {_mac_text(mac): mac for mac in macs}
+        owners = {DIRECTORY_NIC: {}, DIRECTORY_MAC: {}}
+        with self.directory._connect() as conn:
+            for chunk in _chunks(list(keys), _IN_CHUNK):
+                stmt = (
+                    select(_DIRECTORY.c.kind, _DIRECTORY.c.key, _DIRECTORY.c.server_number)
+                    .where(
+                        _DIRECTORY.c.kind.in_((DIRECTORY_NIC, DIRECTORY_MAC)),
+                        _DIRECTORY.c.key.in_(chunk),
+                    )
+                    .order_by(_DIRECTORY.c.id)
+                )
+                for kind, key, number in conn.execute(stmt):
+                    owners[kind].setdefault(keys[key], number)
+        return owners[DIRECTORY_NIC], owners[DIRECTORY_MAC]
+
+    def _resolve(self, kinds, keys):
+        """``{key: server_number}`` for the directory ``keys`` of ``kinds``."""
+        found = {}
+        with self.directory._connect() as conn:
+            for chunk in _chunks(list(keys), _IN_CHUNK):
+                rows = conn.execute(_RESOLVE, {"kinds": list(kinds), "keys": chunk})
+                for key, number in rows:
+                    found.setdefault(key, number)
+        return found
+
+    def _get_listed(self, kinds, key):
+        """The server a directory entry names, or None."""
+        entry = self._find(kinds, key)
+        if entry is None:
+            return None
+        number, hint = entry
+        if hint < len(self.shards):
+            server = self.shards[hint].get_server_by_number(number)
+            if server is not None:
+                return server
+        return self.get_server_by_number(number, skip=hint)
+
+    # --- lookups -------------------------------------------------------
+
+    def get_server_by_number(self, number, skip=None):
+        for shard in self._placements(number):
+            if shard != skip:
+                server = self.shards[shard].get_server_by_number(number)
+                if server is not None:
+                    return server
+        return None
+
+    def get_server_by_mac(self, mac):
+        key = _mac_key(mac)
+        if key is None:
+            return None
+        return self._get_listed((DIRECTORY_MAC, DIRECTORY_NIC), _mac_text(key))
+
+    def get_server_by_name(self, name):
+        return self._get_listed((DIRECTORY_NAME,), name)
+
+    def get_server_by_switch(self, switch_name, switch_port):
+        return self._get_listed((DIRECTORY_SWITCH,), _switch_key(switch_name, switch_port))
+
+    def _servers_by_number(self, numbers):
+        """``{number: server}`` for those of ``numbers`` that exist.
+
+        One ``SQL.lookup_servers`` per shard; mid-reshard, the servers
+        missing from their old shard are asked for on their new one.
+        """
+        layout = self.layout()
+        servers = {}
+        pending = list(dict.fromkeys(numbers))
+        for attempt in range(2):
+            by_shard = {}
+            for number in pending:
+                placements = self._placements(number, layout)
+                if attempt < len(placements):
+                    by_shard.setdefault(placements[attempt], []).append(number)
+            for shard, group in sorted(by_shard.items()):
+                found = self.shards[shard].lookup_servers(server_numbers=group)
+                servers.update((n, s) for n, s in found["server_numbers"].items() if s)
+            pending = [number for number in pending if number not in servers]
+        return servers
+
+    def lookup_servers(self, server_numbers=(), macs=(), switches=()):
+        """Batch lookup: the directory names the servers, their shards load them."""
+        mac_keys = {mac: _mac_key(mac) for mac in macs}
+        texts = {_mac_text(key) for key in mac_keys.values() if key is not None}
+        by_mac = self._resolve((DIRECTORY_MAC, DIRECTORY_NIC), texts) if texts else {}
+        switch_keys = {pair: _switch_key(*pair) for pair in switches}
+        by_switch = (
+            self._resolve((DIRECTORY_SWITCH,), set(switch_keys.values())) if switches else {}
+        )
+        servers = self._servers_by_number([*server_numbers, *by_mac.values(), *by_switch.values()])
+
+        def server(number):
+            return servers.get(number) if number is not None else None
+
+        return {
+            "server_numbers": {n: server(n) for n in server_numbers},
+            "macs": {
+                mac: server(by_mac.get(_mac_text(key))) if key is not None else None
+                for mac, key in mac_keys.items()
+            },
+            "switches": {pair: server(by_switch.get(key)) for pair, key in switch_keys.items()},
+        }
+
+    def list_servers(self, after=None, limit=100, **filters):
+        """Keyset page of servers: one page from every shard, merged."""
+        _filter_names(filters)
+        pages = [shard.list_servers(after, limit, **filters) for shard in self._active()]
+        merged = _unique(heapq.merge(*pages, key=_by_number))
+        return list(itertools.islice(merged, limit))
+
+    def export_servers(self, **filters):
+        """Every matching server: each shard's stream, merged by server_number."""
+        _filter_names(filters)
+        return self._merge_streams([shard.export_servers(**filters) for shard in self._active()])
+
+    def _merge_streams(self, streams):
+        try:
+            yield from _unique(heapq.merge(*streams, key=_by_number))
+        finally:
+            for stream in streams:
+                stream.close()
+
+    # --- writes --------------------------------------------------------
+
+    def update_server_field(self, server_number, field, value):
+        """Atomic set-and-return-previous on the server's shard."""
+        if field not in MUTABLE_FIELDS:
+            raise ValueError(f"{field!r} is not a mutable server field")
+        for shard in self._placements(server_number):
+            try:
+                return self.shards[shard].update_server_field(server_number, field, value)
+            except ServerNotFound:
+                continue
+        raise ServerNotFound(f"server_number {server_number!r} not found")
+
+    # SQL's setters only go through update_server_field, which routes.
+    _set_field = SQL._set_field
+    set_boot_status = SQL.set_boot_status
+    set_boot_os = SQL.set_boot_os
+    set_operational_status = SQL.set_operational_status
+
+    def bulk_update_field(
+        self, field, value, server_numbers=None, switch_name=None, provision_zone_id=None
+    ):
+        """Set-based update of one field, one transaction per shard."""
+        if field not in MUTABLE_FIELDS:
+            raise ValueError(f"{field!r} is not a mutable server field")
+        selectors = {"switch_name": switch_name, "provision_zone_id": provision_zone_id}
+        if server_numbers is None:
+            if switch_name is None and provision_zone_id is None:
+                raise ValueError("bulk_update_field needs at least one target")
+            targets = [(shard, None) for shard in self._active()]
+        else:
+            layout = self.layout()
+            by_shard = {}
+            for number in dict.fromkeys(server_numbers):
+                for shard in self._placements(number, layout):
+                    by_shard.setdefault(shard, []).append(number)
+            targets = [(self.shards[shard], by_shard[shard]) for shard in sorted(by_shard)]
+        previous = {}
+        for shard, numbers in targets:
+            previous.update(
+                shard.bulk_update_field(field, value, server_numbers=numbers, **selectors)
+            )
+        return previous
+
+    def update_server_fields(self, field, values):
+        """Per-server values for one field, one transaction per shard."""
+        if field not in MUTABLE_FIELDS:
+            raise ValueError(f"{field!r} is not a mutable server field")
+        layout = self.layout()
+        by_shard = {}
+        for number, value in values.items():
+            for shard in self._placements(number, layout):
+                by_shard.setdefault(shard, {})[number] = value
+        previous = {}
+        for shard in sorted(by_shard):
+            previous.update(self.shards[shard].update_server_fields(field, by_shard[shard]))
+        return previous
+
+    def _conflict(self, server_data, placements, macs, owners):
+        """Why ``server_data`` can't be created, or None."""
+        number = server_data.get("server_number")
+        for shard in placements[:-1]:
+            if self.shards[shard].get_server_by_number(number) is not None:
+                return f"server_number {number!r} already exists"
+        return _mac_conflict(number, *macs, *owners)
+
+    def create_server(self, server_data):
+        """Insert a new server on its shard and list it in the directory."""
+        _check_server_fields(server_data)
+        placements = self._placements(server_data.get("server_number"))
+        if not placements:
+            raise ValueError(f"server_number {server_data.get('server_number')!r} isn't a number")
+        macs = _server_macs(*_split_interfaces(server_data))
+        owners = self._mac_owners(_all_macs([macs]))
+        message = self._conflict(server_data, placements, macs, owners)
+        if message is not None:
+            raise ServerAlreadyExists(message)
+        shard = placements[-1]
+        ids = self._add_entries(_entries_for(server_data, shard))
+        try:
+            return self.shards[shard].create_server(server_data)
+        except BaseException:
+            self._remove_entries(ids)
+            raise
+
+    def create_servers(self, servers):
+        """Insert many servers: one ``SQL.create_servers`` batch per shard."""
+        for server_data in servers:
+            _check_server_fields(server_data)
+        macs = [_server_macs(*_split_interfaces(server_data)) for server_data in servers]
+        owners = self._mac_owners(_all_macs(macs))
+        results = [None] * len(servers)
+        by_shard = {}
+        for i, server_data in enumerate(servers):
+            number = server_data.get("server_number")
+            placements = self._placements(number)
+            if not placements:
+                raise ValueError(f"server_number {number!r} isn't a number")
+            message = self._conflict(server_data, placements, macs[i], owners)
+            if message is not None:
+                results[i] = {"status": "conflict", "message": message}
+                continue
+            # Claimed for the rest of the batch, like SQL.create_servers.
+            _claim_macs(number, *macs[i], *owners)
+            by_shard.setdefault(placements[-1], []).append(i)
+        for shard, indexes in sorted(by_shard.items()):
+            entries = [_entries_for(servers[i], shard) for i in indexes]
+            ids = self._add_entries([entry for server in entries for entry in server])
+            try:
+                created = self.shards[shard].create_servers([servers[i] for i in indexes])
+            except BaseException:
+                self._remove_entries(ids)
+                raise
+            rejected = []
+            for i, server_entries, result in zip(indexes, entries, created, strict=True):
+                results[i] = result
+                taken, ids = ids[: len(server_entries)], ids[len(server_entries) :]
+                if result["status"] != "created":
+                    rejected.extend(taken)
+            if rejected:
+                self._remove_entries(rejected)
+        return results
+
+    def add_switch(self, server_number, switch_name, switch_port):
+        """Attach a switch on the server's shard and list the port."""
+        for shard in self._placements(server_number):
+            try:
+                row = self.shards[shard].add_switch(server_number, switch_name, switch_port)
+            except ServerNotFound:
+                continue
+            entry = {
+                "kind": DIRECTORY_SWITCH,
+                "key": _switch_key(switch_name, switch_port),
+                "server_number": row["server_number"],
+                "shard": shard,
+            }
+            self._add_entries([entry])
+            return row
+        raise ServerNotFound(f"server_number {server_number!r} not found")
+
+    # --- operations ----------------------------------------------------
+
+    def stats(self):
+        shards, previous = self.layout()
+        return {
+            "layout": {"shards": shards, "previous": previous},
+            "shards": [shard.stats() for shard in self.shards],
+        }
+
+    def ready(self):
+        """True once every shard's schema is current."""
+        return all(shard.ready() for shard in self.shards)
+
+
+# --- resharding ---------------------------------------------------------
+
+
+def _take(session, table, numbers):
+    """Delete ``numbers``' rows from ``table``, returning them."""
+    where = table.c.server_number.in_(numbers)
+    if session.bind.dialect.delete_returning:
+        return [
+            dict(row)
+            for row in session.execute(delete(table).where(where).returning(*table.c)).mappings()
+        ]
+    rows = [dict(row) for row in session.execute(select(table).where(where)).mappings()]
+    session.execute(delete(table).where(where))
+    return rows
+
+
+def _without_id(rows):
+    return [{k: v for k, v in row.items() if k != "id"} for row in rows]
+
+
+def _move(provider, source, moves):
+    """Move servers off shard ``source``; ``moves`` maps server_number to shard.
+
+    Deletes them from the source with RETURNING and inserts what came
+    back on the destinations, committing the destinations first. Until
+    the source commits, its deletes hold the rows (row locks on
+    Postgres/MySQL, the write lock on SQLite), so a write to a moving
+    server waits, then misses on the old shard and lands on the new
+    one. A crash between the commits leaves a server on both shards;
+    lookups prefer the old copy, and running the reshard again moves it
+    over the new one.
+    """
+    numbers = list(moves)
+    with provider.shards[source]._session_scope() as src:
+        if src.bind.dialect.name != "sqlite":
+            # Lock the servers before their children go. A SQLite
+            # session already holds the database write lock (it began
+            # IMMEDIATE).
+            src.execute(
+                select(_SERVER.c.id).where(_SERVER.c.server_number.in_(numbers)).with_for_update()
+            )
+        switches = _take(src, _SWITCH, numbers)
+        nics = _take(src, _NIC, numbers)
+        servers = _take(src, _SERVER, numbers)
+        for dest in sorted(set(moves.values())):
+            mine = {number for number, shard in moves.items() if shard == dest}
+            with provider.shards[dest]._session_scope() as dst:
+                for table in (_SWITCH, _NIC, _SERVER):
+                    dst.execute(delete(table).where(table.c.server_number.in_(mine)))
+                for table, rows in ((_SERVER, servers), (_SWITCH, switches), (_NIC, nics)):
+                    rows = _without_id(row for row in rows if row["server_number"] in mine)
+                    if rows:
+                        dst.execute(insert(table), rows)
+    with provider.directory._session_scope() as s:
+        for dest in set(moves.values()):
+            mine = [number for number, shard in moves.items() if shard == dest]
+            s.execute(
+                update(_DIRECTORY).where(_DIRECTORY.c.server_number.in_(mine)).values(shard=dest)
+            )
+    return len(servers)
+
+
+def reshard(provider, shards, batch=500, grace=None, progress=None):
+    """Move ``provider``'s servers to a ``shards``-way layout, online.
+
+    Records the new layout (keeping the old count as ``previous``),
+    waits ``grace`` seconds -- by default ``layout_refresh_seconds``
+    plus one -- for every worker to pick it up, then walks each shard
+    in server_number order and moves the servers that belong elsewhere,
+    ``batch`` at a time (see :func:`_move`). Workers keep reading and
+    writing throughout; each batch holds its servers only while it
+    copies them. Finally the previous count is cleared.
+
+    If interrupted, run it again with the same ``shards``: it resumes.
+
+    :param provider: a :class:`ShardedSQL` configured with at least
+        ``shards`` URLs
+    :param progress: optional callable ``(shard, moved)`` called after
+        each batch with the servers moved off ``shard`` so far
+    :return: the number of servers moved
+    """
+    if not 1 <= shards <= len(provider.shards):
+        raise ValueError(f"Can reshard to 1..{len(provider.shards)} shards, not {shards}")
+    current, previous = provider.load_layout()
+    if previous is not None and current != shards:
+        raise ValueError(
+            f"A reshard from {previous} to {current} shards is unfinished; "
+            f"rerun it with {current} shards first"
+        )
+    if previous is None:
+        if current == shards:
+            return 0
+        provider.save_layout(shards, current)
+        time.sleep(provider._layout_refresh + 1 if grace is None else grace)
+    moved = 0
+    for source, shard in enumerate(provider._active()):
+        moved_here = 0
+        after = None
+        while True:
+            stmt = select(_SERVER.c.server_number).order_by(_SERVER.c.server_number).limit(batch)
+            if after is not None:
+                stmt = stmt.where(_SERVER.c.server_number > after)
+            with shard._connect() as conn:
+                numbers = conn.execute(stmt).scalars().all()
+            if not numbers:
+                break
+            after = numbers[-1]
+            moves = {n: shard_for(n, shards) for n in numbers}
+            moves = {n: dest for n, dest in moves.items() if dest != source}
+            if moves:
+                moved_here += _move(provider, source, moves)
+                if progress is not None:
+                    progress(source, moved_here)
+        moved += moved_here
+    provider.save_layout(shards, None)
+    log.info("Resharded to %d shards; moved %d servers", shards, moved)
+    return moved
@@ -0,0 +1,377 @@
+#   Copyright 2026 Michael Rice <michael@michaelrice.org>
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import collections
+import logging
+import threading
+import time
+
+from sqlalchemy import func, select
+
+from .pluginbase import ProviderPluginBase
+from .sql import (
+    _IN_CHUNK,
+    _NIC,
+    _SERVER,
+    _SERVER_KEYS,
+    _SWITCH_AT,
+    _SWITCH_KEYS,
+    _ZONE_AT,
+    _ZONE_KEYS,
+    SQL,
+    ServerChange,
+    _chunks,
+    _joined_servers,
+    _mac_key,
+)
+
+log = logging.getLogger(__name__)
+
+_ID_AT = _SERVER_KEYS.index("id")
+_NUMBER_AT = _SERVER_KEYS.index("server_number")
+_MAC_AT = _SERVER_KEYS.index("primary_mac_int")
+_NAME_AT = _SERVER_KEYS.index("hostname")
+_SWITCH_NAME_AT = _SWITCH_KEYS.index("switch_name")
+_SWITCH_PORT_AT = _SWITCH_KEYS.index("switch_port")
+
+# Columns whose values repeat across the fleet (gateways, netmasks, OS,
+# statuses, ...). Equal strings in them -- and in switch names and
+# ports -- share one object per snapshot.
+_UNIQUE_COLUMNS = {
+    "id",
+    "server_number",
+    "primary_ip",
+    "primary_mac",
+    "primary_mac_int",
+    "drac_ip",
+    "hostname",
+}
+_SHARED_AT = tuple(i for i, key in enumerate(_SERVER_KEYS) if key not in _UNIQUE_COLUMNS)
+
+
+class ServerRecord:
+    """One server held in memory.
+
+    Column values live in a single tuple (in ``ServerData`` column
+    order); the zone tuple is shared by every server in that zone,
+    switches are a tuple of row tuples and ``macs`` holds the integer
+    MACs of the server's other interfaces.
+    """
+
+    __slots__ = ("values", "zone", "switches", "macs")
+
+    def __init__(self, values, zone, switches, macs=()):
+        self.values = values
+        self.zone = zone
+        self.switches = switches
+        self.macs = macs
+
+    @property
+    def server_number(self):
+        return self.values[_NUMBER_AT]
+
+    def index_keys(self):
+        """``(index name, key)`` pairs this record is reachable under."""
+        yield "number", self.values[_NUMBER_AT]
+        if self.values[_MAC_AT] is not None:
+            yield "mac", self.values[_MAC_AT]
+        for mac in self.macs:
+            yield "interface", mac
+        yield "name", self.values[_NAME_AT]
+        for switch in self.switches:
+            yield "switch", (switch[_SWITCH_NAME_AT], switch[_SWITCH_PORT_AT])
+
+    def as_dict(self):
+        """The same shape ``SQL.get_server_by_*`` returns; a fresh copy."""
+        server = dict(zip(_SERVER_KEYS, self.values, strict=True))
+        server["provision_zone"] = (
+            dict(zip(_ZONE_KEYS, self.zone, strict=True)) if self.zone is not None else None
+        )
+        server["switches"] = [dict(zip(_SWITCH_KEYS, sw, strict=True)) for sw in self.switches]
+        return server
+
+
+class SnapshotProvider(ProviderPluginBase):
+    """Whole-inventory in-memory provider for edge PXE responders.
+
+    Loads every server, zone and switch row from the configured database
+    at startup and answers ``get_server_by_*`` from hash indexes (by
+    server_number, primary and interface MAC, hostname and switch/port)
+    without touching the database.
+
+    Freshness comes from the ``ServerChange`` log the ``SQL`` provider
+    appends to on every write: at most every ``refresh_seconds``
+    (default 2) a lookup first polls for entries past the last one
+    applied and reloads just those servers. Writes go to the database
+    through an inner ``SQL`` provider and are applied to the snapshot
+    before they return.
+
+    The config dict is the ``SQL`` provider's (``engine``, pool and
+    pragma keys) plus ``refresh_seconds``. To use it, point
+    ``PROVIDER_PLUGIN`` at ``steel_pigs.plugins.providers.snapshot`` /
+    ``SnapshotProvider``.
+
+    On backends with concurrent writers (Postgres/MySQL) a change can
+    commit after one with a higher log id. The snapshot therefore holds
+    its mark back by the ``SQL`` provider's commit lag (see
+    ``change_commit_lag_seconds``): each poll re-reads the entries past
+    the mark, skips the ones already applied and applies late ones. The
+    mark only moves past an id once the log has been seen beyond it for
+    that long. A reload waits out the lag after reading its mark.
+    SQLite serializes writers; there the lag is 0 and none of this
+    costs anything.
+    """
+
+    def __init__(self, config, clock=time.monotonic):
+        self.source = SQL(config)
+        self.refresh_seconds = float(config.get("refresh_seconds", 2.0))
+        self.commit_lag = self.source.change_feed.commit_lag
+        self._clock = clock
+        self._applied = set()  # log ids past the mark already applied
+        self._sightings = collections.deque()  # (when, newest id) not yet commit_lag old
+        self._refresh_lock = threading.Lock()
+        self.refreshes = 0
+        self.changes_applied = 0
+        self.reload()
+
+    # --- loading -----------------------------------------------------------
+
+    @staticmethod
+    def _interfaces(conn, *where):
+        """``{server_number: (mac, ...)}`` for the interface rows matching ``where``."""
+        macs = {}
+        stmt = select(_NIC.c.server_number, _NIC.c.mac).where(*where).order_by(_NIC.c.id)
+        for number, mac in conn.execute(stmt):
+            macs.setdefault(number, []).append(mac)
+        return {number: tuple(values) for number, values in macs.items()}
+
+    def _build(self, rows, zones, strings, macs):
+        """Yield ServerRecords from joined rows ordered by server id."""
+        current = None
+        for row in rows:
+            server_id = row[_ID_AT]
+            if current is None or current[0] != server_id:
+                if current is not None:
+                    yield self._record(current, zones, strings, macs)
+                current = (server_id, row, [])
+            if row[_SWITCH_AT] is not None:
+                switch = [
+                    strings.setdefault(v, v) if isinstance(v, str) else v for v in row[_SWITCH_AT:]
+                ]
+                current[2].append(tuple(switch))
+        if current is not None:
+            yield self._record(current, zones, strings, macs)
+
+    @staticmethod
+    def _record(current, zones, strings, macs):
+        _, row, switches = current
+        values = list(row[:_ZONE_AT])
+        for i in _SHARED_AT:
+            value = values[i]
+            if isinstance(value, str):
+                values[i] = strings.setdefault(value, value)
+        zone = None
+        if row[_ZONE_AT] is not None:
+            # Zones aren't edited through the API; a changed zone row is
+            # picked up by the next reload(), not by refresh().
+            zone = tuple(row[_ZONE_AT:_SWITCH_AT])
+            zone = zones.setdefault(zone[0], zone)
+        return ServerRecord(tuple(values), zone, tuple(switches), macs.get(row[_NUMBER_AT], ()))
+
+    def reload(self):
+        """Replace the whole snapshot with a fresh full load."""
+        with self._refresh_lock:
+            # Read the mark first: a write landing during the load is
+            # then applied again by the next poll rather than missed.
+            # One logged under the mark but not committed yet has landed
+            # once the commit lag has passed.
+            with self.source._connect() as conn:
+                mark = conn.execute(select(func.max(ServerChange.id))).scalar() or 0
+            if self.commit_lag:
+                time.sleep(self.commit_lag)
+            self._load(mark)
+        log.info("Loaded %d servers into the snapshot.", len(self._indexes["number"]))
+
+    def _load(self, mark):
+        with self.source._connect() as conn:
+            zones, strings = {}, {}
+            indexes = {"number": {}, "mac": {}, "interface": {}, "name": {}, "switch": {}}
+            macs = self._interfaces(conn)
+            records = self._build(conn.execute(_joined_servers()), zones, strings, macs)
+            for record in records:
+                for index, key in record.index_keys():
+                    # Ordered by id, so duplicates resolve to the oldest
+                    # row like the SQL provider's lookups do.
+                    indexes[index].setdefault(key, record)
+            self._zones, self._strings, self._indexes = zones, strings, indexes
+            self._mark = mark
+            self._applied.clear()
+            self._sightings.clear()
+            self._next_poll = self._clock() + self.refresh_seconds
+
+    def refresh(self, wait=True):
+        """Apply ServerChange entries past the last one seen.
+
+        :param wait: block on a refresh already running in another
+            thread instead of returning straight away
+        :return: the number of servers reloaded
+        """
+        if not self._refresh_lock.acquire(blocking=wait):
+            return 0
+        try:
+            with self.source._connect() as conn:
+                changes = conn.execute(
+                    select(ServerChange.id, ServerChange.server_number)
+                    .where(ServerChange.id > self._mark)
+                    .order_by(ServerChange.id)
+                ).all()
+                now = self._clock()
+                self._next_poll = now + self.refresh_seconds
+                self.refreshes += 1
+                unseen = [(id_, number) for id_, number in changes if id_ not in self._applied]
+                numbers = list(dict.fromkeys(number for _, number in unseen))
+                fresh = {}
+                for chunk in _chunks(numbers, _IN_CHUNK):
+                    rows = conn.execute(_joined_servers(_SERVER.c.server_number.in_(chunk)))
+                    macs = self._interfaces(conn, _NIC.c.server_number.in_(chunk))
+                    for record in self._build(rows, self._zones, self._strings, macs):
+                        fresh[record.server_number] = record
+            for number in numbers:
+                self._replace(number, fresh.get(number))
+            self._applied.update(id_ for id_, _ in unseen)
+            self._settle(now, changes[-1][0] if changes else None)
+            self.changes_applied += len(numbers)
+            return len(numbers)
+        finally:
+            self._refresh_lock.release()
+
+    def _settle(self, now, newest):
+        """Move the mark past the log ids no write can still commit under:
+        those up to ``newest`` straight away with no commit lag, else up
+        to the newest id seen at least ``commit_lag`` ago."""
+        if not self.commit_lag:
+            if newest is not None:
+                self._mark = newest
+            self._applied.clear()
+            return
+        seen = self._sightings[-1][1] if self._sightings else self._mark
+        if newest is not None and newest > seen:
+            self._sightings.append((now, newest))
+        while self._sightings and self._sightings[0][0] <= now - self.commit_lag:
+            self._mark = self._sightings.popleft()[1]
+        self._applied = {id_ for id_ in self._applied if id_ > self._mark}
+
+    def _replace(self, server_number, record):
+        old = self._indexes["number"].get(server_number)
+        if old is not None:
+            for index, key in old.index_keys():
+                if self._indexes[index].get(key) is old:
+                    del self._indexes[index][key]
+        if record is not None:
+            for index, key in record.index_keys():
+                self._indexes[index].setdefault(key, record)
+
+    def _lookup(self, index, key, fallback=None):
+        if self._clock() >= self._next_poll:
+            self.refresh(wait=False)
+        record = self._indexes[index].get(key)
+        if record is None and fallback is not None:
+            record = self._indexes[fallback].get(key)
+        return record.as_dict() if record is not None else None
+
+    def stats(self):
+        stats = dict(self.source.stats())
+        stats["snapshot"] = {
+            "servers": len(self._indexes["number"]),
+            "zones": len(self._zones),
+            "mark": self._mark,
+            "refreshes": self.refreshes,
+            "changes_applied": self.changes_applied,
+        }
+        return stats
+
+    def ready(self):
+        return self.source.ready()
+
+    # --- reads -------------------------------------------------------------
+
+    def get_server_by_name(self, name):
+        return self._lookup("name", name)
+
+    def get_server_by_number(self, number):
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            return None
+        return self._lookup("number", number)
+
+    def get_server_by_mac(self, mac):
+        key = _mac_key(mac)
+        if key is None:
+            return None
+        # Primary MACs win over interface MACs, as in SQL.
+        return self._lookup("mac", key, fallback="interface")
+
+    def get_server_by_switch(self, switch_name, switch_port):
+        return self._lookup("switch", (switch_name, switch_port))
+
+    def list_servers(self, after=None, limit=100, **filters):
+        # Not on the PXE path; the database's indexes already page well.
+        return self.source.list_servers(after, limit, **filters)
+
+    def export_servers(self, **filters):
+        # Same as list_servers: a full pass reads better from the
+        # database's cursor than from the PXE indexes.
+        return self.source.export_servers(**filters)
+
+    def list_changes(self, since=0, limit=100):
+        return self.source.list_changes(since, limit)
+
+    def wait_for_changes(self, since, timeout):
+        return self.source.wait_for_changes(since, timeout)
+
+    # --- writes: through to the database, then applied ----------------------
+
+    def _write(self, method, *args, **kwargs):
+        try:
+            return getattr(self.source, method)(*args, **kwargs)
+        finally:
+            self.refresh()
+
+    def set_boot_status(self, server_number, boot_status):
+        return self._write("set_boot_status", server_number, boot_status)
+
+    def set_boot_os(self, server_number, boot_os):
+        return self._write("set_boot_os", server_number, boot_os)
+
+    def set_operational_status(self, server_number, operational_status):
+        return self._write("set_operational_status", server_number, operational_status)
+
+    def update_server_field(self, server_number, field, value):
+        return self._write("update_server_field", server_number, field, value)
+
+    def bulk_update_field(self, field, value, **targets):
+        return self._write("bulk_update_field", field, value, **targets)
+
+    def update_server_fields(self, field, values):
+        return self._write("update_server_fields", field, values)
+
+    def create_server(self, server_data):
+        return self._write("create_server", server_data)
+
+    def create_servers(self, servers):
+        return self._write("create_servers", servers)
+
+    def add_switch(self, server_number, switch_name, switch_port):
+        return self._write("add_switch", server_number, switch_name, switch_port)
@@ -12,12 +12,31 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
+import itertools
 import logging
+import re
+import threading
+import time
 from contextlib import contextmanager
+from datetime import datetime
 
-from alembic import command
-from sqlalchemy import ForeignKey, String, create_engine, select
+from sqlalchemy import (
+    BigInteger,
+    ForeignKey,
+    Index,
+    String,
+    bindparam,
+    create_engine,
+    event,
+    func,
+    insert,
+    make_url,
+    select,
+    tuple_,
+    update,
+)
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.orm import (
     DeclarativeBase,
     Mapped,
@@ -25,11 +44,15 @@ from sqlalchemy.orm import (
     relationship,
     sessionmaker,
 )
+from sqlalchemy.pool import StaticPool
 
-from steel_pigs.db import make_alembic_config
+from steel_pigs import affinity
+from steel_pigs.changefeed import ChangeFeed
+from steel_pigs.db import HEAD_REVISION, current_revision, upgrade_schema
 from steel_pigs.exceptions.pigs_exceptions import ServerAlreadyExists, ServerNotFound
+from steel_pigs.mac import int_to_mac, mac_to_int
 
-from .pluginbase import ProviderPluginBase
+from .pluginbase import LIST_FILTERS, MUTABLE_FIELDS, ProviderPluginBase
 
 log = logging.getLogger(__name__)
 
@@ -47,8 +70,28 @@ class ProvisionZone(Base):
     provision_mirror_host: Mapped[str] = mapped_column(String(128))
 
 
+def _mac_key(mac):
+    """``mac`` as an integer, or None if it isn't a MAC address."""
+    try:
+        return mac_to_int(mac)
+    except ValueError:
+        return None
+
+
+def _default_mac_key(context):
+    # Filled in from primary_mac by every INSERT -- ORM, Core and
+    # executemany alike -- unless the caller supplies it.
+    return _mac_key(context.get_current_parameters().get("primary_mac"))
+
+
 class ServerDataModel(Base):
     __tablename__ = "ServerData"
+    # list_servers pages on server_number within one filter value; each
+    # of these serves that as a range scan.
+    __table_args__ = tuple(
+        Index(f"ix_ServerData_{column}_server_number", column, "server_number")
+        for column in LIST_FILTERS
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     server_number: Mapped[int] = mapped_column(unique=True)
@@ -56,10 +99,15 @@ class ServerDataModel(Base):
     primary_gw: Mapped[str] = mapped_column(String(15))
     primary_nm: Mapped[str] = mapped_column(String(15))
     primary_mac: Mapped[str] = mapped_column(String(20))
+    # primary_mac as a 48-bit integer: the lookup key, so every notation
+    # of an address matches. NULL if primary_mac doesn't parse.
+    primary_mac_int: Mapped[int | None] = mapped_column(
+        BigInteger, index=True, default=_default_mac_key
+    )
     drac_ip: Mapped[str | None] = mapped_column(String(15))
     drac_gw: Mapped[str | None] = mapped_column(String(15))
     drac_nm: Mapped[str | None] = mapped_column(String(15))
-    hostname: Mapped[str] = mapped_column(String(255))
+    hostname: Mapped[str] = mapped_column(String(255), index=True)
     dns_domain_name: Mapped[str] = mapped_column(String(255), default="rpc.local")
     dns_server_primary: Mapped[str] = mapped_column(String(15))
     dns_server_secondary: Mapped[str | None] = mapped_column(String(15))
@@ -79,20 +127,577 @@ class ServerDataModel(Base):
 
 class SwitchInfo(Base):
     __tablename__ = "SwitchInfo"
+    # get_server_by_switch filters on both columns; one composite index
+    # serves it (and switch_name-only prefix lookups).
+    __table_args__ = (Index("ix_SwitchInfo_switch_name_switch_port", "switch_name", "switch_port"),)
 
     id: Mapped[int] = mapped_column(primary_key=True)
     switch_name: Mapped[str] = mapped_column(String(255))
     switch_port: Mapped[str] = mapped_column(String(255))
-    server_number: Mapped[int | None] = mapped_column(ForeignKey("ServerData.server_number"))
+    server_number: Mapped[int | None] = mapped_column(
+        ForeignKey("ServerData.server_number"), index=True
+    )
     server: Mapped[ServerDataModel | None] = relationship(back_populates="switches")
 
 
+class ServerInterface(Base):
+    """A NIC a server may PXE from besides its primary one.
+
+    ``mac`` is the address as a 48-bit integer (see ``steel_pigs.mac``);
+    the unique index both enforces one owner per address and serves
+    ``get_server_by_mac``.
+    """
+
+    __tablename__ = "ServerInterface"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    mac: Mapped[int] = mapped_column(BigInteger, unique=True, index=True)
+    server_number: Mapped[int] = mapped_column(ForeignKey("ServerData.server_number"), index=True)
+    role: Mapped[str] = mapped_column(String(32))
+
+
+class ServerChange(Base):
+    """Append-only log of the server_numbers each write touched.
+
+    Written in the same transaction as the change itself. Readers that
+    keep their own copy of the inventory (``SnapshotProvider``) poll it
+    for ids above the last one they applied instead of reloading
+    everything, and ``GET /v1/changes`` serves it as a feed with the id
+    as the cursor. AUTOINCREMENT keeps ids from being reused on SQLite.
+
+    ``action`` is ``CHANGE_CREATE``, ``CHANGE_UPDATE`` (with the
+    ``field`` set) or ``CHANGE_ADD_SWITCH``; both are NULL on entries
+    logged before they existed.
+    """
+
+    __tablename__ = "ServerChange"
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    server_number: Mapped[int]
+    changed_at: Mapped[datetime] = mapped_column(server_default=func.current_timestamp())
+    action: Mapped[str | None] = mapped_column(String(32))
+    field: Mapped[str | None] = mapped_column(String(64))
+
+
+CHANGE_CREATE = "create"
+CHANGE_UPDATE = "update"
+CHANGE_ADD_SWITCH = "add_switch"
+
+
+class ShardDirectory(Base):
+    """Which server, on which shard, a MAC, hostname or switch port names.
+
+    Only used by ``ShardedSQL``, on its first shard; empty everywhere
+    else. ``kind`` is one of the ``DIRECTORY_*`` constants in
+    :mod:`steel_pigs.plugins.providers.sharded` and ``key`` the value in
+    its canonical text form. ``shard`` is where the server was last
+    placed -- a hint, checked by the lookup like any other route.
+    """
+
+    __tablename__ = "ShardDirectory"
+    __table_args__ = (Index("ix_ShardDirectory_kind_key", "kind", "key"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    kind: Mapped[str] = mapped_column(String(8))
+    key: Mapped[str] = mapped_column(String(512))
+    server_number: Mapped[int] = mapped_column(index=True)
+    shard: Mapped[int]
+
+
+class ShardLayout(Base):
+    """``ShardedSQL``'s shard count: one row, on its first shard.
+
+    ``previous`` is set while a reshard moves rows from that many shards
+    to ``shards``; lookups then try the old placement before the new.
+    """
+
+    __tablename__ = "ShardLayout"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    shards: Mapped[int]
+    previous: Mapped[int | None]
+
+
+# Keeps IN (...) lists well under every backend's bind-parameter limit.
+_IN_CHUNK = 500
+
+
+def _chunks(seq, size):
+    for start in range(0, len(seq), size):
+        yield seq[start : start + size]
+
+
+def _check_server_fields(server_data):
+    # Unexpected keys raise rather than silently dropping. This is the
+    # public API; surprises bite later.
+    known = {c.name for c in ServerDataModel.__table__.columns} | {"interfaces"}
+    unknown = set(server_data) - known
+    if unknown:
+        raise ValueError(f"Unknown server fields: {sorted(unknown)}")
+
+
+def _split_interfaces(server_data):
+    """``(ServerData columns, ServerInterface rows)`` from a create_server dict."""
+    columns = {k: v for k, v in server_data.items() if k != "interfaces"}
+    nics = [
+        {
+            "server_number": columns.get("server_number"),
+            "mac": mac_to_int(nic["mac"]),
+            "role": nic.get("role", "data"),
+        }
+        for nic in server_data.get("interfaces", ())
+    ]
+    return columns, nics
+
+
+def _mac_owners(session, macs):
+    """``(interfaces, primaries)``: ``{mac: server_number}`` for the ``macs``
+    already stored as some server's interface, and as some server's
+    primary MAC (the oldest, if several)."""
+    interfaces = {}
+    primaries = {}
+    for chunk in _chunks(list(set(macs)), _IN_CHUNK):
+        stmt = select(_NIC.c.mac, _NIC.c.server_number).where(_NIC.c.mac.in_(chunk))
+        interfaces.update(session.execute(stmt).all())
+        stmt = (
+            select(_SERVER.c.primary_mac_int, _SERVER.c.server_number)
+            .where(_SERVER.c.primary_mac_int.in_(chunk))
+            .order_by(_SERVER.c.id)
+        )
+        for mac, number in session.execute(stmt):
+            primaries.setdefault(mac, number)
+    return interfaces, primaries
+
+
+def _server_macs(columns, nics):
+    """``(primary MAC key or None, interface MAC keys)`` of a server being created."""
+    return _mac_key(columns.get("primary_mac")), [nic["mac"] for nic in nics]
+
+
+def _all_macs(macs):
+    """Every MAC key in a list of ``_server_macs`` results."""
+    return [mac for primary, nic_macs in macs for mac in (primary, *nic_macs) if mac is not None]
+
+
+def _mac_conflict(number, primary, nic_macs, interfaces, primaries):
+    """Message for the first MAC of server ``number`` another server has, or None.
+
+    An interface MAC may be no other server's interface or primary MAC,
+    and a primary MAC no other server's interface: each address leads
+    get_server_by_mac to one server. Primary MACs may repeat, as they
+    always could.
+    """
+    claims = [(mac, owners.get(mac)) for mac in nic_macs for owners in (interfaces, primaries)]
+    if primary is not None:
+        claims.append((primary, interfaces.get(primary)))
+    for mac, owner in claims:
+        if owner is not None and owner != number:
+            return f"MAC {int_to_mac(mac)} already belongs to server {owner!r}"
+    return None
+
+
+def _claim_macs(number, primary, nic_macs, interfaces, primaries):
+    """Record server ``number``'s MACs as taken, for the rest of a batch."""
+    interfaces.update((mac, number) for mac in nic_macs)
+    if primary is not None:
+        primaries.setdefault(primary, number)
+
+
+def _interface_out(nic):
+    return {"mac": int_to_mac(nic["mac"]), "role": nic["role"]}
+
+
 def _row_to_dict(row):
     if row is None:
         return None
-    d = dict(row.__dict__)
-    d.pop("_sa_instance_state", None)
-    return d
+    return {attr.key: getattr(row, attr.key) for attr in row.__mapper__.column_attrs}
+
+
+def _record_changes(session, server_numbers, action, field=None):
+    """Append ``server_numbers`` to the ServerChange log, in ``session``'s transaction."""
+    rows = [
+        {"server_number": number, "action": action, "field": field}
+        for number in server_numbers
+        if number is not None
+    ]
+    if rows:
+        session.execute(insert(ServerChange.__table__), rows)
+        session.info["changed"] = True
+
+
+# --- read path -----------------------------------------------------------
+#
+# Lookups run on Core, not the ORM: no identity map, no instance state,
+# no per-row object construction. Each lookup is a module-level select()
+# with bind parameters, so SQLAlchemy's compiled-statement cache serves
+# it after the first call. One statement returns the server, its zone
+# and one row per switch; _fold_server turns those rows into the dict.
+
+_SERVER = ServerDataModel.__table__
+_ZONE = ProvisionZone.__table__
+_SWITCH = SwitchInfo.__table__
+_NIC = ServerInterface.__table__
+_SERVER_KEYS = tuple(_SERVER.c.keys())
+_ZONE_KEYS = tuple(_ZONE.c.keys())
+_SWITCH_KEYS = tuple(_SWITCH.c.keys())
+_ZONE_AT = len(_SERVER_KEYS)
+_SWITCH_AT = _ZONE_AT + len(_ZONE_KEYS)
+
+# The filter runs against aliases so the subquery never correlates with
+# the outer join.
+_TARGET = _SERVER.alias("target")
+_PORT = _SWITCH.alias("port")
+
+
+def _joined_servers(*where):
+    """Servers matching ``where``, one row per switch, in _fold_server's layout."""
+    return (
+        select(*_SERVER.c, *_ZONE.c, *_SWITCH.c)
+        .select_from(
+            _SERVER.outerjoin(_ZONE, _SERVER.c.provision_zone_id == _ZONE.c.id).outerjoin(
+                _SWITCH, _SWITCH.c.server_number == _SERVER.c.server_number
+            )
+        )
+        .where(*where)
+        .order_by(_SERVER.c.id, _SWITCH.c.id)
+    )
+
+
+def _lookup(*where):
+    target = select(_TARGET.c.id).where(*where).limit(1).scalar_subquery()
+    return _joined_servers(_SERVER.c.id == target)
+
+
+def _mac_lookup():
+    # Primary MAC first, then the other NICs: two index probes, one
+    # statement.
+    by_primary = (
+        select(_TARGET.c.id)
+        .where(_TARGET.c.primary_mac_int == bindparam("value"))
+        .limit(1)
+        .scalar_subquery()
+    )
+    by_interface = (
+        select(_TARGET.c.id)
+        .join(_NIC, _NIC.c.server_number == _TARGET.c.server_number)
+        .where(_NIC.c.mac == bindparam("value"))
+        .scalar_subquery()
+    )
+    return _joined_servers(_SERVER.c.id == func.coalesce(by_primary, by_interface))
+
+
+_LOOKUPS = {
+    "name": _lookup(_TARGET.c.hostname == bindparam("value")),
+    "number": _lookup(_TARGET.c.server_number == bindparam("value")),
+    "mac": _mac_lookup(),
+    "switch": _lookup(
+        _TARGET.c.server_number.in_(
+            select(_PORT.c.server_number).where(
+                _PORT.c.switch_name == bindparam("switch_name"),
+                _PORT.c.switch_port == bindparam("switch_port"),
+            )
+        )
+    ),
+}
+
+
+def _locking_read(field, where):
+    """Current ``field`` of the servers matching ``where``, locked for update."""
+    return select(_SERVER.c.server_number, _SERVER.c[field]).where(*where).with_for_update()
+
+
+def _field_update(field, value, where):
+    return update(_SERVER).where(*where).values({field: value})
+
+
+def _on_switch(switch_name):
+    """Predicate for the servers attached to ``switch_name``."""
+    return _SERVER.c.server_number.in_(
+        select(_SWITCH.c.server_number).where(_SWITCH.c.switch_name == switch_name)
+    )
+
+
+# lookup_servers turns each kind of identifier into server_numbers with
+# one IN (...) per chunk, then loads every server they name with one
+# more. Expanding parameters keep each a single cached statement.
+_KEYS = bindparam("keys", expanding=True)
+_BATCH_PRIMARY_MACS = (
+    select(_SERVER.c.primary_mac_int, _SERVER.c.server_number)
+    .where(_SERVER.c.primary_mac_int.in_(_KEYS))
+    .order_by(_SERVER.c.id)
+)
+_BATCH_NIC_MACS = select(_NIC.c.mac, _NIC.c.server_number).where(_NIC.c.mac.in_(_KEYS))
+# SQLite won't seek an index for a row-value IN list; the leading
+# switch_name IN (...) gives it one.
+_BATCH_SWITCHES = (
+    select(_SWITCH.c.switch_name, _SWITCH.c.switch_port, _SWITCH.c.server_number)
+    .where(
+        _SWITCH.c.switch_name.in_(bindparam("names", expanding=True)),
+        tuple_(_SWITCH.c.switch_name, _SWITCH.c.switch_port).in_(_KEYS),
+    )
+    .order_by(_SWITCH.c.id)
+)
+_BATCH_SERVERS = _joined_servers(_SERVER.c.server_number.in_(_KEYS))
+
+
+def _listing(filters, first_page):
+    """Keyset page of servers (with their zone) for the given filter names."""
+    stmt = (
+        select(*_SERVER.c, *_ZONE.c)
+        .select_from(_SERVER.outerjoin(_ZONE, _SERVER.c.provision_zone_id == _ZONE.c.id))
+        .order_by(_SERVER.c.server_number)
+        .limit(bindparam("limit"))
+    )
+    if not first_page:
+        stmt = stmt.where(_SERVER.c.server_number > bindparam("after"))
+    for name in filters:
+        stmt = stmt.where(_SERVER.c[name] == bindparam(name))
+    return stmt
+
+
+# One statement per combination of filters (and first page or not),
+# built on first use.
+_LISTINGS = {}
+
+
+def _export(filters):
+    """Every server matching the given filter names, one row per switch, by server_number."""
+    where = [_SERVER.c[name] == bindparam(name) for name in filters]
+    return _joined_servers(*where).order_by(None).order_by(_SERVER.c.server_number, _SWITCH.c.id)
+
+
+# Built on first use, like _LISTINGS.
+_EXPORTS = {}
+_NUMBER_AT = _SERVER_KEYS.index("server_number")
+
+# Rows fetched from the cursor at a time by export_servers.
+EXPORT_BATCH = 1000
+
+
+def _filter_names(filters):
+    """Sorted names of the non-None ``filters``; ValueError for unknown ones."""
+    unknown = set(filters) - set(LIST_FILTERS)
+    if unknown:
+        raise ValueError(f"Cannot filter servers on {sorted(unknown)}")
+    return tuple(sorted(name for name, value in filters.items() if value is not None))
+
+
+def _server_with_zone(row):
+    """Server dict with ``provision_zone`` from a row of server and zone columns."""
+    server = dict(zip(_SERVER_KEYS, row[:_ZONE_AT], strict=True))
+    zone = row[_ZONE_AT:_SWITCH_AT]
+    server["provision_zone"] = (
+        dict(zip(_ZONE_KEYS, zone, strict=True)) if zone[0] is not None else None
+    )
+    return server
+
+
+def _fold_server(rows):
+    """Server dict (with ``provision_zone`` and ``switches``) from joined rows."""
+    if not rows:
+        return None
+    server = _server_with_zone(rows[0])
+    server["switches"] = [
+        dict(zip(_SWITCH_KEYS, row[_SWITCH_AT:], strict=True))
+        for row in rows
+        if row[_SWITCH_AT] is not None
+    ]
+    return server
+
+
+_CHANGE = ServerChange.__table__
+_LATEST_CHANGE = select(func.max(_CHANGE.c.id))
+_CHANGES = (
+    select(
+        _CHANGE.c.id.label("seq"),
+        _CHANGE.c.server_number,
+        _CHANGE.c.action,
+        _CHANGE.c.field,
+        _CHANGE.c.changed_at,
+    )
+    .where(_CHANGE.c.id > bindparam("since"))
+    .order_by(_CHANGE.c.id)
+    .limit(bindparam("limit"))
+)
+
+
+# --- engine setup --------------------------------------------------------
+
+# Applied to every new SQLite connection, in this order. busy_timeout
+# goes first so the journal_mode switch itself waits out a busy file
+# instead of failing with "database is locked". WAL lets readers run
+# alongside the single writer; synchronous=NORMAL is durable in WAL
+# mode except for the last transactions on power loss.
+SQLITE_PRAGMAS = {
+    "busy_timeout": 5000,
+    "journal_mode": "wal",
+    "synchronous": "normal",
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64000,  # negative = KiB, so 64 MiB
+}
+
+# Pragmas are interpolated into SQL; only allow plain names and values.
+_PRAGMA_NAME = re.compile(r"[a-z_]+")
+_PRAGMA_VALUE = re.compile(r"-?\d+|[A-Za-z_]+")
+
+
+def _sqlite_pragma_statements(overrides):
+    pragmas = {**SQLITE_PRAGMAS, **(overrides or {})}
+    statements = []
+    for name, value in pragmas.items():
+        if value is None:
+            continue
+        if not _PRAGMA_NAME.fullmatch(name) or not _PRAGMA_VALUE.fullmatch(str(value)):
+            raise ValueError(f"Invalid SQLite pragma {name}={value!r}")
+        statements.append(f"PRAGMA {name}={value}")
+    return statements
+
+
+# Passed through to create_engine when set in the plugin config. Leave a
+# key out (or None) to keep SQLAlchemy's default for the backend's pool.
+POOL_OPTIONS = ("pool_size", "max_overflow", "pool_timeout", "pool_recycle", "pool_pre_ping")
+
+_STATIC_POOL_OPTIONS = ("pool_recycle", "pool_pre_ping")
+
+# Values for the ``migrate`` config key; see ``SQL``.
+MIGRATE_MODES = ("upgrade", "check")
+
+# Per-session statement timeout, by dialect. SQLite has none.
+_STATEMENT_TIMEOUT_SQL = {
+    "postgresql": "SET statement_timeout = {ms}",
+    "mysql": "SET SESSION max_execution_time = {ms}",
+    "mariadb": "SET SESSION max_statement_time = {seconds}",
+}
+
+
+# Execution option _session_scope sets on its connection: how its SQLite
+# transaction begins (see _sqlite_transactions).
+SQLITE_BEGIN = "sqlite_begin"
+
+
+def _sqlite_transactions(engine):
+    """Begin SQLite transactions from SQLAlchemy, not pysqlite.
+
+    pysqlite only sends BEGIN before the first INSERT/UPDATE/DELETE, so
+    a locking read ran outside any transaction and another writer could
+    commit between it and the UPDATE. With the driver in autocommit,
+    every transaction now starts with an explicit BEGIN -- ``BEGIN
+    IMMEDIATE`` for write sessions, which takes the write lock before
+    the first read. Sent on the raw cursor, like pysqlite's own BEGIN,
+    so statement events (and query counts) don't see it.
+    """
+
+    @event.listens_for(engine, "connect")
+    def _autocommit(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _begin(conn):
+        mode = conn.get_execution_options().get(SQLITE_BEGIN, "DEFERRED")
+        cursor = conn.connection.dbapi_connection.cursor()
+        try:
+            cursor.execute(f"BEGIN {mode}")
+        finally:
+            cursor.close()
+
+
+def _run_on_connect(engine, statements):
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+
+def _make_engine(config, factory=create_engine):
+    """Engine for ``config["engine"]`` with pool options and connect hooks.
+
+    ``factory`` may be ``create_async_engine``; the hooks then go on its
+    ``sync_engine``.
+    """
+    pool_kwargs = {k: config[k] for k in POOL_OPTIONS if config.get(k) is not None}
+    url = make_url(config["engine"])
+    in_memory = url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+    if in_memory:
+        # One in-memory database per connection: share a single one
+        # across threads (async views run on a different thread than
+        # the request) instead of SQLAlchemy's per-thread default.
+        pool_kwargs = {k: v for k, v in pool_kwargs.items() if k in _STATIC_POOL_OPTIONS}
+        pool_kwargs.update(poolclass=StaticPool, connect_args={"check_same_thread": False})
+    engine = factory(url, echo=False, **pool_kwargs)
+    hooked = getattr(engine, "sync_engine", engine)
+    timeout_ms = config.get("statement_timeout_ms")
+    if timeout_ms is not None:
+        template = _STATEMENT_TIMEOUT_SQL.get(engine.dialect.name)
+        if template is None:
+            log.warning(
+                "statement_timeout_ms is not supported on %s; ignoring.", engine.dialect.name
+            )
+        else:
+            ms = int(timeout_ms)
+            _run_on_connect(hooked, [template.format(ms=ms, seconds=ms / 1000)])
+    if engine.dialect.name == "sqlite":
+        if not in_memory:
+            # The in-memory database is one shared connection: there is
+            # no other writer to keep out, and threads would trip over
+            # each other's BEGIN.
+            _sqlite_transactions(hooked)
+        _run_on_connect(hooked, _sqlite_pragma_statements(config.get("sqlite_pragmas")))
+    return engine
+
+
+class _PoolMetrics:
+    """Checkout wait times and pool occupancy, for ``stats()``."""
+
+    def __init__(self, pool):
+        self.pool = pool
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+
+    def record(self, wait_ms):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_ms_total += wait_ms
+            self.wait_ms_max = max(self.wait_ms_max, wait_ms)
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self):
+        with self._lock:
+            stats = {
+                "class": type(self.pool).__name__,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_ms_mean": self.wait_ms_total / self.checkouts if self.checkouts else 0.0,
+                "wait_ms_max": self.wait_ms_max,
+            }
+        # Occupancy is only meaningful for QueuePool-style pools.
+        if hasattr(self.pool, "checkedout") and hasattr(self.pool, "size"):
+            in_use, size = self.pool.checkedout(), self.pool.size()
+            capacity = size + max(getattr(self.pool, "_max_overflow", 0), 0)
+            stats.update(
+                checked_out=in_use,
+                size=size,
+                overflow=self.pool.overflow(),
+                utilization=in_use / capacity if capacity else 0.0,
+            )
+        return stats
+
+
+def _commit_lag(engine, configured):
+    """``change_commit_lag_seconds``, defaulting by how the backend orders commits."""
+    if configured is not None:
+        return float(configured)
+    return 0.0 if engine.dialect.name == "sqlite" else 2.0
 
 
 class SQL(ProviderPluginBase):
@@ -100,79 +705,355 @@ class SQL(ProviderPluginBase):
 
     Config dict must include 'engine' (a SQLAlchemy URL). Example:
         {'engine': 'sqlite:///:memory:'}
+
+    An in-memory SQLite database is one connection shared by every
+    thread; fine for tests and development, not for concurrent writers.
+
+    Optional keys:
+
+    * ``sqlite_pragmas`` -- dict merged over ``SQLITE_PRAGMAS`` and run
+      on every new SQLite connection. Map a pragma to ``None`` to skip
+      it, e.g. ``{'journal_mode': None}`` on a filesystem without
+      shared-memory support for WAL. Ignored for other backends.
+    * ``pool_size``, ``max_overflow``, ``pool_timeout``,
+      ``pool_recycle``, ``pool_pre_ping`` -- passed to
+      ``create_engine``; see ``POOL_OPTIONS``.
+    * ``statement_timeout_ms`` -- per-connection statement timeout on
+      Postgres and MySQL/MariaDB.
+    * ``replicas`` -- list of read-replica URLs. ``get_server_by_*``
+      round-robins over them; every write stays on ``engine``. After a
+      write, reads by the same request or actor (see
+      :mod:`steel_pigs.affinity`) go to the primary for
+      ``replica_sticky_seconds`` (default 5) so callers read their own
+      writes despite replication lag. Stickiness is per process.
+      Replica engines get the same pool and pragma settings; their
+      schema is left to replication.
+    * ``migrate`` -- what to do when the database's ``alembic_version``
+      isn't ``HEAD_REVISION``. ``"upgrade"`` (default) runs the
+      migrations under the migration lock (see
+      :func:`steel_pigs.db.upgrade_schema`). ``"check"`` only logs it;
+      :meth:`ready` stays False until someone runs ``python -m
+      steel_pigs.db upgrade``. Either way a current schema costs one
+      query at startup.
+
+    * ``change_poll_seconds`` -- how often requests long-polling
+      ``GET /v1/changes`` check the log for writes made by other
+      processes (default 1). Writes made through this provider wake
+      them straight away.
+
+    * ``change_commit_lag_seconds`` -- how long a change log entry is
+      held back from ``GET /v1/changes`` after it is first seen (default
+      0 on SQLite, 2 elsewhere). Concurrent writers can commit their
+      entries out of sequence order; a consumer misses none as long as
+      each write commits within this long of logging its entry. SQLite
+      runs one writer at a time, so there the order always holds.
+
+    Checkout wait times and pool utilization are reported by
+    :meth:`stats`.
     """
 
     def __init__(self, config):
-        self.engine = create_engine(config["engine"], echo=False)
+        self.engine = _make_engine(config)
+        self._replicas = [
+            _make_engine({**config, "engine": url}) for url in config.get("replicas") or ()
+        ]
+        self._pool_metrics = {
+            engine: _PoolMetrics(engine.pool) for engine in (self.engine, *self._replicas)
+        }
+        self._next_replica = itertools.count()
+        self._sticky_seconds = float(config.get("replica_sticky_seconds", 5.0))
+        self._sticky_lock = threading.Lock()
+        self._sticky_until = {}  # affinity key -> monotonic deadline
+        self.primary_reads = 0
+        self.replica_reads = 0
         self._session_factory = sessionmaker(bind=self.engine, expire_on_commit=False)
-        # Auto-upgrade the schema. Safe for the default SQLite backend
-        # (the file lock serializes worker startup). For Postgres/MySQL,
-        # multiple workers can race -- see README on running
-        # `python -m steel_pigs.db upgrade` as a pre-deploy step instead.
-        alembic_cfg = make_alembic_config(engine=self.engine)
-        command.upgrade(alembic_cfg, "head")
+        self.change_feed = ChangeFeed(
+            self._latest_change,
+            self._read_changes,
+            poll_seconds=float(config.get("change_poll_seconds", 1.0)),
+            commit_lag=_commit_lag(self.engine, config.get("change_commit_lag_seconds")),
+        )
+        migrate = config.get("migrate") or "upgrade"
+        if migrate not in MIGRATE_MODES:
+            raise ValueError(f"migrate must be one of {MIGRATE_MODES}, not {migrate!r}")
+        self.schema_revision = None
+        if not self._check_schema():
+            if migrate == "upgrade":
+                upgrade_schema(self.engine)
+                self._check_schema()
+            else:
+                log.error(
+                    "Database schema is at %s but this build needs %s; not ready until "
+                    "`python -m steel_pigs.db upgrade` runs.",
+                    self.schema_revision,
+                    HEAD_REVISION,
+                )
+
+    def _check_schema(self):
+        with self._connect() as conn:
+            self.schema_revision = current_revision(conn)
+        return self.schema_revision == HEAD_REVISION
+
+    def ready(self):
+        """True once the database schema is at ``HEAD_REVISION``.
+
+        Re-checks while it isn't, so workers started in ``check`` mode
+        become ready as soon as the upgrade lands.
+        """
+        return self.schema_revision == HEAD_REVISION or self._check_schema()
 
     @contextmanager
-    def _session_scope(self):
-        session = self._session_factory()
+    def _connect(self, engine=None):
+        """Check a connection out of ``engine``'s pool, timing the wait."""
+        engine = engine if engine is not None else self.engine
+        metrics = self._pool_metrics[engine]
+        start = time.perf_counter()
         try:
-            yield session
-            session.commit()
-        except Exception:
-            session.rollback()
+            conn = engine.connect()
+        except PoolTimeoutError:
+            metrics.record_timeout()
             raise
-        finally:
-            session.close()
+        metrics.record((time.perf_counter() - start) * 1000)
+        with conn:
+            yield conn
+
+    @contextmanager
+    def _session_scope(self):
+        """Transaction on the primary. Marks the caller sticky on commit.
+
+        On a SQLite file it begins IMMEDIATE, taking the write lock
+        before its first read.
+
+        Wakes the change feed's waiters once a transaction that logged
+        changes has committed.
+        """
+        with self._connect() as conn:
+            conn.execution_options(**{SQLITE_BEGIN: "IMMEDIATE"})
+            session = self._session_factory(bind=conn)
+            try:
+                yield session
+                session.commit()
+                changed = session.info.get("changed", False)
+            except Exception:
+                session.rollback()
+                raise
+            finally:
+                session.close()
+        if self._replicas:
+            self._mark_written(affinity.current_keys())
+        if changed:
+            self.change_feed.notify()
+
+    def _mark_written(self, keys):
+        now = time.monotonic()
+        with self._sticky_lock:
+            if len(self._sticky_until) > 1024:
+                self._sticky_until = {k: t for k, t in self._sticky_until.items() if t > now}
+            for key in keys:
+                self._sticky_until[key] = now + self._sticky_seconds
+
+    def _read_engine(self):
+        """Primary if the caller wrote recently, else the next replica."""
+        if self._replicas:
+            now = time.monotonic()
+            keys = affinity.current_keys()
+            if not any(self._sticky_until.get(key, 0) > now for key in keys):
+                self.replica_reads += 1
+                return self._replicas[next(self._next_replica) % len(self._replicas)]
+        self.primary_reads += 1
+        return self.engine
+
+    def stats(self):
+        stats = {
+            "pool": self._pool_metrics[self.engine].snapshot(),
+            "schema": {"revision": self.schema_revision, "expected": HEAD_REVISION},
+        }
+        if self._replicas:
+            stats["replicas"] = {
+                "primary_reads": self.primary_reads,
+                "replica_reads": self.replica_reads,
+                "pools": [self._pool_metrics[engine].snapshot() for engine in self._replicas],
+            }
+        return stats
+
+    def _get_server(self, kind, params):
+        with self._connect(self._read_engine()) as conn:
+            return _fold_server(conn.execute(_LOOKUPS[kind], params).all())
 
     def get_server_by_name(self, name):
-        stmt = select(ServerDataModel).where(ServerDataModel.hostname == name).limit(1)
-        with self._session_scope() as s:
-            return _row_to_dict(s.execute(stmt).scalar_one_or_none())
+        return self._get_server("name", {"value": name})
 
     def get_server_by_number(self, number):
-        stmt = select(ServerDataModel).where(ServerDataModel.server_number == number).limit(1)
-        with self._session_scope() as s:
-            server = s.execute(stmt).scalar_one_or_none()
-            if server is None:
-                return None
-            ret = _row_to_dict(server)
-            ret["provision_zone"] = _row_to_dict(server.provision_zone)
-            return ret
+        return self._get_server("number", {"value": number})
 
     def get_server_by_mac(self, mac):
-        stmt = select(ServerDataModel).where(ServerDataModel.primary_mac == mac).limit(1)
-        with self._session_scope() as s:
-            return _row_to_dict(s.execute(stmt).scalar_one_or_none())
+        key = _mac_key(mac)
+        if key is None:
+            return None
+        return self._get_server("mac", {"value": key})
 
     def get_server_by_switch(self, switch_name, switch_port):
-        stmt = (
-            select(SwitchInfo)
-            .where(SwitchInfo.switch_name == switch_name)
-            .where(SwitchInfo.switch_port == switch_port)
-            .limit(1)
-        )
-        with self._session_scope() as s:
-            return _row_to_dict(s.execute(stmt).scalar_one_or_none())
+        return self._get_server("switch", {"switch_name": switch_name, "switch_port": switch_port})
 
-    def _update_server_attr(self, server_number, attr, value):
-        stmt = select(ServerDataModel).where(ServerDataModel.server_number == server_number)
+    def lookup_servers(self, server_numbers=(), macs=(), switches=()):
+        """Batch lookup. See ProviderPluginBase.
+
+        Primary MACs, then interface MACs for the rest, then switch
+        ports resolve to server_numbers, and one joined read loads every
+        server named: four statements per ``_IN_CHUNK`` identifiers,
+        however many there are. Ties go the way the single lookups
+        break them (primary MAC before interface, oldest row first).
+        """
+        mac_keys = {mac: _mac_key(mac) for mac in macs}
+        keys = list({key for key in mac_keys.values() if key is not None})
+        pairs = list(dict.fromkeys(switches))
+        by_mac = {}
+        by_switch = {}
+        with self._connect(self._read_engine()) as conn:
+            for chunk in _chunks(keys, _IN_CHUNK):
+                for key, number in conn.execute(_BATCH_PRIMARY_MACS, {"keys": chunk}):
+                    by_mac.setdefault(key, number)
+            rest = [key for key in keys if key not in by_mac]
+            for chunk in _chunks(rest, _IN_CHUNK):
+                by_mac.update(conn.execute(_BATCH_NIC_MACS, {"keys": chunk}).all())
+            for chunk in _chunks(pairs, _IN_CHUNK):
+                for name, port, number in conn.execute(
+                    _BATCH_SWITCHES, {"names": list({name for name, _ in chunk}), "keys": chunk}
+                ):
+                    by_switch.setdefault((name, port), number)
+            numbers = list({*server_numbers, *by_mac.values(), *by_switch.values()})
+            servers = {}
+            for chunk in _chunks(numbers, _IN_CHUNK):
+                rows = conn.execute(_BATCH_SERVERS, {"keys": chunk})
+                for number, server_rows in itertools.groupby(rows, key=lambda r: r[_NUMBER_AT]):
+                    servers[number] = _fold_server(list(server_rows))
+        return {
+            "server_numbers": {n: servers.get(n) for n in server_numbers},
+            "macs": {mac: servers.get(by_mac.get(key)) for mac, key in mac_keys.items()},
+            "switches": {pair: servers.get(by_switch.get(pair)) for pair in pairs},
+        }
+
+    def list_servers(self, after=None, limit=100, **filters):
+        """Keyset page of servers. See ProviderPluginBase.
+
+        Each page is one index range scan -- ``server_number >
+        :after`` on its unique index, or on a ``(filter column,
+        server_number)`` index when filtering -- never an OFFSET.
+        """
+        names = _filter_names(filters)
+        key = (names, after is None)
+        stmt = _LISTINGS.get(key)
+        if stmt is None:
+            stmt = _LISTINGS.setdefault(key, _listing(*key))
+        params = {name: filters[name] for name in names}
+        params.update(after=after, limit=limit)
+        with self._connect(self._read_engine()) as conn:
+            return [_server_with_zone(row) for row in conn.execute(stmt, params)]
+
+    def export_servers(self, **filters):
+        """Every matching server, streamed. See ProviderPluginBase.
+
+        One statement joins each server to its zone and switches; its
+        rows come off a server-side cursor ``EXPORT_BATCH`` at a time
+        and are folded into server dicts as they arrive, so memory
+        doesn't grow with the inventory. The returned generator holds a
+        connection until it is exhausted or closed.
+        """
+        names = _filter_names(filters)
+        stmt = _EXPORTS.get(names)
+        if stmt is None:
+            stmt = _EXPORTS.setdefault(names, _export(names))
+        params = {name: filters[name] for name in names}
+        return self._stream_servers(self._read_engine(), stmt, params)
+
+    def _stream_servers(self, engine, stmt, params):
+        with self._connect(engine) as conn:
+            rows = conn.execution_options(stream_results=True, yield_per=EXPORT_BATCH).execute(
+                stmt, params
+            )
+            for _, server_rows in itertools.groupby(rows, key=lambda row: row[_NUMBER_AT]):
+                yield _fold_server(list(server_rows))
+
+    # The feed reads the primary: a replica behind it could hand out a
+    # cursor past entries it doesn't have yet.
+
+    def _latest_change(self):
+        with self._connect() as conn:
+            return conn.execute(_LATEST_CHANGE).scalar() or 0
+
+    def _read_changes(self, since, limit):
+        with self._connect() as conn:
+            return [
+                dict(row)
+                for row in conn.execute(_CHANGES, {"since": since, "limit": limit}).mappings()
+            ]
+
+    def list_changes(self, since=0, limit=100):
+        """Change log entries after ``since``. See ProviderPluginBase.
+
+        Requests at the same cursor share one read until the log moves
+        (see :class:`steel_pigs.changefeed.ChangeFeed`).
+        """
+        return self.change_feed.read(since, limit)
+
+    def wait_for_changes(self, since, timeout):
+        """Long-poll the change log. See ProviderPluginBase."""
+        return self.change_feed.wait(since, timeout)
+
+    def _update_where(self, s, field, value, where):
+        """Lock the rows matching ``where``, set ``field``, return old values.
+
+        Runs inside the caller's session ``s``: a ``SELECT ... FOR
+        UPDATE`` (SQLite has no row locks, but the session began
+        IMMEDIATE and already holds the write lock) reads the current
+        values, then one ``UPDATE ... WHERE``
+        over the same predicate changes them, using RETURNING to learn
+        which rows changed where the backend supports it.
+        """
+        before = dict(s.execute(_locking_read(field, where)).all())
+        if not before:
+            return {}
+        stmt = _field_update(field, value, where)
+        if self.engine.dialect.update_returning:
+            updated = s.execute(stmt.returning(_SERVER.c.server_number)).scalars()
+        else:
+            s.execute(stmt)
+            updated = before
+        # Rows that started matching after the locking read (a phantom
+        # on backends without predicate locks) have no known previous
+        # value.
+        previous = {number: before.get(number) for number in updated}
+        _record_changes(s, previous, CHANGE_UPDATE, field)
+        return previous
+
+    def update_server_field(self, server_number, field, value):
+        """Atomic set-and-return-previous. See ProviderPluginBase."""
+        if field not in MUTABLE_FIELDS:
+            raise ValueError(f"{field!r} is not a mutable server field")
+        where = [ServerDataModel.__table__.c.server_number == server_number]
         with self._session_scope() as s:
-            server = s.execute(stmt).scalar_one_or_none()
-            if server is None:
-                return None
-            setattr(server, attr, value)
-            return server
+            previous = self._update_where(s, field, value, where)
+        if not previous:
+            raise ServerNotFound(f"server_number {server_number!r} not found")
+        return next(iter(previous.values()))
+
+    def _set_field(self, server_number, field, value):
+        try:
+            self.update_server_field(server_number, field, value)
+        except ServerNotFound:
+            return False
+        return True
 
     def set_boot_status(self, server_number, status):
         log.info("Setting boot status to %s for %s", status, server_number)
-        if self._update_server_attr(server_number, "boot_status", status) is None:
+        if not self._set_field(server_number, "boot_status", status):
             log.info("Unable to locate %s to set its boot status.", server_number)
             return {"operation": "failure", "status_set": "unable to locate device"}
         return {"operation": "success", "status_set": status}
 
     def set_boot_os(self, server_number, boot_os):
         log.info("Setting boot os on %s to %s", server_number, boot_os)
-        if self._update_server_attr(server_number, "boot_os", boot_os) is None:
+        if not self._set_field(server_number, "boot_os", boot_os):
             log.info("Unable to locate %s to update boot os", server_number)
             return {"operation": "failure", "os_set": "unable to locate device"}
         log.info("Updated boot os.")
@@ -180,29 +1061,183 @@ class SQL(ProviderPluginBase):
 
     def set_operational_status(self, server_number, status):
         log.info("Setting Op status on %s to %s", server_number, status)
-        if self._update_server_attr(server_number, "operational_status", status) is None:
+        if not self._set_field(server_number, "operational_status", status):
             log.info("Unable to locate server %s", server_number)
             return {"operation": "failure", "status_set": "unable to locate device"}
         return {"operation": "success", "status_set": status}
 
     def create_server(self, server_data):
-        """Insert a new server from a dict. See ProviderPluginBase."""
-        # Filter to known columns -- unexpected keys raise rather than
-        # silently dropping. This is the public API; surprises bite later.
-        known = {c.name for c in ServerDataModel.__table__.columns}
-        unknown = set(server_data) - known
-        if unknown:
-            raise ValueError(f"Unknown server fields: {sorted(unknown)}")
+        """Insert a new server from a dict. See ProviderPluginBase.
+
+        ``server_data`` may carry ``interfaces``, a list of ``{"mac",
+        "role"}`` dicts for the server's other NICs.
+        """
+        _check_server_fields(server_data)
+        columns, nics = _split_interfaces(server_data)
+        macs = _server_macs(columns, nics)
         try:
             with self._session_scope() as s:
-                row = ServerDataModel(**server_data)
+                owners = _mac_owners(s, _all_macs([macs]))
+                message = _mac_conflict(columns.get("server_number"), *macs, *owners)
+                if message is not None:
+                    raise ServerAlreadyExists(message)
+                row = ServerDataModel(**columns)
                 s.add(row)
                 s.flush()
-                return _row_to_dict(row)
+                if nics:
+                    s.execute(insert(_NIC), nics)
+                _record_changes(s, [row.server_number], CHANGE_CREATE)
+                created = _row_to_dict(row)
         except IntegrityError as e:
             raise ServerAlreadyExists(
                 f"server_number {server_data.get('server_number')!r} already exists"
             ) from e
+        if "interfaces" in server_data:
+            created["interfaces"] = [_interface_out(nic) for nic in nics]
+        return created
+
+    def create_servers(self, servers):
+        """Insert many servers in one transaction. See ProviderPluginBase.
+
+        Taken server_numbers and MACs (already stored, or claimed
+        earlier in ``servers``; see _mac_conflict) are reported as
+        conflicts up front; everything else goes in as executemany INSERTs. If a
+        concurrent writer claims one between the check and the insert,
+        the batch is rolled back and retried one row at a time so only
+        that row conflicts.
+        """
+        for server_data in servers:
+            _check_server_fields(server_data)
+        split = [_split_interfaces(server_data) for server_data in servers]
+        numbers = [columns.get("server_number") for columns, _ in split]
+        macs = [_server_macs(columns, nics) for columns, nics in split]
+        table = ServerDataModel.__table__
+        try:
+            with self._session_scope() as s:
+                taken = set()
+                for chunk in _chunks(numbers, _IN_CHUNK):
+                    taken.update(
+                        s.execute(
+                            select(table.c.server_number).where(table.c.server_number.in_(chunk))
+                        ).scalars()
+                    )
+                owners = _mac_owners(s, _all_macs(macs))
+                results = [None] * len(servers)
+                pending = []
+                for i, number in enumerate(numbers):
+                    if number in taken:
+                        message = f"server_number {number!r} already exists"
+                    else:
+                        message = _mac_conflict(number, *macs[i], *owners)
+                    if message is None:
+                        taken.add(number)
+                        _claim_macs(number, *macs[i], *owners)
+                        pending.append(i)
+                        continue
+                    results[i] = {"status": "conflict", "message": message}
+                created = self._insert_servers(s, [split[i][0] for i in pending])
+                nics = [nic for i in pending for nic in split[i][1]]
+                for chunk in _chunks(nics, _IN_CHUNK):
+                    s.execute(insert(_NIC), chunk)
+                _record_changes(s, created, CHANGE_CREATE)
+                for i in pending:
+                    server = created[numbers[i]]
+                    if "interfaces" in servers[i]:
+                        server = dict(server, interfaces=[_interface_out(n) for n in split[i][1]])
+                    results[i] = {"status": "created", "server": server}
+                return results
+        except IntegrityError:
+            log.info("Bulk insert raced a concurrent writer; retrying row by row.")
+            return ProviderPluginBase.create_servers(self, servers)
+
+    def _insert_servers(self, session, rows):
+        """executemany INSERT; returns the stored rows keyed by server_number."""
+        table = ServerDataModel.__table__
+        # executemany compiles one statement per distinct key set, so
+        # group rows that omit optional/defaulted columns together.
+        by_keys = {}
+        for row in rows:
+            by_keys.setdefault(tuple(sorted(row)), []).append(row)
+        returning = self.engine.dialect.insert_executemany_returning
+        created = {}
+        for group in by_keys.values():
+            stmt = insert(table)
+            if returning:
+                stmt = stmt.returning(*table.c)
+                for chunk in _chunks(group, _IN_CHUNK):
+                    for row in session.execute(stmt, chunk).mappings():
+                        created[row["server_number"]] = dict(row)
+            else:
+                session.execute(stmt, group)
+        if not returning:
+            numbers = [row["server_number"] for row in rows]
+            for chunk in _chunks(numbers, _IN_CHUNK):
+                stmt = select(table).where(table.c.server_number.in_(chunk))
+                for row in session.execute(stmt).mappings():
+                    created[row["server_number"]] = dict(row)
+        return created
+
+    def bulk_update_field(
+        self, field, value, server_numbers=None, switch_name=None, provision_zone_id=None
+    ):
+        """Set-based update of one field. See ProviderPluginBase.
+
+        One transaction of :meth:`_update_where` calls, one per chunk of
+        ``server_numbers`` (or a single one for the selectors).
+        """
+        if field not in MUTABLE_FIELDS:
+            raise ValueError(f"{field!r} is not a mutable server field")
+        table = ServerDataModel.__table__
+        selectors = []
+        if switch_name is not None:
+            selectors.append(_on_switch(switch_name))
+        if provision_zone_id is not None:
+            selectors.append(table.c.provision_zone_id == provision_zone_id)
+        if server_numbers is None:
+            if not selectors:
+                raise ValueError("bulk_update_field needs at least one target")
+            predicates = [selectors]
+        else:
+            numbers = list(dict.fromkeys(server_numbers))
+            predicates = [
+                [table.c.server_number.in_(chunk), *selectors]
+                for chunk in _chunks(numbers, _IN_CHUNK)
+            ]
+        log.info(
+            "Setting %s to %s on servers matching numbers=%s switch=%s zone=%s",
+            field,
+            value,
+            None if server_numbers is None else len(server_numbers),
+            switch_name,
+            provision_zone_id,
+        )
+
+        previous = {}
+        with self._session_scope() as s:
+            for where in predicates:
+                previous.update(self._update_where(s, field, value, where))
+        return previous
+
+    def update_server_fields(self, field, values):
+        """Per-server values for one field in one transaction. See ProviderPluginBase.
+
+        Servers are grouped by value, and each group chunk is one
+        :meth:`_update_where`, so a flush of thousands of boot statuses
+        costs a handful of statements and a single commit.
+        """
+        if field not in MUTABLE_FIELDS:
+            raise ValueError(f"{field!r} is not a mutable server field")
+        table = ServerDataModel.__table__
+        groups = {}
+        for number, value in values.items():
+            groups.setdefault(value, []).append(number)
+        previous = {}
+        with self._session_scope() as s:
+            for value, numbers in groups.items():
+                for chunk in _chunks(numbers, _IN_CHUNK):
+                    where = [table.c.server_number.in_(chunk)]
+                    previous.update(self._update_where(s, field, value, where))
+        return previous
 
     def add_switch(self, server_number, switch_name, switch_port):
         """Attach a switch to an existing server. See ProviderPluginBase."""
@@ -218,14 +1253,19 @@ class SQL(ProviderPluginBase):
             )
             s.add(row)
             s.flush()
+            _record_changes(s, [server_number], CHANGE_ADD_SWITCH)
             return _row_to_dict(row)
 
     def create_entry(self, server_info):
         """Insert a ServerDataModel row. Intended for tests / data loading."""
         with self._session_scope() as s:
             s.add(server_info)
+            s.flush()
+            _record_changes(s, [server_info.server_number], CHANGE_CREATE)
 
     def add_switch_entry(self, switch_info):
         """Insert a SwitchInfo row. Intended for tests / data loading."""
         with self._session_scope() as s:
             s.add(switch_info)
+            s.flush()
+            _record_changes(s, [switch_info.server_number], CHANGE_ADD_SWITCH)
@@ -0,0 +1,328 @@
+#   Copyright 2026 Michael Rice <michael@michaelrice.org>
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import atexit
+import logging
+import threading
+
+from steel_pigs.exceptions.pigs_exceptions import ServerNotFound
+
+from .caching import _server_key
+from .pluginbase import ProviderPluginBase
+
+log = logging.getLogger(__name__)
+
+# The only field the buffer holds back; every other write goes straight
+# through.
+BUFFERED_FIELD = "boot_status"
+
+_MISSING = object()
+
+
+class WriteBehindProvider(ProviderPluginBase):
+    """Coalescing write-behind buffer for boot-status callbacks.
+
+    When a rack boots at once, every node's iPXE and installer scripts
+    report ``kicking``, ``provision`` and ``done`` within seconds, and
+    each report would be its own commit. This wrapper queues boot-status
+    writes instead: the last value per server within ``window_seconds``
+    wins, and a background thread writes the whole batch through the
+    wrapped provider's :meth:`update_server_fields` as one transaction.
+
+    * The queue holds at most ``max_pending`` servers. A write for a new
+      server when it is full flushes early and waits for room.
+    * Lookups through this wrapper see queued values, and the audit
+      ``before`` of a queued write is the value it replaces, queued or
+      committed. Listings, exports, the change feed and other workers
+      see the write once its flush commits; ``generation`` is bumped
+      after every flush so other workers' caches drop the old value.
+    * With ``sync_ack`` a write returns only after the flush holding it
+      has committed, so the caller's acknowledgement is durable; writes
+      still share transactions with whatever else arrived in the window.
+    * :meth:`close` (registered with :mod:`atexit`) flushes what is left.
+      A process killed outright loses up to one window of writes, which
+      the next callback from each node overwrites anyway.
+
+    A failed flush is logged and requeued behind newer writes for the
+    same servers; under ``sync_ack`` it is raised to the waiting callers
+    instead.
+    """
+
+    def __init__(
+        self,
+        provider,
+        window_seconds=0.05,
+        max_pending=10000,
+        sync_ack=False,
+        generation=None,
+    ):
+        self.provider = provider
+        self.window_seconds = window_seconds
+        self.max_pending = max_pending
+        self.sync_ack = sync_ack
+        self.generation = generation
+        self._cond = threading.Condition()
+        # Serializes flushes, so an older batch can't commit after a newer one.
+        self._flush_lock = threading.Lock()
+        self._pending = {}  # server_number -> value, waiting for a flush
+        self._inflight = {}  # the batch being written
+        self._batch = 0  # sequence number of the batch _pending will become
+        self._done = -1  # last batch whose flush finished
+        self._errors = {}  # batch -> exception, for sync_ack waiters
+        self._thread = None
+        self._closed = False
+        self.writes = 0
+        self.coalesced = 0
+        self.flushes = 0
+        self.flushed_rows = 0
+        self.failures = 0
+        self.full_waits = 0
+
+    def __getattr__(self, name):
+        # Only reached for attributes not found normally. Guard against
+        # recursion before ``provider`` is set (copy/pickle, __init__).
+        if name == "provider":
+            raise AttributeError(name)
+        return getattr(self.provider, name)
+
+    # --- buffer mechanics --------------------------------------------------
+
+    def _queued(self, server_number):
+        """The value waiting to be written for ``server_number``, or _MISSING."""
+        key = _server_key(server_number)
+        with self._cond:
+            value = self._pending.get(key, _MISSING)
+            return self._inflight.get(key, _MISSING) if value is _MISSING else value
+
+    def _enqueue(self, server_number, value):
+        """Queue ``value``; False if the buffer is closed and the caller should write."""
+        key = _server_key(server_number)
+        with self._cond:
+            if self._closed:
+                return False
+            while len(self._pending) >= self.max_pending and key not in self._pending:
+                self.full_waits += 1
+                self._cond.notify_all()
+                self._cond.wait()
+                if self._closed:
+                    return False
+            self.writes += 1
+            if key in self._pending:
+                self.coalesced += 1
+            self._pending[key] = value
+            if len(self._pending) in (1, self.max_pending):
+                self._cond.notify_all()
+            batch = self._batch
+            self._start()
+            if not self.sync_ack:
+                return True
+            while self._done < batch:
+                self._cond.wait()
+            error = self._errors.get(batch)
+        if error is not None:
+            raise error
+        return True
+
+    def _start(self):
+        """Start the flusher on first use. Caller holds the condition."""
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="steel-pigs-write-behind", daemon=True
+            )
+            self._thread.start()
+            atexit.register(self.close)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                self._cond.wait_for(
+                    lambda: self._closed or len(self._pending) >= self.max_pending,
+                    self.window_seconds,
+                )
+            self.flush()
+
+    def flush(self):
+        """Write everything queued now, in the calling thread."""
+        with self._flush_lock:
+            with self._cond:
+                batch, values = self._batch, self._pending
+                if not values:
+                    return
+                self._batch += 1
+                self._pending, self._inflight = {}, values
+                self._cond.notify_all()
+            error = None
+            try:
+                self.provider.update_server_fields(BUFFERED_FIELD, values)
+            except Exception as exc:
+                log.exception("Flushing %d queued boot statuses failed.", len(values))
+                error = exc
+            with self._cond:
+                self._inflight = {}
+                self._done = batch
+                if error is None:
+                    self.flushes += 1
+                    self.flushed_rows += len(values)
+                else:
+                    self.failures += 1
+                    if self.sync_ack:
+                        self._errors[batch] = error
+                        self._errors.pop(batch - 64, None)
+                    else:
+                        for key, value in values.items():
+                            self._pending.setdefault(key, value)
+                self._cond.notify_all()
+            if error is None and self.generation is not None:
+                self.generation.bump()
+
+    def close(self):
+        """Stop the flusher and write what is left. Later writes go straight through."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        self.flush()
+        with self._cond:
+            if self._pending:
+                log.error(
+                    "Dropping %d boot statuses that could not be written.", len(self._pending)
+                )
+                self._pending = {}
+
+    def stats(self):
+        stats = dict(self.provider.stats())
+        with self._cond:
+            stats["write_behind"] = {
+                "writes": self.writes,
+                "coalesced": self.coalesced,
+                "flushes": self.flushes,
+                "flushed_rows": self.flushed_rows,
+                "failures": self.failures,
+                "full_waits": self.full_waits,
+                "pending": len(self._pending) + len(self._inflight),
+                "max_pending": self.max_pending,
+                "window_seconds": self.window_seconds,
+                "sync_ack": self.sync_ack,
+            }
+        return stats
+
+    def ready(self):
+        return self.provider.ready()
+
+    # --- reads: the wrapped provider, with queued values laid over ---------
+
+    def _overlay(self, server):
+        if server is None:
+            return None
+        value = self._queued(server.get("server_number"))
+        if value is _MISSING:
+            return server
+        return {**server, BUFFERED_FIELD: value}
+
+    def get_server_by_name(self, name):
+        return self._overlay(self.provider.get_server_by_name(name))
+
+    def get_server_by_number(self, number):
+        return self._overlay(self.provider.get_server_by_number(number))
+
+    def get_server_by_mac(self, mac):
+        return self._overlay(self.provider.get_server_by_mac(mac))
+
+    def get_server_by_switch(self, switch_name, switch_port):
+        return self._overlay(self.provider.get_server_by_switch(switch_name, switch_port))
+
+    async def aget_server_by_name(self, name):
+        return self._overlay(await self.provider.aget_server_by_name(name))
+
+    async def aget_server_by_number(self, number):
+        return self._overlay(await self.provider.aget_server_by_number(number))
+
+    async def aget_server_by_mac(self, mac):
+        return self._overlay(await self.provider.aget_server_by_mac(mac))
+
+    async def aget_server_by_switch(self, switch_name, switch_port):
+        return self._overlay(await self.provider.aget_server_by_switch(switch_name, switch_port))
+
+    def lookup_servers(self, server_numbers=(), macs=(), switches=()):
+        found = self.provider.lookup_servers(server_numbers, macs, switches)
+        return {
+            kind: {key: self._overlay(server) for key, server in entries.items()}
+            for kind, entries in found.items()
+        }
+
+    def list_servers(self, after=None, limit=100, **filters):
+        return self.provider.list_servers(after, limit, **filters)
+
+    def export_servers(self, **filters):
+        return self.provider.export_servers(**filters)
+
+    def list_changes(self, since=0, limit=100):
+        return self.provider.list_changes(since, limit)
+
+    def wait_for_changes(self, since, timeout):
+        return self.provider.wait_for_changes(since, timeout)
+
+    # --- writes ------------------------------------------------------------
+
+    def update_server_field(self, server_number, field, value):
+        if field != BUFFERED_FIELD:
+            return self.provider.update_server_field(server_number, field, value)
+        before = self._queued(server_number)
+        if before is _MISSING:
+            existing = self.provider.get_server_by_number(server_number)
+            if existing is None:
+                raise ServerNotFound(f"server_number {server_number!r} not found")
+            before = existing[field]
+        if not self._enqueue(server_number, value):
+            return self.provider.update_server_field(server_number, field, value)
+        return before
+
+    def set_boot_status(self, server_number, boot_status):
+        try:
+            self.update_server_field(server_number, BUFFERED_FIELD, boot_status)
+        except ServerNotFound:
+            return {"operation": "failure", "status_set": "unable to locate device"}
+        return {"operation": "success", "status_set": boot_status}
+
+    def set_boot_os(self, server_number, boot_os):
+        return self.provider.set_boot_os(server_number, boot_os)
+
+    def set_operational_status(self, server_number, operational_status):
+        return self.provider.set_operational_status(server_number, operational_status)
+
+    def bulk_update_field(self, field, value, **targets):
+        if field == BUFFERED_FIELD:
+            # Queued values are older than this write; land them first.
+            self.flush()
+        return self.provider.bulk_update_field(field, value, **targets)
+
+    def update_server_fields(self, field, values):
+        if field == BUFFERED_FIELD:
+            self.flush()
+        return self.provider.update_server_fields(field, values)
+
+    def create_server(self, server_data):
+        return self.provider.create_server(server_data)
+
+    def create_servers(self, servers):
+        return self.provider.create_servers(servers)
+
+    def add_switch(self, server_number, switch_name, switch_port):
+        return self.provider.add_switch(server_number, switch_name, switch_port)
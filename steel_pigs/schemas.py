@@ -26,15 +26,23 @@ leave the obvious lifecycle defaults (``bootstrapped=False``,
 """
 
 from apiflask import Schema, fields
-from apiflask.validators import Length, OneOf
-from marshmallow import RAISE
+from apiflask.validators import Length, OneOf, Range
+from marshmallow import RAISE, ValidationError, validates_schema
 
+from .mac import mac_to_int
 from .states import BootStatus, OperationalStatus
 
 _BOOT_STATUS_VALUES = [s.value for s in BootStatus]
 _OPERATIONAL_STATUS_VALUES = [s.value for s in OperationalStatus]
 
 
+def _mac_address(value):
+    try:
+        mac_to_int(value)
+    except ValueError as e:
+        raise ValidationError(str(e)) from e
+
+
 class _StrictIn(Schema):
     """Base for input schemas that reject unknown fields with 422.
 
@@ -84,6 +92,11 @@ class ProvisionZoneOut(Schema):
     provision_mirror_host = fields.String()
 
 
+class InterfaceOut(Schema):
+    mac = fields.String(required=True)
+    role = fields.String(required=True)
+
+
 class ServerOut(Schema):
     """Server record returned from the create endpoint and reads."""
 
@@ -110,6 +123,17 @@ class ServerOut(Schema):
     ntp_server = fields.String(required=True)
     provision_zone_id = fields.Integer(allow_none=True)
     provision_zone = fields.Nested(ProvisionZoneOut, allow_none=True, dump_only=True)
+    interfaces = fields.List(fields.Nested(InterfaceOut), dump_only=True)
+
+
+class ServerPageOut(Schema):
+    """Body of ``GET /v1/servers``."""
+
+    servers = fields.List(fields.Nested(ServerOut), required=True)
+    next_after = fields.Integer(
+        allow_none=True,
+        metadata={"description": "Pass as ``after`` for the next page; null on the last one."},
+    )
 
 
 class SwitchOut(Schema):
@@ -121,6 +145,118 @@ class SwitchOut(Schema):
     switch_port = fields.String(required=True)
 
 
+class ServerSwitchOut(SwitchOut):
+    """One of a server's switch ports, nested in export and lookup results.
+
+    Its own class so the spec holds it once: the nested reference and
+    the add-switch response would otherwise both register ``SwitchOut``.
+    """
+
+
+class ServerExportOut(ServerOut):
+    """One line of ``GET /v1/servers:export?format=ndjson``."""
+
+    class Meta:
+        exclude = ("interfaces",)
+
+    switches = fields.List(fields.Nested(ServerSwitchOut), required=True)
+
+
+class ChangeOut(Schema):
+    """One entry of the change log."""
+
+    seq = fields.Integer(required=True, metadata={"description": "Cursor of this entry."})
+    server_number = fields.Integer(required=True)
+    action = fields.String(
+        allow_none=True,
+        metadata={"description": "``create``, ``update`` or ``add_switch``."},
+    )
+    field = fields.String(allow_none=True, metadata={"description": "The field an ``update`` set."})
+    changed_at = fields.DateTime(required=True)
+
+
+class ChangesOut(Schema):
+    """Body of ``GET /v1/changes``."""
+
+    changes = fields.List(fields.Nested(ChangeOut), required=True)
+    next_since = fields.Integer(
+        required=True,
+        metadata={"description": "Pass as ``since`` for the next batch."},
+    )
+
+
+class LookupNumberOut(Schema):
+    """One ``server_numbers`` entry of ``POST /v1/servers:lookup``."""
+
+    server_number = fields.Integer(required=True)
+    found = fields.Boolean(required=True)
+    server = fields.Nested(ServerExportOut, allow_none=True, required=True)
+
+
+class LookupMacOut(Schema):
+    """One ``macs`` entry of ``POST /v1/servers:lookup``."""
+
+    mac = fields.String(required=True, metadata={"description": "As given in the request."})
+    found = fields.Boolean(required=True)
+    server = fields.Nested(ServerExportOut, allow_none=True, required=True)
+
+
+class LookupSwitchOut(Schema):
+    """One ``switches`` entry of ``POST /v1/servers:lookup``."""
+
+    switch_name = fields.String(required=True)
+    switch_port = fields.String(required=True)
+    found = fields.Boolean(required=True)
+    server = fields.Nested(ServerExportOut, allow_none=True, required=True)
+
+
+class ServerLookupOut(Schema):
+    """Result of ``POST /v1/servers:lookup``, in request order."""
+
+    found = fields.Integer(required=True)
+    not_found = fields.Integer(required=True)
+    server_numbers = fields.List(fields.Nested(LookupNumberOut), required=True)
+    macs = fields.List(fields.Nested(LookupMacOut), required=True)
+    switches = fields.List(fields.Nested(LookupSwitchOut), required=True)
+
+
+class BulkItemResultOut(Schema):
+    """Outcome for one item of ``POST /v1/servers:bulk``."""
+
+    index = fields.Integer(required=True, metadata={"description": "Position in the request body."})
+    server_number = fields.Integer()
+    status = fields.String(required=True, validate=OneOf(["created", "conflict", "invalid"]))
+    message = fields.String()
+    errors = fields.Dict(metadata={"description": "Validation errors, keyed by field."})
+
+
+class BulkCreateServersOut(Schema):
+    """Result of ``POST /v1/servers:bulk``."""
+
+    created = fields.Integer(required=True)
+    conflicts = fields.Integer(required=True)
+    invalid = fields.Integer(required=True)
+    results = fields.List(fields.Nested(BulkItemResultOut), required=True)
+
+
+class BulkUpdateItemOut(Schema):
+    """Outcome for one server of a ``POST /v1/update/*:bulk`` call."""
+
+    server_number = fields.Integer(required=True)
+    operation = fields.String(required=True, validate=OneOf(["success", "failure"]))
+    before = fields.String(allow_none=True)
+    after = fields.String()
+    message = fields.String()
+
+
+class BulkUpdateResultOut(Schema):
+    """Result of ``POST /v1/update/status:bulk``, ``os:bulk`` and ``opstatus:bulk``."""
+
+    updated = fields.Integer(required=True)
+    failed = fields.Integer(required=True)
+    results = fields.List(fields.Nested(BulkUpdateItemOut), required=True)
+
+
 # --- Inputs --------------------------------------------------------------
 
 
@@ -148,6 +284,53 @@ class UpdateOpStatusIn(_StrictIn):
     )
 
 
+BULK_TARGETS = ("server_numbers", "switch_name", "provision_zone_id")
+
+
+class _BulkTargetIn(_StrictIn):
+    """Target selection shared by the ``/v1/update/*:bulk`` bodies.
+
+    Exactly one of: an explicit ``server_numbers`` list, every server
+    attached to ``switch_name``, or every server in ``provision_zone_id``.
+    """
+
+    server_numbers = fields.List(fields.Integer(), validate=Length(min=1))
+    switch_name = fields.String(validate=Length(min=1))
+    provision_zone_id = fields.Integer()
+
+    @validates_schema
+    def _exactly_one_target(self, data, **kwargs):
+        if sum(key in data for key in BULK_TARGETS) != 1:
+            raise ValidationError(
+                "Supply exactly one of server_numbers, switch_name, provision_zone_id."
+            )
+
+
+class BulkUpdateBootStatusIn(_BulkTargetIn):
+    """Body of ``POST /v1/update/status:bulk``."""
+
+    boot_status = fields.String(required=True, validate=OneOf(_BOOT_STATUS_VALUES))
+
+
+class BulkUpdateBootOsIn(_BulkTargetIn):
+    """Body of ``POST /v1/update/os:bulk``."""
+
+    boot_os = fields.String(required=True, validate=Length(min=1))
+
+
+class BulkUpdateOpStatusIn(_BulkTargetIn):
+    """Body of ``POST /v1/update/opstatus:bulk``."""
+
+    opstatus = fields.String(required=True, validate=OneOf(_OPERATIONAL_STATUS_VALUES))
+
+
+class InterfaceIn(_StrictIn):
+    """One of a server's other NICs, in ``POST /v1/servers``."""
+
+    mac = fields.String(required=True, validate=_mac_address)
+    role = fields.String(load_default="data", validate=Length(min=1, max=32))
+
+
 class CreateServerIn(_StrictIn):
     """Body of ``POST /v1/servers``.
 
@@ -160,7 +343,7 @@ class CreateServerIn(_StrictIn):
     primary_ip = fields.String(required=True)
     primary_gw = fields.String(required=True)
     primary_nm = fields.String(required=True)
-    primary_mac = fields.String(required=True)
+    primary_mac = fields.String(required=True, validate=_mac_address)
     hostname = fields.String(required=True)
     dns_server_primary = fields.String(required=True)
     boot_os = fields.String(required=True)
@@ -187,6 +370,14 @@ class CreateServerIn(_StrictIn):
     dns_server_secondary = fields.String(load_default=None, allow_none=True)
     dns_server_tertiary = fields.String(load_default=None, allow_none=True)
     provision_zone_id = fields.Integer(load_default=None, allow_none=True)
+    # Every NIC besides primary_mac the server may PXE from.
+    interfaces = fields.List(fields.Nested(InterfaceIn))
+
+    @validates_schema
+    def _distinct_macs(self, data, **kwargs):
+        macs = [data["primary_mac"]] + [nic["mac"] for nic in data.get("interfaces", ())]
+        if len({mac_to_int(mac) for mac in macs}) != len(macs):
+            raise ValidationError("primary_mac and interface MACs must all differ.", "interfaces")
 
 
 class AddSwitchIn(_StrictIn):
@@ -196,6 +387,57 @@ class AddSwitchIn(_StrictIn):
     switch_port = fields.String(required=True, validate=Length(min=1))
 
 
+class SwitchRowIn(AddSwitchIn):
+    """One switch entry for ``python -m steel_pigs.db load --switches``."""
+
+    server_number = fields.Integer(required=True)
+
+
+class ProvisionZoneIn(_StrictIn):
+    """One zone for ``python -m steel_pigs.db load --zones``.
+
+    ``id`` is kept when given, so servers' ``provision_zone_id`` still
+    points at the same zone after a dump and reload.
+    """
+
+    id = fields.Integer(load_default=None, allow_none=True)
+    zone_name = fields.String(required=True, validate=Length(min=1, max=128))
+    provision_img_host = fields.String(required=True, validate=Length(min=1, max=128))
+    provision_mirror_host = fields.String(required=True, validate=Length(min=1, max=128))
+
+
+class SwitchPortIn(_StrictIn):
+    """A switch/port pair to resolve."""
+
+    switch_name = fields.String(required=True, validate=Length(min=1))
+    switch_port = fields.String(required=True, validate=Length(min=1))
+
+
+# Identifiers per list in one POST /v1/servers:lookup.
+LOOKUP_MAX = 10_000
+
+
+class ServerLookupIn(_StrictIn):
+    """Body of ``POST /v1/servers:lookup``.
+
+    Any mix of the three lists, at least one identifier in total. MACs
+    that don't parse aren't an error; they come back not found.
+    """
+
+    server_numbers = fields.List(
+        fields.Integer(), load_default=list, validate=Length(max=LOOKUP_MAX)
+    )
+    macs = fields.List(fields.String(), load_default=list, validate=Length(max=LOOKUP_MAX))
+    switches = fields.List(
+        fields.Nested(SwitchPortIn), load_default=list, validate=Length(max=LOOKUP_MAX)
+    )
+
+    @validates_schema
+    def _something_to_look_up(self, data, **kwargs):
+        if not any(data.get(key) for key in ("server_numbers", "macs", "switches")):
+            raise ValidationError("Supply at least one of server_numbers, macs, switches.")
+
+
 # --- Query args ----------------------------------------------------------
 
 
@@ -213,6 +455,61 @@ class PxeQuery(Schema):
     switch_port = fields.String(load_default=None)
 
 
+SERVER_PAGE_MAX = 1000
+
+
+class _ServerFilterQuery(Schema):
+    """Equality filters shared by the server listing and export."""
+
+    operational_status = fields.String(
+        load_default=None, validate=OneOf(_OPERATIONAL_STATUS_VALUES)
+    )
+    boot_status = fields.String(load_default=None, validate=OneOf(_BOOT_STATUS_VALUES))
+    boot_os = fields.String(load_default=None)
+    provision_zone_id = fields.Integer(load_default=None)
+
+
+class ServerListQuery(_ServerFilterQuery):
+    """Query args for ``GET /v1/servers``."""
+
+    after = fields.Integer(
+        load_default=None,
+        metadata={"description": "Last server_number of the previous page."},
+    )
+    limit = fields.Integer(load_default=100, validate=Range(min=1, max=SERVER_PAGE_MAX))
+
+
+EXPORT_FORMATS = ("ndjson", "csv")
+
+
+class ServerExportQuery(_ServerFilterQuery):
+    """Query args for ``GET /v1/servers:export``."""
+
+    format = fields.String(load_default="ndjson", validate=OneOf(EXPORT_FORMATS))
+
+
+CHANGES_PAGE_MAX = 1000
+# A waiting request holds a server thread; gunicorn_conf's worker timeout
+# stays above this.
+CHANGES_WAIT_MAX = 60
+
+
+class ChangesQuery(Schema):
+    """Query args for ``GET /v1/changes``."""
+
+    since = fields.Integer(
+        load_default=0,
+        validate=Range(min=0),
+        metadata={"description": "``next_since`` of the previous batch; 0 for the start."},
+    )
+    wait = fields.Float(
+        load_default=0,
+        validate=Range(min=0, max=CHANGES_WAIT_MAX),
+        metadata={"description": "Seconds to wait for a change if there is none yet."},
+    )
+    limit = fields.Integer(load_default=100, validate=Range(min=1, max=CHANGES_PAGE_MAX))
+
+
 class HardwareQuery(Schema):
     """Query args for ``GET /hardware``."""
 
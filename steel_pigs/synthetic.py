@@ -0,0 +1,50 @@
+#   Copyright 2026 Michael Rice <michael@michaelrice.org>
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Synthetic servers for the tests, the benchmarks and ``explain --seeded``.
+
+Everything about a synthetic server follows from its number, so a
+caller can name its MAC or hostname without keeping the row around.
+"""
+
+from .mac import int_to_mac
+
+
+def server_mac(number, nic=0):
+    """A distinct locally administered MAC for interface ``nic`` of
+    server ``number``, built from all 48 bits: ``server_mac(256)`` is
+    ``02:00:00:00:01:00`` and ``server_mac(256, 1)`` ``02:01:00:00:01:00``.
+    """
+    return int_to_mac((0x02 << 40) | (nic << 32) | number)
+
+
+def make_server(number, **overrides):
+    """create_server input for synthetic server ``number``."""
+    return {
+        "server_number": number,
+        "primary_ip": f"10.{number >> 16 & 255}.{number >> 8 & 255}.{number & 255}",
+        "primary_gw": "10.0.0.1",
+        "primary_nm": "255.0.0.0",
+        "primary_mac": server_mac(number),
+        "hostname": f"node-{number}",
+        "dns_server_primary": "8.8.8.8",
+        "bootstrapped": False,
+        "boot_os": "Ubuntu",
+        "boot_os_version": "22.04",
+        "boot_profile": "Standard",
+        "boot_status": "kicking",
+        "operational_status": "provisioning",
+        "ntp_server": "pool.ntp.org",
+        **overrides,
+    }
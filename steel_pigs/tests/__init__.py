@@ -14,9 +14,16 @@
 
 import logging
 import unittest
+from contextlib import contextmanager
+from dataclasses import replace
+
+from sqlalchemy import event
 
 from steel_pigs.plugins.providers.sql import SQL, ProvisionZone, ServerDataModel, SwitchInfo
 
+# Keys get_server_by_number returns that create_server doesn't take.
+_STORED_ONLY = ("id", "primary_mac_int", "provision_zone", "switches")
+
 
 def make_seed_data():
     """Build a fresh set of ORM objects for an in-memory SQL plugin."""
@@ -57,6 +64,43 @@ def seed_sql_plugin(sql_plugin):
         sql_plugin.add_switch_entry(switch)
 
 
+def server_template(sql_plugin):
+    """The seeded server (see seed_sql_plugin) as create_server input."""
+    stored = sql_plugin.get_server_by_number(555121)
+    return {k: v for k, v in stored.items() if k not in _STORED_ONLY}
+
+
+def app_with_provider(provider, **plugin_overrides):
+    """A TESTING app whose server_data plugin is ``provider``; other
+    plugins are the configured ones unless overridden by name."""
+    # Imported here: conftest.py sets the environment pigs_config reads
+    # at import time, after this package is imported.
+    from steel_pigs.webapp import create_app
+
+    base = create_app(config_overrides={"TESTING": True}).extensions["steel_pigs"].load_all()
+    plugins = replace(base, server_data=provider, **plugin_overrides)
+    return create_app(config_overrides={"TESTING": True}, plugins=plugins)
+
+
+@contextmanager
+def count_queries(engine):
+    """Collect every SQL statement ``engine`` executes inside the block.
+
+    Yields a list that fills up as statements run; assert on its length
+    to pin the round trips a call costs and catch N+1 regressions.
+    """
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
 class PigTests(unittest.TestCase):
     """Base class for tests that exercise the SQL plugin in isolation."""
 
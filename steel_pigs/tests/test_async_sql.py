@@ -0,0 +1,144 @@
+#   Copyright 2026 Michael Rice <michael@michaelrice.org>
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Tests for the asyncio-backed lookups and the async PXE views."""
+
+import asyncio
+import gc
+import importlib.util
+import tempfile
+import threading
+import unittest
+import warnings
+from pathlib import Path
+
+from steel_pigs.tests import app_with_provider, seed_sql_plugin
+
+HAVE_AIOSQLITE = importlib.util.find_spec("aiosqlite") is not None
+
+if HAVE_AIOSQLITE:
+    from steel_pigs.plugins.providers.async_sql import AsyncSQL
+
+
+@unittest.skipUnless(HAVE_AIOSQLITE, "aiosqlite is not installed")
+class TestAsyncSQL(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.sql = AsyncSQL({"engine": f"sqlite:///{Path(self._tmp.name) / 'pigs.db'}"})
+        self.addCleanup(self.sql.close)
+        seed_sql_plugin(self.sql)
+
+    def test_awaited_lookups_match_blocking_ones(self):
+        cases = [
+            ("name", ("hogzilla",)),
+            ("number", (555121,)),
+            ("mac", ("00:11:22:33:44:55",)),
+            ("switch", ("Switch 01", "2")),
+        ]
+        for kind, args in cases:
+            with self.subTest(kind=kind):
+                expected = getattr(self.sql, f"get_server_by_{kind}")(*args)
+                awaited = asyncio.run(getattr(self.sql, f"aget_server_by_{kind}")(*args))
+                self.assertIsNotNone(awaited)
+                self.assertEqual(awaited, expected)
+
+    def test_unknown_server_is_none(self):
+        self.assertIsNone(asyncio.run(self.sql.aget_server_by_mac("ff:ff:ff:ff:ff:ff")))
+
+    def test_any_caller_loop_can_await(self):
+        # Flask gives every async view a fresh loop; the provider's
+        # connections must outlive them.
+        for _ in range(3):
+            server = asyncio.run(self.sql.aget_server_by_number(555121))
+            self.assertEqual(server["hostname"], "hogzilla")
+
+    def test_concurrent_lookups(self):
+        async def many():
+            return await asyncio.gather(
+                *(self.sql.aget_server_by_number(555121) for _ in range(20))
+            )
+
+        servers = asyncio.run(many())
+        self.assertEqual({s["hostname"] for s in servers}, {"hogzilla"})
+        self.assertEqual(self.sql.stats()["async_pool"]["checkouts"], 20)
+
+    def test_sees_blocking_writes(self):
+        self.sql.set_boot_os(555121, "Rocky")
+        server = asyncio.run(self.sql.aget_server_by_number(555121))
+        self.assertEqual(server["boot_os"], "Rocky")
+
+    def test_in_memory_sqlite_is_rejected(self):
+        with self.assertRaises(ValueError):
+            AsyncSQL({"engine": "sqlite:///:memory:"})
+
+
+@unittest.skipUnless(HAVE_AIOSQLITE, "aiosqlite is not installed")
+class TestAsyncRoutes(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._tmp = tempfile.TemporaryDirectory()
+        cls.sql = AsyncSQL({"engine": f"sqlite:///{Path(cls._tmp.name) / 'pigs.db'}"})
+        seed_sql_plugin(cls.sql)
+        cls.app = app_with_provider(cls.sql)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.sql.close()
+        cls._tmp.cleanup()
+
+    def setUp(self):
+        self.client = self.app.test_client()
+
+    def test_pxe_by_mac(self):
+        rv = self.client.get("/pxe?mac=00:11:22:33:44:55")
+        self.assertEqual(rv.status_code, 200)
+        self.assertIn(b"hogzilla", rv.data)
+
+    def test_pxe_by_switch(self):
+        rv = self.client.get("/pxe?switch_name=Switch%2001&switch_port=1")
+        self.assertEqual(rv.status_code, 200)
+
+    def test_provision_unknown_mac_is_404(self):
+        rv = self.client.get("/provision/os/start?mac=ff:ff:ff:ff:ff:ff")
+        self.assertEqual(rv.status_code, 404)
+
+    def test_versions(self):
+        self.assertEqual(self.client.get("/versions").status_code, 200)
+        self.assertEqual(self.client.get("/versions/ipxe").status_code, 200)
+
+    def test_view_loops_close_with_their_thread(self):
+        from steel_pigs.webapp import _run_on_thread_loop
+
+        loops = []
+
+        async def view():
+            loops.append(asyncio.get_running_loop())
+
+        run = _run_on_thread_loop(view)
+        gc.collect()  # earlier tests' garbage would warn inside the block
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always", ResourceWarning)
+            thread = threading.Thread(target=lambda: (run(), run()))
+            thread.start()
+            thread.join()
+            gc.collect()
+        self.assertIs(loops[0], loops[1])
+        self.assertTrue(loops[0].is_closed())
+        # Closed by us, not by the garbage collector's "unclosed loop" path.
+        self.assertEqual([w for w in caught if "unclosed event loop" in str(w.message)], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -99,6 +99,36 @@ class TestAuditLog(unittest.TestCase):
         self.assertEqual(ev["action"], "set_operational_status")
         self.assertEqual(ev["after"], {"operational_status": "kicking"})
 
+    def test_before_is_the_value_the_write_replaced(self):
+        headers = {"Authorization": f"Bearer {API_TOKEN}"}
+        body = {"server_number": 555121, "boot_os": "First"}
+        self.client.post("/v1/update/os", json=body, headers=headers)
+        body["boot_os"] = "Second"
+        self.client.post("/v1/update/os", json=body, headers=headers)
+        self.assertEqual(self.capture.events[1]["before"], {"boot_os": "First"})
+
+    def test_unknown_server_is_audited_without_before(self):
+        self.client.post(
+            "/v1/update/os",
+            json={"server_number": 424242, "boot_os": "Fedora"},
+            headers={"Authorization": f"Bearer {API_TOKEN}"},
+        )
+        self.assertEqual(len(self.capture.events), 1)
+        self.assertIsNone(self.capture.events[0]["before"])
+
+    def test_bulk_update_emits_one_event_for_the_batch(self):
+        self.client.post(
+            "/v1/update/os:bulk",
+            json={"switch_name": "Switch 01", "boot_os": "Fedora"},
+            headers={"Authorization": f"Bearer {API_TOKEN}"},
+        )
+        self.assertEqual(len(self.capture.events), 1)
+        ev = self.capture.events[0]
+        self.assertEqual(ev["action"], "bulk_set_boot_os")
+        self.assertEqual(ev["resource"], "servers?switch_name=Switch 01")
+        self.assertEqual(ev["after"], {"555121": {"boot_os": "Fedora"}})
+        self.assertIn("555121", ev["before"])
+
     # --- auth-failure events ----------------------------------------------
 
     def test_unauthenticated_emits_auth_failed(self):
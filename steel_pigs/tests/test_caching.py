@@ -0,0 +1,238 @@
+#   Copyright 2026 Michael Rice <michael@michaelrice.org>
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Tests for the read-through provider cache."""
+
+import asyncio
+import os
+import unittest
+from collections import Counter
+from unittest.mock import patch
+
+from steel_pigs import pigs_config
+from steel_pigs.plugins.providers.caching import CachingProvider
+from steel_pigs.plugins.providers.pluginbase import ProviderPluginBase
+from steel_pigs.tests import seed_sql_plugin
+from steel_pigs.webapp import create_app
+
+
+class DictProvider(ProviderPluginBase):
+    """Minimal in-memory provider that counts lookups."""
+
+    def __init__(self):
+        self.calls = Counter()
+        self.servers = {
+            1: {"server_number": 1, "hostname": "one", "primary_mac": "m1", "boot_status": "a"},
+            2: {"server_number": 2, "hostname": "two", "primary_mac": "m2", "boot_status": "a"},
+        }
+        self.switches = {("sw", "1"): 1}
+
+    def _find(self, kind, pred):
+        self.calls[kind] += 1
+        return next((dict(s) for s in self.servers.values() if pred(s)), None)
+
+    def get_server_by_name(self, name):
+        return self._find("name", lambda s: s["hostname"] == name)
+
+    def get_server_by_number(self, number):
+        return self._find("number", lambda s: s["server_number"] == int(number))
+
+    def get_server_by_mac(self, mac):
+        return self._find("mac", lambda s: s["primary_mac"] == mac)
+
+    def get_server_by_switch(self, switch_name, switch_port):
+        number = self.switches.get((switch_name, switch_port))
+        return self._find("switch", lambda s: s["server_number"] == number)
+
+    def set_boot_status(self, server_number, boot_status):
+        self.servers[server_number]["boot_status"] = boot_status
+
+    def set_boot_os(self, server_number, boot_os):
+        self.servers[server_number]["boot_os"] = boot_os
+
+    def set_operational_status(self, server_number, operational_status):
+        self.servers[server_number]["operational_status"] = operational_status
+
+    def create_server(self, server_data):
+        self.servers[server_data["server_number"]] = dict(server_data)
+        return dict(server_data)
+
+    def add_switch(self, server_number, switch_name, switch_port):
+        self.switches[(switch_name, switch_port)] = server_number
+        return {"server_number": server_number}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCachingProvider(unittest.TestCase):
+    def setUp(self):
+        self.inner = DictProvider()
+        self.clock = FakeClock()
+        self.cache = CachingProvider(self.inner, max_entries=3, ttl_seconds=5, clock=self.clock)
+
+    def test_repeat_lookup_is_served_from_cache(self):
+        self.cache.get_server_by_mac("m1")
+        self.cache.get_server_by_mac("m1")
+        self.assertEqual(self.inner.calls["mac"], 1)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_awaited_lookups_share_the_cache(self):
+        self.cache.get_server_by_mac("m1")
+        server = asyncio.run(self.cache.aget_server_by_mac("m1"))
+        self.assertEqual(server["server_number"], 1)
+        self.assertEqual(self.inner.calls["mac"], 1)
+        self.cache.invalidate(1)
+        asyncio.run(self.cache.aget_server_by_mac("m1"))
+        self.assertEqual(self.inner.calls["mac"], 2)
+
+    def test_number_keys_are_normalized(self):
+        self.cache.get_server_by_number(1)
+        self.cache.get_server_by_number("1")
+        self.assertEqual(self.inner.calls["number"], 1)
+
+    def test_entries_expire_after_ttl(self):
+        self.cache.get_server_by_name("one")
+        self.clock.now += 6
+        self.cache.get_server_by_name("one")
+        self.assertEqual(self.inner.calls["name"], 2)
+
+    def test_least_recently_used_is_evicted(self):
+        self.cache.get_server_by_name("one")
+        self.cache.get_server_by_name("two")
+        self.cache.get_server_by_mac("m1")
+        self.cache.get_server_by_name("one")  # refresh -> "two" is now oldest
+        self.cache.get_server_by_mac("m2")
+        self.assertEqual(self.cache.evictions, 1)
+        self.cache.get_server_by_name("two")
+        self.assertEqual(self.inner.calls["name"], 2 + 1)
+
+    def test_misses_are_not_cached(self):
+        self.assertIsNone(self.cache.get_server_by_name("nope"))
+        self.cache.create_server({"server_number": 3, "hostname": "nope", "primary_mac": "m3"})
+        self.assertEqual(self.cache.get_server_by_name("nope")["server_number"], 3)
+
+    def test_mutation_evicts_every_key_for_the_server(self):
+        self.cache.get_server_by_number(1)
+        self.cache.get_server_by_mac("m1")
+        self.cache.get_server_by_switch("sw", "1")
+        self.cache.get_server_by_name("two")
+        self.cache.set_boot_status(1, "b")
+        self.assertEqual(self.cache.get_server_by_mac("m1")["boot_status"], "b")
+        self.assertEqual(self.cache.get_server_by_switch("sw", "1")["boot_status"], "b")
+        self.assertEqual(self.inner.calls["mac"], 2)
+        self.assertEqual(self.inner.calls["switch"], 2)
+        # Unrelated server stays cached.
+        self.cache.get_server_by_name("two")
+        self.assertEqual(self.inner.calls["name"], 1)
+
+    def test_every_write_path_invalidates(self):
+        writes = [
+            lambda: self.cache.set_boot_os(1, "Fedora"),
+            lambda: self.cache.set_operational_status(1, "online"),
+            lambda: self.cache.add_switch(1, "sw", "9"),
+            lambda: self.cache.create_server({"server_number": 1, "hostname": "one"}),
+        ]
+        for write in writes:
+            self.cache.get_server_by_number(1)
+            before = self.inner.calls["number"]
+            write()
+            self.cache.get_server_by_number(1)
+            self.assertEqual(self.inner.calls["number"], before + 1)
+
+    def test_update_server_field_falls_back_to_setter_and_evicts(self):
+        self.cache.get_server_by_mac("m2")
+        self.assertEqual(self.cache.update_server_field(2, "boot_status", "z"), "a")
+        self.assertEqual(self.cache.get_server_by_mac("m2")["boot_status"], "z")
+
+    def test_bulk_update_evicts_each_updated_server(self):
+        self.cache.get_server_by_mac("m1")
+        self.cache.get_server_by_mac("m2")
+        self.cache.bulk_update_field("boot_status", "b", server_numbers=[1, 2, 3])
+        self.assertEqual(self.cache.get_server_by_mac("m1")["boot_status"], "b")
+        self.assertEqual(self.cache.get_server_by_mac("m2")["boot_status"], "b")
+        self.assertEqual(self.inner.calls["mac"], 4)
+
+    def test_load_racing_a_write_is_not_stored(self):
+        def racing_lookup(number):
+            # A write lands while the lookup is in flight.
+            result = DictProvider.get_server_by_number(self.inner, number)
+            self.cache.set_boot_status(1, "b")
+            return result
+
+        self.inner.get_server_by_number = racing_lookup
+        self.assertEqual(self.cache.get_server_by_number(1)["boot_status"], "a")
+        self.assertEqual(self.cache.stats()["cache"]["entries"], 0)
+
+    def test_stats_reports_counters(self):
+        self.cache.get_server_by_mac("m1")
+        self.cache.get_server_by_mac("m1")
+        stats = self.cache.stats()["cache"]
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["entries"], 1)
+
+    def test_unknown_attributes_pass_through(self):
+        self.assertIs(self.cache.servers, self.inner.servers)
+
+
+class TestCacheWiring(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._env_patcher = patch.dict(os.environ, {"STEEL_PIGS_API_TOKEN": "cache-token"})
+        cls._env_patcher.start()
+        with patch.dict(pigs_config.PROVIDER_CACHE, {"enabled": True}):
+            cls.app = create_app(config_overrides={"TESTING": True})
+        seed_sql_plugin(cls.app.extensions["steel_pigs"].server_data)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._env_patcher.stop()
+
+    def setUp(self):
+        self.client = self.app.test_client()
+
+    def test_provider_is_wrapped_when_enabled(self):
+        self.assertIsInstance(self.app.extensions["steel_pigs"].server_data, CachingProvider)
+
+    def test_stats_endpoint_reports_hits(self):
+        self.client.get("/pxe?server_number=555121")
+        self.client.get("/pxe?server_number=555121")
+        stats = self.client.get("/stats").get_json()["provider"]["cache"]
+        self.assertGreaterEqual(stats["hits"], 1)
+
+    def test_update_route_is_visible_on_next_read(self):
+        self.client.get("/pxe?server_number=555121")
+        self.client.post(
+            "/v1/update/os",
+            json={"server_number": 555121, "boot_os": "Gentoo"},
+            headers={"Authorization": "Bearer cache-token"},
+        )
+        rv = self.client.get("/pxe?server_number=555121")
+        self.assertIn(b"set steel_beard_boot_os Gentoo", rv.data)
+
+
+class TestCacheDisabledByDefault(unittest.TestCase):
+    def test_provider_is_not_wrapped(self):
+        app = create_app(config_overrides={"TESTING": True})
+        self.assertNotIsInstance(app.extensions["steel_pigs"].server_data, CachingProvider)
+
+
+if __name__ == "__main__":
+    unittest.main()
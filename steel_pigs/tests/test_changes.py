@@ -0,0 +1,301 @@
+#   Copyright 2026 Michael Rice <michael@michaelrice.org>
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Tests for the change feed: ChangeFeed, SQL.list_changes and GET /v1/changes."""
+
+import os
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from steel_pigs.changefeed import ChangeFeed
+from steel_pigs.plugins.providers.sql import SQL
+from steel_pigs.synthetic import server_mac
+from steel_pigs.tests import app_with_provider, count_queries, seed_sql_plugin, server_template
+
+API_TOKEN = "changes-test-token"
+
+
+class _Log:
+    """In-memory change log for ChangeFeed tests."""
+
+    def __init__(self):
+        self.entries = []
+        self.latest_calls = 0
+        self.read_calls = 0
+
+    def append(self):
+        self.entries.append({"seq": len(self.entries) + 1})
+
+    def latest(self):
+        self.latest_calls += 1
+        return len(self.entries)
+
+    def read(self, since, limit):
+        self.read_calls += 1
+        return self.entries[since : since + limit]
+
+
+def _in_thread(target, *args):
+    result = {}
+    thread = threading.Thread(target=lambda: result.setdefault("value", target(*args)))
+    thread.start()
+    return thread, result
+
+
+class TestChangeFeed(unittest.TestCase):
+    def setUp(self):
+        self.log = _Log()
+        self.feed = ChangeFeed(self.log.latest, self.log.read, poll_seconds=60)
+
+    def _wait_for_waiters(self, count):
+        deadline = time.monotonic() + 5
+        while self.feed._waiters < count and time.monotonic() < deadline:
+            time.sleep(0.001)
+
+    def test_returns_at_once_when_behind(self):
+        self.log.append()
+        self.assertTrue(self.feed.wait(0, timeout=5))
+
+    def test_times_out(self):
+        start = time.monotonic()
+        self.assertFalse(self.feed.wait(0, timeout=0.05))
+        self.assertGreaterEqual(time.monotonic() - start, 0.05)
+
+    def test_notify_wakes_every_waiter_with_one_read_of_the_head(self):
+        self.feed.head()
+        waiters = [_in_thread(self.feed.wait, 0, 10) for _ in range(20)]
+        self._wait_for_waiters(20)
+        polls = self.log.latest_calls
+        self.log.append()
+        self.feed.notify()
+        for thread, result in waiters:
+            thread.join(5)
+            self.assertTrue(result["value"])
+        self.assertEqual(self.log.latest_calls, polls + 1)
+
+    def test_notify_without_waiters_reads_nothing(self):
+        self.feed.head()
+        self.log.append()
+        self.feed.notify()
+        self.assertEqual(self.log.latest_calls, 1)
+        self.assertEqual(self.feed.head(), 1)
+
+    def test_polls_for_writes_from_other_processes(self):
+        feed = ChangeFeed(self.log.latest, self.log.read, poll_seconds=0.02)
+        feed.head()
+        thread, result = _in_thread(feed.wait, 0, 10)
+        time.sleep(0.05)
+        self.log.append()  # no notify(): another process wrote it
+        thread.join(5)
+        self.assertTrue(result["value"])
+
+    def test_equal_cursors_share_a_read_until_the_head_moves(self):
+        self.log.append()
+        self.feed.head()
+        for _ in range(5):
+            self.assertEqual(self.feed.read(0, 10), [{"seq": 1}])
+        self.assertEqual(self.log.read_calls, 1)
+        self.log.append()
+        self.feed.notify()
+        self.assertEqual(len(self.feed.read(0, 10)), 2)
+        self.assertEqual(self.log.read_calls, 2)
+
+    def test_a_read_repolls_a_stale_head(self):
+        clock = [100.0]
+        feed = ChangeFeed(self.log.latest, self.log.read, poll_seconds=1, clock=lambda: clock[0])
+        self.assertEqual(feed.read(0, 10), [])
+        self.log.append()  # another process
+        self.assertEqual(feed.read(0, 10), [])
+        clock[0] += 1
+        self.assertEqual(feed.read(0, 10), [{"seq": 1}])
+
+    def test_commit_lag_holds_back_new_entries(self):
+        clock = [100.0]
+        feed = ChangeFeed(
+            self.log.latest, self.log.read, poll_seconds=0, clock=lambda: clock[0], commit_lag=2
+        )
+        self.log.append()
+        self.assertEqual(feed.read(0, 10), [])
+        self.assertFalse(feed.wait(0, 0))
+        clock[0] += 2
+        self.assertEqual(feed.read(0, 10), [{"seq": 1}])
+        self.log.append()
+        self.log.append()
+        self.assertEqual(feed.read(0, 10), [{"seq": 1}])
+        clock[0] += 1
+        self.assertEqual(feed.read(1, 10), [])
+        clock[0] += 1
+        self.assertEqual(feed.read(1, 10), [{"seq": 2}, {"seq": 3}])
+
+    def test_a_waiter_wakes_once_the_lag_passes(self):
+        feed = ChangeFeed(self.log.latest, self.log.read, poll_seconds=60, commit_lag=0.05)
+        self.log.append()
+        start = time.monotonic()
+        self.assertTrue(feed.wait(0, 5))
+        self.assertGreaterEqual(time.monotonic() - start, 0.05)
+        self.assertEqual(feed.read(0, 10), [{"seq": 1}])
+
+
+class TestSQLChanges(unittest.TestCase):
+    def setUp(self):
+        self.sql = SQL({"engine": "sqlite:///:memory:"})
+        seed_sql_plugin(self.sql)
+
+    def test_writes_are_logged_with_their_action(self):
+        since = self.sql.change_feed.head()
+        self.sql.set_boot_status(555121, "online")
+        self.sql.add_switch(555121, "Switch 02", "7")
+        changes = self.sql.list_changes(since)
+        self.assertEqual(
+            [(c["server_number"], c["action"], c["field"]) for c in changes],
+            [(555121, "update", "boot_status"), (555121, "add_switch", None)],
+        )
+        self.assertEqual(changes[1]["seq"], changes[0]["seq"] + 1)
+        self.assertIsNotNone(changes[0]["changed_at"])
+
+    def test_bulk_update_logs_each_server(self):
+        since = self.sql.change_feed.head()
+        template = server_template(self.sql)
+        self.sql.create_servers(
+            [dict(template, server_number=n, primary_mac=server_mac(n)) for n in (1, 2)]
+        )
+        self.sql.bulk_update_field("operational_status", "online", server_numbers=[1, 2])
+        changes = self.sql.list_changes(since)
+        self.assertEqual(
+            [(c["server_number"], c["action"]) for c in changes],
+            [(1, "create"), (2, "create"), (1, "update"), (2, "update")],
+        )
+
+    def test_limit_and_cursor(self):
+        since = self.sql.change_feed.head()
+        for status in ("online", "kicking", "online"):
+            self.sql.set_boot_status(555121, status)
+        first = self.sql.list_changes(since, limit=2)
+        rest = self.sql.list_changes(first[-1]["seq"], limit=2)
+        self.assertEqual(len(first), 2)
+        self.assertEqual(len(rest), 1)
+        self.assertEqual(self.sql.list_changes(rest[-1]["seq"]), [])
+
+    def test_failed_write_wakes_nobody(self):
+        head = self.sql.change_feed.head()
+        self.sql.set_boot_status(999, "online")
+        self.assertEqual(self.sql.change_feed.head(), head)
+        self.assertFalse(self.sql.wait_for_changes(head, 0))
+
+    def test_write_wakes_a_waiter(self):
+        head = self.sql.change_feed.head()
+        thread, result = _in_thread(self.sql.wait_for_changes, head, 10)
+        time.sleep(0.05)
+        self.sql.set_boot_os(555121, "CentOS")
+        thread.join(5)
+        self.assertTrue(result["value"])
+
+    def test_waiters_share_the_batch_read(self):
+        head = self.sql.change_feed.head()
+        self.sql.set_boot_status(555121, "online")
+        self.sql.change_feed.head()
+        with count_queries(self.sql.engine) as statements:
+            for _ in range(10):
+                self.assertEqual(len(self.sql.list_changes(head)), 1)
+        self.assertEqual(len(statements), 1)
+
+
+class TestCrossProcessChanges(unittest.TestCase):
+    def test_write_through_another_engine_is_polled(self):
+        with tempfile.TemporaryDirectory() as workdir:
+            url = f"sqlite:///{Path(workdir) / 'changes.db'}"
+            reader = SQL({"engine": url, "change_poll_seconds": 0.02})
+            writer = SQL({"engine": url})
+            seed_sql_plugin(writer)
+            head = reader.change_feed.head()
+            thread, result = _in_thread(reader.wait_for_changes, head, 10)
+            time.sleep(0.05)
+            writer.set_boot_status(555121, "online")
+            thread.join(5)
+            self.assertTrue(result["value"])
+            self.assertEqual(reader.list_changes(head)[0]["field"], "boot_status")
+            reader.engine.dispose()
+            writer.engine.dispose()
+
+    def test_a_read_sees_another_workers_write_after_a_poll_interval(self):
+        with tempfile.TemporaryDirectory() as workdir:
+            url = f"sqlite:///{Path(workdir) / 'changes.db'}"
+            first = SQL({"engine": url, "change_poll_seconds": 0.02})
+            second = SQL({"engine": url})
+            seed_sql_plugin(second)
+            head = first.change_feed.head()
+            self.assertEqual(first.list_changes(head), [])
+            self.assertFalse(first.wait_for_changes(head, 0.01))
+            second.set_boot_status(555121, "online")
+            time.sleep(0.05)
+            self.assertEqual(first.list_changes(head)[0]["field"], "boot_status")
+            first.engine.dispose()
+            second.engine.dispose()
+
+
+class TestChangesRoute(unittest.TestCase):
+    def setUp(self):
+        patcher = patch.dict(os.environ, {"STEEL_PIGS_API_TOKEN": API_TOKEN})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.sql = SQL({"engine": "sqlite:///:memory:"})
+        seed_sql_plugin(self.sql)
+        self.client = app_with_provider(self.sql).test_client()
+        self.headers = {"Authorization": f"Bearer {API_TOKEN}"}
+
+    def _changes(self, query):
+        return self.client.get(f"/v1/changes?{query}", headers=self.headers)
+
+    def test_mutation_shows_up_in_the_feed(self):
+        since = self._changes("").get_json()["next_since"]
+        self.assertEqual(since, self.sql.change_feed.head())
+        rv = self.client.post(
+            "/v1/update/status",
+            json={"server_number": 555121, "boot_status": "online"},
+            headers=self.headers,
+        )
+        self.assertEqual(rv.status_code, 200)
+        body = self._changes(f"since={since}").get_json()
+        self.assertEqual(len(body["changes"]), 1)
+        self.assertEqual(body["changes"][0]["field"], "boot_status")
+        self.assertEqual(body["next_since"], body["changes"][0]["seq"])
+
+    def test_nothing_new_keeps_the_cursor(self):
+        since = self.sql.change_feed.head()
+        body = self._changes(f"since={since}&wait=0.05").get_json()
+        self.assertEqual(body, {"changes": [], "next_since": since})
+
+    def test_long_poll_returns_when_a_change_lands(self):
+        since = self.sql.change_feed.head()
+        timer = threading.Timer(0.1, self.sql.set_boot_status, (555121, "online"))
+        timer.start()
+        start = time.monotonic()
+        body = self._changes(f"since={since}&wait=10").get_json()
+        timer.join()
+        self.assertLess(time.monotonic() - start, 5)
+        self.assertEqual(len(body["changes"]), 1)
+
+    def test_wait_is_capped(self):
+        self.assertEqual(self._changes("wait=61").status_code, 422)
+
+    def test_requires_auth(self):
+        self.assertEqual(self.client.get("/v1/changes").status_code, 401)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -12,11 +12,30 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
+import tempfile
+import threading
 import unittest
+from pathlib import Path
+from unittest.mock import patch
 
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import MetaData, Table, create_engine, event, insert, inspect, select
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 
-from steel_pigs.tests import PigTests, seed_sql_plugin
+from steel_pigs.db import HEAD_REVISION, make_alembic_config, upgrade_schema
+from steel_pigs.db import main as db_cli
+from steel_pigs.exceptions.pigs_exceptions import ServerAlreadyExists, ServerNotFound
+from steel_pigs.plugins.providers.sql import SQL, Base, ServerChange, ServerInterface
+from steel_pigs.tests import (
+    PigTests,
+    app_with_provider,
+    count_queries,
+    seed_sql_plugin,
+    server_template,
+)
 
 
 class TestSQL(PigTests):
@@ -45,6 +64,31 @@ class TestSQL(PigTests):
         entry = self.sql.get_server_by_mac(mac)
         self.assertEqual(mac, entry["primary_mac"])
 
+    def test_find_server_by_mac_in_any_notation(self):
+        for mac in ("00-11-22-33-44-55", "0011.2233.4455", "001122334455", " 00:11:22:33:44:55"):
+            with self.subTest(mac=mac):
+                self.assertEqual(self.sql.get_server_by_mac(mac)["server_number"], 555121)
+
+    def test_unparsable_mac_finds_nothing(self):
+        with count_queries(self.sql.engine) as statements:
+            self.assertIsNone(self.sql.get_server_by_mac("00:11:22"))
+        self.assertEqual(statements, [])
+
+    def test_mac_key_is_stored_on_every_insert_path(self):
+        server = self.sql.get_server_by_mac("00:11:22:33:44:55")
+        self.assertEqual(server["primary_mac_int"], 0x001122334455)
+        base = {k: v for k, v in server.items() if k not in ("id", "provision_zone", "switches")}
+        del base["primary_mac_int"]
+        created = self.sql.create_server(
+            dict(base, server_number=1, primary_mac="AA-BB-CC-00-00-01")
+        )
+        self.assertEqual(created["primary_mac_int"], 0xAABBCC000001)
+        [result] = self.sql.create_servers(
+            [dict(base, server_number=2, primary_mac="aabb.cc00.0002")]
+        )
+        self.assertEqual(result["server"]["primary_mac_int"], 0xAABBCC000002)
+        self.assertEqual(self.sql.get_server_by_mac("aa:bb:cc:00:00:02")["server_number"], 2)
+
     def test_no_results_return_none(self):
         name = "badname"
         entry = self.sql.get_server_by_name(name)
@@ -73,7 +117,11 @@ class TestSQL(PigTests):
         switch_port = "1"
         entry = self.sql.get_server_by_switch(switch_name, switch_port)
         self.assertEqual(555121, entry["server_number"])
-        self.assertEqual("1", entry["switch_port"])
+        self.assertEqual("hogzilla", entry["hostname"])
+        self.assertIn(
+            {"switch_name": switch_name, "switch_port": switch_port},
+            [{k: sw[k] for k in ("switch_name", "switch_port")} for sw in entry["switches"]],
+        )
 
     def test_find_server_by_switch_filters_on_both_name_and_port(self):
         # Regression: the original implementation used Python `and`, which
@@ -87,6 +135,383 @@ class TestSQL(PigTests):
         s = self.sql.get_server_by_number(number)
         self.assertEqual(s["provision_zone"]["zone_name"], "DFW1")
 
+    def test_every_lookup_returns_the_full_server_in_one_query(self):
+        lookups = {
+            "name": lambda: self.sql.get_server_by_name("hogzilla"),
+            "number": lambda: self.sql.get_server_by_number(555121),
+            "mac": lambda: self.sql.get_server_by_mac("00:11:22:33:44:55"),
+            "switch": lambda: self.sql.get_server_by_switch("Switch 01", "2"),
+        }
+        for kind, lookup in lookups.items():
+            with self.subTest(kind), count_queries(self.sql.engine) as statements:
+                server = lookup()
+            self.assertEqual(len(statements), 1, statements)
+            self.assertEqual(server["server_number"], 555121)
+            self.assertEqual(server["provision_zone"]["zone_name"], "DFW1")
+            self.assertEqual(len(server["switches"]), 2)
+
+    def test_miss_costs_one_query(self):
+        with count_queries(self.sql.engine) as statements:
+            self.assertIsNone(self.sql.get_server_by_mac("ff:ff:ff:ff:ff:ff"))
+        self.assertEqual(len(statements), 1)
+
+
+class TestInterfaces(unittest.TestCase):
+    def setUp(self):
+        self.sql = SQL({"engine": "sqlite:///:memory:"})
+        seed_sql_plugin(self.sql)
+        self.base = server_template(self.sql)
+
+    def _server(self, number, *macs):
+        return dict(
+            self.base,
+            server_number=number,
+            hostname=f"host-{number}",
+            primary_mac=f"aa:bb:cc:00:00:{number % 100:02d}",
+            interfaces=[{"mac": mac, "role": "data"} for mac in macs],
+        )
+
+    def test_any_interface_finds_the_server_in_one_query(self):
+        created = self.sql.create_server(self._server(1, "AA-BB-CC-01-00-01", "aabb.cc02.0001"))
+        self.assertEqual(
+            created["interfaces"],
+            [
+                {"mac": "aa:bb:cc:01:00:01", "role": "data"},
+                {"mac": "aa:bb:cc:02:00:01", "role": "data"},
+            ],
+        )
+        for mac in ("aa:bb:cc:00:00:01", "aa:bb:cc:01:00:01", "AABBCC020001"):
+            with self.subTest(mac=mac), count_queries(self.sql.engine) as statements:
+                self.assertEqual(self.sql.get_server_by_mac(mac)["server_number"], 1)
+            self.assertEqual(len(statements), 1)
+
+    def test_primary_mac_wins_over_an_interface(self):
+        # Rows from before create_server refused this still resolve one way.
+        self.sql.create_server(self._server(1))
+        nic = {"server_number": 1, "mac": 0x001122334455, "role": "bmc"}
+        with self.sql.engine.begin() as conn:
+            conn.execute(insert(ServerInterface), nic)
+        mac = "00:11:22:33:44:55"
+        self.assertEqual(self.sql.get_server_by_mac(mac)["server_number"], 555121)
+        found = self.sql.lookup_servers(macs=[mac])["macs"][mac]
+        self.assertEqual(found["server_number"], 555121)
+
+    def test_a_mac_is_a_primary_or_an_interface_not_both(self):
+        with self.assertRaisesRegex(ServerAlreadyExists, "server 555121"):
+            self.sql.create_server(self._server(1, "00-11-22-33-44-55"))
+        self.sql.create_server(self._server(2, "aa:bb:cc:01:00:02"))
+        with self.assertRaisesRegex(ServerAlreadyExists, "aa:bb:cc:01:00:02 .* server 2"):
+            self.sql.create_server(dict(self._server(3), primary_mac="aa:bb:cc:01:00:02"))
+        results = self.sql.create_servers(
+            [
+                self._server(4, "00:11:22:33:44:55"),  # a stored primary MAC
+                self._server(5, "aa:bb:cc:01:00:05"),
+                dict(self._server(6), primary_mac="aa:bb:cc:01:00:05"),  # 5's interface
+                self._server(7, "aa:bb:cc:00:00:08"),
+                self._server(8),  # its primary MAC is 7's interface
+            ]
+        )
+        self.assertEqual(
+            [r["status"] for r in results],
+            ["conflict", "created", "conflict", "created", "conflict"],
+        )
+
+    def test_claimed_interface_mac_is_a_conflict(self):
+        self.sql.create_server(self._server(1, "aa:bb:cc:01:00:01"))
+        with self.assertRaisesRegex(ServerAlreadyExists, "aa:bb:cc:01:00:01"):
+            self.sql.create_server(self._server(2, "aa:bb:cc:01:00:01"))
+        self.assertIsNone(self.sql.get_server_by_number(2))
+
+    def test_bulk_create_reports_claimed_macs_per_item(self):
+        self.sql.create_server(self._server(1, "aa:bb:cc:01:00:01"))
+        results = self.sql.create_servers(
+            [
+                self._server(2, "aa:bb:cc:01:00:01"),  # already stored
+                self._server(3, "aa:bb:cc:01:00:03"),
+                self._server(4, "aa:bb:cc:01:00:03"),  # claimed earlier in the batch
+            ]
+        )
+        self.assertEqual([r["status"] for r in results], ["conflict", "created", "conflict"])
+        self.assertIn("server 1", results[0]["message"])
+        self.assertEqual(self.sql.get_server_by_mac("aa:bb:cc:01:00:03")["server_number"], 3)
+        self.assertIsNone(self.sql.get_server_by_number(4))
+
+    def test_unparsable_interface_mac_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self.sql.create_server(self._server(1, "nope"))
+
+
+class TestUpdateServerField(unittest.TestCase):
+    def setUp(self):
+        self.sql = SQL({"engine": "sqlite:///:memory:"})
+        seed_sql_plugin(self.sql)
+
+    def test_returns_previous_value(self):
+        self.assertEqual(self.sql.update_server_field(555121, "boot_os", "Fedora"), "Ubuntu")
+        self.assertEqual(self.sql.update_server_field(555121, "boot_os", "Arch"), "Fedora")
+        self.assertEqual(self.sql.get_server_by_number(555121)["boot_os"], "Arch")
+
+    def test_missing_server_raises(self):
+        with self.assertRaises(ServerNotFound):
+            self.sql.update_server_field(1, "boot_status", "online")
+
+    def test_runs_one_locking_read_and_one_update(self):
+        with count_queries(self.sql.engine) as statements:
+            self.sql.update_server_field(555121, "operational_status", "online")
+        # ... plus the ServerChange marker, in the same transaction.
+        self.assertEqual(
+            [st.split()[0].upper() for st in statements], ["SELECT", "UPDATE", "INSERT"]
+        )
+
+
+class TestConcurrentUpdates(unittest.TestCase):
+    """Two workers (providers) writing the same server of one SQLite file."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        url = f"sqlite:///{Path(tmp.name) / 'race.db'}"
+        self.first, self.second = SQL({"engine": url}), SQL({"engine": url})
+        for sql in (self.first, self.second):
+            self.addCleanup(sql.engine.dispose)
+        seed_sql_plugin(self.first)
+
+    def test_a_writer_cannot_commit_between_the_locking_read_and_the_update(self):
+        previous = {}
+
+        def second_writer():
+            previous["second"] = self.second.update_server_field(555121, "boot_status", "provision")
+
+        other = threading.Thread(target=second_writer)
+
+        @event.listens_for(self.first.engine, "before_cursor_execute")
+        def race(conn, cursor, statement, *args):
+            if statement.startswith("UPDATE") and other.ident is None:
+                other.start()
+                other.join(0.5)  # long enough to commit, if nothing stops it
+
+        previous["first"] = self.first.update_server_field(555121, "boot_status", "done")
+        other.join()
+        self.assertEqual(previous, {"first": "kicking", "second": "done"})
+        self.assertEqual(self.first.get_server_by_number(555121)["boot_status"], "provision")
+
+
+class TestChangeLog(unittest.TestCase):
+    def setUp(self):
+        self.sql = SQL({"engine": "sqlite:///:memory:"})
+        seed_sql_plugin(self.sql)
+
+    def _logged(self):
+        with self.sql.engine.connect() as conn:
+            return (
+                conn.execute(select(ServerChange.server_number).order_by(ServerChange.id))
+                .scalars()
+                .all()
+            )
+
+    def test_every_write_path_appends_the_server(self):
+        start = len(self._logged())
+        self.sql.set_boot_os(555121, "Fedora")
+        self.sql.bulk_update_field("boot_status", "done", switch_name="Switch 01")
+        self.sql.add_switch(555121, "Switch 03", "1")
+        base = self.sql.get_server_by_number(555121)
+        server = {k: v for k, v in base.items() if k not in ("id", "provision_zone", "switches")}
+        self.sql.create_servers([dict(server, server_number=1, hostname="a", primary_mac="m1")])
+        self.assertEqual(self._logged()[start:], [555121, 555121, 555121, 1])
+
+    def test_failed_writes_are_not_logged(self):
+        start = len(self._logged())
+        self.sql.set_boot_os(424242, "Fedora")
+        self.assertEqual(len(self._logged()), start)
+
+
+class TestBulkUpdateField(unittest.TestCase):
+    def setUp(self):
+        self.sql = SQL({"engine": "sqlite:///:memory:"})
+        seed_sql_plugin(self.sql)
+        base = self.sql.get_server_by_number(555121)
+        for number in (555122, 555123):
+            server = {
+                k: v for k, v in base.items() if k not in ("id", "provision_zone", "switches")
+            }
+            server.update(
+                server_number=number,
+                hostname=f"host-{number}",
+                primary_mac=f"00:11:22:33:44:{number % 100:02d}",
+            )
+            self.sql.create_server(server)
+        self.sql.add_switch(555122, "Switch 02", "1")
+
+    def test_updates_listed_servers_and_returns_previous_values(self):
+        previous = self.sql.bulk_update_field(
+            "boot_status", "online", server_numbers=[555121, 555122]
+        )
+        self.assertEqual(previous, {555121: "kicking", 555122: "kicking"})
+        self.assertEqual(self.sql.get_server_by_number(555122)["boot_status"], "online")
+        self.assertEqual(self.sql.get_server_by_number(555123)["boot_status"], "kicking")
+
+    def test_missing_numbers_are_left_out(self):
+        previous = self.sql.bulk_update_field("boot_os", "Fedora", server_numbers=[555123, 1])
+        self.assertEqual(previous, {555123: "Ubuntu"})
+
+    def test_switch_selector(self):
+        previous = self.sql.bulk_update_field(
+            "operational_status", "online", switch_name="Switch 01"
+        )
+        self.assertEqual(list(previous), [555121])
+
+    def test_provision_zone_selector(self):
+        zone_id = self.sql.get_server_by_number(555121)["provision_zone_id"]
+        previous = self.sql.bulk_update_field("boot_os", "Debian", provision_zone_id=zone_id)
+        self.assertEqual(sorted(previous), [555121, 555122, 555123])
+
+    def test_large_number_lists_are_chunked(self):
+        numbers = list(range(1, 1200)) + [555122]
+        previous = self.sql.bulk_update_field("boot_status", "done", server_numbers=numbers)
+        self.assertEqual(previous, {555122: "kicking"})
+
+    def test_unknown_field_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self.sql.bulk_update_field("hostname", "x", server_numbers=[555121])
+
+    def test_no_target_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self.sql.bulk_update_field("boot_os", "x")
+
+
+class TestPoolConfig(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.url = f"sqlite:///{Path(self._tmp.name) / 'pool.db'}"
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_pool_options_reach_the_engine(self):
+        sql = SQL(
+            {
+                "engine": self.url,
+                "pool_size": 3,
+                "max_overflow": 1,
+                "pool_recycle": 60,
+                "pool_pre_ping": True,
+                "pool_timeout": None,
+            }
+        )
+        self.assertEqual(sql.engine.pool.size(), 3)
+        self.assertEqual(sql.engine.pool._recycle, 60)
+        self.assertTrue(sql.engine.pool._pre_ping)
+
+    def test_stats_report_checkouts_and_utilization(self):
+        sql = SQL({"engine": self.url, "pool_size": 2, "max_overflow": 2})
+        sql.get_server_by_number(1)
+        with sql._connect():
+            pool = sql.stats()["pool"]
+        self.assertGreaterEqual(pool["checkouts"], 2)
+        self.assertEqual(pool["checked_out"], 1)
+        self.assertEqual(pool["utilization"], 0.25)
+        self.assertGreaterEqual(pool["wait_ms_max"], pool["wait_ms_mean"])
+
+    def test_checkout_timeouts_are_counted(self):
+        sql = SQL({"engine": self.url, "pool_size": 1, "max_overflow": 0, "pool_timeout": 0.05})
+        with sql._connect(), self.assertRaises(PoolTimeoutError):
+            sql.get_server_by_number(1)
+        self.assertEqual(sql.stats()["pool"]["timeouts"], 1)
+
+    def test_statement_timeout_is_ignored_on_sqlite(self):
+        with self.assertLogs("steel_pigs.plugins.providers.sql", "WARNING"):
+            SQL({"engine": self.url, "statement_timeout_ms": 100})
+
+
+class TestSchema(PigTests):
+    def _indexed_columns(self, table):
+        return [tuple(ix["column_names"]) for ix in inspect(self.sql.engine).get_indexes(table)]
+
+    def test_lookup_columns_are_indexed(self):
+        server_ix = self._indexed_columns("ServerData")
+        self.assertIn(("primary_mac_int",), server_ix)
+        self.assertIn(("hostname",), server_ix)
+        switch_ix = self._indexed_columns("SwitchInfo")
+        self.assertIn(("switch_name", "switch_port"), switch_ix)
+        self.assertIn(("server_number",), switch_ix)
+
+    def test_head_revision_matches_migrations(self):
+        # Workers trust HEAD_REVISION instead of reading the scripts;
+        # a new migration must bump it.
+        script = ScriptDirectory.from_config(make_alembic_config())
+        self.assertEqual(script.get_current_head(), HEAD_REVISION)
+
+    def test_migrations_match_models(self):
+        # Guards against declaring an index/column on the models and
+        # forgetting the Alembic revision (or vice versa).
+        with self.sql.engine.connect() as conn:
+            diff = compare_metadata(MigrationContext.configure(conn), Base.metadata)
+        self.assertEqual(diff, [])
+
+
+class TestMigrateModes(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.url = f"sqlite:///{Path(self._tmp.name) / 'schema.db'}"
+
+    def test_current_schema_skips_alembic(self):
+        SQL({"engine": self.url})
+        with patch("steel_pigs.plugins.providers.sql.upgrade_schema") as upgrade:
+            sql = SQL({"engine": self.url})
+        upgrade.assert_not_called()
+        self.assertTrue(sql.ready())
+        self.assertEqual(sql.stats()["schema"]["revision"], HEAD_REVISION)
+
+    def test_check_mode_waits_for_the_upgrade(self):
+        with self.assertLogs("steel_pigs.plugins.providers.sql", "ERROR"):
+            sql = SQL({"engine": self.url, "migrate": "check"})
+        self.assertFalse(sql.ready())
+        self.assertIsNone(sql.stats()["schema"]["revision"])
+        self.assertFalse(inspect(sql.engine).has_table("ServerData"))
+        db_cli(["--url", self.url, "upgrade"])
+        self.assertTrue(sql.ready())
+        self.assertEqual(sql.schema_revision, HEAD_REVISION)
+
+    def test_upgrade_mode_migrates_an_old_schema(self):
+        db_cli(["--url", self.url, "upgrade", "25c7d4c34a27"])
+        sql = SQL({"engine": self.url})
+        self.assertTrue(sql.ready())
+        self.assertTrue(inspect(sql.engine).has_table("ServerChange"))
+
+    def test_upgrade_backfills_the_mac_key(self):
+        db_cli(["--url", self.url, "upgrade", "0edc7e9bd910"])
+        engine = create_engine(self.url)
+        self.addCleanup(engine.dispose)
+        old_servers = Table("ServerData", MetaData(), autoload_with=engine)
+        filler = {c.name: "x" for c in old_servers.c if not c.nullable and c.name != "id"}
+        with engine.begin() as conn:
+            conn.execute(
+                insert(old_servers),
+                [
+                    dict(filler, server_number=number, primary_mac=mac, bootstrapped=False)
+                    for number, mac in ((1, "AA-BB-CC-00-00-01"), (2, "0:1b:2:3:4:5"), (3, "bogus"))
+                ],
+            )
+        db_cli(["--url", self.url, "upgrade"])
+        sql = SQL({"engine": self.url})
+        self.assertEqual(sql.get_server_by_mac("aa:bb:cc:00:00:01")["server_number"], 1)
+        self.assertEqual(sql.get_server_by_mac("00:1b:02:03:04:05")["server_number"], 2)
+        self.assertIsNone(sql.get_server_by_number(3)["primary_mac_int"])
+
+    def test_unknown_mode_is_rejected(self):
+        with self.assertRaises(ValueError):
+            SQL({"engine": self.url, "migrate": "sometimes"})
+
+    def test_readyz_is_503_until_the_schema_matches(self):
+        sql = SQL({"engine": self.url, "migrate": "check"})
+        client = app_with_provider(sql).test_client()
+        rv = client.get("/readyz")
+        self.assertEqual(rv.status_code, 503)
+        self.assertEqual(rv.get_json()["status"], "unavailable")
+        upgrade_schema(sql.engine)
+        self.assertEqual(client.get("/readyz").status_code, 200)
+
 
 if __name__ == "__main__":
     unittest.main()
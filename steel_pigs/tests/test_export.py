@@ -0,0 +1,209 @@
+#   Copyright 2026 Michael Rice <michael@michaelrice.org>
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Tests for SQL.export_servers and GET /v1/servers:export."""
+
+import csv
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from steel_pigs.plugins.providers import sql as sql_module
+from steel_pigs.plugins.providers.sql import SQL
+from steel_pigs.tests import app_with_provider, count_queries, seed_sql_plugin
+
+API_TOKEN = "export-test-token"
+
+# The memory test exports this many servers and allows the export this
+# much growth in peak RSS. The NDJSON it streams is ~310 MiB; holding
+# it, or the rows behind it, would blow well past the bound.
+EXPORT_ROWS = 500_000
+EXPORT_RSS_BOUND_MIB = 32
+
+
+# Servers 1..rows, generated inside SQLite: building half a million
+# rows in Python would take most of the memory test's time. Odd numbers
+# are online; each server has one switch port.
+_SEED_SERVERS = """
+INSERT INTO "ServerData" (
+    server_number, primary_ip, primary_gw, primary_nm, primary_mac, primary_mac_int,
+    hostname, dns_domain_name, dns_server_primary, bootstrapped, boot_os,
+    boot_os_version, boot_profile, boot_status, operational_status, ntp_server
+)
+WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n WHERE x < ?)
+SELECT
+    x, '10.0.' || (x / 256 % 256) || '.' || (x % 256), '10.0.0.1', '255.255.0.0',
+    printf('02:00:00:%02x:%02x:%02x', x / 65536, x / 256 % 256, x % 256), (2 << 40) + x,
+    printf('node-%07d', x), 'rpc.local', '8.8.8.8', 0, 'Ubuntu',
+    '22.04', 'Standard', 'kicking', CASE x % 2 WHEN 1 THEN 'online' ELSE 'provisioning' END,
+    'pool.ntp.org'
+FROM n
+"""
+_SEED_SWITCHES = """
+INSERT INTO "SwitchInfo" (server_number, switch_name, switch_port)
+WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n WHERE x < ?)
+SELECT x, 'sw-' || (x / 48), CAST(x % 48 AS TEXT) FROM n
+"""
+
+
+def _populate(engine, rows):
+    with engine.begin() as conn:
+        conn.exec_driver_sql(_SEED_SERVERS, (rows,))
+        conn.exec_driver_sql(_SEED_SWITCHES, (rows,))
+
+
+class TestExportServers(unittest.TestCase):
+    def setUp(self):
+        self.sql = SQL({"engine": "sqlite:///:memory:"})
+        seed_sql_plugin(self.sql)
+        _populate(self.sql.engine, 10)
+
+    def test_streams_every_server_with_zone_and_switches(self):
+        servers = list(self.sql.export_servers())
+        self.assertEqual([s["server_number"] for s in servers], [*range(1, 11), 555121])
+        seeded = servers[-1]
+        self.assertEqual(seeded["provision_zone"]["zone_name"], "DFW1")
+        self.assertEqual([s["switch_port"] for s in seeded["switches"]], ["1", "2"])
+        self.assertIsNone(servers[0]["provision_zone"])
+        self.assertEqual(servers[0]["switches"][0]["switch_name"], "sw-0")
+
+    def test_is_one_streamed_query(self):
+        with (
+            patch.object(sql_module, "EXPORT_BATCH", 3),
+            count_queries(self.sql.engine) as statements,
+        ):
+            servers = self.sql.export_servers()
+            self.assertEqual(statements, [])
+            self.assertEqual(len(list(servers)), 11)
+        self.assertEqual(len(statements), 1)
+
+    def test_filters(self):
+        servers = self.sql.export_servers(operational_status="online", boot_os=None)
+        self.assertEqual([s["server_number"] for s in servers], [1, 3, 5, 7, 9])
+
+    def test_unknown_filter_raises_on_the_call(self):
+        with self.assertRaises(ValueError):
+            self.sql.export_servers(hostname="hogzilla")
+
+
+class TestExportRoute(unittest.TestCase):
+    def setUp(self):
+        patcher = patch.dict(os.environ, {"STEEL_PIGS_API_TOKEN": API_TOKEN})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        sql = SQL({"engine": "sqlite:///:memory:"})
+        seed_sql_plugin(sql)
+        _populate(sql.engine, 5)
+        self.client = app_with_provider(sql).test_client()
+
+    def _get(self, query=""):
+        return self.client.get(
+            f"/v1/servers:export?{query}", headers={"Authorization": f"Bearer {API_TOKEN}"}
+        )
+
+    def test_ndjson(self):
+        rv = self._get()
+        self.assertEqual(rv.status_code, 200)
+        self.assertTrue(rv.is_streamed)
+        self.assertEqual(rv.mimetype, "application/x-ndjson")
+        lines = [json.loads(line) for line in rv.get_data(as_text=True).splitlines()]
+        self.assertEqual([s["server_number"] for s in lines], [1, 2, 3, 4, 5, 555121])
+        self.assertEqual(lines[-1]["provision_zone"]["zone_name"], "DFW1")
+        self.assertEqual(len(lines[-1]["switches"]), 2)
+        self.assertNotIn("primary_mac_int", lines[0])
+
+    def test_csv(self):
+        rv = self._get("format=csv&provision_zone_id=1")
+        self.assertEqual(rv.mimetype, "text/csv")
+        rows = list(csv.DictReader(io.StringIO(rv.get_data(as_text=True))))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["hostname"], "hogzilla")
+        self.assertEqual(rows[0]["provision_zone_name"], "DFW1")
+        self.assertEqual(rows[0]["switches"], "Switch 01:1;Switch 01:2")
+
+    def test_empty_csv_has_a_header(self):
+        rv = self._get("format=csv&boot_os=nothing")
+        self.assertEqual(
+            rv.get_data(as_text=True).splitlines()[0].split(",")[:2], ["id", "server_number"]
+        )
+
+    def test_unknown_format(self):
+        self.assertEqual(self._get("format=xml").status_code, 422)
+
+    def test_requires_auth(self):
+        self.assertEqual(self.client.get("/v1/servers:export").status_code, 401)
+
+
+# Run in a child process so its peak RSS is the export's alone.
+_EXPORT_CHILD = """
+import os, resource, sys
+from steel_pigs.plugins.providers.sql import SQL
+from steel_pigs.tests import app_with_provider
+
+# SQLite's page cache and mmap are capped by their pragmas, not by the
+# export; keep them small so the measurement is the export's own.
+sql = SQL(
+    {
+        "engine": "sqlite:///" + sys.argv[1],
+        "sqlite_pragmas": {"mmap_size": 0, "cache_size": -2000},
+    }
+)
+client = app_with_provider(sql).test_client()
+headers = {"Authorization": "Bearer " + os.environ["STEEL_PIGS_API_TOKEN"]}
+client.get("/v1/servers:export?boot_os=warm-up", headers=headers).close()
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+rv = client.get("/v1/servers:export", headers=headers)
+lines = size = 0
+for chunk in rv.response:
+    lines += chunk.count(b"\\n")
+    size += len(chunk)
+rv.close()
+after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(lines, size, (after - before) // 1024)
+"""
+
+
+@unittest.skipUnless(sys.platform.startswith("linux"), "ru_maxrss is KiB on Linux")
+class TestExportMemory(unittest.TestCase):
+    def test_peak_rss_stays_flat(self):
+        with tempfile.TemporaryDirectory() as workdir:
+            path = Path(workdir) / "export.db"
+            sql = SQL({"engine": f"sqlite:///{path}"})
+            _populate(sql.engine, EXPORT_ROWS)
+            sql.engine.dispose()
+            proc = subprocess.run(
+                [sys.executable, "-c", _EXPORT_CHILD, str(path)],
+                capture_output=True,
+                text=True,
+                check=True,
+                env={
+                    **os.environ,
+                    "STEEL_PIGS_API_TOKEN": API_TOKEN,
+                    "STEEL_PIGS_SECRET_KEY": "export",
+                },
+            )
+        lines, size, grew_mib = map(int, proc.stdout.split())
+        self.assertEqual(lines, EXPORT_ROWS)
+        self.assertGreater(size, 4 * EXPORT_RSS_BOUND_MIB * 1024 * 1024)
+        self.assertLess(grew_mib, EXPORT_RSS_BOUND_MIB)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -215,5 +215,83 @@ class TestV1MutationRoutes(unittest.TestCase):
         self.assertEqual(rv.status_code, 422)
 
 
+class TestV1BulkUpdateRoutes(unittest.TestCase):
+    """POST /v1/update/*:bulk."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls._env_patcher = patch.dict(os.environ, {"STEEL_PIGS_API_TOKEN": API_TOKEN})
+        cls._env_patcher.start()
+        cls.app = create_app(config_overrides={"TESTING": True})
+        seed_sql_plugin(cls.app.extensions["steel_pigs"].server_data)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._env_patcher.stop()
+
+    def setUp(self):
+        self.client = self.app.test_client()
+
+    def _post(self, path, body, auth=True):
+        headers = {"Authorization": f"Bearer {API_TOKEN}"} if auth else {}
+        return self.client.post(path, json=body, headers=headers)
+
+    def test_unauthenticated_returns_401(self):
+        rv = self._post(
+            "/v1/update/status:bulk",
+            {"server_numbers": [555121], "boot_status": "online"},
+            auth=False,
+        )
+        self.assertEqual(rv.status_code, 401)
+
+    def test_status_by_server_numbers_reports_each_server(self):
+        rv = self._post(
+            "/v1/update/status:bulk",
+            {"server_numbers": [555121, 424242], "boot_status": "done"},
+        )
+        self.assertEqual(rv.status_code, 200)
+        body = rv.get_json()
+        self.assertEqual((body["updated"], body["failed"]), (1, 1))
+        ok, missing = body["results"]
+        self.assertEqual(ok["server_number"], 555121)
+        self.assertEqual(ok["operation"], "success")
+        self.assertEqual(ok["after"], "done")
+        self.assertEqual(missing["server_number"], 424242)
+        self.assertEqual(missing["operation"], "failure")
+
+    def test_os_by_switch_name(self):
+        rv = self._post("/v1/update/os:bulk", {"switch_name": "Switch 01", "boot_os": "Arch"})
+        self.assertEqual(rv.status_code, 200)
+        self.assertEqual(rv.get_json()["updated"], 1)
+        server = self.app.extensions["steel_pigs"].server_data.get_server_by_number(555121)
+        self.assertEqual(server["boot_os"], "Arch")
+
+    def test_opstatus_by_provision_zone(self):
+        server_data = self.app.extensions["steel_pigs"].server_data
+        zone_id = server_data.get_server_by_number(555121)["provision_zone_id"]
+        rv = self._post(
+            "/v1/update/opstatus:bulk",
+            {"provision_zone_id": zone_id, "opstatus": "online"},
+        )
+        self.assertEqual(rv.status_code, 200)
+        self.assertEqual(rv.get_json()["results"][0]["after"], "online")
+
+    def test_requires_exactly_one_target(self):
+        for body in (
+            {"boot_status": "online"},
+            {"server_numbers": [555121], "switch_name": "Switch 01", "boot_status": "online"},
+            {"server_numbers": [], "boot_status": "online"},
+        ):
+            with self.subTest(body=body):
+                self.assertEqual(self._post("/v1/update/status:bulk", body).status_code, 422)
+
+    def test_unknown_value_returns_422(self):
+        rv = self._post(
+            "/v1/update/opstatus:bulk",
+            {"server_numbers": [555121], "opstatus": "garbage"},
+        )
+        self.assertEqual(rv.status_code, 422)
+
+
 if __name__ == "__main__":
     unittest.main()
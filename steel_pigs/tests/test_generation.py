@@ -0,0 +1,173 @@
+#   Copyright 2026 Michael Rice <michael@michaelrice.org>
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Cross-worker cache invalidation via the shared generation counter."""
+
+import multiprocessing
+import os
+import re
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from steel_pigs.generation import FileGeneration, LocalGeneration
+from steel_pigs.plugins.providers.caching import CachingProvider
+from steel_pigs.plugins.providers.sql import SQL
+from steel_pigs.tests import seed_sql_plugin
+
+API_TOKEN = "generation-test-token"
+BOOT_OS_LINE = re.compile(rb"set steel_beard_boot_os (\S+)")
+
+
+def _bump_in_child(path, times):
+    gen = FileGeneration(path)
+    for _ in range(times):
+        gen.bump()
+
+
+def _worker(conn):
+    """Stand-in for one gunicorn worker: a full app with its own cache.
+
+    Reads the environment set up by the parent (DB file, cache on,
+    shared generation file) and answers commands over ``conn``.
+    """
+    from steel_pigs.webapp import create_app
+
+    app = create_app(config_overrides={"TESTING": True})
+    client = app.test_client()
+    while True:
+        cmd, arg = conn.recv()
+        if cmd == "read":
+            # Read twice so the second is answered from the cache.
+            client.get("/pxe?server_number=555121")
+            body = client.get("/pxe?server_number=555121").data
+            conn.send(BOOT_OS_LINE.search(body).group(1).decode())
+        elif cmd == "write":
+            rv = client.post(
+                "/v1/update/os",
+                json={"server_number": 555121, "boot_os": arg},
+                headers={"Authorization": f"Bearer {API_TOKEN}"},
+            )
+            conn.send(rv.status_code)
+        elif cmd == "hits":
+            conn.send(client.get("/stats").get_json()["provider"]["cache"]["hits"])
+        else:
+            conn.send(None)
+            return
+
+
+class TestFileGeneration(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self._tmp.name) / "gen"
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_bump_increments(self):
+        gen = FileGeneration(self.path)
+        start = gen.current()
+        self.assertEqual(gen.bump(), start + 1)
+        self.assertEqual(gen.current(), start + 1)
+
+    def test_bump_is_visible_to_other_mappings(self):
+        a, b = FileGeneration(self.path), FileGeneration(self.path)
+        a.bump()
+        self.assertEqual(b.current(), a.current())
+
+    def test_concurrent_bumps_from_processes_are_not_lost(self):
+        gen = FileGeneration(self.path)
+        ctx = multiprocessing.get_context("spawn")
+        procs = [ctx.Process(target=_bump_in_child, args=(str(self.path), 200)) for _ in range(3)]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join(30)
+        self.assertEqual(gen.current(), 600)
+
+    def test_cache_flushes_when_generation_moves(self):
+        gen = LocalGeneration()
+        sql = SQL({"engine": "sqlite:///:memory:"})
+        seed_sql_plugin(sql)
+        cache = CachingProvider(sql, generation=gen)
+        cache.get_server_by_number(555121)
+        # Simulate another worker's write: DB changes behind the cache.
+        sql.set_boot_os(555121, "Elsewhere")
+        self.assertEqual(cache.get_server_by_number(555121)["boot_os"], "Ubuntu")
+        gen.bump()
+        self.assertEqual(cache.get_server_by_number(555121)["boot_os"], "Elsewhere")
+
+
+class TestCrossWorkerInvalidation(unittest.TestCase):
+    """Two worker processes, one DB file, one generation file.
+
+    After a write is acknowledged by one worker, the other worker must
+    never answer with the value from before the write -- even though it
+    had that value cached with a long TTL.
+    """
+
+    ROUNDS = 10
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        tmp = Path(self._tmp.name)
+        db_url = f"sqlite:///{tmp / 'inventory.db'}"
+        seed_sql_plugin(SQL({"engine": db_url}))
+        env = {
+            "STEEL_PIGS_DATABASE_URL": db_url,
+            "STEEL_PIGS_API_TOKEN": API_TOKEN,
+            "STEEL_PIGS_PROVIDER_CACHE": "1",
+            "STEEL_PIGS_PROVIDER_CACHE_TTL": "600",
+            "STEEL_PIGS_CACHE_GENERATION_FILE": str(tmp / "cache.gen"),
+        }
+        ctx = multiprocessing.get_context("spawn")
+        self.workers = []
+        # Spawned children inherit os.environ as of start().
+        with patch.dict(os.environ, env):
+            for _ in range(2):
+                parent, child = ctx.Pipe()
+                proc = ctx.Process(target=_worker, args=(child,), daemon=True)
+                proc.start()
+                self.workers.append((proc, parent))
+
+    def tearDown(self):
+        for proc, conn in self.workers:
+            conn.send(("stop", None))
+            proc.join(10)
+        self._tmp.cleanup()
+
+    def _call(self, worker, cmd, arg=None):
+        conn = self.workers[worker][1]
+        conn.send((cmd, arg))
+        return conn.recv()
+
+    def test_worker_never_serves_stale_record_after_ack(self):
+        for i in range(self.ROUNDS):
+            writer, reader = i % 2, (i + 1) % 2
+            # Both workers have the current value cached.
+            self._call(reader, "read")
+            self._call(writer, "read")
+            value = f"os-{i}"
+            self.assertEqual(self._call(writer, "write", value), 200)
+            self.assertEqual(self._call(reader, "read"), value)
+            self.assertEqual(self._call(writer, "read"), value)
+        # The reads above must have exercised the caches, or the
+        # assertions prove nothing.
+        self.assertGreater(self._call(0, "hits"), 0)
+        self.assertGreater(self._call(1, "hits"), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
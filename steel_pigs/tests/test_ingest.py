@@ -12,9 +12,10 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
-"""Tests for POST /v1/servers and POST /v1/servers/<n>/switches."""
+"""Tests for POST /v1/servers, /v1/servers:bulk and /v1/servers/<n>/switches."""
 
 import json
+import logging
 import os
 import unittest
 from unittest.mock import patch
@@ -90,8 +91,44 @@ class TestCreateServer(_IngestTestBase):
         self.assertIsNotNone(fetched)
         self.assertEqual(fetched["hostname"], "readback")
 
+    def test_interfaces_are_stored_and_resolve_to_the_server(self):
+        payload = _valid_server_payload(
+            server_number=999107,
+            primary_mac="aa:bb:cc:00:10:07",
+            interfaces=[{"mac": "AA-BB-CC-01-10-07", "role": "data"}, {"mac": "aabb.cc02.1007"}],
+        )
+        rv = self.client.post("/v1/servers", json=payload, headers=self._auth())
+        self.assertEqual(rv.status_code, 201)
+        self.assertEqual(
+            rv.get_json()["interfaces"],
+            [
+                {"mac": "aa:bb:cc:01:10:07", "role": "data"},
+                {"mac": "aa:bb:cc:02:10:07", "role": "data"},
+            ],
+        )
+        provider = self.app.extensions["steel_pigs"].server_data
+        self.assertEqual(provider.get_server_by_mac("aa:bb:cc:02:10:07")["server_number"], 999107)
+
+    def test_interface_mac_owned_by_another_server_returns_409(self):
+        nic = {"mac": "aa:bb:cc:01:10:08"}
+        first = _valid_server_payload(server_number=999108, interfaces=[nic])
+        self.client.post("/v1/servers", json=first, headers=self._auth())
+        second = _valid_server_payload(server_number=999109, interfaces=[nic])
+        rv = self.client.post("/v1/servers", json=second, headers=self._auth())
+        self.assertEqual(rv.status_code, 409)
+        self.assertIn("999108", rv.get_json()["message"])
+        fetched = self.app.extensions["steel_pigs"].server_data.get_server_by_number(999109)
+        self.assertIsNone(fetched)
+
     # --- validation -------------------------------------------------------
 
+    def test_repeated_interface_mac_returns_422(self):
+        payload = _valid_server_payload(
+            server_number=999110, interfaces=[{"mac": "AA-BB-CC-00-00-01"}]
+        )
+        rv = self.client.post("/v1/servers", json=payload, headers=self._auth())
+        self.assertEqual(rv.status_code, 422)
+
     def test_missing_required_field_returns_422(self):
         payload = _valid_server_payload(server_number=999102)
         del payload["hostname"]
@@ -108,6 +145,11 @@ class TestCreateServer(_IngestTestBase):
         rv = self.client.post("/v1/servers", json=payload, headers=self._auth())
         self.assertEqual(rv.status_code, 422)
 
+    def test_invalid_mac_returns_422(self):
+        payload = _valid_server_payload(server_number=999106, primary_mac="aa:bb:cc")
+        rv = self.client.post("/v1/servers", json=payload, headers=self._auth())
+        self.assertEqual(rv.status_code, 422)
+
     def test_unknown_field_returns_422(self):
         payload = _valid_server_payload(server_number=999105)
         payload["totally_made_up_field"] = "x"
@@ -179,5 +221,110 @@ class TestAddSwitch(_IngestTestBase):
         self.assertEqual(rv.status_code, 404)
 
 
+class _AuditCapture(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.events = []
+
+    def emit(self, record):
+        self.events.append(json.loads(record.getMessage()))
+
+
+class TestBulkCreateServers(_IngestTestBase):
+    def setUp(self):
+        super().setUp()
+        self.capture = _AuditCapture()
+        self.audit_logger = logging.getLogger("steel_pigs.audit")
+        self.audit_logger.addHandler(self.capture)
+        self.audit_logger.setLevel(logging.INFO)
+
+    def tearDown(self):
+        self.audit_logger.removeHandler(self.capture)
+
+    def _post(self, body):
+        return self.client.post("/v1/servers:bulk", json=body, headers=self._auth())
+
+    def _fetch(self, number):
+        return self.app.extensions["steel_pigs"].server_data.get_server_by_number(number)
+
+    def test_unauthenticated_returns_401(self):
+        rv = self.client.post("/v1/servers:bulk", json=[_valid_server_payload()])
+        self.assertEqual(rv.status_code, 401)
+
+    def test_json_array_creates_every_server(self):
+        body = [_valid_server_payload(server_number=n) for n in (777001, 777002, 777003)]
+        rv = self._post(body)
+        self.assertEqual(rv.status_code, 200)
+        result = rv.get_json()
+        self.assertEqual((result["created"], result["conflicts"], result["invalid"]), (3, 0, 0))
+        self.assertEqual([r["index"] for r in result["results"]], [0, 1, 2])
+        self.assertEqual(self._fetch(777002)["hostname"], "ingest-1")
+
+    def test_ndjson_body_is_accepted(self):
+        lines = [json.dumps(_valid_server_payload(server_number=n)) for n in (777101, 777102)]
+        rv = self.client.post(
+            "/v1/servers:bulk",
+            data="\n".join(lines) + "\n\n",
+            content_type="application/x-ndjson",
+            headers=self._auth(),
+        )
+        self.assertEqual(rv.status_code, 200)
+        self.assertEqual(rv.get_json()["created"], 2)
+        self.assertIsNotNone(self._fetch(777102))
+
+    def test_conflicts_are_reported_per_item(self):
+        self._post([_valid_server_payload(server_number=777201)])
+        body = [
+            _valid_server_payload(server_number=777201),  # already stored
+            _valid_server_payload(server_number=777202),
+            _valid_server_payload(server_number=777202),  # repeated in the batch
+        ]
+        result = self._post(body).get_json()
+        self.assertEqual(
+            [r["status"] for r in result["results"]], ["conflict", "created", "conflict"]
+        )
+        self.assertIn("777201", result["results"][0]["message"])
+        self.assertIsNotNone(self._fetch(777202))
+
+    def test_invalid_items_do_not_abort_the_batch(self):
+        bad = _valid_server_payload(server_number=777301, boot_status="garbage")
+        body = [bad, _valid_server_payload(server_number=777302), "not an object"]
+        result = self._post(body).get_json()
+        statuses = [r["status"] for r in result["results"]]
+        self.assertEqual(statuses, ["invalid", "created", "invalid"])
+        self.assertIn("boot_status", result["results"][0]["errors"])
+        self.assertEqual(result["results"][0]["server_number"], 777301)
+        self.assertIsNone(self._fetch(777301))
+
+    def test_bad_ndjson_line_is_reported(self):
+        data = json.dumps(_valid_server_payload(server_number=777401)) + "\n{nope\n"
+        rv = self.client.post(
+            "/v1/servers:bulk",
+            data=data,
+            content_type="application/x-ndjson",
+            headers=self._auth(),
+        )
+        result = rv.get_json()
+        self.assertEqual([r["status"] for r in result["results"]], ["created", "invalid"])
+
+    def test_non_array_body_returns_400(self):
+        rv = self._post(_valid_server_payload(server_number=777501))
+        self.assertEqual(rv.status_code, 400)
+
+    def test_one_audit_event_per_batch(self):
+        self.app.config["BULK_BATCH_SIZE"] = 2
+        try:
+            body = [_valid_server_payload(server_number=777600 + n) for n in range(5)]
+            result = self._post(body).get_json()
+        finally:
+            self.app.config["BULK_BATCH_SIZE"] = 500
+        self.assertEqual(result["created"], 5)
+        self.assertEqual([r["index"] for r in result["results"]], list(range(5)))
+        events = [e for e in self.capture.events if e["action"] == "bulk_create_servers"]
+        self.assertEqual(len(events), 3)
+        self.assertEqual(events[0]["after"]["created"], [777600, 777601])
+        self.assertEqual(events[2]["after"]["created"], [777604])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,142 @@
+#   Copyright 2026 Michael Rice <michael@michaelrice.org>
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Tests for SQL.list_servers and GET /v1/servers."""
+
+import os
+import unittest
+from unittest.mock import patch
+
+from steel_pigs.plugins.providers.sql import SQL
+from steel_pigs.synthetic import server_mac
+from steel_pigs.tests import app_with_provider, count_queries, seed_sql_plugin, server_template
+
+API_TOKEN = "listing-test-token"
+
+
+def _seed(sql, numbers):
+    seed_sql_plugin(sql)
+    base = server_template(sql)
+    sql.create_servers(
+        [
+            dict(
+                base,
+                server_number=number,
+                hostname=f"host-{number}",
+                primary_mac=server_mac(number),
+                operational_status="online" if number % 3 == 0 else "provisioning",
+                provision_zone_id=None if number % 2 else base["provision_zone_id"],
+            )
+            for number in numbers
+        ]
+    )
+
+
+class TestListServers(unittest.TestCase):
+    def setUp(self):
+        self.sql = SQL({"engine": "sqlite:///:memory:"})
+        _seed(self.sql, range(1, 21))
+
+    def _numbers(self, servers):
+        return [server["server_number"] for server in servers]
+
+    def test_pages_follow_server_number(self):
+        first = self.sql.list_servers(limit=8)
+        self.assertEqual(self._numbers(first), list(range(1, 9)))
+        rest = self.sql.list_servers(after=18, limit=8)
+        self.assertEqual(self._numbers(rest), [19, 20, 555121])
+        self.assertEqual(self.sql.list_servers(after=555121), [])
+
+    def test_servers_carry_their_zone(self):
+        server = self.sql.list_servers(after=1, limit=1)[0]
+        self.assertEqual(server["provision_zone"]["zone_name"], "DFW1")
+        self.assertIsNone(self.sql.list_servers(limit=1)[0]["provision_zone"])
+        self.assertNotIn("switches", server)
+
+    def test_filters_combine(self):
+        servers = self.sql.list_servers(after=3, limit=100, operational_status="online")
+        self.assertEqual(self._numbers(servers), [6, 9, 12, 15, 18])
+        servers = self.sql.list_servers(
+            limit=100, operational_status="online", provision_zone_id=1, boot_os="Ubuntu"
+        )
+        self.assertEqual(self._numbers(servers), [6, 12, 18])
+
+    def test_none_filters_are_ignored(self):
+        servers = self.sql.list_servers(limit=100, boot_status=None)
+        self.assertEqual(len(servers), 21)
+
+    def test_unknown_filter_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self.sql.list_servers(hostname="hogzilla")
+
+    def test_page_is_one_keyed_query(self):
+        with count_queries(self.sql.engine) as statements:
+            self.sql.list_servers(after=5, limit=5, boot_status="kicking")
+        self.assertEqual(len(statements), 1)
+        self.assertIn('"ServerData".server_number > ?', statements[0])
+
+
+class TestListServersRoute(unittest.TestCase):
+    def setUp(self):
+        patcher = patch.dict(os.environ, {"STEEL_PIGS_API_TOKEN": API_TOKEN})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        sql = SQL({"engine": "sqlite:///:memory:"})
+        _seed(sql, range(1, 21))
+        self.client = app_with_provider(sql).test_client()
+
+    def _get(self, query):
+        return self.client.get(
+            f"/v1/servers?{query}", headers={"Authorization": f"Bearer {API_TOKEN}"}
+        )
+
+    def test_walks_every_page(self):
+        seen, after = [], None
+        while True:
+            rv = self._get("limit=7" + (f"&after={after}" if after is not None else ""))
+            self.assertEqual(rv.status_code, 200)
+            body = rv.get_json()
+            seen.extend(server["server_number"] for server in body["servers"])
+            after = body["next_after"]
+            if after is None:
+                break
+        self.assertEqual(seen, [*range(1, 21), 555121])
+
+    def test_full_last_page_has_no_next(self):
+        body = self._get("after=14&limit=7").get_json()
+        self.assertEqual(len(body["servers"]), 7)
+        self.assertIsNone(body["next_after"])
+
+    def test_output_uses_the_server_schema(self):
+        server = self._get("limit=1&after=1").get_json()["servers"][0]
+        self.assertEqual(server["provision_zone"]["zone_name"], "DFW1")
+        self.assertNotIn("primary_mac_int", server)
+
+    def test_filters(self):
+        body = self._get("operational_status=online&provision_zone_id=1").get_json()
+        self.assertEqual([s["server_number"] for s in body["servers"]], [6, 12, 18])
+
+    def test_page_size_is_capped(self):
+        self.assertEqual(self._get("limit=1001").status_code, 422)
+        self.assertEqual(self._get("limit=0").status_code, 422)
+
+    def test_unknown_status_is_rejected(self):
+        self.assertEqual(self._get("boot_status=bogus").status_code, 422)
+
+    def test_requires_auth(self):
+        self.assertEqual(self.client.get("/v1/servers").status_code, 401)
+
+
+if __name__ == "__main__":
+    unittest.main()
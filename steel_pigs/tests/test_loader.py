@@ -0,0 +1,302 @@
+#   Copyright 2026 Michael Rice <michael@michaelrice.org>
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Tests for ``python -m steel_pigs.db load`` / ``dump``."""
+
+import contextlib
+import io
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from sqlalchemy import create_engine, inspect, pool
+from sqlalchemy.exc import IntegrityError
+
+from steel_pigs import db, loader
+from steel_pigs.plugins.providers.sql import SQL
+from steel_pigs.schemas import CreateServerIn
+from steel_pigs.synthetic import make_server
+from steel_pigs.tests import count_queries, seed_sql_plugin
+
+
+class LoaderTestCase(unittest.TestCase):
+    def setUp(self):
+        workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(workdir.cleanup)
+        self.dir = Path(workdir.name)
+
+    def _database(self, name):
+        """URL of a migrated, empty SQLite file."""
+        url = f"sqlite:///{self.dir / name}"
+        SQL({"engine": url}).engine.dispose()
+        return url
+
+    def _engine(self, url):
+        engine = create_engine(url, poolclass=pool.NullPool)
+        self.addCleanup(engine.dispose)
+        return engine
+
+    def _cli(self, *argv):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            db.main([str(arg) for arg in argv])
+        return out.getvalue()
+
+    def _write_ndjson(self, name, rows):
+        path = self.dir / name
+        path.write_text("".join(json.dumps(row) + "\n" for row in rows))
+        return path
+
+
+class TestRoundTrip(LoaderTestCase):
+    def setUp(self):
+        super().setUp()
+        self.source = self._database("source.db")
+        sql = SQL({"engine": self.source})
+        self.addCleanup(sql.engine.dispose)
+        seed_sql_plugin(sql)
+        nics = [{"mac": "aa:bb:cc:dd:ee:01", "role": "bmc"}]
+        sql.create_server(
+            CreateServerIn().load(make_server(7, drac_ip="10.1.0.7", interfaces=nics))
+        )
+        sql.add_switch(7, "sw-1", "3")
+
+    def _round_trip(self, suffix):
+        first = {kind: self.dir / f"{kind}-1{suffix}" for kind in ("zones", "servers", "switches")}
+        second = {kind: self.dir / f"{kind}-2{suffix}" for kind in first}
+        self._cli("--url", self.source, "dump", *self._args(first))
+        target = self._database(f"target{suffix}.db")
+        output = self._cli("--url", target, "load", *self._args(first))
+        self._cli("--url", target, "dump", *self._args(second))
+        for kind in first:
+            self.assertEqual(first[kind].read_text(), second[kind].read_text(), kind)
+        return target, output
+
+    @staticmethod
+    def _args(files):
+        return [arg for kind, path in files.items() for arg in (f"--{kind}", path)]
+
+    def test_csv_round_trip(self):
+        target, output = self._round_trip(".csv")
+        self.assertIn("servers: 2 rows", output)
+        self.assertIn("rows/s", output)
+        sql = SQL({"engine": target})
+        self.addCleanup(sql.engine.dispose)
+        server = sql.get_server_by_mac("aa:bb:cc:dd:ee:01")
+        self.assertEqual(server["server_number"], 7)
+        self.assertEqual(server["drac_ip"], "10.1.0.7")
+        self.assertEqual(sql.get_server_by_switch("sw-1", "3")["server_number"], 7)
+        seeded = sql.get_server_by_number(555121)
+        self.assertEqual(seeded["provision_zone"]["zone_name"], "DFW1")
+        self.assertIsNone(seeded["drac_ip"])
+
+    def test_ndjson_round_trip(self):
+        target, _ = self._round_trip(".ndjson")
+        sql = SQL({"engine": target})
+        self.addCleanup(sql.engine.dispose)
+        self.assertEqual(
+            [c["action"] for c in sql.list_changes(limit=10)],
+            ["create", "create", "add_switch", "add_switch", "add_switch"],
+        )
+
+
+class TestLoad(LoaderTestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = self._database("inventory.db")
+        self.engine = self._engine(self.url)
+
+    def test_loads_in_executemany_batches(self):
+        servers = self._write_ndjson("servers.ndjson", [make_server(n) for n in range(1, 11)])
+        with count_queries(self.engine) as statements:
+            results = loader.load(self.engine, servers=servers, batch_size=4)
+        self.assertEqual(results["servers"]["loaded"], 10)
+        inserts = [s for s in statements if s.startswith('INSERT INTO "ServerData"')]
+        self.assertEqual(len(inserts), 3)
+
+    def test_invalid_rows_are_reported_and_skipped(self):
+        path = self.dir / "servers.ndjson"
+        path.write_text(
+            json.dumps(make_server(1))
+            + "\n{not json\n"
+            + json.dumps(make_server(2, primary_mac="nope"))
+            + "\n\n"
+            + json.dumps(make_server(3, colour="blue"))
+            + "\n"
+        )
+        output = io.StringIO()
+        with self.assertRaises(SystemExit) as raised, contextlib.redirect_stdout(output):
+            db.main(["--url", self.url, "load", "--servers", str(path)])
+        self.assertEqual(raised.exception.code, 1)
+        self.assertIn("servers: 1 rows", output.getvalue())
+        self.assertIn("3 rejected", output.getvalue())
+        self.assertIn(f"{path}:3: ", output.getvalue())
+
+    def test_rejected_rows_carry_their_line_and_errors(self):
+        path = self._write_ndjson(
+            "servers.ndjson",
+            [make_server(1, primary_mac="nope"), make_server(2), {"colour": "blue"}],
+        )
+        results = loader.load(self.engine, servers=path)["servers"]
+        self.assertEqual(results["loaded"], 1)
+        self.assertEqual([line for line, _ in results["rejected"]], [1, 3])
+        self.assertIn("primary_mac", results["rejected"][0][1])
+        self.assertIn("colour", results["rejected"][1][1])
+
+    def test_csv_cells_are_typed_by_the_schema(self):
+        path = self.dir / "servers.csv"
+        path.write_text(
+            "server_number,primary_ip,primary_gw,primary_nm,primary_mac,hostname,"
+            "dns_server_primary,boot_os,boot_os_version,boot_profile,ntp_server,bootstrapped,"
+            "drac_ip,interfaces\n"
+            "9,10.0.0.9,10.0.0.1,255.0.0.0,02:00:00:00:00:09,node-9,8.8.8.8,Ubuntu,22.04,"
+            "Standard,pool.ntp.org,true,,aa:00:00:00:00:01=bmc;aa:00:00:00:00:02\n"
+        )
+        loader.load(self.engine, servers=path)
+        sql = SQL({"engine": self.url})
+        self.addCleanup(sql.engine.dispose)
+        server = sql.get_server_by_mac("aa:00:00:00:00:02")
+        self.assertEqual((server["server_number"], server["bootstrapped"]), (9, True))
+        self.assertIsNone(server["drac_ip"])
+        self.assertEqual(server["boot_status"], "kicking")
+
+    def test_taken_keys_are_rejected(self):
+        sql = SQL({"engine": self.url})
+        self.addCleanup(sql.engine.dispose)
+        seed_sql_plugin(sql)  # server 555121, primary MAC 00:11:22:33:44:55, zone 1 "DFW1"
+        zones = self._write_ndjson(
+            "zones.ndjson",
+            [
+                {
+                    "id": 1,
+                    "zone_name": "ORD1",
+                    "provision_img_host": "i",
+                    "provision_mirror_host": "m",
+                },
+                {"zone_name": "DFW1", "provision_img_host": "i", "provision_mirror_host": "m"},
+                {"zone_name": "IAD1", "provision_img_host": "i", "provision_mirror_host": "m"},
+                {"zone_name": "IAD1", "provision_img_host": "i", "provision_mirror_host": "m"},
+            ],
+        )
+        nic = [{"mac": "00:11:22:33:44:55"}]
+        servers = self._write_ndjson(
+            "servers.ndjson",
+            [
+                make_server(555121),
+                make_server(1),
+                make_server(2, interfaces=nic),
+                make_server(1, primary_mac="02:00:00:00:01:01"),
+                make_server(3, interfaces=[{"mac": "aa:00:00:00:00:01"}]),
+                make_server(4, primary_mac="aa:00:00:00:00:01"),
+                make_server(5),
+            ],
+        )
+        results = loader.load(self.engine, zones=zones, servers=servers, batch_size=4)
+        self.assertEqual(results["zones"]["loaded"], 1)
+        self.assertEqual(
+            [(line, errors["_conflict"][0]) for line, errors in results["zones"]["rejected"]],
+            [
+                (1, "zone id 1 already exists"),
+                (2, "zone_name 'DFW1' already exists"),
+                (4, "zone_name 'IAD1' already exists"),
+            ],
+        )
+        self.assertEqual(results["servers"]["loaded"], 3)
+        self.assertEqual(
+            [(line, errors["_conflict"][0]) for line, errors in results["servers"]["rejected"]],
+            [
+                (1, "server_number 555121 already exists"),
+                (3, "MAC 00:11:22:33:44:55 already belongs to server 555121"),
+                (4, "server_number 1 already exists"),
+                (6, "MAC aa:00:00:00:00:01 already belongs to server 3"),
+            ],
+        )
+        self.assertEqual(sql.get_server_by_number(1)["primary_mac"], "02:00:00:00:00:01")
+
+    def test_rows_naming_a_missing_zone_or_server_are_rejected(self):
+        servers = self._write_ndjson(
+            "servers.ndjson",
+            [
+                make_server(1),
+                make_server(1, hostname="again"),
+                make_server(2, provision_zone_id=99),
+            ],
+        )
+        switches = self.dir / "switches.csv"
+        switches.write_text(
+            "server_number,switch_name,switch_port\n1,sw-a,1\n999,sw-b,2\n2,sw-a,3\n"
+        )
+        results = loader.load(self.engine, servers=servers, switches=switches)
+        self.assertEqual(
+            [(line, errors["_conflict"][0]) for line, errors in results["servers"]["rejected"]],
+            [(2, "server_number 1 already exists"), (3, "provision_zone_id 99 does not exist")],
+        )
+        self.assertEqual(results["switches"]["loaded"], 1)
+        self.assertEqual(
+            [(line, errors["_conflict"][0]) for line, errors in results["switches"]["rejected"]],
+            [(3, "server_number 999 does not exist"), (4, "server_number 2 does not exist")],
+        )
+        with self.engine.connect() as conn:
+            rows = conn.exec_driver_sql('SELECT server_number FROM "SwitchInfo"').scalars().all()
+        self.assertEqual(rows, [1])
+
+    def test_indexes_are_only_dropped_when_asked(self):
+        servers = self._write_ndjson("servers.ndjson", [make_server(n) for n in range(1, 4)])
+        with count_queries(self.engine) as statements:
+            loader.load(self.engine, servers=servers)
+        self.assertFalse([s for s in statements if s.startswith("DROP INDEX")])
+
+    def test_indexes_are_rebuilt(self):
+        before = self._indexes()
+        servers = self._write_ndjson("servers.ndjson", [make_server(n) for n in range(1, 4)])
+        report = []
+        loader.load(self.engine, servers=servers, rebuild_indexes=True, report=report.append)
+        self.assertEqual(self._indexes(), before)
+        self.assertIn("locked", report[0])
+        self.assertTrue(report[-1].startswith("rebuilt "))
+
+    def test_a_failed_load_writes_nothing(self):
+        before = self._indexes()
+        servers = self._write_ndjson("servers.ndjson", [make_server(1), make_server(2)])
+        # As if a concurrent writer took a key after the check.
+        failure = IntegrityError("INSERT", {}, Exception("UNIQUE constraint failed"))
+        with patch.object(loader, "_log_changes", side_effect=failure):
+            with self.assertRaises(IntegrityError):
+                loader.load(self.engine, servers=servers, rebuild_indexes=True)
+            with self.assertRaisesRegex(SystemExit, "^load failed, nothing was written: UNIQUE"):
+                self._cli("--url", self.url, "load", "--servers", servers)
+        self.assertEqual(self._indexes(), before)
+        with self.engine.connect() as conn:
+            self.assertFalse(conn.exec_driver_sql('SELECT count(*) FROM "ServerData"').scalar())
+
+    def test_needs_a_file_and_a_migrated_database(self):
+        with self.assertRaises(SystemExit):
+            db.main(["--url", self.url, "load"])
+        with self.assertRaisesRegex(SystemExit, "upgrade"):
+            db.main(["--url", f"sqlite:///{self.dir / 'empty.db'}", "dump", "--zones", "z.csv"])
+        with self.assertRaises(ValueError):
+            loader.load(self.engine, servers=self.dir / "servers.txt")
+
+    def _indexes(self):
+        inspector = inspect(self.engine)
+        return {
+            table: sorted(index["name"] for index in inspector.get_indexes(table))
+            for table in ("ServerData", "ServerInterface", "SwitchInfo")
+        }
+
+
+if __name__ == "__main__":
+    unittest.main()
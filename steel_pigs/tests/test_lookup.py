@@ -0,0 +1,202 @@
+#   Copyright 2026 Michael Rice <michael@michaelrice.org>
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Tests for lookup_servers and POST /v1/servers:lookup."""
+
+import os
+import unittest
+from unittest.mock import patch
+
+from steel_pigs.plugins.providers.noformat import NoFormatProvider
+from steel_pigs.plugins.providers.pluginbase import ProviderPluginBase
+from steel_pigs.plugins.providers.sql import SQL
+from steel_pigs.synthetic import server_mac
+from steel_pigs.tests import app_with_provider, count_queries, seed_sql_plugin, server_template
+
+API_TOKEN = "lookup-test-token"
+
+
+def _add_servers(sql, numbers):
+    template = server_template(sql)
+    sql.create_servers(
+        [
+            template
+            | {
+                "server_number": n,
+                "hostname": f"node-{n}",
+                "primary_mac": server_mac(n),
+            }
+            for n in numbers
+        ]
+    )
+    for n in numbers:
+        sql.add_switch(n, "sw-1", str(n))
+
+
+class TestSQLLookup(unittest.TestCase):
+    def setUp(self):
+        self.sql = SQL({"engine": "sqlite:///:memory:"})
+        seed_sql_plugin(self.sql)
+        _add_servers(self.sql, range(1, 41))
+
+    def test_resolves_every_kind(self):
+        self.sql.create_server(
+            server_template(self.sql)
+            | {
+                "server_number": 50,
+                "primary_mac": "02:00:00:00:01:00",
+                "interfaces": [{"mac": "aa:bb:cc:dd:ee:01"}],
+            }
+        )
+        found = self.sql.lookup_servers(
+            server_numbers=[3, 999],
+            macs=["02-00-00-00-00-07", "AABB.CCDD.EE01", "not-a-mac", "02:00:00:00:ff:ff"],
+            switches=[("sw-1", "9"), ("Switch 01", "2"), ("sw-1", "404")],
+        )
+        numbers = {
+            kind: {key: server and server["server_number"] for key, server in entries.items()}
+            for kind, entries in found.items()
+        }
+        self.assertEqual(numbers["server_numbers"], {3: 3, 999: None})
+        self.assertEqual(
+            numbers["macs"],
+            {
+                "02-00-00-00-00-07": 7,
+                "AABB.CCDD.EE01": 50,
+                "not-a-mac": None,
+                "02:00:00:00:ff:ff": None,
+            },
+        )
+        self.assertEqual(
+            numbers["switches"],
+            {("sw-1", "9"): 9, ("Switch 01", "2"): 555121, ("sw-1", "404"): None},
+        )
+        server = found["switches"][("Switch 01", "2")]
+        self.assertEqual(server["provision_zone"]["zone_name"], "DFW1")
+        self.assertEqual([s["switch_port"] for s in server["switches"]], ["1", "2"])
+
+    def test_statements_dont_grow_with_identifiers(self):
+        with count_queries(self.sql.engine) as few:
+            self.sql.lookup_servers([1], ["02:00:00:00:00:01"], [("sw-1", "1")])
+        with count_queries(self.sql.engine) as many:
+            found = self.sql.lookup_servers(
+                server_numbers=range(1, 41),
+                macs=[server_mac(n) for n in range(1, 41)],
+                switches=[("sw-1", str(n)) for n in range(1, 41)],
+            )
+        # Every MAC is a primary one, so the interface query is skipped.
+        self.assertEqual(len(few), 3)
+        self.assertEqual(len(many), 3)
+        self.assertTrue(all(found["macs"].values()))
+
+    def test_matches_the_single_lookups(self):
+        found = self.sql.lookup_servers([5], ["02:00:00:00:00:05"], [("sw-1", "5")])
+        single = self.sql.get_server_by_number(5)
+        self.assertEqual(found["server_numbers"][5], single)
+        self.assertEqual(found["macs"]["02:00:00:00:00:05"], single)
+        self.assertEqual(found["switches"][("sw-1", "5")], single)
+
+    def test_default_falls_back_to_single_lookups(self):
+        args = ([5, 999], ["02:00:00:00:00:05", "bogus"], [("sw-1", "5"), ("sw-1", "404")])
+        with count_queries(self.sql.engine) as statements:
+            found = ProviderPluginBase.lookup_servers(self.sql, *args)
+        self.assertEqual(len(statements), 5)  # "bogus" never reaches the database
+        self.assertEqual(found, self.sql.lookup_servers(*args))
+
+
+class _ShortSwitchNames(NoFormatProvider):
+    """Formatter that expands the LLDP short form ``sw01`` to ``Switch 01``."""
+
+    def format_switch(self, switch):
+        return f"Switch {switch[2:]}" if switch.startswith("sw") else switch
+
+    def format_mac(self, mac):
+        return mac.strip()
+
+
+class TestLookupRoute(unittest.TestCase):
+    def setUp(self):
+        patcher = patch.dict(os.environ, {"STEEL_PIGS_API_TOKEN": API_TOKEN})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.sql = SQL({"engine": "sqlite:///:memory:"})
+        seed_sql_plugin(self.sql)
+        self.app = app_with_provider(self.sql, formatter=_ShortSwitchNames({}))
+        self.client = self.app.test_client()
+
+    def _lookup(self, body):
+        return self.client.post(
+            "/v1/servers:lookup", json=body, headers={"Authorization": f"Bearer {API_TOKEN}"}
+        )
+
+    def test_marks_what_was_not_found(self):
+        rv = self._lookup(
+            {
+                "server_numbers": [555121, 7],
+                "macs": [" 00:11:22:33:44:55 ", "bogus"],
+                "switches": [
+                    {"switch_name": "sw01", "switch_port": "1"},
+                    {"switch_name": "sw01", "switch_port": "9"},
+                ],
+            }
+        )
+        self.assertEqual(rv.status_code, 200)
+        body = rv.get_json()
+        self.assertEqual((body["found"], body["not_found"]), (3, 3))
+        self.assertEqual(
+            [(e["server_number"], e["found"]) for e in body["server_numbers"]],
+            [(555121, True), (7, False)],
+        )
+        self.assertIsNone(body["server_numbers"][1]["server"])
+        # Identifiers come back as sent, before the formatter touched them.
+        self.assertEqual(
+            [(e["mac"], e["found"]) for e in body["macs"]],
+            [(" 00:11:22:33:44:55 ", True), ("bogus", False)],
+        )
+        self.assertEqual(
+            [(e["switch_name"], e["switch_port"], e["found"]) for e in body["switches"]],
+            [("sw01", "1", True), ("sw01", "9", False)],
+        )
+        server = body["switches"][0]["server"]
+        self.assertEqual(server["hostname"], "hogzilla")
+        self.assertEqual(len(server["switches"]), 2)
+        self.assertNotIn("primary_mac_int", server)
+
+    def test_repeated_identifiers_are_answered_each_time(self):
+        body = self._lookup({"server_numbers": [555121, 555121]}).get_json()
+        self.assertEqual([e["found"] for e in body["server_numbers"]], [True, True])
+
+    def test_one_batch_for_the_request(self):
+        with count_queries(self.sql.engine) as statements:
+            self._lookup({"macs": [server_mac(n) for n in range(100)]})
+        self.assertLessEqual(len(statements), 4)
+
+    def test_needs_something_to_look_up(self):
+        self.assertEqual(self._lookup({}).status_code, 422)
+        self.assertEqual(self._lookup({"macs": []}).status_code, 422)
+        self.assertEqual(self._lookup({"hostnames": ["x"]}).status_code, 422)
+
+    def test_leaves_caches_alone(self):
+        generation = self.app.extensions["steel_pigs.generation"]
+        before = generation.current()
+        self._lookup({"server_numbers": [555121]})
+        self.assertEqual(generation.current(), before)
+
+    def test_requires_auth(self):
+        rv = self.client.post("/v1/servers:lookup", json={"server_numbers": [1]})
+        self.assertEqual(rv.status_code, 401)
+
+
+if __name__ == "__main__":
+    unittest.main()
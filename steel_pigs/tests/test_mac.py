@@ -0,0 +1,56 @@
+#   Copyright 2026 Michael Rice <michael@michaelrice.org>
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import unittest
+
+from steel_pigs.mac import int_to_mac, mac_to_int
+
+
+class TestMacToInt(unittest.TestCase):
+    def test_common_notations_agree(self):
+        for mac in (
+            "aa:bb:cc:0d:0e:ff",
+            "AA:BB:CC:0D:0E:FF",
+            "AA-BB-CC-0D-0E-FF",
+            "aabb.cc0d.0eff",
+            "AABBCC0D0EFF",
+            "aa:bb:cc:d:e:ff",
+            "  aa:bb:cc:0d:0e:ff\n",
+        ):
+            with self.subTest(mac=mac):
+                self.assertEqual(mac_to_int(mac), 0xAABBCC0D0EFF)
+
+    def test_rejects_non_macs(self):
+        for mac in (
+            "",
+            "aa:bb:cc:dd:ee",
+            "aa:bb:cc:dd:ee:ff:00",
+            "aa:bb-cc:dd:ee:ff",
+            "aa:bb:cc:dd:ee:gg",
+            "aab:bcc:dde:eff",
+            "aabb.ccdd.ee",
+            "aabbccddeef",
+            None,
+            0xAABBCCDDEEFF,
+        ):
+            with self.subTest(mac=mac), self.assertRaises(ValueError):
+                mac_to_int(mac)
+
+    def test_round_trip(self):
+        self.assertEqual(int_to_mac(mac_to_int("00-1B-02-03-04-05")), "00:1b:02:03:04:05")
+        self.assertEqual(int_to_mac(0), "00:00:00:00:00:00")
+
+
+if __name__ == "__main__":
+    unittest.main()
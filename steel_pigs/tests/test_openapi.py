@@ -20,6 +20,7 @@ schema on every change is the enforcement.
 """
 
 import unittest
+import warnings
 
 from openapi_spec_validator import validate
 
@@ -42,6 +43,13 @@ class TestOpenAPISpec(unittest.TestCase):
         self.assertEqual(spec["openapi"][0], "3")
         self.assertEqual(spec["info"]["title"], "Steel PIGS")
 
+    def test_each_schema_is_registered_once(self):
+        app = create_app(config_overrides={"TESTING": True})
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            schemas = app.test_client().get("/openapi.json").get_json()["components"]["schemas"]
+        self.assertNotIn("Switch1", schemas)
+
     def test_swagger_ui_is_served(self):
         rv = self.client.get("/docs")
         self.assertEqual(rv.status_code, 200)
@@ -66,6 +74,10 @@ class TestOpenAPISpec(unittest.TestCase):
             "/v1/update/os",
             "/v1/update/opstatus",
             "/v1/servers",
+            "/v1/servers:bulk",
+            "/v1/update/status:bulk",
+            "/v1/update/os:bulk",
+            "/v1/update/opstatus:bulk",
             "/v1/servers/{server_number}/switches",
         ):
             op = spec["paths"][path]["post"]
@@ -0,0 +1,115 @@
+#   Copyright 2026 Michael Rice <michael@michaelrice.org>
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Read/write splitting in the SQL provider, using separate SQLite files.
+
+Nothing replicates between the files, which makes it easy to tell where
+each read was served from: the primary and each replica hold a
+different ``boot_os`` for the same server.
+"""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from flask import Flask, g
+
+from steel_pigs.plugins.providers.sql import SQL
+from steel_pigs.tests import seed_sql_plugin
+
+
+class TestReplicaRouting(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        tmp = Path(self._tmp.name)
+        self.primary_url = f"sqlite:///{tmp / 'primary.db'}"
+        self.replica_urls = [f"sqlite:///{tmp / f'replica{i}.db'}" for i in (1, 2)]
+        seed_sql_plugin(SQL({"engine": self.primary_url}))
+        for i, url in enumerate(self.replica_urls, start=1):
+            replica = SQL({"engine": url})
+            seed_sql_plugin(replica)
+            replica.set_boot_os(555121, f"replica-{i}")
+        self.app = Flask(__name__)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _sql(self, **config):
+        return SQL({"engine": self.primary_url, "replicas": self.replica_urls, **config})
+
+    def _boot_os(self, sql):
+        return sql.get_server_by_number(555121)["boot_os"]
+
+    def _request(self, request_id, actor=None):
+        ctx = self.app.test_request_context()
+        ctx.push()
+        g.request_id = request_id
+        if actor is not None:
+            g.actor = actor
+        self.addCleanup(ctx.pop)
+
+    def test_reads_round_robin_over_replicas(self):
+        sql = self._sql()
+        seen = [self._boot_os(sql) for _ in range(4)]
+        self.assertEqual(seen, ["replica-1", "replica-2", "replica-1", "replica-2"])
+
+    def test_writes_go_to_the_primary(self):
+        sql = self._sql()
+        sql.set_boot_os(555121, "written")
+        primary = SQL({"engine": self.primary_url})
+        self.assertEqual(self._boot_os(primary), "written")
+        self.assertTrue(self._boot_os(sql).startswith("replica-"))
+
+    def test_same_request_reads_its_own_write(self):
+        sql = self._sql()
+        self._request("req-1")
+        sql.set_boot_os(555121, "written")
+        self.assertEqual(self._boot_os(sql), "written")
+
+    def test_actor_is_sticky_across_requests(self):
+        sql = self._sql()
+        with self.app.test_request_context():
+            g.request_id, g.actor = "req-1", "ops"
+            sql.set_boot_os(555121, "written")
+        with self.app.test_request_context():
+            g.request_id, g.actor = "req-2", "ops"
+            self.assertEqual(self._boot_os(sql), "written")
+        with self.app.test_request_context():
+            g.request_id = "req-3"  # anonymous PXE client
+            self.assertTrue(self._boot_os(sql).startswith("replica-"))
+
+    def test_stickiness_expires(self):
+        sql = self._sql(replica_sticky_seconds=0)
+        self._request("req-1", actor="ops")
+        sql.set_boot_os(555121, "written")
+        self.assertTrue(self._boot_os(sql).startswith("replica-"))
+
+    def test_stats_count_reads_per_target(self):
+        sql = self._sql()
+        self._request("req-1")
+        self._boot_os(sql)
+        sql.set_boot_os(555121, "written")
+        self._boot_os(sql)
+        stats = sql.stats()["replicas"]
+        self.assertEqual((stats["replica_reads"], stats["primary_reads"]), (1, 1))
+        self.assertEqual(len(stats["pools"]), 2)
+
+    def test_without_replicas_reads_use_the_primary(self):
+        sql = SQL({"engine": self.primary_url})
+        self.assertEqual(self._boot_os(sql), "Ubuntu")
+        self.assertNotIn("replicas", sql.stats())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,329 @@
+#   Copyright 2026 Michael Rice <michael@michaelrice.org>
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Tests for ShardedSQL, shard_for and resharding, on local SQLite files."""
+
+import io
+import tempfile
+import threading
+import unittest
+from collections import Counter
+from contextlib import ExitStack, redirect_stdout
+from pathlib import Path
+
+from steel_pigs import db
+from steel_pigs.exceptions.pigs_exceptions import ServerAlreadyExists, ServerNotFound
+from steel_pigs.plugins.providers.sharded import ShardedSQL, reshard, shard_for
+from steel_pigs.synthetic import make_server
+from steel_pigs.tests import count_queries
+
+
+class _ShardFiles(unittest.TestCase):
+    """Four SQLite files; ``self.sharded`` starts on the first ``SHARDS``."""
+
+    SHARDS = 2
+
+    def setUp(self):
+        workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(workdir.cleanup)
+        self.urls = [f"sqlite:///{Path(workdir.name) / f'shard{i}.db'}" for i in range(4)]
+        self.sharded = self._provider(self.urls[: self.SHARDS])
+
+    def _provider(self, urls):
+        provider = ShardedSQL({"shards": urls, "layout_refresh_seconds": 0})
+        self.addCleanup(lambda: [shard.engine.dispose() for shard in provider.shards])
+        return provider
+
+    def _holder(self, provider, number):
+        """Indexes of the shards ``number`` is actually stored on."""
+        return [
+            i
+            for i, shard in enumerate(provider.shards)
+            if shard.get_server_by_number(number) is not None
+        ]
+
+
+class TestShardFor(unittest.TestCase):
+    def test_is_stable_and_balanced(self):
+        self.assertEqual(shard_for(555121, 8), shard_for("555121", 8))
+        counts = Counter(shard_for(n, 4) for n in range(40_000))
+        self.assertEqual(sorted(counts), [0, 1, 2, 3])
+        self.assertTrue(all(9_000 < count < 11_000 for count in counts.values()))
+
+    def test_growing_only_moves_servers_to_the_new_shard(self):
+        moved = [n for n in range(30_000) if shard_for(n, 3) != shard_for(n, 4)]
+        self.assertTrue(all(shard_for(n, 4) == 3 for n in moved))
+        self.assertAlmostEqual(len(moved) / 30_000, 0.25, delta=0.02)
+
+
+class TestShardedSQL(_ShardFiles):
+    def setUp(self):
+        super().setUp()
+        results = self.sharded.create_servers([make_server(n) for n in range(1, 21)])
+        self.assertTrue(all(r["status"] == "created" for r in results))
+        self.sharded.create_server(
+            make_server(
+                100, hostname="hogzilla", interfaces=[{"mac": "aa:bb:cc:00:00:01", "role": "bmc"}]
+            )
+        )
+        self.sharded.add_switch(100, "Switch 01", "7")
+
+    def test_servers_are_spread_by_hash(self):
+        for number in (*range(1, 21), 100):
+            self.assertEqual(self._holder(self.sharded, number), [shard_for(number, 2)])
+        self.assertEqual({shard_for(n, 2) for n in range(1, 21)}, {0, 1})
+
+    def test_lookups(self):
+        self.assertEqual(self.sharded.get_server_by_number(7)["hostname"], "node-7")
+        self.assertEqual(self.sharded.get_server_by_name("hogzilla")["server_number"], 100)
+        self.assertEqual(self.sharded.get_server_by_mac("0200.0000.0007")["server_number"], 7)
+        self.assertEqual(self.sharded.get_server_by_mac("AA-BB-CC-00-00-01")["server_number"], 100)
+        server = self.sharded.get_server_by_switch("Switch 01", "7")
+        self.assertEqual(server["switches"][0]["switch_port"], "7")
+        self.assertIsNone(self.sharded.get_server_by_number(99))
+        self.assertIsNone(self.sharded.get_server_by_mac("02:00:00:00:09:09"))
+        self.assertIsNone(self.sharded.get_server_by_mac("not-a-mac"))
+        self.assertIsNone(self.sharded.get_server_by_switch("Switch 01", "8"))
+
+    def test_mac_lookup_reads_only_the_owning_shard(self):
+        owner = shard_for(100, 2)
+        other = self.sharded.shards[1 - owner]
+        with ExitStack() as stack:
+            shard_statements = stack.enter_context(count_queries(self.sharded.shards[owner].engine))
+            other_statements = stack.enter_context(count_queries(other.engine))
+            self.assertIsNotNone(self.sharded.get_server_by_mac("aa:bb:cc:00:00:01"))
+        if owner == 0:
+            # Directory row, then the server, both on the first shard.
+            self.assertEqual(len(shard_statements), 2)
+        else:
+            self.assertEqual(len(shard_statements), 1)
+            self.assertEqual(len(other_statements), 1)
+        self.assertEqual(len(other_statements) + len(shard_statements), 2)
+
+    def test_writes(self):
+        self.assertEqual(self.sharded.set_boot_status(7, "online")["operation"], "success")
+        self.assertEqual(self.sharded.update_server_field(7, "boot_os", "Debian"), "Ubuntu")
+        self.assertEqual(self.sharded.set_boot_os(99, "Debian")["operation"], "failure")
+        with self.assertRaises(ServerNotFound):
+            self.sharded.add_switch(99, "Switch 01", "9")
+        server = self.sharded.get_server_by_number(7)
+        self.assertEqual((server["boot_status"], server["boot_os"]), ("online", "Debian"))
+
+    def test_conflicts(self):
+        with self.assertRaises(ServerAlreadyExists):
+            self.sharded.create_server(make_server(7, hostname="again"))
+        # The interface MAC belongs to server 100, whichever shard 101 is on.
+        nic = {"mac": "aa:bb:cc:00:00:01", "role": "data"}
+        results = self.sharded.create_servers(
+            [make_server(101, interfaces=[nic]), make_server(102), make_server(102)]
+        )
+        self.assertEqual([r["status"] for r in results], ["conflict", "created", "conflict"])
+        self.assertIn("belongs to server 100", results[0]["message"])
+        # Nor may one server's primary MAC be another's interface, either way.
+        seven = {"mac": make_server(7)["primary_mac"], "role": "data"}
+        with self.assertRaisesRegex(ServerAlreadyExists, "server 7"):
+            self.sharded.create_server(make_server(103, interfaces=[seven]))
+        with self.assertRaisesRegex(ServerAlreadyExists, "server 100"):
+            self.sharded.create_server(make_server(104, primary_mac="aa:bb:cc:00:00:01"))
+        # Rejected servers leave nothing behind in the directory.
+        self.assertIsNone(self.sharded.get_server_by_name("node-101"))
+        self.assertEqual(self.sharded.get_server_by_name("node-102")["server_number"], 102)
+
+    def test_primary_mac_wins_over_an_interface(self):
+        # A directory row from before create_server refused this.
+        mac = make_server(7)["primary_mac"]
+        self.sharded._add_entries(
+            [
+                {
+                    "kind": "nic",
+                    "key": mac.replace(":", ""),
+                    "server_number": 100,
+                    "shard": shard_for(100, 2),
+                }
+            ]
+        )
+        self.assertEqual(self.sharded.get_server_by_mac(mac)["server_number"], 7)
+        self.assertEqual(self.sharded.lookup_servers(macs=[mac])["macs"][mac]["server_number"], 7)
+
+    def test_bulk_update(self):
+        previous = self.sharded.bulk_update_field(
+            "operational_status", "online", server_numbers=[1, 2, 3, 99]
+        )
+        self.assertEqual(previous, {n: "provisioning" for n in (1, 2, 3)})
+        previous = self.sharded.bulk_update_field("boot_os", "Debian", switch_name="Switch 01")
+        self.assertEqual(previous, {100: "Ubuntu"})
+
+    def test_per_server_values_are_one_transaction_per_shard(self):
+        values = {1: "provision", 2: "done", 3: "provision", 99: "done"}
+        previous = self.sharded.update_server_fields("boot_status", values)
+        self.assertEqual(sorted(previous), [1, 2, 3])
+        self.assertEqual(
+            [self.sharded.get_server_by_number(n)["boot_status"] for n in (1, 2, 3)],
+            ["provision", "done", "provision"],
+        )
+
+    def test_list_and_export_merge_shards_in_order(self):
+        first = self.sharded.list_servers(limit=8)
+        rest = self.sharded.list_servers(after=first[-1]["server_number"], limit=100)
+        numbers = [s["server_number"] for s in first + rest]
+        self.assertEqual(numbers, [*range(1, 21), 100])
+        self.sharded.set_operational_status(4, "online")
+        self.assertEqual(
+            [s["server_number"] for s in self.sharded.list_servers(operational_status="online")],
+            [4],
+        )
+        exported = list(self.sharded.export_servers())
+        self.assertEqual([s["server_number"] for s in exported], numbers)
+        self.assertEqual(exported[-1]["switches"][0]["switch_name"], "Switch 01")
+        with self.assertRaises(ValueError):
+            self.sharded.export_servers(hostname="hogzilla")
+
+    def test_batch_lookup_is_one_read_per_shard(self):
+        with ExitStack() as stack:
+            statements = [
+                stack.enter_context(count_queries(shard.engine)) for shard in self.sharded.shards
+            ]
+            found = self.sharded.lookup_servers(
+                server_numbers=[1, 2, 99],
+                macs=[make_server(n)["primary_mac"] for n in range(3, 21)] + ["aa:bb:cc:00:00:01"],
+                switches=[("Switch 01", "7"), ("Switch 01", "8")],
+            )
+        self.assertEqual([s["server_number"] for s in found["macs"].values()], [*range(3, 21), 100])
+        self.assertIsNone(found["server_numbers"][99])
+        self.assertEqual(found["switches"][("Switch 01", "7")]["server_number"], 100)
+        self.assertIsNone(found["switches"][("Switch 01", "8")])
+        # The directory and layout reads on the first shard, then one
+        # server read per shard, not one per identifier.
+        self.assertEqual([len(s) for s in statements], [4, 1])
+
+    def test_change_feed_is_unsupported(self):
+        with self.assertRaises(NotImplementedError):
+            self.sharded.list_changes()
+
+    def test_stats_and_ready(self):
+        self.assertTrue(self.sharded.ready())
+        stats = self.sharded.stats()
+        self.assertEqual(stats["layout"], {"shards": 2, "previous": None})
+        self.assertEqual(len(stats["shards"]), 2)
+
+
+class TestLayout(_ShardFiles):
+    def test_extra_urls_idle_until_a_reshard(self):
+        grown = self._provider(self.urls[:3])
+        self.assertEqual(grown.layout(), (2, None))
+        grown.create_server(make_server(5))
+        self.assertEqual(self._holder(grown, 5), [shard_for(5, 2)])
+
+    def test_layout_needing_missing_urls_is_refused(self):
+        self.sharded.save_layout(2, None)
+        with self.assertRaises(ValueError):
+            self._provider(self.urls[:1])
+
+
+class TestReshard(_ShardFiles):
+    COUNT = 300
+
+    def setUp(self):
+        super().setUp()
+        self.sharded.create_servers([make_server(n) for n in range(1, self.COUNT + 1)])
+        for n in range(1, self.COUNT + 1, 10):
+            self.sharded.add_switch(n, "sw-1", str(n))
+
+    def _check_everything_reachable(self, provider, shards):
+        for n in range(1, self.COUNT + 1):
+            self.assertEqual(self._holder(provider, n), [shard_for(n, shards)])
+        for n in range(1, self.COUNT + 1, 10):
+            self.assertEqual(provider.get_server_by_switch("sw-1", str(n))["server_number"], n)
+            self.assertEqual(provider.get_server_by_name(f"node-{n}")["server_number"], n)
+
+    def test_grow(self):
+        provider = self._provider(self.urls[:3])
+        moved = reshard(provider, 3, batch=40, grace=0)
+        expected = sum(shard_for(n, 2) != shard_for(n, 3) for n in range(1, self.COUNT + 1))
+        self.assertEqual(moved, expected)
+        self.assertEqual(provider.load_layout(), (3, None))
+        self._check_everything_reachable(provider, 3)
+        # The directory's hints followed the servers: one shard per lookup.
+        moved_number = next(n for n in range(1, self.COUNT + 1) if shard_for(n, 3) == 2)
+        with count_queries(provider.shards[1].engine) as statements:
+            provider.get_server_by_mac(make_server(moved_number)["primary_mac"])
+        self.assertEqual(statements, [])
+        self.assertEqual(reshard(provider, 3, grace=0), 0)
+
+    def test_shrink(self):
+        provider = self._provider(self.urls[:3])
+        reshard(provider, 3, grace=0)
+        reshard(provider, 1, grace=0)
+        self._check_everything_reachable(provider, 1)
+        self.assertEqual(len(provider.list_servers(limit=1000)), self.COUNT)
+
+    def test_resumes_an_interrupted_reshard(self):
+        provider = self._provider(self.urls[:3])
+        provider.save_layout(3, 2)
+        self.assertEqual(provider.get_server_by_number(1)["server_number"], 1)
+        with self.assertRaises(ValueError):
+            reshard(provider, 2, grace=0)
+        reshard(provider, 3, grace=0)
+        self._check_everything_reachable(provider, 3)
+
+    def test_writes_during_a_reshard_are_kept(self):
+        provider = self._provider(self.urls[:4])
+        writer = self._provider(self.urls[:4])
+        provider.save_layout(4, 2)
+        stop = threading.Event()
+        last = {}
+        failures = []
+
+        def write():
+            statuses = ("online", "kicking", "provision", "done")
+            i = 0
+            while not stop.is_set():
+                number = i % self.COUNT + 1
+                status = statuses[i % len(statuses)]
+                result = writer.set_boot_status(number, status)
+                if result["operation"] == "success":
+                    last[number] = status
+                else:
+                    failures.append(number)
+                i += 1
+
+        thread = threading.Thread(target=write)
+        thread.start()
+        try:
+            reshard(provider, 4, batch=10, grace=0)
+        finally:
+            stop.set()
+            thread.join()
+        self.assertEqual(failures, [])
+        self.assertGreater(len(last), 0)
+        for number, status in last.items():
+            self.assertEqual(provider.get_server_by_number(number)["boot_status"], status)
+        self._check_everything_reachable(provider, 4)
+
+
+class TestReshardCommand(_ShardFiles):
+    def test_moves_servers_and_reports(self):
+        self.sharded.create_servers([make_server(n) for n in range(1, 51)])
+        out = io.StringIO()
+        with redirect_stdout(out):
+            db.main(["reshard", "--shards", *self.urls[:3], "--grace", "0", "--batch", "20"])
+        self.assertIn("Resharded to 3 shards", out.getvalue())
+        provider = self._provider(self.urls[:3])
+        self.assertEqual(provider.layout(), (3, None))
+        for n in range(1, 51):
+            self.assertEqual(self._holder(provider, n), [shard_for(n, 3)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+#   Copyright 2026 Michael Rice <michael@michaelrice.org>
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Tests for the in-memory snapshot provider."""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from sqlalchemy import func, insert, select, update
+
+from steel_pigs.plugins.providers.snapshot import ServerRecord, SnapshotProvider
+from steel_pigs.plugins.providers.sql import CHANGE_UPDATE, SQL, ServerChange, ServerDataModel
+from steel_pigs.synthetic import make_server
+from steel_pigs.tests import count_queries, seed_sql_plugin
+from steel_pigs.webapp import _load_plugin
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestSnapshotProvider(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.url = f"sqlite:///{Path(self._tmp.name) / 'inventory.db'}"
+        # A second provider stands in for writers elsewhere in the fleet.
+        self.db = SQL({"engine": self.url})
+        seed_sql_plugin(self.db)
+        self.db.create_server(make_server(700001, interfaces=[{"mac": "aa:bb:cc:01:00:01"}]))
+        self.clock = FakeClock()
+        self.snap = SnapshotProvider({"engine": self.url, "refresh_seconds": 2}, clock=self.clock)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_lookups_match_the_sql_provider(self):
+        lookups = [
+            ("get_server_by_number", (555121,)),
+            ("get_server_by_number", ("555121",)),
+            ("get_server_by_name", ("hogzilla",)),
+            ("get_server_by_mac", ("00:11:22:33:44:55",)),
+            ("get_server_by_mac", ("00-11-22-33-44-55",)),
+            ("get_server_by_mac", ("not a mac",)),
+            ("get_server_by_mac", ("AA-BB-CC-01-00-01",)),
+            ("get_server_by_switch", ("Switch 01", "2")),
+            ("get_server_by_number", (700001,)),
+            ("get_server_by_mac", ("ff:ff:ff:ff:ff:ff",)),
+            ("get_server_by_switch", ("Switch 01", "9")),
+        ]
+        for method, args in lookups:
+            with self.subTest(method=method, args=args):
+                self.assertEqual(getattr(self.snap, method)(*args), getattr(self.db, method)(*args))
+
+    def test_lookups_do_not_touch_the_database_between_polls(self):
+        with count_queries(self.snap.source.engine) as statements:
+            for _ in range(10):
+                self.snap.get_server_by_mac("00:11:22:33:44:55")
+        self.assertEqual(statements, [])
+
+    def test_returned_dicts_are_copies(self):
+        self.snap.get_server_by_number(555121)["boot_os"] = "mutated"
+        self.assertEqual(self.snap.get_server_by_number(555121)["boot_os"], "Ubuntu")
+
+    def test_external_writes_are_picked_up_incrementally(self):
+        self.db.set_boot_os(555121, "Fedora")
+        self.db.add_switch(700001, "Switch 02", "7")
+        self.db.create_server(make_server(700002, interfaces=[{"mac": "aa:bb:cc:01:00:02"}]))
+        self.assertEqual(self.snap.get_server_by_number(555121)["boot_os"], "Ubuntu")
+        self.clock.now += 3
+        self.assertEqual(self.snap.get_server_by_number(555121)["boot_os"], "Fedora")
+        self.assertEqual(self.snap.get_server_by_switch("Switch 02", "7")["server_number"], 700001)
+        self.assertIsNotNone(self.snap.get_server_by_name("node-700002"))
+        self.assertEqual(self.snap.get_server_by_mac("aa:bb:cc:01:00:02")["server_number"], 700002)
+        # Only the three touched servers were reloaded.
+        self.assertEqual(self.snap.stats()["snapshot"]["changes_applied"], 3)
+
+    def _commit_boot_os(self, change_id, number, boot_os):
+        # A writer that took its log id earlier than it commits.
+        with self.db.engine.begin() as conn:
+            conn.execute(
+                update(ServerDataModel)
+                .where(ServerDataModel.server_number == number)
+                .values(boot_os=boot_os)
+            )
+            conn.execute(
+                insert(ServerChange).values(
+                    id=change_id, server_number=number, action=CHANGE_UPDATE, field="boot_os"
+                )
+            )
+
+    def test_changes_committed_out_of_order_are_not_missed(self):
+        snap = SnapshotProvider(
+            {"engine": self.url, "refresh_seconds": 2, "change_commit_lag_seconds": 0.05},
+            clock=self.clock,
+        )
+        with self.db.engine.connect() as conn:
+            mark = conn.execute(select(func.max(ServerChange.id))).scalar()
+        self._commit_boot_os(mark + 2, 555121, "Fedora")
+        self.assertEqual(snap.refresh(), 1)
+        self.assertEqual(snap.get_server_by_number(555121)["boot_os"], "Fedora")
+        # Id mark + 1 may still commit: the mark stays put.
+        self.assertEqual(snap.stats()["snapshot"]["mark"], mark)
+        self._commit_boot_os(mark + 1, 700001, "Debian")
+        self.assertEqual(snap.refresh(), 1)
+        self.assertEqual(snap.get_server_by_number(700001)["boot_os"], "Debian")
+        self.clock.now += 1
+        self.assertEqual(snap.refresh(), 0)
+        self.assertEqual(snap.stats()["snapshot"]["mark"], mark + 2)
+        self.assertEqual(snap.stats()["snapshot"]["changes_applied"], 2)
+
+    def test_writes_through_the_snapshot_are_visible_immediately(self):
+        self.assertEqual(self.snap.update_server_field(555121, "boot_status", "online"), "kicking")
+        self.assertEqual(self.snap.get_server_by_number(555121)["boot_status"], "online")
+        self.snap.create_server(make_server(700003))
+        self.assertEqual(self.snap.get_server_by_number(700003)["hostname"], "node-700003")
+
+    def test_records_are_compact(self):
+        record = self.snap._indexes["number"][555121]
+        self.assertIsInstance(record, ServerRecord)
+        self.assertFalse(hasattr(record, "__dict__"))
+        other = self.snap._indexes["number"][700001]
+        # Repeated values share one string object.
+        boot_os = record.values.index("Ubuntu")
+        self.assertIs(record.values[boot_os], other.values[boot_os])
+
+    def test_loads_through_plugin_config(self):
+        provider = _load_plugin(
+            {
+                "namespace": "steel_pigs.plugins.providers.snapshot",
+                "class": "SnapshotProvider",
+                "engine": self.url,
+            }
+        )
+        self.assertEqual(provider.get_server_by_number(700001)["hostname"], "node-700001")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+#   Copyright 2026 Michael Rice <michael@michaelrice.org>
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""SQLite connection pragmas and multi-process read/write behaviour."""
+
+import multiprocessing
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from sqlalchemy.exc import OperationalError
+
+from steel_pigs.plugins.providers.sql import SQL, SQLITE_PRAGMAS
+from steel_pigs.tests import seed_sql_plugin
+
+STRESS_SECONDS = 1.5
+
+
+def _pragma(sql, name):
+    with sql.engine.connect() as conn:
+        return conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+
+
+def _stress_worker(url, role, start, results):
+    """One process hammering the DB until ``STRESS_SECONDS`` have passed."""
+    sql = SQL({"engine": url})
+    done = errors = 0
+    start.wait()
+    deadline = time.monotonic() + STRESS_SECONDS
+    while time.monotonic() < deadline:
+        try:
+            if role == "writer":
+                sql.update_server_field(555121, "boot_os", f"os-{done}")
+            else:
+                sql.get_server_by_number(555121)
+        except OperationalError:
+            errors += 1
+        else:
+            done += 1
+    results.put((role, done, errors))
+
+
+class TestSqlitePragmas(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.url = f"sqlite:///{Path(self._tmp.name) / 'inventory.db'}"
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_defaults_are_applied_to_file_databases(self):
+        sql = SQL({"engine": self.url})
+        self.assertEqual(_pragma(sql, "journal_mode"), "wal")
+        self.assertEqual(_pragma(sql, "busy_timeout"), SQLITE_PRAGMAS["busy_timeout"])
+        self.assertEqual(_pragma(sql, "synchronous"), 1)  # NORMAL
+        self.assertEqual(_pragma(sql, "cache_size"), SQLITE_PRAGMAS["cache_size"])
+
+    def test_config_overrides_and_disables_pragmas(self):
+        sql = SQL(
+            {
+                "engine": self.url,
+                "sqlite_pragmas": {"busy_timeout": 250, "journal_mode": None},
+            }
+        )
+        self.assertEqual(_pragma(sql, "busy_timeout"), 250)
+        self.assertEqual(_pragma(sql, "journal_mode"), "delete")
+
+    def test_invalid_pragma_is_rejected(self):
+        with self.assertRaises(ValueError):
+            SQL({"engine": self.url, "sqlite_pragmas": {"cache_size": "1; DROP TABLE x"}})
+
+
+class TestConcurrentReadersAndWriter(unittest.TestCase):
+    """Several reader processes and one writer on the same SQLite file.
+
+    With WAL and busy_timeout none of them may see "database is locked",
+    and readers must keep making progress while the writer commits.
+    """
+
+    READERS = 3
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.url = f"sqlite:///{Path(self._tmp.name) / 'inventory.db'}"
+        seed_sql_plugin(SQL({"engine": self.url}))
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_reads_progress_during_writes_without_lock_errors(self):
+        ctx = multiprocessing.get_context("spawn")
+        start, results = ctx.Event(), ctx.Queue()
+        roles = ["writer"] + ["reader"] * self.READERS
+        procs = [
+            ctx.Process(target=_stress_worker, args=(self.url, role, start, results))
+            for role in roles
+        ]
+        for proc in procs:
+            proc.start()
+        start.set()
+        outcomes = [results.get(timeout=60) for _ in procs]
+        for proc in procs:
+            proc.join(10)
+
+        reads = sum(done for role, done, _ in outcomes if role == "reader")
+        writes = sum(done for role, done, _ in outcomes if role == "writer")
+        self.assertEqual([errors for *_, errors in outcomes], [0] * len(procs))
+        self.assertGreater(writes, 0)
+        for role, done, _ in outcomes:
+            self.assertGreater(done, 0, f"a {role} made no progress")
+        # Readers aren't serialized behind the writer: together they
+        # complete more operations than it does.
+        self.assertGreater(reads, writes)
+
+
+if __name__ == "__main__":
+    unittest.main()
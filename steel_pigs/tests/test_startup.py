@@ -0,0 +1,142 @@
+#   Copyright 2026 Michael Rice <michael@michaelrice.org>
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Worker startup: what importing the app loads, and lazy plugin loading.
+
+Set ``STEEL_PIGS_TEST_ARTIFACTS`` to a directory to keep the
+``python -X importtime`` report for ``import steel_pigs.webapp`` as
+``importtime.txt`` (CI uploads it).
+"""
+
+import os
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+from steel_pigs.generation import LocalGeneration
+from steel_pigs.webapp import LazyPlugins, Plugins, create_app
+
+# Only loaded once a plugin is built or the demo UI is used.
+DEFERRED_MODULES = ("sqlalchemy", "alembic", "flask_wtf", "steel_pigs.pigs_app_settings.forms")
+
+
+def importtime_report(module):
+    """``(module, self us, cumulative us)`` rows for importing ``module``."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, "STEEL_PIGS_SECRET_KEY": "importtime"},
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+class CountingPlugin:
+    built = 0
+
+    def __init__(self, spec):
+        type(self).built += 1
+        self.spec = spec
+
+
+def _spec(cls="CountingPlugin", namespace=__name__):
+    return {"namespace": namespace, "class": cls}
+
+
+class TestImportTime(unittest.TestCase):
+    def test_app_import_defers_heavy_modules(self):
+        rows = importtime_report("steel_pigs.webapp")
+        artifacts = os.environ.get("STEEL_PIGS_TEST_ARTIFACTS")
+        if artifacts:
+            path = Path(artifacts) / "importtime.txt"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            ordered = sorted(rows, key=lambda row: row[2], reverse=True)
+            path.write_text(
+                f"{'cumulative us':>14} {'self us':>9}  module\n"
+                + "".join(f"{c:>14} {s:>9}  {name}\n" for name, s, c in ordered)
+            )
+        imported = {name for name, _, _ in rows}
+        for module in DEFERRED_MODULES:
+            self.assertNotIn(module, imported)
+
+
+class TestLazyPlugins(unittest.TestCase):
+    def setUp(self):
+        CountingPlugin.built = 0
+        specs = {name: _spec() for name in ("server_data", "version", "formatter")}
+        specs.update(pxe=_spec(), provision=_spec(), auth=_spec())
+        self.plugins = LazyPlugins(specs, {"enabled": False}, LocalGeneration())
+
+    def test_nothing_is_built_up_front(self):
+        self.plugins.import_modules()
+        self.assertEqual(CountingPlugin.built, 0)
+
+    def test_each_plugin_is_built_once(self):
+        first = self.plugins.version
+        self.assertIs(self.plugins.version, first)
+        self.assertEqual(CountingPlugin.built, 1)
+        self.assertEqual(first.spec, _spec())
+
+    def test_load_all(self):
+        loaded = self.plugins.load_all()
+        self.assertIsInstance(loaded, Plugins)
+        self.assertEqual(CountingPlugin.built, 6)
+
+    def test_unknown_attribute(self):
+        with self.assertRaises(AttributeError):
+            self.plugins.nope  # noqa: B018
+
+    def test_readyz_is_503_when_the_provider_fails_to_load(self):
+        app = create_app(config_overrides={"TESTING": True})
+        specs = {name: _spec() for name in ("version", "formatter", "pxe", "provision", "auth")}
+        specs["server_data"] = _spec(namespace="steel_pigs.plugins.providers.missing")
+        app.extensions["steel_pigs"] = LazyPlugins(specs, {}, LocalGeneration())
+        with self.assertLogs("steel_pigs.webapp", "ERROR"):
+            rv = app.test_client().get("/readyz")
+        self.assertEqual(rv.status_code, 503)
+        self.assertEqual(rv.get_json()["reason"], "plugins not initialized")
+
+
+class TestGunicornHooks(unittest.TestCase):
+    def test_worker_init_builds_the_plugins(self):
+        from steel_pigs import gunicorn_conf, webapp
+
+        lazy = webapp.app.extensions["steel_pigs"]
+        gunicorn_conf.when_ready(SimpleNamespace(cfg=SimpleNamespace(preload_app=True)))
+        gunicorn_conf.post_worker_init(worker=None)
+        self.assertIn("server_data", vars(lazy))
+        self.assertTrue(lazy.server_data.ready())
+
+    def test_long_polls_fit_in_a_worker(self):
+        from steel_pigs import gunicorn_conf
+        from steel_pigs.schemas import CHANGES_WAIT_MAX
+
+        # A waiting GET /v1/changes must hold one thread, not the
+        # worker, and finish well before the worker timeout.
+        self.assertEqual(gunicorn_conf.worker_class, "gthread")
+        self.assertGreater(gunicorn_conf.threads, 1)
+        self.assertGreaterEqual(gunicorn_conf.timeout, CHANGES_WAIT_MAX + 15)
+
+
+if __name__ == "__main__":
+    unittest.main()
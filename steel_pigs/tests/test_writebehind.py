@@ -0,0 +1,256 @@
+#   Copyright 2026 Michael Rice <michael@michaelrice.org>
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Tests for the boot-status write-behind buffer."""
+
+import os
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from steel_pigs import pigs_config
+from steel_pigs.exceptions.pigs_exceptions import ServerNotFound
+from steel_pigs.generation import LocalGeneration
+from steel_pigs.plugins.providers.caching import CachingProvider
+from steel_pigs.plugins.providers.pluginbase import ProviderPluginBase
+from steel_pigs.plugins.providers.sql import SQL
+from steel_pigs.plugins.providers.writebehind import WriteBehindProvider
+from steel_pigs.synthetic import server_mac
+from steel_pigs.tests import app_with_provider, count_queries, seed_sql_plugin, server_template
+from steel_pigs.webapp import create_app
+
+API_TOKEN = "write-behind-token"
+
+
+def _sql(numbers=()):
+    sql = SQL({"engine": "sqlite:///:memory:"})
+    seed_sql_plugin(sql)
+    template = server_template(sql)
+    sql.create_servers(
+        [template | {"server_number": n, "primary_mac": server_mac(n)} for n in numbers]
+    )
+    return sql
+
+
+def _status(sql, number):
+    return sql.get_server_by_number(number)["boot_status"]
+
+
+class TestUpdateServerFields(unittest.TestCase):
+    def setUp(self):
+        self.sql = _sql(range(1, 7))
+
+    def test_one_transaction_for_every_value(self):
+        values = {1: "kicking", 2: "done", 3: "kicking", 4: "online", 999: "done"}
+        since = self.sql.change_feed.head()
+        with count_queries(self.sql.engine) as statements:
+            previous = self.sql.update_server_fields("boot_status", values)
+        self.assertEqual(sorted(previous), [1, 2, 3, 4])
+        self.assertEqual(
+            {n: _status(self.sql, n) for n in (1, 2, 3, 4)},
+            {1: "kicking", 2: "done", 3: "kicking", 4: "online"},
+        )
+        # Lock, update and change log per distinct value, not per server.
+        self.assertEqual(len(statements), 9)
+        self.assertEqual(
+            sorted(c["server_number"] for c in self.sql.list_changes(since)), [1, 2, 3, 4]
+        )
+
+    def test_default_matches_the_override(self):
+        values = {1: "done", 2: "online", 404: "done"}
+        self.assertEqual(
+            ProviderPluginBase.update_server_fields(self.sql, "boot_status", values),
+            {1: "kicking", 2: "kicking"},
+        )
+        self.assertEqual(
+            self.sql.update_server_fields("boot_status", {1: "kicking", 2: "kicking"}),
+            {1: "done", 2: "online"},
+        )
+
+    def test_rejects_other_fields(self):
+        with self.assertRaises(ValueError):
+            self.sql.update_server_fields("hostname", {1: "x"})
+
+
+class TestWriteBehind(unittest.TestCase):
+    def setUp(self):
+        self.sql = _sql(range(1, 41))
+        self.generation = LocalGeneration()
+
+    def _buffer(self, **kwargs):
+        kwargs.setdefault("window_seconds", 60)
+        buffer = WriteBehindProvider(self.sql, generation=self.generation, **kwargs)
+        self.addCleanup(buffer.close)
+        return buffer
+
+    def test_last_write_wins_in_one_flush(self):
+        buffer = self._buffer()
+        since = self.sql.change_feed.head()
+        with count_queries(self.sql.engine) as statements:
+            for status in ("kicking", "provision", "done"):
+                for n in range(1, 41):
+                    buffer.set_boot_status(n, status)
+        self.assertEqual(len(statements), 40)  # one existence read per new server
+        self.assertEqual(_status(self.sql, 1), "kicking")
+        before = self.generation.current()
+        buffer.flush()
+        self.assertEqual({_status(self.sql, n) for n in range(1, 41)}, {"done"})
+        self.assertEqual(len(self.sql.list_changes(since, limit=1000)), 40)
+        self.assertGreater(self.generation.current(), before)
+        stats = buffer.stats()["write_behind"]
+        self.assertEqual((stats["writes"], stats["coalesced"]), (120, 80))
+        self.assertEqual((stats["flushes"], stats["flushed_rows"], stats["pending"]), (1, 40, 0))
+
+    def test_reads_and_before_values_see_the_queue(self):
+        buffer = self._buffer()
+        self.assertEqual(buffer.update_server_field(1, "boot_status", "provision"), "kicking")
+        self.assertEqual(buffer.update_server_field("1", "boot_status", "done"), "provision")
+        self.assertEqual(buffer.get_server_by_number(1)["boot_status"], "done")
+        self.assertEqual(buffer.get_server_by_mac("02:00:00:00:00:01")["boot_status"], "done")
+        found = buffer.lookup_servers(server_numbers=[1, 2])
+        self.assertEqual(found["server_numbers"][1]["boot_status"], "done")
+        self.assertEqual(found["server_numbers"][2]["boot_status"], "kicking")
+        self.assertEqual(_status(self.sql, 1), "kicking")
+
+    def test_unknown_server_is_not_queued(self):
+        buffer = self._buffer()
+        with self.assertRaises(ServerNotFound):
+            buffer.update_server_field(404, "boot_status", "done")
+        self.assertEqual(buffer.set_boot_status(404, "done")["operation"], "failure")
+        self.assertEqual(buffer.stats()["write_behind"]["pending"], 0)
+
+    def test_other_fields_write_through(self):
+        buffer = self._buffer()
+        self.assertEqual(buffer.update_server_field(1, "boot_os", "Gentoo"), "Ubuntu")
+        self.assertEqual(self.sql.get_server_by_number(1)["boot_os"], "Gentoo")
+
+    def test_bulk_update_lands_after_the_queue(self):
+        buffer = self._buffer()
+        buffer.set_boot_status(1, "provision")
+        buffer.bulk_update_field("boot_status", "online", server_numbers=[1, 2])
+        buffer.flush()
+        self.assertEqual([_status(self.sql, n) for n in (1, 2)], ["online", "online"])
+
+    def test_window_flushes_in_the_background(self):
+        buffer = self._buffer(window_seconds=0.01)
+        buffer.set_boot_status(1, "done")
+        self.assertTrue(self._eventually(lambda: _status(self.sql, 1) == "done"))
+
+    def test_full_queue_flushes_early(self):
+        buffer = self._buffer(max_pending=4)
+        for n in range(1, 10):
+            buffer.set_boot_status(n, "done")
+        self.assertTrue(self._eventually(lambda: buffer.stats()["write_behind"]["flushes"] >= 2))
+        self.assertLessEqual(buffer.stats()["write_behind"]["pending"], 4)
+        self.assertGreaterEqual(buffer.stats()["write_behind"]["full_waits"], 2)
+
+    def test_sync_ack_returns_after_the_commit(self):
+        buffer = self._buffer(window_seconds=0.01, sync_ack=True)
+        threads = [
+            threading.Thread(target=buffer.set_boot_status, args=(n, "online"))
+            for n in range(1, 21)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual({_status(self.sql, n) for n in range(1, 21)}, {"online"})
+        self.assertLess(buffer.stats()["write_behind"]["flushes"], 20)
+
+    def test_sync_ack_raises_a_failed_flush(self):
+        buffer = self._buffer(window_seconds=0.01, sync_ack=True)
+        with (
+            patch.object(self.sql, "update_server_fields", side_effect=RuntimeError("down")),
+            self.assertLogs("steel_pigs.plugins.providers.writebehind", "ERROR"),
+            self.assertRaises(RuntimeError),
+        ):
+            buffer.set_boot_status(1, "done")
+        self.assertEqual(buffer.stats()["write_behind"]["pending"], 0)
+
+    def test_failed_flush_is_requeued_behind_newer_writes(self):
+        buffer = self._buffer()
+        buffer.set_boot_status(1, "provision")
+        buffer.set_boot_status(2, "provision")
+        with (
+            patch.object(self.sql, "update_server_fields", side_effect=RuntimeError("down")),
+            self.assertLogs("steel_pigs.plugins.providers.writebehind", "ERROR"),
+        ):
+            buffer.flush()
+        buffer.set_boot_status(2, "done")
+        buffer.flush()
+        self.assertEqual([_status(self.sql, n) for n in (1, 2)], ["provision", "done"])
+
+    def test_close_flushes_and_later_writes_go_through(self):
+        buffer = self._buffer(window_seconds=60)
+        buffer.set_boot_status(1, "done")
+        buffer.close()
+        self.assertEqual(_status(self.sql, 1), "done")
+        buffer.set_boot_status(2, "online")
+        self.assertEqual(_status(self.sql, 2), "online")
+
+    @staticmethod
+    def _eventually(check, timeout=5):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if check():
+                return True
+            time.sleep(0.01)
+        return False
+
+
+class TestWriteBehindWiring(unittest.TestCase):
+    def setUp(self):
+        patcher = patch.dict(os.environ, {"STEEL_PIGS_API_TOKEN": API_TOKEN})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_buffer_sits_under_the_cache(self):
+        config = {"enabled": True, "window_seconds": 0.05, "max_pending": 10, "sync_ack": False}
+        with (
+            patch.dict(pigs_config.PROVIDER_WRITE_BEHIND, config),
+            patch.dict(pigs_config.PROVIDER_CACHE, {"enabled": True}),
+        ):
+            app = create_app(config_overrides={"TESTING": True})
+        provider = app.extensions["steel_pigs"].server_data
+        self.addCleanup(provider.provider.close)
+        self.assertIsInstance(provider, CachingProvider)
+        self.assertIsInstance(provider.provider, WriteBehindProvider)
+        self.assertEqual(provider.provider.max_pending, 10)
+
+    def test_status_route_is_acknowledged_before_the_flush(self):
+        sql = _sql()
+        buffer = WriteBehindProvider(sql, window_seconds=60)
+        self.addCleanup(buffer.close)
+        client = app_with_provider(buffer).test_client()
+        rv = client.post(
+            "/v1/update/status",
+            json={"server_number": 555121, "boot_status": "done"},
+            headers={"Authorization": f"Bearer {API_TOKEN}"},
+        )
+        self.assertEqual(rv.get_json(), {"operation": "success", "status_set": "done"})
+        self.assertEqual(_status(sql, 555121), "kicking")
+        self.assertIn(
+            b"set steel_beard_boot_status done", client.get("/pxe?server_number=555121").data
+        )
+        buffer.flush()
+        self.assertEqual(_status(sql, 555121), "done")
+
+    def test_disabled_by_default(self):
+        app = create_app(config_overrides={"TESTING": True})
+        self.assertNotIsInstance(app.extensions["steel_pigs"].server_data, WriteBehindProvider)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -28,31 +28,59 @@ The demo HTML frontend stays as a vanilla Flask Blueprint (so it
 doesn't appear in the OpenAPI spec).
 """
 
+import asyncio
+import csv
+import functools
+import io
+import json
 import logging
+import threading
 import uuid
+import weakref
 from dataclasses import dataclass
 from importlib import import_module
 from typing import Any
 
 from apiflask import APIBlueprint, APIFlask, abort
-from flask import current_app, g, make_response, render_template, request
+from flask import current_app, g, make_response, render_template, request, stream_with_context
 from flask_bootstrap import Bootstrap5
+from marshmallow import ValidationError
 
 from . import audit, pigs_config
 from .auth import auth
 from .exceptions.pigs_exceptions import ServerAlreadyExists, ServerNotFound
+from .generation import make_generation
 from .pigs_app_settings.frontend import frontend
+from .plugins.providers.caching import CachingProvider
+from .plugins.providers.writebehind import WriteBehindProvider
 from .schemas import (
+    BULK_TARGETS,
+    CHANGES_PAGE_MAX,
+    LOOKUP_MAX,
+    SERVER_PAGE_MAX,
     AddSwitchIn,
     BootOsResultOut,
     BootStatusResultOut,
+    BulkCreateServersOut,
+    BulkUpdateBootOsIn,
+    BulkUpdateBootStatusIn,
+    BulkUpdateOpStatusIn,
+    BulkUpdateResultOut,
+    ChangesOut,
+    ChangesQuery,
     CreateServerIn,
     HardwareQuery,
     HealthOut,
     OpStatusResultOut,
     ProvisionQuery,
     PxeQuery,
+    ServerExportOut,
+    ServerExportQuery,
+    ServerListQuery,
+    ServerLookupIn,
+    ServerLookupOut,
     ServerOut,
+    ServerPageOut,
     SwitchOut,
     UpdateBootOsIn,
     UpdateBootStatusIn,
@@ -90,6 +118,76 @@ def _load_plugin(spec):
     return klass(spec)
 
 
+def _wrap_provider(provider, generation, cfg, write_behind=None):
+    """Layer the optional write-behind buffer, then the read-through
+    cache, over the inventory provider."""
+    if write_behind and write_behind.get("enabled"):
+        provider = WriteBehindProvider(
+            provider,
+            window_seconds=write_behind["window_seconds"],
+            max_pending=write_behind["max_pending"],
+            sync_ack=write_behind["sync_ack"],
+            generation=generation,
+        )
+    if not cfg.get("enabled"):
+        return provider
+    return CachingProvider(
+        provider,
+        max_entries=cfg["max_entries"],
+        ttl_seconds=cfg["ttl_seconds"],
+        generation=generation,
+    )
+
+
+class LazyPlugins:
+    """The configured plugins, each imported and built on first use.
+
+    Stands in for :class:`Plugins` in ``app.extensions``. Importing the
+    app therefore doesn't load SQLAlchemy or open a database, and a
+    gunicorn master that preloads the app (``GUNICORN_PRELOAD``) forks
+    workers that build their own engines instead of sharing the
+    master's connections. Specs and cache settings are captured when
+    the app is created.
+    """
+
+    def __init__(self, specs, cache_config, generation, write_behind_config=None):
+        self._specs = specs
+        self._cache_config = cache_config
+        self._write_behind_config = write_behind_config
+        self._generation = generation
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        # Only reached until the plugin is cached in the instance dict.
+        if name.startswith("_") or name not in self._specs:
+            raise AttributeError(name)
+        with self._lock:
+            if name not in self.__dict__:
+                plugin = _load_plugin(self._specs[name])
+                if name == "server_data":
+                    plugin = _wrap_provider(
+                        plugin,
+                        self._generation,
+                        self._cache_config,
+                        self._write_behind_config,
+                    )
+                self.__dict__[name] = plugin
+        return self.__dict__[name]
+
+    def import_modules(self):
+        """Import every plugin module without building anything.
+
+        Run in a preloading master so workers share the imported code
+        copy-on-write.
+        """
+        for spec in self._specs.values():
+            import_module(spec["namespace"])
+
+    def load_all(self) -> Plugins:
+        """Build every plugin now (e.g. when a worker boots)."""
+        return Plugins(**{name: getattr(self, name) for name in self._specs})
+
+
 def _plugins() -> Plugins:
     return current_app.extensions["steel_pigs"]
 
@@ -120,11 +218,38 @@ def healthz():
 
 @api.get("/readyz")
 @api.output(HealthOut)
-@api.doc(summary="Readiness probe", description="Returns 200 if create_app() registered plugins.")
+@api.doc(
+    summary="Readiness probe",
+    description=(
+        "Returns 200 once the inventory provider loads and reports ready "
+        "(e.g. its database schema matches this build); 503 otherwise."
+    ),
+    responses={200: {"description": "Ready"}, 503: {"description": "Not ready"}},
+)
 def readyz():
+    try:
+        ready = _plugins().server_data.ready()
+    except Exception:
+        log.exception("Loading the inventory provider failed.")
+        return {"status": "unavailable", "reason": "plugins not initialized"}, 503
+    if not ready:
+        return {"status": "unavailable", "reason": "inventory provider not ready"}, 503
     return {"status": "ok"}
 
 
+@api.get("/stats")
+@api.doc(
+    summary="Inventory provider counters",
+    description=(
+        "Whatever the inventory plugin reports from ``stats()`` -- cache "
+        "hit/miss counters when the provider cache is enabled. The shape "
+        "depends on the configured plugins."
+    ),
+)
+def get_stats():
+    return {"provider": _plugins().server_data.stats()}
+
+
 @api.get("/pxe")
 @api.input(PxeQuery, location="query")
 @api.doc(
@@ -143,15 +268,17 @@ def readyz():
         412: {"description": "No identification params supplied"},
     },
 )
-def get_pxe_script(query_data):
+async def get_pxe_script(query_data):
     log.info("Request to /pxe with params: %s", _log_safe(query_data))
     p = _plugins()
     if query_data["server_number"] is not None:
-        server_data = p.server_data.get_server_by_number(query_data["server_number"])
+        server_data = await p.server_data.aget_server_by_number(query_data["server_number"])
     elif query_data["mac"] is not None:
-        server_data = p.server_data.get_server_by_mac(p.formatter.format_mac(query_data["mac"]))
+        server_data = await p.server_data.aget_server_by_mac(
+            p.formatter.format_mac(query_data["mac"])
+        )
     elif query_data["switch_name"] is not None and query_data["switch_port"] is not None:
-        server_data = p.server_data.get_server_by_switch(
+        server_data = await p.server_data.aget_server_by_switch(
             p.formatter.format_switch(query_data["switch_name"]),
             p.formatter.format_port(query_data["switch_port"]),
         )
@@ -193,7 +320,7 @@ def get_hardware_specs(query_data):
     summary="Software versions metadata (JSON)",
     description="Returned shape is determined by the configured version plugin.",
 )
-def get_software_versions_json():
+async def get_software_versions_json():
     log.info("Returning version data.")
     return _plugins().version.get_latest_versions()
 
@@ -209,7 +336,7 @@ def get_software_versions_json():
         },
     },
 )
-def get_software_versions_ipxe(project=None):
+async def get_software_versions_ipxe(project=None):
     log.info("Fetching iPXE version script.")
     r = make_response(_plugins().version.get_latest_ipxe(project))
     r.mimetype = "text/plain"
@@ -234,10 +361,10 @@ def get_software_versions_ipxe(project=None):
         404: {"description": "Server not found for given MAC"},
     },
 )
-def begin_os_provisioning(query_data):
+async def begin_os_provisioning(query_data):
     log.info("Fetching provision start: %s", _log_safe(query_data))
     p = _plugins()
-    server = p.server_data.get_server_by_mac(mac=query_data["mac"])
+    server = await p.server_data.aget_server_by_mac(mac=query_data["mac"])
     if server is None:
         abort(404, f"Server not found using {query_data['mac']}")
     op_status = str(server["operational_status"]).lower()
@@ -253,13 +380,46 @@ def begin_os_provisioning(query_data):
 v1 = APIBlueprint("v1", __name__, url_prefix="/v1", tag="Mutate")
 
 
-def _audit_context(field, server_number, new_value):
-    """Build before/after snapshots for the audit log."""
-    existing = _plugins().server_data.get_server_by_number(server_number)
-    return {
-        "before": {field: existing[field]} if existing else None,
-        "after": {field: new_value},
-    }
+# POSTs that only read; they leave every worker's cache alone.
+_READ_ONLY_POSTS = {"v1.v1_lookup_servers"}
+
+
+@v1.after_request
+def _bump_cache_generation(response):
+    # Runs before the response is sent: by the time a client sees the
+    # acknowledgement, every worker's next read will drop its caches.
+    if (
+        request.method not in ("GET", "HEAD", "OPTIONS")
+        and request.endpoint not in _READ_ONLY_POSTS
+        and response.status_code < 400
+    ):
+        current_app.extensions["steel_pigs.generation"].bump()
+    return response
+
+
+def _update_one(action, field, server_number, value, result_key):
+    """Run a single-server ``/v1/update/*`` request and audit it.
+
+    The provider changes the field and hands back the value it replaced
+    in one transaction, so the audit ``before`` is exactly what the
+    write overwrote -- no separate pre-read.
+    """
+    try:
+        before = _plugins().server_data.update_server_field(server_number, field, value)
+    except ServerNotFound:
+        log.info("Unable to locate %s to set %s.", _log_safe(server_number), field)
+        snapshot, result = None, {"operation": "failure", result_key: "unable to locate device"}
+    else:
+        snapshot, result = {field: before}, {"operation": "success", result_key: value}
+    audit.emit(
+        action=action,
+        resource=f"server/{server_number}",
+        actor=g.get("actor"),
+        before=snapshot,
+        after={field: value},
+        request_id=g.get("request_id"),
+    )
+    return result
 
 
 @v1.post("/update/status")
@@ -268,19 +428,13 @@ def _audit_context(field, server_number, new_value):
 @v1.input(UpdateBootStatusIn)
 @v1.output(BootStatusResultOut)
 def v1_set_boot_status(json_data):
-    server_number = json_data["server_number"]
-    boot_status = json_data["boot_status"]
-    ctx = _audit_context("boot_status", server_number, boot_status)
-    result = _plugins().server_data.set_boot_status(server_number, boot_status)
-    audit.emit(
-        action="set_boot_status",
-        resource=f"server/{server_number}",
-        actor=g.get("actor"),
-        before=ctx["before"],
-        after=ctx["after"],
-        request_id=g.get("request_id"),
+    return _update_one(
+        "set_boot_status",
+        "boot_status",
+        json_data["server_number"],
+        json_data["boot_status"],
+        "status_set",
     )
-    return result
 
 
 @v1.post("/update/os")
@@ -289,19 +443,9 @@ def v1_set_boot_status(json_data):
 @v1.input(UpdateBootOsIn)
 @v1.output(BootOsResultOut)
 def v1_set_boot_os(json_data):
-    server_number = json_data["server_number"]
-    boot_os = json_data["boot_os"]
-    ctx = _audit_context("boot_os", server_number, boot_os)
-    result = _plugins().server_data.set_boot_os(server_number, boot_os)
-    audit.emit(
-        action="set_boot_os",
-        resource=f"server/{server_number}",
-        actor=g.get("actor"),
-        before=ctx["before"],
-        after=ctx["after"],
-        request_id=g.get("request_id"),
+    return _update_one(
+        "set_boot_os", "boot_os", json_data["server_number"], json_data["boot_os"], "os_set"
     )
-    return result
 
 
 @v1.post("/update/opstatus")
@@ -310,19 +454,97 @@ def v1_set_boot_os(json_data):
 @v1.input(UpdateOpStatusIn)
 @v1.output(OpStatusResultOut)
 def v1_set_operational_status(json_data):
-    server_number = json_data["server_number"]
-    operational_status = json_data["opstatus"]
-    ctx = _audit_context("operational_status", server_number, operational_status)
-    result = _plugins().server_data.set_operational_status(server_number, operational_status)
+    return _update_one(
+        "set_operational_status",
+        "operational_status",
+        json_data["server_number"],
+        json_data["opstatus"],
+        "status_set",
+    )
+
+
+def _bulk_update(action, field, value, json_data):
+    """Run a ``/v1/update/*:bulk`` request and audit it as one event."""
+    targets = {key: json_data[key] for key in BULK_TARGETS if key in json_data}
+    try:
+        previous = _plugins().server_data.bulk_update_field(field, value, **targets)
+    except NotImplementedError as exc:
+        abort(501, str(exc))
+    requested = targets.get("server_numbers")
+    order = dict.fromkeys(requested) if requested is not None else sorted(previous)
+    results = []
+    for number in order:
+        if number in previous:
+            results.append(
+                {
+                    "server_number": number,
+                    "operation": "success",
+                    "before": previous[number],
+                    "after": value,
+                }
+            )
+        else:
+            results.append(
+                {
+                    "server_number": number,
+                    "operation": "failure",
+                    "message": "unable to locate device",
+                }
+            )
+    selector = "&".join(f"{k}={v}" for k, v in targets.items() if k != "server_numbers")
     audit.emit(
-        action="set_operational_status",
-        resource=f"server/{server_number}",
+        action=f"bulk_{action}",
+        resource=f"servers?{selector}" if selector else "servers",
         actor=g.get("actor"),
-        before=ctx["before"],
-        after=ctx["after"],
+        before={str(n): {field: old} for n, old in previous.items()},
+        after={str(n): {field: value} for n in previous},
         request_id=g.get("request_id"),
     )
-    return result
+    return {
+        "updated": len(previous),
+        "failed": len(results) - len(previous),
+        "results": results,
+    }
+
+
+_BULK_UPDATE_DESCRIPTION = (
+    "Target exactly one of: ``server_numbers`` (a list), ``switch_name`` "
+    "(every server attached to that switch) or ``provision_zone_id``. Runs "
+    "as one set-based update; listed servers that don't exist come back "
+    "as per-server failures. Emits a single audit event for the batch."
+)
+
+
+@v1.post("/update/status:bulk")
+@v1.doc(summary="Set the boot status of many servers", description=_BULK_UPDATE_DESCRIPTION)
+@v1.auth_required(auth)
+@v1.input(BulkUpdateBootStatusIn)
+@v1.output(BulkUpdateResultOut)
+def v1_bulk_set_boot_status(json_data):
+    return _bulk_update("set_boot_status", "boot_status", json_data["boot_status"], json_data)
+
+
+@v1.post("/update/os:bulk")
+@v1.doc(summary="Set the boot OS of many servers", description=_BULK_UPDATE_DESCRIPTION)
+@v1.auth_required(auth)
+@v1.input(BulkUpdateBootOsIn)
+@v1.output(BulkUpdateResultOut)
+def v1_bulk_set_boot_os(json_data):
+    return _bulk_update("set_boot_os", "boot_os", json_data["boot_os"], json_data)
+
+
+@v1.post("/update/opstatus:bulk")
+@v1.doc(
+    summary="Set the operational status of many servers",
+    description=_BULK_UPDATE_DESCRIPTION,
+)
+@v1.auth_required(auth)
+@v1.input(BulkUpdateOpStatusIn)
+@v1.output(BulkUpdateResultOut)
+def v1_bulk_set_operational_status(json_data):
+    return _bulk_update(
+        "set_operational_status", "operational_status", json_data["opstatus"], json_data
+    )
 
 
 @v1.post("/servers")
@@ -333,11 +555,13 @@ def v1_set_operational_status(json_data):
         "boot template selection (boot_os, boot_os_version, boot_profile), "
         "and the NTP server. ``bootstrapped``, ``boot_status``, "
         "``operational_status``, and ``dns_domain_name`` get sensible "
-        "first-boot defaults if omitted."
+        "first-boot defaults if omitted. ``interfaces`` lists the server's "
+        "other NICs (``mac`` and a free-form ``role``, default ``data``) so "
+        "``/pxe?mac=`` finds it whichever NIC it boots from."
     ),
     responses={
         201: {"description": "Server registered"},
-        409: {"description": "server_number already exists"},
+        409: {"description": "server_number or an interface MAC already exists"},
         422: {"description": "Validation error"},
     },
 )
@@ -361,6 +585,344 @@ def v1_create_server(json_data):
     return created
 
 
+@v1.get("/servers")
+@v1.doc(
+    summary="List servers",
+    description=(
+        "Servers in ``server_number`` order, ``limit`` per page (at most "
+        f"{SERVER_PAGE_MAX}). Pages are keyed, not offset: pass the "
+        "response's ``next_after`` as ``after`` to fetch the next page, so "
+        "the millionth row costs the same as the first. ``operational_status``, "
+        "``boot_status``, ``boot_os`` and ``provision_zone_id`` filter by "
+        "equality."
+    ),
+    tags=["Inventory"],
+)
+@v1.auth_required(auth)
+@v1.input(ServerListQuery, location="query")
+@v1.output(ServerPageOut)
+def v1_list_servers(query_data):
+    after, limit = query_data.pop("after"), query_data.pop("limit")
+    try:
+        # One extra row says whether there is a next page.
+        servers = _plugins().server_data.list_servers(after, limit + 1, **query_data)
+    except NotImplementedError as exc:
+        abort(501, str(exc))
+    more = len(servers) > limit
+    servers = servers[:limit]
+    return {"servers": servers, "next_after": servers[-1]["server_number"] if more else None}
+
+
+# Export lines carry ServerExportOut's fields. Rows are projected onto
+# them directly: a schema dump per row would be most of the export's
+# cost at fleet size, and provider dicts already hold JSON types.
+_EXPORT_FIELDS = tuple(ServerExportOut().fields)
+_CSV_FIELDS = (
+    *(name for name in _EXPORT_FIELDS if name not in ("provision_zone", "switches")),
+    "provision_zone_name",
+    "switches",
+)
+# Servers serialized per chunk written to the client.
+_EXPORT_CHUNK = 500
+
+
+def _export_ndjson(servers):
+    for batch in _batched(servers, _EXPORT_CHUNK):
+        yield "".join(
+            json.dumps({name: server[name] for name in _EXPORT_FIELDS}, separators=(",", ":"))
+            + "\n"
+            for server in batch
+        )
+
+
+def _export_csv(servers):
+    # provision_zone flattens to its name; switches to
+    # ``switch_name:switch_port`` pairs separated by ``;``.
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(_CSV_FIELDS)
+    for batch in _batched(servers, _EXPORT_CHUNK):
+        for server in batch:
+            zone = server["provision_zone"]
+            writer.writerow(
+                (
+                    *(server[name] for name in _CSV_FIELDS[:-2]),
+                    zone["zone_name"] if zone else None,
+                    ";".join(f"{s['switch_name']}:{s['switch_port']}" for s in server["switches"]),
+                )
+            )
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+_EXPORTERS = {
+    "ndjson": (_export_ndjson, "application/x-ndjson"),
+    "csv": (_export_csv, "text/csv"),
+}
+
+
+@v1.post("/servers:lookup")
+@v1.doc(
+    summary="Resolve many identifiers to servers",
+    description=(
+        "For sweeps that would otherwise make one ``/pxe`` call per "
+        "identifier. Send any mix of ``server_numbers``, ``macs`` and "
+        f"``switches`` (``switch_name`` / ``switch_port`` pairs), up to "
+        f"{LOOKUP_MAX} of each. MACs and switch names and ports go through "
+        "the configured formatter first, as ``/pxe`` does. Each list comes "
+        "back in request order with ``found`` and the server (zone and "
+        "switches included), or ``server: null``; ``not_found`` counts the "
+        "misses. The provider resolves each list with a few ``IN (...)`` "
+        "queries rather than one per identifier."
+    ),
+    tags=["Inventory"],
+)
+@v1.auth_required(auth)
+@v1.input(ServerLookupIn)
+@v1.output(ServerLookupOut)
+def v1_lookup_servers(json_data):
+    p = _plugins()
+    macs = {mac: p.formatter.format_mac(mac) for mac in json_data["macs"]}
+    switches = {
+        (s["switch_name"], s["switch_port"]): (
+            p.formatter.format_switch(s["switch_name"]),
+            p.formatter.format_port(s["switch_port"]),
+        )
+        for s in json_data["switches"]
+    }
+    found = p.server_data.lookup_servers(
+        server_numbers=list(dict.fromkeys(json_data["server_numbers"])),
+        macs=list(dict.fromkeys(macs.values())),
+        switches=list(dict.fromkeys(switches.values())),
+    )
+    result = {
+        "server_numbers": [
+            {"server_number": number, "server": found["server_numbers"][number]}
+            for number in json_data["server_numbers"]
+        ],
+        "macs": [{"mac": mac, "server": found["macs"][macs[mac]]} for mac in json_data["macs"]],
+        "switches": [
+            {
+                "switch_name": s["switch_name"],
+                "switch_port": s["switch_port"],
+                "server": found["switches"][switches[s["switch_name"], s["switch_port"]]],
+            }
+            for s in json_data["switches"]
+        ],
+    }
+    entries = [entry for key in ("server_numbers", "macs", "switches") for entry in result[key]]
+    for entry in entries:
+        entry["found"] = entry["server"] is not None
+    result["found"] = sum(entry["found"] for entry in entries)
+    result["not_found"] = len(entries) - result["found"]
+    return result
+
+
+@v1.get("/servers:export")
+@v1.doc(
+    summary="Export every server",
+    description=(
+        "The whole inventory (or the servers matching the same filters as "
+        "``GET /v1/servers``) in ``server_number`` order, streamed as it is "
+        "read from the database. ``format=ndjson`` (default) writes one "
+        "``ServerExportOut`` object per line; ``format=csv`` writes a header "
+        "row, the zone as ``provision_zone_name`` and switches as "
+        "``switch_name:switch_port`` pairs separated by ``;``."
+    ),
+    tags=["Inventory"],
+    responses={
+        200: {
+            "description": "The export",
+            "content": {"application/x-ndjson": {}, "text/csv": {}},
+        },
+        501: {"description": "The provider can't export"},
+    },
+)
+@v1.auth_required(auth)
+@v1.input(ServerExportQuery, location="query")
+def v1_export_servers(query_data):
+    render, mimetype = _EXPORTERS[query_data.pop("format")]
+    try:
+        servers = _plugins().server_data.export_servers(**query_data)
+    except NotImplementedError as exc:
+        abort(501, str(exc))
+    return current_app.response_class(stream_with_context(render(servers)), mimetype=mimetype)
+
+
+@v1.get("/changes")
+@v1.doc(
+    summary="Feed of inventory changes",
+    description=(
+        "Every write through ``/v1`` logs one entry per server it touched, "
+        "numbered by a sequence that only grows. Pass the response's "
+        "``next_since`` as ``since`` to get the entries after it (at most "
+        f"``limit``, up to {CHANGES_PAGE_MAX}), then fetch the servers they "
+        "name -- work in proportion to what changed, not to the fleet. "
+        "With ``wait``, a request that finds nothing new holds on for up "
+        "to that many seconds and returns as soon as a change lands. "
+        "Entries are handed out in ``seq`` order with no gaps behind "
+        "``next_since``: where writers can commit out of order "
+        "(Postgres, MySQL) an entry is held back for the provider's "
+        "commit lag (default 2 seconds) after it first appears, and is "
+        "only guaranteed to show up if its write committed within it."
+    ),
+    tags=["Inventory"],
+    responses={501: {"description": "The provider has no change feed"}},
+)
+@v1.auth_required(auth)
+@v1.input(ChangesQuery, location="query")
+@v1.output(ChangesOut)
+def v1_list_changes(query_data):
+    provider = _plugins().server_data
+    since, limit = query_data["since"], query_data["limit"]
+    try:
+        changes = provider.list_changes(since, limit)
+        if (
+            not changes
+            and query_data["wait"]
+            and provider.wait_for_changes(since, query_data["wait"])
+        ):
+            changes = provider.list_changes(since, limit)
+    except NotImplementedError as exc:
+        abort(501, str(exc))
+    return {"changes": changes, "next_since": changes[-1]["seq"] if changes else since}
+
+
+_NDJSON_MIMETYPES = ("application/x-ndjson", "application/jsonl")
+
+
+def _iter_lines(stream, chunk_size=64 * 1024):
+    """Split a byte stream into lines, reading it in large chunks.
+
+    Iterating the request stream directly reads each line in tiny
+    pieces, which dominates the cost of a big NDJSON upload.
+    """
+    pending = b""
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        yield from lines
+    if pending:
+        yield pending
+
+
+def _bulk_items():
+    """Yield ``(item, parse_error)`` pairs from the request body.
+
+    NDJSON bodies are read line by line off the input stream, so a large
+    upload never sits in memory as one parsed document.
+    """
+    if request.mimetype in _NDJSON_MIMETYPES:
+        for raw in _iter_lines(request.stream):
+            line = raw.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line), None
+            except ValueError as exc:
+                yield None, f"Invalid JSON: {exc}"
+        return
+    body = request.get_json(silent=True)
+    if not isinstance(body, list):
+        abort(400, "Expected a JSON array, or NDJSON with Content-Type: application/x-ndjson.")
+    for item in body:
+        yield item, None
+
+
+def _batched(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _create_server_batch(offset, batch):
+    """Validate and insert one batch; return its per-item results."""
+    results = [{"index": offset + i} for i in range(len(batch))]
+    candidates = []
+    for i, (_, parse_error) in enumerate(batch):
+        if parse_error is None:
+            candidates.append(i)
+        else:
+            results[i].update(status="invalid", errors={"_json": [parse_error]})
+
+    try:
+        loaded = CreateServerIn(many=True).load([batch[i][0] for i in candidates])
+        errors = {}
+    except ValidationError as exc:
+        loaded, errors = exc.valid_data, exc.messages
+    valid = []
+    for pos, i in enumerate(candidates):
+        if pos in errors:
+            results[i].update(status="invalid", errors=errors[pos])
+            server_number = loaded[pos].get("server_number")
+            if server_number is not None:
+                results[i]["server_number"] = server_number
+        else:
+            valid.append((i, loaded[pos]))
+
+    outcomes = _plugins().server_data.create_servers([data for _, data in valid]) if valid else []
+    for (i, data), outcome in zip(valid, outcomes, strict=True):
+        results[i].update(server_number=data["server_number"], status=outcome["status"])
+        if outcome["status"] == "conflict":
+            results[i]["message"] = outcome["message"]
+
+    audit.emit(
+        action="bulk_create_servers",
+        resource="servers",
+        actor=g.get("actor"),
+        before=None,
+        after={
+            "created": [r["server_number"] for r in results if r["status"] == "created"],
+            "conflicts": [r["server_number"] for r in results if r["status"] == "conflict"],
+            "invalid": [r["index"] for r in results if r["status"] == "invalid"],
+        },
+        request_id=g.get("request_id"),
+    )
+    return results
+
+
+@v1.post("/servers:bulk")
+@v1.doc(
+    summary="Register many servers",
+    description=(
+        "Body is a JSON array of ``POST /v1/servers`` payloads, or the same "
+        "objects as NDJSON (``Content-Type: application/x-ndjson``, one per "
+        "line) for large uploads. Items are validated and inserted in "
+        "batches of ``BULK_BATCH_SIZE``, one transaction and one audit "
+        "event per batch. Duplicate server_numbers and invalid items are "
+        "reported per item; they don't abort the rest of the upload."
+    ),
+    responses={
+        200: {"description": "Per-item results"},
+        400: {"description": "Body is neither a JSON array nor NDJSON"},
+    },
+)
+@v1.auth_required(auth)
+@v1.output(BulkCreateServersOut)
+def v1_bulk_create_servers():
+    batch_size = current_app.config["BULK_BATCH_SIZE"]
+    results = []
+    for batch in _batched(_bulk_items(), batch_size):
+        results.extend(_create_server_batch(len(results), batch))
+    return {
+        "created": sum(r["status"] == "created" for r in results),
+        "conflicts": sum(r["status"] == "conflict" for r in results),
+        "invalid": sum(r["status"] == "invalid" for r in results),
+        "results": results,
+    }
+
+
 @v1.post("/servers/<int:server_number>/switches")
 @v1.doc(
     summary="Attach a switch entry to an existing server",
@@ -397,11 +959,53 @@ def v1_add_switch(server_number, json_data):
 # --- App factory ----------------------------------------------------------
 
 
+class _ThreadLoop:
+    """One server thread's event loop, closed once the thread exits and
+    drops its thread-local copy."""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        weakref.finalize(self, self.loop.close).atexit = False
+
+
+_view_loops = threading.local()
+
+
+def _run_on_thread_loop(func):
+    """``Flask.async_to_sync`` replacement for the async views.
+
+    asgiref's default starts a new thread and event loop for every call
+    (~0.4 ms). Each server thread keeps one loop instead, closed when
+    the thread exits, and runs the view on it; a thread already running
+    a loop falls back to asgiref.
+    """
+    fallback = None
+
+    @functools.wraps(func)
+    def run(*args, **kwargs):
+        nonlocal fallback
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            owned = getattr(_view_loops, "owned", None)
+            if owned is None:
+                owned = _view_loops.owned = _ThreadLoop()
+            return owned.loop.run_until_complete(func(*args, **kwargs))
+        if fallback is None:
+            from asgiref.sync import async_to_sync
+
+            fallback = async_to_sync(func)
+        return fallback(*args, **kwargs)
+
+    return run
+
+
 def create_app(config_overrides=None, plugins: Plugins | None = None) -> APIFlask:
     """Build the configured APIFlask app.
 
-    Pass ``plugins`` to inject pre-built plugin instances (used by tests
-    so routes and seeding share the same in-memory plugin state).
+    Plugins are loaded on first use (see :class:`LazyPlugins`). Pass
+    ``plugins`` to inject pre-built plugin instances (used by tests so
+    routes and seeding share the same in-memory plugin state).
     """
     app = APIFlask(
         __name__,
@@ -424,11 +1028,14 @@ def create_app(config_overrides=None, plugins: Plugins | None = None) -> APIFlas
     app.config["TAGS"] = [
         {"name": "Read", "description": "PXE-boot and health endpoints (unauthenticated)."},
         {"name": "Mutate", "description": "Inventory mutations (bearer auth required)."},
+        {"name": "Inventory", "description": "Inventory reads (bearer auth required)."},
     ]
     app.config["SECRET_KEY"] = pigs_config.SECRET_KEY
+    app.config["BULK_BATCH_SIZE"] = pigs_config.BULK_BATCH_SIZE
     if config_overrides:
         app.config.update(config_overrides)
 
+    app.async_to_sync = _run_on_thread_loop
     Bootstrap5(app)
     app.register_blueprint(frontend)
     app.register_blueprint(api)
@@ -440,14 +1047,16 @@ def create_app(config_overrides=None, plugins: Plugins | None = None) -> APIFlas
         # events can be correlated with infra logs; otherwise generate one.
         g.request_id = request.headers.get("X-Request-ID") or str(uuid.uuid4())
 
+    generation = make_generation(pigs_config.PROVIDER_CACHE.get("generation_file"))
     if plugins is None:
-        plugins = Plugins(
-            **{
-                attr: _load_plugin(getattr(pigs_config, config_key))
-                for attr, config_key in _PLUGIN_SPECS.items()
-            }
+        plugins = LazyPlugins(
+            {attr: dict(getattr(pigs_config, key)) for attr, key in _PLUGIN_SPECS.items()},
+            dict(pigs_config.PROVIDER_CACHE),
+            generation,
+            dict(pigs_config.PROVIDER_WRITE_BEHIND),
         )
     app.extensions["steel_pigs"] = plugins
+    app.extensions["steel_pigs.generation"] = generation
     return app
 
 